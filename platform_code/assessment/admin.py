@@ -8,6 +8,7 @@ from assessment.admin_utils.labelling_admin import LabellingAdmin
 from assessment.admin_utils.master_choice_admin import MasterChoiceAdmin
 from assessment.admin_utils.master_element_admin import MasterEvaluationElementAdmin
 from assessment.admin_utils.master_section_admin import MasterSectionAdmin
+from assessment.admin_utils.organisation_export_admin import OrganisationExportAdmin
 from assessment.admin_utils.scoring_import import ScoringAdmin
 from assessment.models import (
     Assessment,
@@ -18,10 +19,12 @@ from assessment.models import (
     EvaluationElementWeight,
     EvaluationScore,
     ExternalLink,
+    Job,
     Labelling,
     MasterChoice,
     MasterEvaluationElement,
     MasterSection,
+    OrganisationExport,
     ScoringSystem,
     Section,
     Upgrade,
@@ -43,3 +46,5 @@ admin.site.register(EvaluationScore)
 admin.site.register(Labelling, LabellingAdmin)
 admin.site.register(Assessment, JsonUploadAssessmentAdmin)
 admin.site.register(ScoringSystem, ScoringAdmin)
+admin.site.register(Job)
+admin.site.register(OrganisationExport, OrganisationExportAdmin)
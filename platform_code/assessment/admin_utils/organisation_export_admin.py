@@ -0,0 +1,47 @@
+import os
+
+from assessment.models import OrganisationExport
+from django.contrib import admin, messages
+from django.http import FileResponse
+from django.template.defaultfilters import slugify
+
+
+class OrganisationExportAdmin(admin.ModelAdmin):
+    """
+    Defines the admin panel for the exports of the results of the organisations
+    """
+
+    actions = ["download_export"]
+    list_display = (
+        "organisation",
+        "status",
+        "progression",
+        "created_by",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status",)
+
+    def progression(self, obj):
+        return f"{obj.get_progression()} %"
+
+    def download_export(self, request, queryset):
+        """
+        Action to download the zip file of the selected export, which must be done
+        """
+        if queryset.count() != 1:
+            self.message_user(request, "Please select one export.", messages.WARNING)
+            return None
+        organisation_export = queryset.get()
+        if organisation_export.status != OrganisationExport.DONE or not os.path.isfile(
+            organisation_export.file_path or ""
+        ):
+            self.message_user(request, "This export is not available.", messages.WARNING)
+            return None
+        return FileResponse(
+            open(organisation_export.file_path, "rb"),
+            as_attachment=True,
+            filename=f"{slugify(organisation_export.organisation.name)}-evaluations.zip",
+        )
+
+    download_export.short_description = "Download the export"
@@ -1,4 +1,5 @@
 from assessment.forms import ScoringSystemForm
+from assessment.rescoring import rescore_assessment
 from django.contrib import admin, messages
 from django.contrib.admin import helpers
 from django.contrib.admin.exceptions import DisallowedModelAdminToField
@@ -27,6 +28,7 @@ class ScoringAdmin(admin.ModelAdmin):
             "widget": PrettyJSONWidget,
         }
     }
+    actions = ["rescore_evaluations"]
 
     def get_form(self, request, obj=None, **kwargs):
         """Get the form which will be displayed"""
@@ -39,6 +41,27 @@ class ScoringAdmin(admin.ModelAdmin):
         fieldsets = super().get_fieldsets(request, obj)
         return fieldsets
 
+    def rescore_evaluations(self, request, queryset):
+        """Calculate again the max points, points and scores of all the evaluations of the assessments"""
+        for assessment in {
+            scoring.assessment for scoring in queryset.select_related("assessment")
+        }:
+            try:
+                count = rescore_assessment(assessment, only_flagged=False)
+                self.message_user(
+                    request,
+                    f"{count} evaluations of the assessment {assessment} have been rescored!",
+                    messages.SUCCESS,
+                )
+            except Exception as e:
+                self.message_user(
+                    request,
+                    f"An error occurred, {e}, when rescoring the evaluations of the assessment "
+                    f"{assessment}",
+                    messages.ERROR,
+                )
+        return redirect(request.path_info)
+
     def _changeform_view(self, request, object_id, form_url, extra_context):
         """
         Just add a try/except when saving the form in case there are issues with the scoring file
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AssessmentConfig(AppConfig):
     name = "assessment"
+
+    def ready(self):
+        # Connect the signal receivers
+        from . import signals  # noqa: F401
@@ -0,0 +1,101 @@
+"""
+Cache of the evaluation element cards rendered in the section page.
+
+A card is cached with a key built from everything it displays which can change: the evaluation element
+(updated_at, status, ticked choices, applicability), the position of the card in the section, the section url,
+the active language, the edit rights of the user, whether the evaluation is editable and the resources of the element liked by the user. The master
+objects (texts, resources, change logs) are in the key through a generation number, renewed by the signals when
+one of them is modified (see assessment/signals.py), which invalidates all the cards at once. The generation is the
+version of the "master_objects" family of home/versioned_cache.py, stored in the database, so it is the same in all
+the containers (the PDF of the results stored by the worker use it too, see assessment/results_pdf_cache.py).
+
+The cards contain csrf tokens, which are specific to the user session: they are rendered with a placeholder,
+replaced by the token of the request each time the card is served.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import get_language
+from home.versioned_cache import get_cache_version, invalidate_cache
+
+CSRF_TOKEN_PLACEHOLDER = "__element_card_csrf_token__"
+
+
+def get_element_card_cache():
+    """
+    Return the cache backend of the element cards (ELEMENT_CARD_CACHE setting, "default" if not set)
+    """
+    return caches[getattr(settings, "ELEMENT_CARD_CACHE", "default")]
+
+
+def get_generation():
+    """
+    Return the current generation of the master objects, shared by all the processes through the database
+    :return: int
+    """
+    return get_cache_version("master_objects")
+
+
+def invalidate_element_cards():
+    """
+    Renew the generation of the master objects, so all the cards cached are invalidated
+    """
+    invalidate_cache("master_objects")
+
+
+def get_element_card_key(
+    element, section_url, position, is_last, user_can_edit, evaluation_is_editable, liked_resource_ids
+):
+    """
+    Build the cache key of the card of the evaluation element
+    :param element: evaluation element, preferably loaded with the evaluation tree
+    :param section_url: url of the section page, used by the forms of the card
+    :param position: position of the card in the section (starting at 1)
+    :param is_last: boolean, True if this is the last card of the section
+    :param user_can_edit: boolean, edit rights of the user on the evaluation
+    :param evaluation_is_editable: boolean, is_editable field of the evaluation (false once labelled)
+    :param liked_resource_ids: set of the ids of the resources liked by the user
+    :return: string
+    """
+    change_log = element.get_element_change_log()
+    state = (
+        get_generation(),
+        element.id,
+        element.updated_at.isoformat(),
+        element.status,
+        tuple((choice.id, choice.is_ticked) for choice in element.choice_set.all()),
+        element.is_applicable(),
+        change_log.updated_at.isoformat() if change_log is not None else None,
+        section_url,
+        position,
+        is_last,
+        get_language(),
+        user_can_edit,
+        evaluation_is_editable,
+        tuple(
+            sorted(
+                resource.id
+                for resource in element.master_evaluation_element.external_links.all()
+                if resource.id in liked_resource_ids
+            )
+        ),
+    )
+    return "element_card." + hashlib.md5(repr(state).encode()).hexdigest()
+
+
+def get_cached_card(key):
+    """
+    Return the card cached with this key (with the csrf token placeholder), else None
+    """
+    return get_element_card_cache().get(key)
+
+
+def set_cached_card(key, card):
+    """
+    Cache the card for ELEMENT_CARD_CACHE_TIMEOUT seconds
+    """
+    get_element_card_cache().set(
+        key, card, getattr(settings, "ELEMENT_CARD_CACHE_TIMEOUT", 3600)
+    )
@@ -1,10 +1,7 @@
 from assessment.models import Choice
-from assessment.utils import markdownify_bold, markdownify_italic, select_label_choice
 from ckeditor.widgets import CKEditorWidget
 from django import forms
 from django.forms import ModelForm, widgets
-from django.forms.renderers import get_default_renderer
-from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
 
@@ -113,27 +110,15 @@ class ChoiceForm(ModelForm):
 
 class MarkdownifyRadioChoices(widgets.RadioSelect):
     """
-    Format the choices of the evaluation elements in order to transform markdown symbols into html tags
+    Radio widget of the choices of the evaluation elements. The markdown symbols of the labels are already
+    transformed into html tags, the labels being the html of the master choices rendered when they are saved
+    (see MasterChoice.answer_text_label)
     """
 
-    def _render(self, template_name, context, renderer=None):
-        if renderer is None:
-            renderer = get_default_renderer()
-        text = renderer.render(template_name, context)
-        for value in select_label_choice(renderer.render(template_name, context)):
-            text = text.replace(value, markdownify_italic(markdownify_bold(value)))
-        return mark_safe(text)
-
 
 class MarkdownifyMultiselectChoices(forms.CheckboxSelectMultiple):
     """
-    Format the choices of the evaluation elements in order to transform markdown symbols into html tags
+    Checkbox widget of the choices of the evaluation elements. The markdown symbols of the labels are already
+    transformed into html tags, the labels being the html of the master choices rendered when they are saved
+    (see MasterChoice.answer_text_label)
     """
-
-    def _render(self, template_name, context, renderer=None):
-        if renderer is None:
-            renderer = get_default_renderer()
-        text = renderer.render(template_name, context)
-        for value in select_label_choice(renderer.render(template_name, context)):
-            text = text.replace(value, markdownify_italic(markdownify_bold(value)))
-        return mark_safe(text)
@@ -1,5 +1,5 @@
 from assessment.models import Choice, Section
-from assessment.utils import remove_markdown_bold, remove_markdownify_italic
+from assessment.models.evaluation_element import get_choice_order_key
 from django import forms
 from django.forms import ModelForm, widgets
 from django.utils.safestring import mark_safe
@@ -25,8 +25,8 @@ class ResultsForm(ModelForm):
         if evaluation_element.master_evaluation_element.question_type == "radio":
             choices_tuple = evaluation_element.get_choices_as_tuple()
             # list of all the choices for this evaluation element
-            list_choices = list(
-                evaluation_element.choice_set.all().order_by("master_choice__order_id")
+            list_choices = sorted(
+                evaluation_element.choice_set.all(), key=get_choice_order_key
             )
             question = forms.ChoiceField(
                 label="",
@@ -162,9 +162,7 @@ class RadioResultsWidget(widgets.CheckboxSelectMultiple):
                     + "_"
                     + str(order_choice)
                     + '" >'
-                    + remove_markdown_bold(
-                        remove_markdownify_italic(choice.master_choice.answer_text)
-                    )
+                    + choice.master_choice.get_answer_text_plain()
                     + "</label></li>"
                 )
             else:
@@ -176,9 +174,7 @@ class RadioResultsWidget(widgets.CheckboxSelectMultiple):
                     + "_"
                     + str(order_choice)
                     + '" >'
-                    + remove_markdown_bold(
-                        remove_markdownify_italic(choice.master_choice.answer_text)
-                    )
+                    + choice.master_choice.get_answer_text_plain()
                     + "</label></li>"
                 )
 
@@ -206,9 +202,7 @@ class CheckboxResultsWidget(widgets.RadioSelect):
                     + "_"
                     + str(order_choice)
                     + '" >'
-                    + remove_markdown_bold(
-                        remove_markdownify_italic(choice.master_choice.answer_text)
-                    )
+                    + choice.master_choice.get_answer_text_plain()
                     + "</label></li>"
                 )
             else:
@@ -220,9 +214,7 @@ class CheckboxResultsWidget(widgets.RadioSelect):
                     + "_"
                     + str(order_choice)
                     + '" >'
-                    + remove_markdown_bold(
-                        remove_markdownify_italic(choice.master_choice.answer_text)
-                    )
+                    + choice.master_choice.get_answer_text_plain()
                     + "</label></li>"
                 )
 
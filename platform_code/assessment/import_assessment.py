@@ -1,6 +1,7 @@
 import re
 
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
+from django.db import transaction
 
 from .models import (
     Assessment,
@@ -46,7 +47,12 @@ class ImportAssessment:
             self.message = f" Error: {e}."
             self.success = False
 
+    @transaction.atomic
     def process_import(self):
+        """
+        Create the objects of the assessment in one transaction, so the versions of the caches depending on the
+        master objects are renewed once for the import and not at each object saved (see home/versioned_cache.py)
+        """
         self.assessment = self.create_assessment()
         # In case we need to create the scoring system
         scoring_system_dic = {}
@@ -0,0 +1,137 @@
+"""
+Background job runner, with the database as queue, so no broker is needed.
+
+The jobs are created in the requests with enqueue_job and run by the run_jobs command (see
+assessment/management/commands/run_jobs.py), which can be run by several workers at once: each job is taken
+in a transaction with a row lock skipping the jobs already taken. A job can be delayed, to run it once after a
+series of changes, and a failed job is retried after a delay doubled at each attempt.
+The handlers of the jobs are registered in JOB_HANDLERS with their dotted path, so they are imported only by the
+workers.
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from home.monitoring_events import flush_events
+from home.versioned_cache import reset_cache_versions
+from sentry_sdk import capture_message
+
+from .models import Job
+
+logger = logging.getLogger("monitoring")
+
+# Name of the jobs and dotted path of their handler, which is called with the payload of the job as keyword arguments
+JOB_HANDLERS = {
+    "prerender_evaluation_results": "assessment.results_prerendering.prerender_evaluation_results",
+    "export_organisation_results": "assessment.organisation_export.export_organisation_results",
+    "rollup_stats": "home.stats_rollup.rollup_stats",
+    "purge_monitoring": "home.monitoring_events.purge_monitoring",
+}
+
+
+def enqueue_job(name, delay=0, **payload):
+    """
+    Create a pending job run in delay seconds, unless the same job (same name and payload) is already pending, as
+    it is not run yet. The pending job is then postponed to the end of the new delay, so a job enqueued at each
+    change of an object (e.g. each answer saved) is run once, when the changes stop.
+    :param name: string, key of JOB_HANDLERS
+    :param delay: number of seconds before the job can be run
+    :param payload: keyword arguments of the handler, serializable in json
+    :return: job
+    """
+    if name not in JOB_HANDLERS:
+        raise KeyError(
+            f"The job {name} is not registered, available jobs: {JOB_HANDLERS.keys()}"
+        )
+    run_after = timezone.now() + timedelta(seconds=delay)
+    job = Job.objects.filter(name=name, payload=payload, status=Job.PENDING).first()
+    if job is None:
+        job = Job.objects.create(name=name, payload=payload, run_after=run_after)
+    elif job.run_after < run_after:
+        # The job is only postponed if it has not been taken by a worker meanwhile
+        Job.objects.filter(id=job.id, status=Job.PENDING).update(run_after=run_after)
+        job.run_after = run_after
+    return job
+
+
+def take_next_job():
+    """
+    Take the pending job to run first, once its run_after date is passed, or a running job whose worker has not
+    finished it after JOB_TIMEOUT seconds (the worker has been stopped), and set it running.
+    :return: job or None if there is no job to run
+    """
+    timeout = getattr(settings, "JOB_TIMEOUT", 600)
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Job.PENDING, run_after__lte=now)
+                | Q(
+                    status=Job.RUNNING,
+                    started_at__lt=now - timedelta(seconds=timeout),
+                )
+            )
+            .order_by("run_after", "id")
+            .first()
+        )
+        if job is not None:
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.started_at = timezone.now()
+            job.save(update_fields=["status", "attempts", "started_at"])
+    return job
+
+
+def run_job(job):
+    """
+    Run the handler of the job. The job is deleted if it succeeds, else it is pending again to be retried after
+    JOB_RETRY_DELAY seconds doubled at each attempt, or failed if it has been attempted JOB_MAX_ATTEMPTS times.
+    :param job: job taken by take_next_job
+    :return: boolean, True if the job succeeded
+    """
+    # The values cached may have been invalidated by the web server since the previous job
+    reset_cache_versions()
+    try:
+        handler = import_string(JOB_HANDLERS[job.name])
+        handler(**job.payload)
+    except Exception as e:
+        job.error = traceback.format_exc()
+        if job.attempts < getattr(settings, "JOB_MAX_ATTEMPTS", 3):
+            job.status = Job.PENDING
+            retry_delay = getattr(settings, "JOB_RETRY_DELAY", 60) * 2 ** (job.attempts - 1)
+            job.run_after = timezone.now() + timedelta(seconds=retry_delay)
+        else:
+            job.status = Job.FAILED
+            capture_message(f"[job_failed] The job {job.name} (id {job.id}) failed, error {e}")
+        job.save(update_fields=["status", "error", "run_after"])
+        logger.warning(
+            f"[job_error] The job {job.name} (id {job.id}) failed at the attempt {job.attempts}, error {e}"
+        )
+        return False
+    job.delete()
+    return True
+
+
+def run_pending_jobs(max_jobs=None):
+    """
+    Run the jobs until there is no job to run, or max_jobs jobs have been run
+    :param max_jobs: int or None
+    :return: number of jobs run (succeeded or not)
+    """
+    count = 0
+    while max_jobs is None or count < max_jobs:
+        job = take_next_job()
+        if job is None:
+            break
+        run_job(job)
+        # The monitoring events logged by the job are saved as at the end of a request
+        flush_events()
+        count += 1
+    return count
@@ -0,0 +1,65 @@
+from assessment.element_card_cache import invalidate_element_cards
+from assessment.models import MasterChoice, MasterEvaluationElement
+from assessment.models.assessment import get_available_languages
+from assessment.utils import set_rendered_fields
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the texts of the master evaluation elements and master choices, as done when they are saved. "
+        "By default, only the master objects with texts not rendered yet are processed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Render the texts of all the master objects, after a change of the rendering",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of master objects rendered and saved at once",
+        )
+
+    def handle(self, *args, **options):
+        languages = get_available_languages()
+        for model in (MasterEvaluationElement, MasterChoice):
+            field_list = [
+                f"{rendered_field}_{language}"
+                for rendered_field in model.RENDERED_FIELDS
+                for language in languages
+            ]
+            object_list = model.objects.order_by("id")
+            if not options["all"]:
+                not_rendered = Q()
+                for field in field_list:
+                    not_rendered |= Q(**{f"{field}__isnull": True})
+                object_list = object_list.filter(not_rendered)
+
+            count = 0
+            chunk = []
+            for obj in object_list.iterator(chunk_size=options["chunk_size"]):
+                set_rendered_fields(obj, model.RENDERED_FIELDS, languages)
+                chunk.append(obj)
+                if len(chunk) == options["chunk_size"]:
+                    count += self.save_chunk(model, chunk, field_list)
+            count += self.save_chunk(model, chunk, field_list)
+            self.stdout.write(f"{model.__name__}: {count} objects rendered")
+        # The cards of the section page display the rendered texts
+        invalidate_element_cards()
+
+    @staticmethod
+    def save_chunk(model, chunk, field_list):
+        """
+        Save the rendered fields of the objects of the chunk, without sending the save signals which would
+        invalidate the caches for each object, and empty the chunk
+        :return: int, number of objects saved
+        """
+        model.objects.bulk_update(chunk, field_list)
+        count = len(chunk)
+        chunk.clear()
+        return count
@@ -0,0 +1,47 @@
+from assessment.models import Assessment
+from assessment.rescoring import rescore_assessment
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Calculate again the max points, the points and the score of the evaluations after a change of the "
+        "scoring system or of the evaluation element weight. By default, only the evaluations flagged with "
+        "need_to_set_max_points are processed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--assessment",
+            dest="versions",
+            action="append",
+            help="Version of the assessment to process, can be repeated. By default all the assessments",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Process all the evaluations, not only the ones flagged",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of evaluations processed and saved at once",
+        )
+
+    def handle(self, *args, **options):
+        assessment_list = Assessment.objects.all().order_by("created_at")
+        if options["versions"]:
+            assessment_list = assessment_list.filter(version__in=options["versions"])
+            if not assessment_list:
+                raise CommandError(f"No assessment with the versions {options['versions']}")
+
+        for assessment in assessment_list:
+            count = rescore_assessment(
+                assessment,
+                only_flagged=not options["all"],
+                chunk_size=options["chunk_size"],
+            )
+            self.stdout.write(
+                f"Assessment V{assessment.version}: {count} evaluations rescored"
+            )
@@ -0,0 +1,51 @@
+import time
+
+from assessment.jobs import run_pending_jobs
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the background jobs (prerendering of the results of the evaluations). By default, the worker "
+        "waits for new jobs until it is stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the pending jobs then stop",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=getattr(settings, "JOB_WORKER_SLEEP", 5),
+            help="Number of seconds to wait when there is no job to run",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=None,
+            help="Number of jobs run before stopping. By default no limit",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while options["max_jobs"] is None or total < options["max_jobs"]:
+                max_jobs = (
+                    options["max_jobs"] - total if options["max_jobs"] is not None else None
+                )
+                count = run_pending_jobs(max_jobs=max_jobs)
+                total += count
+                if options["once"]:
+                    break
+                if not count:
+                    time.sleep(options["sleep"])
+                    # The connection may have been closed by the database while the worker was waiting
+                    close_old_connections()
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"{total} jobs run")
@@ -0,0 +1,84 @@
+# Generated by Django 3.2.7 on 2026-10-18 09:13
+
+from django.db import migrations, models
+
+
+def set_progression_counters(apps, schema_editor):
+    """
+    Set the counters of the existing sections and evaluations, as done by Section.set_progression and
+    Evaluation.set_finished
+    """
+    Evaluation = apps.get_model('assessment', 'Evaluation')
+    Section = apps.get_model('assessment', 'Section')
+    EvaluationElement = apps.get_model('assessment', 'EvaluationElement')
+    Choice = apps.get_model('assessment', 'Choice')
+
+    # The evaluation elements are not applicable if the choice they depend on is ticked
+    choices_ticked = set(
+        Choice.objects.filter(is_ticked=True).values_list(
+            'evaluation_element__section__evaluation_id', 'master_choice_id'
+        )
+    )
+    section_counters = {}
+    for section_id, evaluation_id, status, depends_on_id in EvaluationElement.objects.values_list(
+        'section_id', 'section__evaluation_id', 'status', 'master_evaluation_element__depends_on_id'
+    ):
+        counters = section_counters.setdefault(section_id, [0, 0])
+        counters[0] += 1
+        if status or (evaluation_id, depends_on_id) in choices_ticked:
+            counters[1] += 1
+
+    section_list = list(Section.objects.all())
+    evaluation_counters = {}
+    for section in section_list:
+        section.nb_elements, section.nb_elements_done = section_counters.get(section.id, [0, 0])
+        counters = evaluation_counters.setdefault(section.evaluation_id, [0, 0, 0])
+        counters[0] += 1
+        counters[1] += int(section.user_progression >= 100)
+        counters[2] += section.points
+    Section.objects.bulk_update(section_list, ['nb_elements', 'nb_elements_done'], batch_size=1000)
+
+    evaluation_list = list(Evaluation.objects.all())
+    for evaluation in evaluation_list:
+        evaluation.nb_sections, evaluation.nb_sections_done, evaluation.points = evaluation_counters.get(
+            evaluation.id, [0, 0, 0]
+        )
+    Evaluation.objects.bulk_update(
+        evaluation_list, ['nb_sections', 'nb_sections_done', 'points'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0011_evaluationelement_is_in_action_plan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluation',
+            name='nb_sections',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='evaluation',
+            name='nb_sections_done',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='evaluation',
+            name='points',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='nb_elements',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='nb_elements_done',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(set_progression_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 3.2.7 on 2026-10-18 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0012_progression_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='masterchoice',
+            name='answer_text_html',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterchoice',
+            name='answer_text_html_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterchoice',
+            name='answer_text_html_fr',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterchoice',
+            name='answer_text_label',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterchoice',
+            name='answer_text_label_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterchoice',
+            name='answer_text_label_fr',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterchoice',
+            name='answer_text_plain',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterchoice',
+            name='answer_text_plain_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterchoice',
+            name='answer_text_plain_fr',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterevaluationelement',
+            name='explanation_text_html',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterevaluationelement',
+            name='explanation_text_html_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterevaluationelement',
+            name='explanation_text_html_fr',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterevaluationelement',
+            name='name_html',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterevaluationelement',
+            name='name_html_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterevaluationelement',
+            name='name_html_fr',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterevaluationelement',
+            name='question_text_html',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterevaluationelement',
+            name='question_text_html_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='masterevaluationelement',
+            name='question_text_html_fr',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+    ]
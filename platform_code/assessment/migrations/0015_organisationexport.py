@@ -0,0 +1,32 @@
+# Generated by Django 3.2.7 on 2026-10-18 11:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('home', '0010_unique_membership'),
+        ('assessment', '0014_background_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganisationExport',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], default='pending', max_length=20)),
+                ('nb_evaluations', models.IntegerField(default=0)),
+                ('nb_evaluations_done', models.IntegerField(default=0)),
+                ('file_path', models.CharField(blank=True, max_length=500, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('organisation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='home.organisation')),
+            ],
+        ),
+    ]
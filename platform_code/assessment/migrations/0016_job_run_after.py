@@ -0,0 +1,27 @@
+# Generated by Django 3.2.7 on 2026-10-18 16:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0015_organisationexport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='run_after',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_status_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ),
+    ]
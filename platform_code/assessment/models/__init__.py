@@ -6,7 +6,9 @@ from .evaluation_element import EvaluationElement, MasterEvaluationElement
 from .evaluation_element_weight import EvaluationElementWeight
 from .evaluation_score import EvaluationScore
 from .external_link import ExternalLink
+from .job import Job
 from .labelling import Labelling
+from .organisation_export import OrganisationExport
 from .scoring_system import ScoringSystem
 from .section import MasterSection, Section
 from .upgrade import Upgrade
@@ -24,7 +26,9 @@ __all__ = [
     "EvaluationElementWeight",
     "EvaluationScore",
     "ExternalLink",
+    "Job",
     "Labelling",
+    "OrganisationExport",
     "ScoringSystem",
     "MasterSection",
     "Section",
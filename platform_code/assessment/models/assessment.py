@@ -3,6 +3,9 @@ import itertools
 from django.conf import settings
 from django.db import models
 
+from .assessment_registry import get_assessment_registry
+from .translation_completeness import get_translation_completeness
+
 # Define as a constant as issue ith circular imports
 # Do not register 'risk_domain' field of MasterEvaluationElement
 TRANSLATED_FIELDS = {
@@ -15,12 +18,11 @@ TRANSLATED_FIELDS = {
 
 
 def get_last_assessment_created():
-    """Get the last assessment created - If no assessment in DB, returns None"""
-
-    if len(list(Assessment.objects.all().order_by("-created_at"))) > 0:
-        return list(Assessment.objects.all().order_by("-created_at"))[0]
-    else:
-        return None
+    """
+    Get the last assessment created - If no assessment in DB, returns None
+    It is read from the assessment registry cached in the process
+    """
+    return get_assessment_registry().latest()
 
 
 class Assessment(models.Model):
@@ -81,13 +83,10 @@ class Assessment(models.Model):
     def get_the_available_languages(self):
         """
         This method returns the list of the languages for the assessment, based on those
-        which are registered in the settings
+        which are registered in the settings.
+        It is read from the translation completeness of the assessment, cached in the process
         """
-        language_list = []
-        for language in get_available_languages():
-            if self.check_has_language(language):
-                language_list.append(language)
-        return language_list
+        return list(get_translation_completeness(self.id).available_languages)
 
     def check_has_language(self, language):
         """
@@ -96,33 +95,7 @@ class Assessment(models.Model):
         for the language.
         Returns True if all the fields are not None, else False
         """
-        dic = TRANSLATED_FIELDS
-        # For all the fields which have a translation in the Assessment class, check if they are not None
-        for field in dic["assessment"]:
-            if not getattr(self, field + "_" + language):
-                return False
-        # Check that all the fields of MasterSection which are registered to have a translation,
-        # are not None for the language
-        for master_section in self.mastersection_set.all():
-            for field in dic["master_section"]:
-                if not getattr(master_section, field + "_" + language):
-                    return False
-            for master_evaluation_element in master_section.masterevaluationelement_set.all():
-                for field in dic["master_evaluation_element"]:
-                    if (
-                        not getattr(master_evaluation_element, field + "_" + language)
-                        and master_evaluation_element.get_numbering() != "2.2"
-                    ):
-                        return False
-                for master_choice in master_evaluation_element.masterchoice_set.all():
-                    for field in dic["master_choice"]:
-                        if not getattr(master_choice, field + "_" + language):
-                            return False
-                for external_link in master_evaluation_element.external_links.all():
-                    for field in dic["external_link"]:
-                        if not getattr(external_link, field + "_" + language):
-                            return False
-        return True
+        return get_translation_completeness(self.id).has_language(language)
 
     def get_fields_not_translated(self, language):
         """
@@ -131,34 +104,7 @@ class Assessment(models.Model):
         for the language. If they are, it is added to the dic_fields, with the obj as key and the field as value.
         The dic is then returned.
         """
-        dic_fields = {}
-        dic = TRANSLATED_FIELDS
-        # For all the fields which have a translation in the Assessment class, check if they are not None
-        for field in dic["assessment"]:
-            if not getattr(self, field + "_" + language):
-                dic_fields[self] = field + "_" + language
-        # Check that all the fields of MasterSection which are registered to have a translation,
-        # are not None for the language
-        for master_section in self.mastersection_set.all():
-            for field in dic["master_section"]:
-                if not getattr(master_section, field + "_" + language):
-                    dic_fields[master_section] = field + "_" + language
-            for master_evaluation_element in master_section.masterevaluationelement_set.all():
-                for field in dic["master_evaluation_element"]:
-                    if (
-                        not getattr(master_evaluation_element, field + "_" + language)
-                        and master_evaluation_element.get_numbering() != "2.2"
-                    ):
-                        dic_fields[master_evaluation_element] = field + "_" + language
-                for master_choice in master_evaluation_element.masterchoice_set.all():
-                    for field in dic["master_choice"]:
-                        if not getattr(master_choice, field + "_" + language):
-                            dic_fields[master_choice] = field + "_" + language
-                for external_link in master_evaluation_element.external_links.all():
-                    for field in dic["external_link"]:
-                        if not getattr(external_link, field + "_" + language):
-                            dic_fields[external_link] = field + "_" + language
-        return dic_fields
+        return get_translation_completeness(self.id).get_fields_not_translated(language)
 
     def delete_language(self, language):
         """
@@ -167,8 +113,9 @@ class Assessment(models.Model):
         Requires that there are at least 2 languages for the assessment.
         """
         # The assessment needs at least to contain the field "name" in the language
-        if language in self.get_the_available_languages():
-            if len(self.get_the_available_languages()) > 1:
+        available_languages = self.get_the_available_languages()
+        if language in available_languages:
+            if len(available_languages) > 1:
                 self.clean_assessment_language(language)
             else:
                 raise ValueError(
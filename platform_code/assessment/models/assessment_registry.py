@@ -0,0 +1,88 @@
+from django.apps import apps
+from home.versioned_cache import get_cached_value, invalidate_cache
+
+
+class AssessmentRegistry:
+    """
+    The assessment registry holds the versions of the assessments imported on the platform, loaded with one query:
+        - the latest assessment, which is the last one created (the new evaluations are created with it)
+        - the versions of the assessments, parsed as floats and ordered
+        - the chain of the previous versions of each version
+
+    The assessments are imported a few times a year, so the registry is cached (see get_assessment_registry). It
+    is invalidated when an assessment is saved or deleted (see assessment/signals.py).
+    """
+
+    def __init__(self):
+        # The model is got from the registry as the module of the assessments uses the registry
+        Assessment = apps.get_model("assessment", "Assessment")
+        assessment_list = list(Assessment.objects.order_by("created_at", "id"))
+
+        self.latest_assessment = assessment_list[-1] if assessment_list else None
+        self.latest_version = (
+            float(self.latest_assessment.version) if self.latest_assessment else None
+        )
+        self.versions = {assessment.id: assessment.version for assessment in assessment_list}
+        self.ordered_versions = tuple(
+            sorted(float(assessment.version) for assessment in assessment_list)
+        )
+        self.previous_versions = {
+            assessment.version: self.versions.get(assessment.previous_assessment_id)
+            for assessment in assessment_list
+        }
+
+    def latest(self):
+        """
+        Get the latest assessment, else None if there is no assessment
+        :return: assessment or None
+        """
+        return self.latest_assessment
+
+    def is_upgradable(self, version):
+        """
+        True if there is an assessment with a version more recent than this version
+        :param version: string or float
+        :return: boolean
+        """
+        if self.latest_version is None:
+            return False
+        return float(version) < self.latest_version
+
+    def get_version(self, assessment_id):
+        """
+        Get the version of the assessment with this id, else None
+        :param assessment_id: int
+        :return: string or None
+        """
+        return self.versions.get(assessment_id)
+
+    def get_previous_versions(self, version):
+        """
+        Get the chain of the previous versions of the version, from the closest to the oldest
+        :param version: string
+        :return: list of strings
+        """
+        previous_versions = []
+        previous_version = self.previous_versions.get(version)
+        while previous_version is not None and previous_version not in previous_versions:
+            previous_versions.append(previous_version)
+            previous_version = self.previous_versions.get(previous_version)
+        return previous_versions
+
+
+def get_assessment_registry():
+    """
+    Return the assessment registry from the cache (see home/versioned_cache.py), else it is loaded and cached.
+    A registry loaded inside a transaction is not cached, as the assessments it contains may be rolled back.
+    :return: AssessmentRegistry
+    """
+    return get_cached_value(
+        "assessment_registry", "registry", AssessmentRegistry, cache_in_transaction=False
+    )
+
+
+def invalidate_assessment_registry():
+    """
+    Remove the assessment registry from the cache of all the processes
+    """
+    invalidate_cache("assessment_registry")
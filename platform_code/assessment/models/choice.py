@@ -1,7 +1,16 @@
 import re
 
+from assessment.utils import (
+    get_rendered_field,
+    render_choice_label,
+    render_choice_plain,
+    render_markdown,
+    set_rendered_fields,
+)
 from django.db import models
 
+from .assessment import get_available_languages
+from .condition_index import get_condition_index_of_master_choice
 from .evaluation_element import EvaluationElement, MasterEvaluationElement
 
 
@@ -20,9 +29,21 @@ class MasterChoice(models.Model):
     order_id = models.CharField(blank=True, null=True, max_length=200)  # can be letters
     # When a master choice can disable the other master choices of the evaluation element, it is set to True
     is_concerned_switch = models.BooleanField(default=False)
+    # Versions of the answer text rendered for each language when the object is saved: the sanitized html of the
+    # markdown, the label of the choice forms and the text without markdown of the results page
+    answer_text_html = models.TextField(blank=True, null=True, editable=False)
+    answer_text_label = models.TextField(blank=True, null=True, editable=False)
+    answer_text_plain = models.TextField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Rendered fields with their source field and render function
+    RENDERED_FIELDS = {
+        "answer_text_html": ("answer_text", render_markdown),
+        "answer_text_label": ("answer_text", render_choice_label),
+        "answer_text_plain": ("answer_text", render_choice_plain),
+    }
+
     def __str__(self):
         if self.get_numbering() and self.answer_text:
             return f"Master choice {self.get_numbering()} {self.answer_text}"
@@ -31,6 +52,26 @@ class MasterChoice(models.Model):
         else:
             return f"Master choice (id {str(self.pk)})"
 
+    def save(self, *args, **kwargs):
+        set_rendered_fields(self, self.RENDERED_FIELDS, get_available_languages())
+        super().save(*args, **kwargs)
+
+    def get_answer_text_html(self):
+        """Html of the answer text in the active language"""
+        return get_rendered_field(self, "answer_text_html", "answer_text", render_markdown)
+
+    def get_answer_text_label(self):
+        """Label of the answer text in the active language, used by the choice forms"""
+        return get_rendered_field(
+            self, "answer_text_label", "answer_text", render_choice_label
+        )
+
+    def get_answer_text_plain(self):
+        """Answer text without markdown in the active language, used by the results page"""
+        return get_rendered_field(
+            self, "answer_text_plain", "answer_text", render_choice_plain
+        )
+
     def get_numbering(self):
         """
         Get the numbering of the master choice, like 1.2.a for the section 1, evaluation element 2 and choice a
@@ -140,16 +181,13 @@ class Choice(models.Model):
         the list of evaluation_element depending on this choice
         :returns list
         """
-        evaluation_id = self.get_evaluation_id()
-        list_element = []
-        list_master_element = self.master_choice.conditioned_by.all()
-        for master_element in list_master_element:
-            element = EvaluationElement.objects.get(
-                section__evaluation__id=evaluation_id,
-                master_evaluation_element=master_element,
-            )
-            list_element.append(element)
-        return list_element
+        condition_index = get_condition_index_of_master_choice(self.master_choice_id)
+        master_element_ids = condition_index.get_master_elements_conditioned_by(
+            self.master_choice_id
+        )
+        if not master_element_ids:
+            return []
+        return self.evaluation_element.get_evaluation_elements(master_element_ids)
 
     def has_element_conditioned_on(self):
         """
@@ -157,10 +195,8 @@ class Choice(models.Model):
         True if this choice has evaluation elements which depends on, else False
         :returns: boolean
         """
-        if self.get_list_element_depending_on():
-            return True
-        else:
-            return False
+        condition_index = get_condition_index_of_master_choice(self.master_choice_id)
+        return bool(condition_index.get_master_elements_conditioned_by(self.master_choice_id))
 
     def has_condition_on(self):
         """
@@ -170,12 +206,13 @@ class Choice(models.Model):
         A choice setting conditions on other choices returns False value
         :return: boolean
         """
-
-        master_evaluation_element = self.master_choice.master_evaluation_element
-        for master_choice in master_evaluation_element.masterchoice_set.all():
-            if master_choice.is_concerned_switch and master_choice != self.master_choice:
-                return True
-        return False
+        condition_index = get_condition_index_of_master_choice(self.master_choice_id)
+        return any(
+            master_choice_id != self.master_choice_id
+            for master_choice_id in condition_index.get_switch_master_choices(
+                condition_index.get_master_element_of_choice(self.master_choice_id)
+            )
+        )
 
     def get_choice_depending_on(self):
         """
@@ -0,0 +1,275 @@
+from types import MappingProxyType
+
+from django.apps import apps
+from home.versioned_cache import get_cached_value, invalidate_cache
+
+# Id maps of the evaluations, with the evaluation ids as keys
+_EVALUATION_ID_MAPS = {}
+# Max number of evaluation id maps kept in the process, the oldest ones are removed first
+EVALUATION_ID_MAPS_MAX_SIZE = 500
+
+
+class ConditionIndex:
+    """
+    The condition index is the immutable graph of the conditions of an assessment, indexed by master object ids:
+        - conditions inter evaluation elements: the master choice each master evaluation element depends on and,
+        reversed, the master evaluation elements conditioned by each master choice
+        - conditions intra evaluation element: the master choice setting conditions on the other master choices
+        of its master evaluation element (is_concerned_switch)
+
+    The master objects of an assessment do not change once imported, so the index is built with two queries and
+    cached (see get_condition_index). It is invalidated when a master choice or a master evaluation element is
+    saved or deleted (see assessment/signals.py). The index is shared by the threads and must not be modified.
+    """
+
+    def __init__(self, assessment_id):
+        self.assessment_id = assessment_id
+
+        # The master models are got from the registry as the modules of the master objects use the index
+        MasterChoice = apps.get_model("assessment", "MasterChoice")
+        MasterEvaluationElement = apps.get_model("assessment", "MasterEvaluationElement")
+
+        depends_on = {}
+        conditioned_by = {}
+        for master_element_id, depends_on_id in (
+            MasterEvaluationElement.objects.filter(master_section__assessment_id=assessment_id)
+            .order_by("id")
+            .values_list("id", "depends_on_id")
+        ):
+            if depends_on_id is not None:
+                depends_on[master_element_id] = depends_on_id
+                conditioned_by.setdefault(depends_on_id, []).append(master_element_id)
+
+        element_of_choice = {}
+        choices_of_element = {}
+        switch_choices = {}
+        for master_choice_id, master_element_id, is_concerned_switch in (
+            MasterChoice.objects.filter(
+                master_evaluation_element__master_section__assessment_id=assessment_id
+            )
+            .order_by("id")
+            .values_list("id", "master_evaluation_element_id", "is_concerned_switch")
+        ):
+            element_of_choice[master_choice_id] = master_element_id
+            choices_of_element.setdefault(master_element_id, []).append(master_choice_id)
+            if is_concerned_switch:
+                switch_choices.setdefault(master_element_id, []).append(master_choice_id)
+
+        self.depends_on = depends_on
+        self.conditioned_by = {key: tuple(value) for key, value in conditioned_by.items()}
+        self.element_of_choice = element_of_choice
+        self.choices_of_element = {key: tuple(value) for key, value in choices_of_element.items()}
+        self.switch_choices = {key: tuple(value) for key, value in switch_choices.items()}
+
+    def get_master_choice_depending_on(self, master_element_id):
+        """
+        Get the id of the master choice the master evaluation element depends on (condition inter), else None
+        :param master_element_id: int
+        :return: int or None
+        """
+        return self.depends_on.get(master_element_id)
+
+    def get_master_elements_conditioned_by(self, master_choice_id):
+        """
+        Get the ids of the master evaluation elements depending on the master choice (condition inter)
+        :param master_choice_id: int
+        :return: tuple
+        """
+        return self.conditioned_by.get(master_choice_id, ())
+
+    def get_master_elements_conditioned_by_element(self, master_element_id):
+        """
+        Get the ids of the master evaluation elements depending on the master choices of the master evaluation
+        element (condition inter)
+        :param master_element_id: int
+        :return: list
+        """
+        return [
+            conditioned_master_element_id
+            for master_choice_id in self.choices_of_element.get(master_element_id, ())
+            for conditioned_master_element_id in self.get_master_elements_conditioned_by(
+                master_choice_id
+            )
+        ]
+
+    def get_master_choice_setting_conditions(self, master_element_id):
+        """
+        Get the id of the first master choice of the master evaluation element setting conditions on other
+        master evaluation elements, else None
+        :param master_element_id: int
+        :return: int or None
+        """
+        for master_choice_id in self.choices_of_element.get(master_element_id, ()):
+            if master_choice_id in self.conditioned_by:
+                return master_choice_id
+        return None
+
+    def get_switch_master_choices(self, master_element_id):
+        """
+        Get the ids of the master choices setting conditions on the other master choices of the master evaluation
+        element (condition intra)
+        :param master_element_id: int
+        :return: tuple
+        """
+        return self.switch_choices.get(master_element_id, ())
+
+    def get_switch_master_choice(self, master_element_id):
+        """
+        Get the id of the first master choice setting conditions on the other master choices of the master
+        evaluation element (condition intra), else None
+        :param master_element_id: int
+        :return: int or None
+        """
+        switch_master_choices = self.get_switch_master_choices(master_element_id)
+        return switch_master_choices[0] if switch_master_choices else None
+
+    def get_master_element_of_choice(self, master_choice_id):
+        """
+        Get the id of the master evaluation element of the master choice
+        :param master_choice_id: int
+        :return: int
+        """
+        return self.element_of_choice[master_choice_id]
+
+
+class MasterAssessmentMap:
+    """
+    Assessment ids of all the master evaluation elements and master choices, with their ids as keys, so the
+    condition index of a master object is found without querying its assessment. The map is built with two
+    queries and cached with the condition indexes, so it is invalidated with them when a master object is
+    saved or deleted (see get_master_assessment_map).
+    """
+
+    def __init__(self):
+        MasterChoice = apps.get_model("assessment", "MasterChoice")
+        MasterEvaluationElement = apps.get_model("assessment", "MasterEvaluationElement")
+        self.element_assessments = dict(
+            MasterEvaluationElement.objects.values_list("id", "master_section__assessment_id")
+        )
+        self.choice_assessments = dict(
+            MasterChoice.objects.values_list(
+                "id", "master_evaluation_element__master_section__assessment_id"
+            )
+        )
+
+
+class EvaluationIdMap:
+    """
+    Map of the ids of the evaluation elements and choices of an evaluation, with the ids of their master objects
+    as keys, loaded with one query for the evaluation elements and one for the choices, so the elements without
+    choices are in the map too. The body of an evaluation is created once, so the map is cached in the process
+    (see get_evaluation_id_map).
+    """
+
+    def __init__(self, evaluation_id):
+        self.evaluation_id = evaluation_id
+        Choice = apps.get_model("assessment", "Choice")
+        EvaluationElement = apps.get_model("assessment", "EvaluationElement")
+
+        element_ids = {
+            master_element_id: element_id
+            for element_id, master_element_id in EvaluationElement.objects.filter(
+                section__evaluation_id=evaluation_id
+            ).values_list("id", "master_evaluation_element_id")
+        }
+        choice_ids = {
+            master_choice_id: choice_id
+            for choice_id, master_choice_id in Choice.objects.filter(
+                evaluation_element__section__evaluation_id=evaluation_id
+            ).values_list("id", "master_choice_id")
+        }
+        self.element_ids = MappingProxyType(element_ids)
+        self.choice_ids = MappingProxyType(choice_ids)
+
+    def has_master_ids(self, master_element_ids=(), master_choice_ids=()):
+        """
+        True if all the master evaluation elements and master choices are in the map
+        """
+        return all(master_id in self.element_ids for master_id in master_element_ids) and all(
+            master_id in self.choice_ids for master_id in master_choice_ids
+        )
+
+
+def get_condition_index(assessment_id):
+    """
+    Return the condition index of the assessment from the cache (see home/versioned_cache.py), else the index is
+    built and cached
+    :param assessment_id: int
+    :return: ConditionIndex
+    """
+    return get_cached_value(
+        "condition_index", assessment_id, lambda: ConditionIndex(assessment_id)
+    )
+
+
+def get_master_assessment_map():
+    """
+    Return the assessment ids of the master objects from the cache, with the condition indexes
+    :return: MasterAssessmentMap
+    """
+    return get_cached_value("condition_index", "master_assessments", MasterAssessmentMap)
+
+
+def get_condition_index_of_master_element(master_element_id):
+    """
+    Return the condition index of the assessment of the master evaluation element. A master evaluation element
+    created since the map was built (in the current transaction) is queried.
+    :param master_element_id: int
+    :return: ConditionIndex
+    """
+    assessment_id = get_master_assessment_map().element_assessments.get(master_element_id)
+    if assessment_id is None:
+        MasterEvaluationElement = apps.get_model("assessment", "MasterEvaluationElement")
+        assessment_id = MasterEvaluationElement.objects.values_list(
+            "master_section__assessment_id", flat=True
+        ).get(id=master_element_id)
+    return get_condition_index(assessment_id)
+
+
+def get_condition_index_of_master_choice(master_choice_id):
+    """
+    Return the condition index of the assessment of the master choice. A master choice created since the map
+    was built (in the current transaction) is queried.
+    :param master_choice_id: int
+    :return: ConditionIndex
+    """
+    assessment_id = get_master_assessment_map().choice_assessments.get(master_choice_id)
+    if assessment_id is None:
+        MasterChoice = apps.get_model("assessment", "MasterChoice")
+        assessment_id = MasterChoice.objects.values_list(
+            "master_evaluation_element__master_section__assessment_id", flat=True
+        ).get(id=master_choice_id)
+    return get_condition_index(assessment_id)
+
+
+def invalidate_condition_index():
+    """
+    Remove the condition indexes of all the assessments, and the assessment ids of the master objects, from the
+    cache of all the processes
+    """
+    invalidate_cache("condition_index")
+
+
+def get_evaluation_id_map(evaluation_id, master_element_ids=(), master_choice_ids=()):
+    """
+    Return the id map of the evaluation, from the cache of the process if it contains the master objects
+    needed, else the map is loaded again (the body of the evaluation may have been completed since).
+    An empty map (evaluation without body yet) is not cached.
+    :param evaluation_id: int
+    :param master_element_ids: ids of the master evaluation elements which need to be in the map
+    :param master_choice_ids: ids of the master choices which need to be in the map
+    :return: EvaluationIdMap
+    """
+    evaluation_id_map = _EVALUATION_ID_MAPS.get(evaluation_id)
+    if evaluation_id_map is not None and evaluation_id_map.has_master_ids(
+        master_element_ids, master_choice_ids
+    ):
+        return evaluation_id_map
+    evaluation_id_map = EvaluationIdMap(evaluation_id)
+    if evaluation_id_map.element_ids:
+        _EVALUATION_ID_MAPS.pop(evaluation_id, None)
+        while len(_EVALUATION_ID_MAPS) >= EVALUATION_ID_MAPS_MAX_SIZE:
+            # The dictionaries keep the insertion order, so the first key is the oldest map
+            _EVALUATION_ID_MAPS.pop(next(iter(_EVALUATION_ID_MAPS)))
+        _EVALUATION_ID_MAPS[evaluation_id] = evaluation_id_map
+    return evaluation_id_map
@@ -1,19 +1,29 @@
 import random
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.template.defaultfilters import slugify
 from django.urls import reverse
 from django.utils import timezone
 from home.models import Organisation
 
 from .assessment import Assessment, get_last_assessment_created
+from .assessment_registry import get_assessment_registry
 from .choice import Choice, MasterChoice
-from .evaluation_element import EvaluationElement, MasterEvaluationElement
+from .evaluation_element import (
+    EvaluationElement,
+    MasterEvaluationElement,
+    calculate_element_max_points,
+)
 from .evaluation_score import EvaluationScore
+from .evaluation_tree import EvaluationTree
+from .scoring_plan import get_scoring_plan
 from .section import Section
 from .upgrade import Upgrade
 
+# Fields of the progression of the evaluation, updated by deltas when answers are saved
+PROGRESSION_FIELDS = ["nb_sections", "nb_sections_done", "points", "is_finished", "finished_at"]
+
 
 class Evaluation(models.Model):
     """
@@ -46,6 +56,11 @@ class Evaluation(models.Model):
     )  # NEED TO DELETE NULL AND BLANK LATER
     # There are only 2 status choices for an evaluation: done or not done, by default the evaluation is not done
     is_finished = models.BooleanField(default=False)
+    # Counters of the sections and of the sections done, and total of the points of the sections, updated by deltas
+    # when an answer is saved
+    nb_sections = models.IntegerField(default=0)
+    nb_sections_done = models.IntegerField(default=0)
+    points = models.FloatField(default=0)
     is_editable = models.BooleanField(default=True)
     is_deleteable = models.BooleanField(default=True)
     # No score by default, the object will be created when the evaluation is validated by the user
@@ -113,15 +128,15 @@ class Evaluation(models.Model):
     def is_upgradable(self):
         """
         Test if an evaluation is upgradable. True if there is an assessment with a latest version
+        The versions are read from the assessment registry, without querying the assessment of the evaluation
         :return: boolean
         """
-
-        if get_last_assessment_created():
-            last_version = float(get_last_assessment_created().version)
-            version = float(self.assessment.version)
-            return version < last_version
-        else:
-            return False
+        assessment_registry = get_assessment_registry()
+        version = assessment_registry.get_version(self.assessment_id)
+        if version is None:
+            # The assessment has been created after the registry in an other process
+            version = self.assessment.version
+        return assessment_registry.is_upgradable(version)
 
     def freeze_evaluation(self):
         """
@@ -134,15 +149,9 @@ class Evaluation(models.Model):
 
     def get_list_all_elements(self):
         """
-        Returns the list of all the evaluation elements
+        Returns the list of all the evaluation elements, ordered by section and by master evaluation element
         """
-        list_all_elements = []
-        for section in self.section_set.all().order_by("master_section__order_id"):
-            for element in section.evaluationelement_set.all().order_by(
-                "master_evaluation_element__order_id"
-            ):
-                list_all_elements.append(element)
-        return list_all_elements
+        return self.get_tree().get_element_list()
 
     def has_labelling(self):
         """
@@ -168,55 +177,106 @@ class Evaluation(models.Model):
         if self.has_labelling():
             return self.get_labelling().status == "justification"
 
-    def get_dict_sections_elements_choices(self):
-        dict_sections_elements = {}
-        for section in self.section_set.all().order_by("master_section__order_id"):
-            dict_sections_elements[section] = {}
-            for element in section.evaluationelement_set.all().order_by(
-                "master_evaluation_element__order_id"
-            ):
-                dict_sections_elements[section][element] = [
-                    choice for choice in element.choice_set.all().order_by("id")
-                ]
-        return dict_sections_elements
+    def get_tree(self, with_change_logs=False, section_ids=None):
+        """
+        Load the body of the evaluation (sections, evaluation elements, choices and master objects) with a fixed
+        number of queries
+        :param with_change_logs: boolean, if True the change logs of the evaluation elements are loaded too
+        :param section_ids: list of section ids, if given only the evaluation elements of these sections are loaded
+        :return: EvaluationTree
+        """
+        return EvaluationTree(self, with_change_logs=with_change_logs, section_ids=section_ids)
 
+    def get_dict_sections_elements_choices(self, tree=None):
+        """
+        Dictionary with the sections as keys and dictionaries {evaluation element: list of choices} as values
+        :param tree: EvaluationTree of the evaluation, loaded if not given
+        :return: dictionary
+        """
+        if tree is None:
+            tree = self.get_tree()
+        return tree.get_dict_sections_elements_choices()
+
+    @transaction.atomic
     def create_evaluation_body(self):
         """
         Create the dynamic elements (section, evaluation elements, choices) for an evaluation after the being
         created with EvaluationForm
         All the dynamic objects are based on static objects (master_section, master_evaluation_elements, master_choice)
         according to the assessment's version.
+
+        The master tree of the assessment is loaded once, the max points are calculated in memory from the
+        scoring system json and the objects are inserted with bulk_create, so the number of queries does not
+        depend on the size of the assessment.
         """
         assessment = self.assessment
         master_section_list = assessment.get_master_sections_list()
-        for master_section in master_section_list:
-            section = Section.create_section(master_section, self)
-
-            # creation of the evaluation elements for each section
-            master_evaluation_element_list = list(
-                MasterEvaluationElement.objects.filter(master_section=master_section)
+        master_elements_dic = {master_section.id: [] for master_section in master_section_list}
+        master_element_list = MasterEvaluationElement.objects.filter(
+            master_section__assessment=assessment
+        ).select_related("master_section")
+        for master_evaluation_element in master_element_list:
+            master_elements_dic[master_evaluation_element.master_section_id].append(
+                master_evaluation_element
+            )
+        master_choices_dic = {
+            master_evaluation_element.id: []
+            for master_element_list in master_elements_dic.values()
+            for master_evaluation_element in master_element_list
+        }
+        master_choice_list = MasterChoice.objects.filter(
+            master_evaluation_element__master_section__assessment=assessment
+        ).order_by("id")
+        for master_choice in master_choice_list:
+            master_choices_dic[master_choice.master_evaluation_element_id].append(
+                master_choice
             )
 
-            for master_evaluation_element in master_evaluation_element_list:
-                evaluation_element = EvaluationElement.create_evaluation_element(
-                    master_evaluation_element, section
-                )
+        # The weights of the scoring are needed to set the max points of the evaluation elements
+        scoring_plan = get_scoring_plan(assessment.id)
 
-                # creation of the choices for each evaluation element
-                master_choice_list = list(
-                    MasterChoice.objects.filter(
-                        master_evaluation_element=master_evaluation_element
+        section_list = []
+        evaluation_element_list = []
+        for master_section in master_section_list:
+            section = Section(
+                master_section=master_section,
+                evaluation=self,
+                max_points=0,
+                nb_elements=len(master_elements_dic[master_section.id]),
+            )
+            for master_evaluation_element in master_elements_dic[master_section.id]:
+                max_points = calculate_element_max_points(
+                    master_evaluation_element.question_type,
+                    [
+                        scoring_plan.get_choice_points(master_choice.id)
+                        for master_choice in master_choices_dic[master_evaluation_element.id]
+                    ],
+                )
+                evaluation_element_list.append(
+                    EvaluationElement(
+                        master_evaluation_element=master_evaluation_element,
+                        section=section,
+                        max_points=max_points,
                     )
                 )
-                for master_choice in master_choice_list:
-                    choice = Choice.create_choice(master_choice, evaluation_element)
-                    # Useless as it is already saved in create_choice but we need to use choice for flake
-                    choice.save()
-
-                # Set the max points for the evaluation element, after the choices are created
-                evaluation_element.set_max_points()
-            # After the creation of the evaluation elements, sets max points for the section
-            section.set_max_points()
+                section.max_points += max_points
+            section_list.append(section)
+        # The evaluation elements get the ids of their sections once these are inserted
+        Section.objects.bulk_create(section_list)
+        EvaluationElement.objects.bulk_create(evaluation_element_list)
+
+        choice_list = []
+        for evaluation_element in evaluation_element_list:
+            for master_choice in master_choices_dic[
+                evaluation_element.master_evaluation_element_id
+            ]:
+                choice_list.append(
+                    Choice(master_choice=master_choice, evaluation_element=evaluation_element)
+                )
+        Choice.objects.bulk_create(choice_list)
+        self.nb_sections = len(section_list)
+        self.save()
+
         # Create evaluation score object
         EvaluationScore.create_evaluation_score(evaluation=self)
 
@@ -258,11 +318,47 @@ class Evaluation(models.Model):
                             choice.fetch = False
                             choice.save()
 
+    def get_tree_by_numbering(self):
+        """
+        Load the sections, evaluation elements and choices of the evaluation in 3 queries and return 3 dictionaries
+        with the numbering of the master objects as keys (tuples of strings, ex ("1", "2", "a") for the choice 1.2.a)
+        :return: tuple of dictionaries (sections, elements, choices)
+        """
+        sections_dic = {
+            (str(section.master_section.order_id),): section
+            for section in self.section_set.all().select_related("master_section")
+        }
+        elements_dic = {
+            (
+                str(element.master_evaluation_element.master_section.order_id),
+                str(element.master_evaluation_element.order_id),
+            ): element
+            for element in EvaluationElement.objects.filter(section__evaluation=self)
+            .select_related("master_evaluation_element__master_section")
+            .order_by("id")
+        }
+        choices_dic = {
+            (
+                str(choice.master_choice.master_evaluation_element.master_section.order_id),
+                str(choice.master_choice.master_evaluation_element.order_id),
+                str(choice.master_choice.order_id),
+            ): choice
+            for choice in Choice.objects.filter(evaluation_element__section__evaluation=self)
+            .select_related("master_choice__master_evaluation_element__master_section")
+            .order_by("id")
+        }
+        return sections_dic, elements_dic, choices_dic
+
+    @transaction.atomic
     def upgrade(self, **kwargs):
         """
         The evaluation is upgraded from the current version to the latest. All the notes and the answers are retrieved,
         fetched from the origin version.
         Return the new evaluation (and DO NOT delete the older)
+
+        The trees of the old and the new evaluations are loaded once in dictionaries keyed by numbering, the
+        upgrade json is resolved in memory and the new objects are saved with bulk updates. The points, status and
+        progressions are then calculated in one pass.
         :return:
         """
 
@@ -293,120 +389,209 @@ class Evaluation(models.Model):
         new_eval.created_at = created_at
         new_eval.create_evaluation_body()
 
-        for new_section in new_eval.section_set.all():
-            new_section_number = new_section.master_section.get_numbering()
-            if upgrade_dic["sections"][new_section_number] == "no_fetch":
+        old_sections_dic, old_elements_dic, old_choices_dic = self.get_tree_by_numbering()
+        new_sections_dic, new_elements_dic, new_choices_dic = new_eval.get_tree_by_numbering()
+
+        for numbering, new_section in new_sections_dic.items():
+            upgrade_status = upgrade_dic["sections"][numbering[0]]
+            if upgrade_status == "no_fetch":
                 new_section.fetch = False
-                new_section.save()
             else:
                 # We rely on the upgrade dic to find the matching
                 # Two cases: 1 if it fetches itself, or "id" (ex "2") if it fetches an other section
-                if upgrade_dic["sections"][new_section_number] == 1:
-                    older_section_order_id = new_section.master_section.order_id
-                else:
-                    older_section_order_id = upgrade_dic["sections"][new_section_number]
-                new_section.user_notes = self.section_set.get(
-                    master_section__order_id=older_section_order_id
-                ).user_notes
-                new_section.save()
-
-            for new_element in new_section.evaluationelement_set.all():
-                new_element_number = new_element.master_evaluation_element.get_numbering()
-                if upgrade_dic["elements"][new_element_number]["upgrade_status"] == "no_fetch":
-                    new_element.fetch = False
-                    new_element.save()
-                else:
-                    # Two cases: "1" if it fetches itself, or "id" (ex "1.1") if it fetches an other EE
-                    if upgrade_dic["elements"][new_element_number]["upgrade_status"] != 1:
-                        older_element_order_id = upgrade_dic["elements"][new_element_number][
-                            "upgrade_status"
-                        ][-1]
-                        older_element_section_order_id = upgrade_dic["elements"][
-                            new_element_number
-                        ]["upgrade_status"][-3]
-                    else:
-                        older_element_order_id = new_element.master_evaluation_element.order_id
-                        older_element_section_order_id = (
-                            new_element.master_evaluation_element.master_section.order_id
-                        )
-                    older_element = EvaluationElement.objects.get(
-                        master_evaluation_element__order_id=older_element_order_id,
-                        section__master_section__order_id=older_element_section_order_id,
-                        section__evaluation=self,
-                    )
-                    new_element.user_notes = older_element.user_notes
-                    new_element.user_justification = older_element.user_justification
-                    new_element.is_in_action_plan = older_element.is_in_action_plan
-                    new_element.save()
-
-                for new_choice in new_element.choice_set.all():
-                    new_choice_number = new_choice.master_choice.get_numbering()
-                    if upgrade_dic["answer_items"][new_choice_number] == "no_fetch":
-                        new_choice.fetch = False
-                        new_choice.save()
-                    else:
-                        # Two cases: "1" if it fetches itself, or "id" (ex "1.1.a") if it fetches an other choice
-                        if upgrade_dic["answer_items"][new_choice_number] != 1:
-                            older_choice_order_id = upgrade_dic["answer_items"][
-                                new_choice_number
-                            ][-1]
-                            older_choice_element_order_id = upgrade_dic["answer_items"][
-                                new_choice_number
-                            ][-3]
-                            older_choice_section_order_id = upgrade_dic["answer_items"][
-                                new_choice_number
-                            ][-5]
-                        else:
-                            # Fetch self
-                            older_choice_order_id = new_choice.master_choice.order_id
-                            older_choice_element_order_id = (
-                                new_choice.master_choice.master_evaluation_element.order_id
-                            )
-                            older_choice_section_order_id = (
-                                new_choice.master_choice.master_evaluation_element.master_section.order_id
-                            )
-                        older_choice = Choice.objects.get(
-                            master_choice__order_id=older_choice_order_id,
-                            evaluation_element__master_evaluation_element__order_id=older_choice_element_order_id,
-                            evaluation_element__section__master_section__order_id=older_choice_section_order_id,
-                            evaluation_element__section__evaluation=self,
-                        )
-                        new_choice.is_ticked = older_choice.is_ticked
-                        new_choice.save()
-
-                new_element.set_points()
-                new_element.set_status()
-                # Not sure it is useful to save as already done in the methods
-                new_element.save()
-
-            new_section.set_points()
-            new_section.set_progression()
-            new_section.save()
+                if upgrade_status != 1:
+                    numbering = (str(upgrade_status),)
+                new_section.user_notes = old_sections_dic[numbering].user_notes
+
+        for numbering, new_element in new_elements_dic.items():
+            upgrade_status = upgrade_dic["elements"][".".join(numbering)]["upgrade_status"]
+            if upgrade_status == "no_fetch":
+                new_element.fetch = False
+            else:
+                # Two cases: "1" if it fetches itself, or "id" (ex "1.1") if it fetches an other EE
+                if upgrade_status != 1:
+                    numbering = tuple(upgrade_status.split("."))
+                older_element = old_elements_dic[numbering]
+                new_element.user_notes = older_element.user_notes
+                new_element.user_justification = older_element.user_justification
+                new_element.is_in_action_plan = older_element.is_in_action_plan
+
+        for numbering, new_choice in new_choices_dic.items():
+            upgrade_status = upgrade_dic["answer_items"][".".join(numbering)]
+            if upgrade_status == "no_fetch":
+                new_choice.fetch = False
+            else:
+                # Two cases: "1" if it fetches itself, or "id" (ex "1.1.a") if it fetches an other choice
+                if upgrade_status != 1:
+                    numbering = tuple(upgrade_status.split("."))
+                new_choice.is_ticked = old_choices_dic[numbering].is_ticked
+
+        new_eval.set_points_and_progression(
+            list(new_sections_dic.values()),
+            list(new_elements_dic.values()),
+            list(new_choices_dic.values()),
+        )
+        Section.objects.bulk_update(
+            new_sections_dic.values(),
+            [
+                "fetch",
+                "user_notes",
+                "points",
+                "user_progression",
+                "nb_elements",
+                "nb_elements_done",
+            ],
+        )
+        EvaluationElement.objects.bulk_update(
+            new_elements_dic.values(),
+            [
+                "fetch",
+                "user_notes",
+                "user_justification",
+                "is_in_action_plan",
+                "points",
+                "status",
+            ],
+        )
+        # Only the choices which differ from the default values need to be updated
+        Choice.objects.bulk_update(
+            [
+                choice
+                for choice in new_choices_dic.values()
+                if choice.is_ticked or not choice.fetch
+            ],
+            ["fetch", "is_ticked"],
+        )
 
         new_eval.set_finished()
         # we don't set the score here as it is already implemented in the views so we will redirect
         return new_eval
 
+    def set_points_and_progression(self, section_list, element_list, choice_list):
+        """
+        Calculate in memory, in one pass, the points and status of the evaluation elements and the points and
+        progression of the sections, as done by the methods set_points, set_status and set_progression.
+        The elements which are not applicable (the choice they depend on is ticked) have their choices reset.
+        The objects are modified but not saved.
+
+        :param section_list: list of the sections of the evaluation
+        :param element_list: list of the evaluation elements, with the master element and master section loaded
+        :param choice_list: list of the choices, with the master tree loaded
+        """
+        scoring_plan = get_scoring_plan(self.assessment_id)
+
+        choices_by_master_choice = {choice.master_choice_id: choice for choice in choice_list}
+        choices_by_element = {element.id: [] for element in element_list}
+        for choice in choice_list:
+            choices_by_element[choice.evaluation_element_id].append(choice)
+
+        elements_by_section = {section.id: [] for section in section_list}
+        applicable_dic = {}
+        for element in element_list:
+            master_element = element.master_evaluation_element
+            # The element is not applicable if the choice it depends on is ticked
+            applicable_dic[element.id] = not (
+                master_element.depends_on_id
+                and choices_by_master_choice[master_element.depends_on_id].is_ticked
+            )
+            points_element = 0
+            if applicable_dic[element.id]:
+                for choice in choices_by_element[element.id]:
+                    if choice.is_ticked:
+                        points_element += scoring_plan.get_choice_points(
+                            choice.master_choice_id
+                        )
+                points_element = points_element * scoring_plan.get_element_weight(
+                    master_element.id
+                )
+            else:
+                # Reset the choices of the elements disabled
+                for choice in choices_by_element[element.id]:
+                    choice.is_ticked = False
+            element.points = points_element
+            element.status = any(choice.is_ticked for choice in choices_by_element[element.id])
+            elements_by_section[element.section_id].append(element)
+
+        for section in section_list:
+            section_element_list = elements_by_section[section.id]
+            section.nb_elements = len(section_element_list)
+            section.nb_elements_done = len(
+                [
+                    element
+                    for element in section_element_list
+                    if element.status or not applicable_dic[element.id]
+                ]
+            )
+            section.calculate_progression()
+            section.points = sum(
+                element.points
+                for element in section_element_list
+                if applicable_dic[element.id]
+            )
+
     def set_finished(self):
         """
         If all section are completed, the evaluation is set to finished and the user can validate it
         """
+        list_section = list(self.section_set.all())
+        self.nb_sections = len(list_section)
+        self.nb_sections_done = len([section for section in list_section if section.is_done()])
+        self.points = sum(section.points for section in list_section)
+        self.update_finished()
+        self.save()
 
-        # We assume the evaluation is not finished
-        self.is_finished = False
+    def update_finished(self):
+        """
+        The evaluation is finished when all the sections are done (progression of 100 %), according to the counters
+        """
+        self.is_finished = self.nb_sections_done == self.nb_sections
+        # If the field is empty, it is the first time the evaluation is finished so it is set to now
+        if self.is_finished and not self.finished_at:
+            self.finished_at = timezone.now()
 
-        list_section = self.section_set.all()
-        for section in list_section:
-            # If the loop for has no break (all section are 100 % done)
-            if section.user_progression < 100:
-                break
-        # If there is no break encountered in the for loop, which means all sections have progression equal to 100
-        else:
-            self.is_finished = True
-            # If the field is empty, it is the first time the evaluation is finished so it is set to now
-            if not self.finished_at:
-                self.finished_at = timezone.now()
-        self.save()
+    def apply_elements_delta(self, states_before, element_list):
+        """
+        Update the counters, progression and points of the sections and of the evaluation with the changes of
+        the evaluation elements, without scanning the whole evaluation.
+        The rows of the evaluation and of the sections are locked and their counters loaded again in the
+        transaction, so the deltas of concurrent requests (e.g. a burst of answers) are applied one after the
+        other and none is lost.
+        :param states_before: dictionary with the element ids as keys and the progression states of the elements
+            before the changes as values (see EvaluationElement.get_progression_state)
+        :param element_list: list of the evaluation elements changed, with their values after the changes
+        :return: dictionary of the sections of the elements, with their ids as keys
+        """
+        delta_by_section = {}
+        for element in element_list:
+            is_done_before, points_before = states_before[element.id]
+            is_done, points = element.get_progression_state()
+            delta_done, delta_points = delta_by_section.get(element.section_id, (0, 0))
+            delta_by_section[element.section_id] = (
+                delta_done + int(is_done) - int(is_done_before),
+                delta_points + points - points_before,
+            )
+
+        section_dic = {}
+        with transaction.atomic():
+            # The evaluation is locked before its sections, like in all the updates of the progression
+            Evaluation.objects.select_for_update().filter(id=self.id).exists()
+            self.refresh_from_db(fields=PROGRESSION_FIELDS)
+            for section in (
+                Section.objects.select_for_update()
+                .filter(id__in=delta_by_section.keys())
+                .order_by("id")
+            ):
+                section_dic[section.id] = section
+                delta_done, delta_points = delta_by_section[section.id]
+                if delta_done == 0 and delta_points == 0:
+                    continue
+                was_done = section.is_done()
+                section.apply_delta(delta_done, delta_points)
+                self.nb_sections_done += int(section.is_done()) - int(was_done)
+                self.points += delta_points
+            self.update_finished()
+            self.save(update_fields=PROGRESSION_FIELDS + ["updated_at"])
+        return section_dic
 
     def calculate_progression(self):
         """
@@ -1,11 +1,16 @@
 import random
 
+from assessment.utils import get_rendered_field, render_markdown, set_rendered_fields
 from ckeditor.fields import RichTextField
 from django.db import models
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
+from .assessment import get_available_languages
+from .condition_index import get_condition_index_of_master_element, get_evaluation_id_map
 from .element_change_log import ElementChangeLog
 from .evaluation_element_weight import EvaluationElementWeight
+from .scoring_plan import get_scoring_plan
 from .scoring_system import ScoringSystem
 from .section import MasterSection, Section
 
@@ -46,10 +51,21 @@ class MasterEvaluationElement(models.Model):
         on_delete=models.SET_NULL,
         related_name="conditioned_by",
     )
+    # Sanitized html of the markdown texts, rendered for each language when the object is saved
+    name_html = models.TextField(blank=True, null=True, editable=False)
+    question_text_html = models.TextField(blank=True, null=True, editable=False)
+    explanation_text_html = models.TextField(blank=True, null=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Rendered fields with their source field and render function
+    RENDERED_FIELDS = {
+        "name_html": ("name", render_markdown),
+        "question_text_html": ("question_text", render_markdown),
+        "explanation_text_html": ("explanation_text", render_markdown),
+    }
+
     class Meta:
         ordering = ["order_id"]
 
@@ -68,6 +84,24 @@ class MasterEvaluationElement(models.Model):
         else:
             return f"Master evaluation element (id {str(self.pk)})"
 
+    def save(self, *args, **kwargs):
+        set_rendered_fields(self, self.RENDERED_FIELDS, get_available_languages())
+        super().save(*args, **kwargs)
+
+    def get_name_html(self):
+        """Html of the name in the active language"""
+        return get_rendered_field(self, "name_html", "name", render_markdown)
+
+    def get_question_text_html(self):
+        """Html of the question text in the active language"""
+        return get_rendered_field(self, "question_text_html", "question_text", render_markdown)
+
+    def get_explanation_text_html(self):
+        """Html of the explanation text in the active language"""
+        return get_rendered_field(
+            self, "explanation_text_html", "explanation_text", render_markdown
+        )
+
     def get_verbose_name(self):
         if self.master_section.order_id and self.order_id and self.name:
             return (
@@ -149,25 +183,23 @@ class EvaluationElement(models.Model):
         It doesn't count the choices with conditions inter or intra as they always count 0 points
         but give automatically half the points
         """
-        scoring_choices = self.get_scoring_system().master_choices_weight_json
+        scoring_plan = self.get_scoring_plan()
         return sorted(
             self.get_list_of_choices_without_conditions(),
-            key=lambda choice: float(scoring_choices[choice.master_choice.get_numbering()]),
+            key=lambda choice: scoring_plan.get_choice_points(choice.master_choice_id),
         )[0]
 
     def get_choices_list_max_points(self):
         """
         Get the choice of the element with the max points
         """
-        scoring_choices = self.get_scoring_system().master_choices_weight_json
+        scoring_plan = self.get_scoring_plan()
         choices_list = []
         if self.master_evaluation_element.question_type == "radio":
             choices_list = [
                 sorted(
                     self.get_list_of_choices_without_conditions(),
-                    key=lambda choice: float(
-                        scoring_choices[choice.master_choice.get_numbering()]
-                    ),
+                    key=lambda choice: scoring_plan.get_choice_points(choice.master_choice_id),
                 )[-1]
             ]
         else:
@@ -210,22 +242,29 @@ class EvaluationElement(models.Model):
     def get_choices_as_tuple(self):
         """parse the choices field and return a tuple formatted appropriately
         for the 'choices' argument of a form widget."""
-        choices_query = self.choice_set.all().order_by("master_choice__order_id")
+        # Sorted in memory so the choices prefetched by the evaluation tree are not queried again
+        choices_query = sorted(self.choice_set.all(), key=get_choice_order_key)
         choices_list = []
         for choice in choices_query:
             # case it s a choice which is incompatible with other choices, we add some text for the user
+            # The labels are the html of the master choices, rendered when they are saved
             if choice.set_conditions_on_other_choices():
                 choices_list.append(
                     (
                         choice,
-                        choice.master_choice.answer_text
-                        + _(
-                            " | (When this answer is selected, the others cannot be selected)"
+                        # The text added comes from the translation catalog of the platform
+                        mark_safe(
+                            choice.master_choice.get_answer_text_label()
+                            + str(
+                                _(
+                                    " | (When this answer is selected, the others cannot be selected)"
+                                )
+                            )
                         ),
                     )
                 )
             else:
-                choices_list.append((choice, choice.master_choice.answer_text))
+                choices_list.append((choice, choice.master_choice.get_answer_text_label()))
         choices_tuple = tuple(choices_list)
         return choices_tuple
 
@@ -325,28 +364,68 @@ class EvaluationElement(models.Model):
 
     def has_condition_on(self):
         """True if the evaluation element depends on a choice, else False"""
-        if self.get_master_choice_depending_on() is None:
-            return False
-        else:
-            return True
+        return self.master_evaluation_element.depends_on_id is not None
+
+    def get_condition_index(self):
+        """
+        Return the condition index of the assessment, with the conditions inter and intra evaluation elements
+        :return: ConditionIndex
+        """
+        return get_condition_index_of_master_element(self.master_evaluation_element_id)
+
+    def get_evaluation_id_map(self, master_element_ids=(), master_choice_ids=()):
+        """
+        Return the map of the ids of the evaluation elements and choices of the evaluation, by master object ids
+        :return: EvaluationIdMap
+        """
+        return get_evaluation_id_map(
+            self.section.evaluation_id, master_element_ids, master_choice_ids
+        )
+
+    def get_evaluation_elements(self, master_element_ids):
+        """
+        Return the list of the evaluation elements of the evaluation for these master evaluation elements
+        :param master_element_ids: list of master evaluation element ids
+        :return: list
+        """
+        if not master_element_ids:
+            return []
+        id_map = self.get_evaluation_id_map(master_element_ids=master_element_ids)
+        return list(
+            EvaluationElement.objects.filter(
+                id__in=[id_map.element_ids[master_id] for master_id in master_element_ids]
+            )
+        )
+
+    def get_evaluation_choice(self, master_choice_id):
+        """
+        Return the choice of the evaluation for this master choice, else None
+        :param master_choice_id: int or None
+        :return: choice or None
+        """
+        if master_choice_id is None:
+            return None
+        id_map = self.get_evaluation_id_map(master_choice_ids=[master_choice_id])
+        # The choice model is got from the related manager as the module choice imports this one
+        return self.choice_set.model.objects.get(id=id_map.choice_ids[master_choice_id])
 
     def get_choice_depending_on(self):
         """:returns choice if the evaluation element depends on a choice"""
-        evaluation_id = self.section.evaluation.id
-        if self.has_condition_on():
-            master_choice = self.get_master_choice_depending_on()
-            choice = master_choice.choice_set.filter(
-                evaluation_element__section__evaluation__id=evaluation_id
-            )[0]
-            return choice
-        else:
-            return None
+        # Set when the evaluation element is loaded with the evaluation tree
+        if hasattr(self, "prefetched_choice_depending_on"):
+            return self.prefetched_choice_depending_on
+        return self.get_evaluation_choice(self.master_evaluation_element.depends_on_id)
 
     def get_element_depending_on(self):
         """Return the evaluation element on which the choice this evaluation element depends on belong"""
+        if hasattr(self, "prefetched_choice_depending_on"):
+            choice = self.prefetched_choice_depending_on
+            return choice.evaluation_element if choice is not None else None
         if self.has_condition_on():
-            choice = self.get_choice_depending_on()
-            return choice.evaluation_element
+            master_element_id = self.get_condition_index().get_master_element_of_choice(
+                self.master_evaluation_element.depends_on_id
+            )
+            return self.get_evaluation_elements([master_element_id])[0]
         return None
 
     def is_applicable(self):
@@ -364,44 +443,72 @@ class EvaluationElement(models.Model):
         else:
             return True
 
+    def get_progression_state(self):
+        """
+        State of the evaluation element used for the progression and the points of the section:
+        if it is done (answered or not applicable) and the points counted (only for an applicable element)
+        :return: tuple (boolean, float)
+        """
+        if self.is_applicable():
+            return self.status, self.points
+        return True, 0
+
+    def get_elements_conditioned(self):
+        """
+        Return the list of the evaluation elements depending on the choices of this evaluation element
+        (conditions inter evaluation elements)
+        :return: list
+        """
+        return self.get_evaluation_elements(
+            self.get_condition_index().get_master_elements_conditioned_by_element(
+                self.master_evaluation_element_id
+            )
+        )
+
     def has_condition_on_other_elements(self):
         """
         For this element, if one of his choice set conditions for other element,
         return True, else False
         """
-        for choice in self.choice_set.all():
-            if choice.has_element_conditioned_on():
-                return True
-        return False
+        return (
+            self.get_condition_index().get_master_choice_setting_conditions(
+                self.master_evaluation_element_id
+            )
+            is not None
+        )
 
     def get_choice_setting_conditions_on_other_elements(self):
         """
         Get the choice setting conditions on other evaluation elements
         """
-        for choice in self.choice_set.all():
-            if choice.has_element_conditioned_on():
-                return choice
-        return None
+        return self.get_evaluation_choice(
+            self.get_condition_index().get_master_choice_setting_conditions(
+                self.master_evaluation_element_id
+            )
+        )
 
     def has_condition_between_choices(self):
         """Within an evaluation element, if the choices have condition on each other
         if at least one choice disables other choices, return True, else False
         :return boolean
         """
-        for choice in self.choice_set.all():
-            if choice.master_choice.is_concerned_switch:
-                return True
-        return False
+        return (
+            self.get_condition_index().get_switch_master_choice(
+                self.master_evaluation_element_id
+            )
+            is not None
+        )
 
     def get_choice_condition_intra(self):
         """
         For condition intra evaluation element, get the choice which set condition on other, else None
         :return: choice or None
         """
-        for choice in self.choice_set.all():
-            if choice.master_choice.is_concerned_switch:
-                return choice
-        return None
+        return self.get_evaluation_choice(
+            self.get_condition_index().get_switch_master_choice(
+                self.master_evaluation_element_id
+            )
+        )
 
     def get_list_choices_with_condition(self):
         """
@@ -450,17 +557,14 @@ class EvaluationElement(models.Model):
         the dic of EvaluationElementWeight
         """
 
-        scoring_system = self.get_scoring_system()
-        master_evaluation_element_weight = self.get_master_evaluation_element_weight()
+        scoring_plan = self.get_scoring_plan()
         points_element = 0
 
         # If the evaluation element is applicable
         if self.is_applicable():
             for choice in self.choice_set.all():
                 if choice.is_ticked:
-                    points_element += scoring_system.get_master_choice_points(
-                        choice.master_choice
-                    )
+                    points_element += scoring_plan.get_choice_points(choice.master_choice_id)
 
                     # Manage the case the choice disable other evaluation element to set their points to 0
                     if choice.has_element_conditioned_on():
@@ -473,9 +577,7 @@ class EvaluationElement(models.Model):
                             element.save()
 
             # Multiply the sum of the choices weight by the evaluation element weight
-            element_weight = master_evaluation_element_weight.get_master_element_weight(
-                self.master_evaluation_element
-            )
+            element_weight = scoring_plan.get_element_weight(self.master_evaluation_element_id)
             points_element = points_element * element_weight
 
             # check if it works
@@ -489,6 +591,15 @@ class EvaluationElement(models.Model):
         self.points = points_element
         self.save()
 
+    def get_scoring_plan(self):
+        """
+        Return the compiled scoring plan (weights of the choices and of the evaluation elements)
+        of the assessment of the evaluation
+        :return: ScoringPlan
+        """
+        # organisation_type = self.section.evaluation.orga_id.type_orga  # Not implemented yet
+        return get_scoring_plan(self.section.evaluation.assessment_id)
+
     def get_scoring_system(self):
         """
         :return scoring system object
@@ -531,8 +642,7 @@ class EvaluationElement(models.Model):
         :return: float
         """
 
-        scoring_system = self.get_scoring_system()
-        return scoring_system.attributed_points_coefficient
+        return self.get_scoring_plan().coefficient_scoring_system
 
     def set_max_points(self):
         """
@@ -543,22 +653,16 @@ class EvaluationElement(models.Model):
         :return: float
         """
 
-        max_points = 0
-        scoring_system = self.get_scoring_system()
-
-        if self.master_evaluation_element.question_type == "radio":
-            for choice in self.choice_set.all():
-                # We take the max of the weight attributed to a choice of this evaluation element
-                if scoring_system.get_master_choice_points(choice.master_choice) > max_points:
-                    max_points = scoring_system.get_master_choice_points(choice.master_choice)
-
-        # it is a checkbox
-        elif self.master_evaluation_element.question_type == "checkbox":
-            for choice in self.choice_set.all():
-                # we sum their weight
-                max_points += scoring_system.get_master_choice_points(choice.master_choice)
-
-        self.max_points = max_points
+        scoring_plan = self.get_scoring_plan()
+        self.max_points = calculate_element_max_points(
+            self.master_evaluation_element.question_type,
+            [
+                scoring_plan.get_choice_points(master_choice_id)
+                for master_choice_id in self.choice_set.values_list(
+                    "master_choice_id", flat=True
+                )
+            ],
+        )
         self.save()
 
     def calculate_points_not_concerned(self):
@@ -570,7 +674,6 @@ class EvaluationElement(models.Model):
         """
 
         sum_points_not_concerned = 0
-        master_evaluation_element_weight = self.get_master_evaluation_element_weight()
 
         # if the evaluation element is applicable and there are conditions between choices inside this
         # evaluation element
@@ -588,11 +691,8 @@ class EvaluationElement(models.Model):
             sum_points_not_concerned = self.max_points
 
         # We return the sum_points_not_concerned weighted by the evaluation element weight
-        return (
-            sum_points_not_concerned
-            * master_evaluation_element_weight.get_master_element_weight(
-                self.master_evaluation_element
-            )
+        return sum_points_not_concerned * self.get_scoring_plan().get_element_weight(
+            self.master_evaluation_element_id
         )
 
     def get_element_change_log(self):
@@ -603,7 +703,10 @@ class EvaluationElement(models.Model):
          - if this is a new evaluation then we should use the previous_assessment from the Assessment class
          and not upgraded_from of the class Evaluation because it will be null
          - if this is an upgraded evaluation then we will use the upgraded_from object
+        The change log is not queried if it has been loaded with the evaluation tree.
         """
+        if hasattr(self, "prefetched_change_log"):
+            return self.prefetched_change_log
         if self.section.evaluation.upgraded_from:
             try:
                 change_log = ElementChangeLog.objects.get(
@@ -654,3 +757,37 @@ class EvaluationElement(models.Model):
         Check if the change log is visible, returns true or false
         """
         return self.get_element_change_log().visibility
+
+
+def calculate_element_max_points(question_type, weight_list):
+    """
+    Calculate in memory the max points of an evaluation element from the weights of its choices.
+    For a radio question, this is the max of the weights, for a checkbox question, the sum of the weights.
+
+    :param question_type: question type of the master evaluation element, radio or checkbox
+    :param weight_list: list of the weights (float) of the choices of the evaluation element
+    :return: float
+    """
+    max_points = 0
+    if question_type == "radio":
+        # We take the max of the weight attributed to a choice of this evaluation element
+        for weight in weight_list:
+            if weight > max_points:
+                max_points = weight
+
+    # it is a checkbox
+    elif question_type == "checkbox":
+        # we sum their weight
+        for weight in weight_list:
+            max_points += weight
+    return max_points
+
+
+def get_choice_order_key(choice):
+    """
+    Key to sort the choices by the order id of their master choice, the choices without order id are the last ones
+    :param choice: choice
+    :return: tuple
+    """
+    order_id = choice.master_choice.order_id
+    return order_id is None, order_id or ""
@@ -2,7 +2,15 @@ from django.db import models
 from django.db.models import JSONField
 
 from .evaluation_element_weight import EvaluationElementWeight
-from .scoring_system import ScoringSystem
+from .scoring_engine import (
+    ScoringEngine,
+    calculate_dilatation_factor,
+    calculate_points_obtained,
+    calculate_points_sections,
+    calculate_points_to_dilate,
+    calculate_score,
+)
+from .scoring_plan import get_scoring_plan
 
 
 class EvaluationScore(models.Model):
@@ -76,16 +84,9 @@ class EvaluationScore(models.Model):
         # TODO work on the organisation_type and see how to define it
         # organisation_type = self.section.evaluation.orga_id.type_orga  # Not implemented yet
         organisation_type = "entreprise"
-        query_scoring_system = ScoringSystem.objects.filter(
-            assessment=self.evaluation.assessment, organisation_type=organisation_type
-        )
-        if len(list(query_scoring_system)) == 1:
-            self.coefficient_scoring_system = query_scoring_system[
-                0
-            ].attributed_points_coefficient
-        else:
-            # Todo see how we should manage communication with this case
-            self.coefficient_scoring_system = 0.5
+        self.coefficient_scoring_system = get_scoring_plan(
+            self.evaluation.assessment_id, organisation_type
+        ).coefficient_scoring_system
         self.save()
 
     def set_max_points(self):
@@ -112,6 +113,7 @@ class EvaluationScore(models.Model):
         """
         if self.need_to_set_max_points:
             max_points = 0
+            points = 0
             for section in self.evaluation.section_set.all():
                 for evaluation_element in section.evaluationelement_set.all():
                     evaluation_element.set_max_points()
@@ -121,6 +123,9 @@ class EvaluationScore(models.Model):
                 section.set_max_points()
                 max_points += section.max_points
                 section.set_points()
+                points += section.points
+            self.evaluation.points = points
+            self.evaluation.save()
             self.max_points = max_points
             self.need_to_set_max_points = False
             self.save()
@@ -133,19 +138,9 @@ class EvaluationScore(models.Model):
         :return: float
         """
         # todo test element weight with values not equal to 1
-        evaluation_element_weight = self.get_element_weight()
-        sum_points_not_concerned = 0
-        for section in self.evaluation.section_set.all():
-            for element in section.evaluationelement_set.all():
-                # Check this is useful to calculate points not concerned (condition intra or inter)
-                if element.has_condition_between_choices() or not element.is_applicable():
-                    element_weight = evaluation_element_weight.get_master_element_weight(
-                        element.master_evaluation_element
-                    )
-                    sum_points_not_concerned += (
-                        element.calculate_points_not_concerned() * element_weight
-                    )
-        self.points_not_concerned = sum_points_not_concerned
+        self.points_not_concerned = ScoringEngine(
+            self.evaluation
+        ).calculate_points_not_concerned()
         self.save()
 
     def set_exposition_dic(self):
@@ -162,79 +157,18 @@ class EvaluationScore(models.Model):
 
         Conditions inter/intra = no risk
         """
-        exposition_dic = {}
-        for section in self.evaluation.section_set.all().order_by("master_section__order_id"):
-            for element in section.evaluationelement_set.all().order_by(
-                "master_evaluation_element__order_id"
-            ):
-                if (
-                    not element.master_evaluation_element.risk_domain
-                    and not element.has_condition_on()
-                ):
-                    continue
-                # Check condition inter elements
-                if element.has_condition_on():
-                    # No condition inter, so concerned by the risk, register it with evaluation setting conditions
-                    if element.is_applicable():
-                        if (
-                            element.get_element_depending_on().master_evaluation_element.risk_domain
-                            not in exposition_dic
-                        ):
-                            exposition_dic[
-                                element.get_element_depending_on().master_evaluation_element.risk_domain
-                            ] = [
-                                element.get_element_depending_on().master_evaluation_element.id
-                            ]
-
-                    # Condition inter, so not concerned by the risk, just register it
-                    else:
-                        if (
-                            element.get_element_depending_on().master_evaluation_element.risk_domain
-                            not in exposition_dic
-                        ):
-                            exposition_dic[
-                                element.get_element_depending_on().master_evaluation_element.risk_domain
-                            ] = []
-                # Check conditions intra element (and not the case with condition intra)
-                if element.has_condition_between_choices() and element.is_applicable():
-                    # If the choice is ticked, so not concerned by the risk
-                    if element.get_choice_condition_intra().is_ticked:
-                        # The risk is not in the dictionary (if it already is, just let the list like this)
-                        if element.master_evaluation_element.risk_domain not in exposition_dic:
-                            exposition_dic[element.master_evaluation_element.risk_domain] = []
-                    # Choice not ticked, so concerned by the risk
-                    else:
-                        # The risk is not in the dictionary
-                        if element.master_evaluation_element.risk_domain not in exposition_dic:
-                            exposition_dic[element.master_evaluation_element.risk_domain] = [
-                                element.master_evaluation_element.id
-                            ]
-                        # Already the risk in the dictionary
-                        else:
-                            exposition_dic[
-                                element.master_evaluation_element.risk_domain
-                            ].append(element.master_evaluation_element.id)
-                # Case element with condition intra and not applicable due to conditions inter, still add the risk as
-                # not exposed
-                if element.has_condition_between_choices() and not element.is_applicable():
-                    if element.master_evaluation_element.risk_domain not in exposition_dic:
-                        exposition_dic[element.master_evaluation_element.risk_domain] = []
-        self.exposition_dic = exposition_dic
+        self.exposition_dic = ScoringEngine(self.evaluation).calculate_exposition_dic()
         self.save()
 
     def set_points_obtained(self):
         """
         This method calculates the points obtained in all the sections
         """
-
-        points_obtained = 0
-        for section in self.evaluation.section_set.all():
-            points_obtained += section.points
-
-        # Add the points not concerned * the coefficient (half points not concerned usually)
-        points_obtained += self.points_not_concerned * self.coefficient_scoring_system
-
-        self.points_obtained = round(points_obtained, 4)
+        self.points_obtained = calculate_points_obtained(
+            calculate_points_sections(self.evaluation.section_set.all()),
+            self.points_not_concerned,
+            self.coefficient_scoring_system,
+        )
         self.save()
 
     def set_points_to_dilate(self):
@@ -244,10 +178,8 @@ class EvaluationScore(models.Model):
 
         :return: float
         """
-        coefficient = self.coefficient_scoring_system
-
-        self.points_to_dilate = round(
-            self.points_obtained - self.points_not_concerned * coefficient, 4
+        self.points_to_dilate = calculate_points_to_dilate(
+            self.points_obtained, self.points_not_concerned, self.coefficient_scoring_system
         )
         self.save()
 
@@ -257,11 +189,8 @@ class EvaluationScore(models.Model):
 
         :return:
         """
-        max_points = self.max_points
-        pts_not_concerned = self.points_not_concerned
-        coeff = self.coefficient_scoring_system
-        self.dilatation_factor = round(
-            (max_points - pts_not_concerned * coeff) / (max_points - pts_not_concerned), 6
+        self.dilatation_factor = calculate_dilatation_factor(
+            self.max_points, self.points_not_concerned, self.coefficient_scoring_system
         )
         self.save()
 
@@ -272,11 +201,13 @@ class EvaluationScore(models.Model):
         :return: None, save the score of the evaluation (float)
         """
 
-        score_after_dilatation = (
-            self.dilatation_factor * self.points_to_dilate
-            + self.points_not_concerned * self.coefficient_scoring_system
+        self.score = calculate_score(
+            self.dilatation_factor,
+            self.points_to_dilate,
+            self.points_not_concerned,
+            self.coefficient_scoring_system,
+            self.max_points,
         )
-        self.score = round(score_after_dilatation * 100 / self.max_points, 1)
         self.save()
 
     def process_score_calculation(self):
@@ -286,13 +217,12 @@ class EvaluationScore(models.Model):
         """
         if self.evaluation.is_finished:
             if self.need_to_calculate:
-                # Order is important
-                self.set_points_not_concerned()
-                self.set_points_obtained()
-                self.set_points_to_dilate()
-                self.set_dilatation_factor()
-                self.set_score()
-                self.set_exposition_dic()
+                # All the fields are calculated in one pass and saved with one query
+                scoring_dic = ScoringEngine(self.evaluation).calculate_scoring(
+                    self.max_points, self.coefficient_scoring_system
+                )
+                for field, value in scoring_dic.items():
+                    setattr(self, field, value)
                 self.need_to_calculate = False
         else:
             self.score = 0
@@ -0,0 +1,141 @@
+from django.db.models import Prefetch
+
+from .choice import Choice
+from .element_change_log import ElementChangeLog
+from .evaluation_element import EvaluationElement
+
+
+class EvaluationTree:
+    """
+    The evaluation tree is the body of an evaluation (sections, evaluation elements, choices and their master
+    objects) loaded with a fixed number of queries, whatever the size of the assessment, and linked in memory:
+        - the sections are ordered by master section, the evaluation elements by master evaluation element
+        and the choices by id
+        - the master section of the master evaluation elements and the master evaluation element of the master
+        choices point to the loaded objects, so get_numbering and __str__ do not query them again
+        - each evaluation element with a condition inter evaluation elements knows the loaded choice it depends on
+        - the change logs of the evaluation elements are loaded at once if with_change_logs is True
+        - if section_ids is given, all the sections are loaded but only the evaluation elements and choices of
+        these sections, as the section page only displays one section
+
+    It is used by the section, results and PDF views, by the forms (set_form_for_sections and
+    set_form_for_results) and by Evaluation.get_dict_sections_elements_choices and
+    Evaluation.get_list_all_elements.
+    """
+
+    def __init__(self, evaluation, with_change_logs=False, section_ids=None):
+        self.evaluation = evaluation
+
+        element_query = EvaluationElement.objects.select_related("master_evaluation_element")
+        choice_query = Choice.objects.select_related("master_choice")
+        if section_ids is not None:
+            element_query = element_query.filter(section_id__in=section_ids)
+            choice_query = choice_query.filter(evaluation_element__section_id__in=section_ids)
+        self.section_list = list(
+            evaluation.section_set.select_related("master_section")
+            .order_by("master_section__order_id")
+            .prefetch_related(
+                Prefetch(
+                    "evaluationelement_set",
+                    queryset=element_query.prefetch_related(
+                        "master_evaluation_element__external_links"
+                    ).order_by("master_evaluation_element__order_id", "id"),
+                ),
+                Prefetch(
+                    "evaluationelement_set__choice_set",
+                    queryset=choice_query.order_by("id"),
+                ),
+            )
+        )
+
+        self.element_dic = {}
+        self.choices_by_master_choice = {}
+        for section in self.section_list:
+            for element in section.evaluationelement_set.all():
+                element.master_evaluation_element.master_section = section.master_section
+                self.element_dic.setdefault(section.id, []).append(element)
+                for choice in element.choice_set.all():
+                    choice.master_choice.master_evaluation_element = (
+                        element.master_evaluation_element
+                    )
+                    self.choices_by_master_choice[choice.master_choice_id] = choice
+
+        for element in self.get_element_list():
+            depends_on_id = element.master_evaluation_element.depends_on_id
+            # The choice may belong to a section which is not loaded, then it is queried when needed
+            if depends_on_id in self.choices_by_master_choice:
+                element.prefetched_choice_depending_on = self.choices_by_master_choice[
+                    depends_on_id
+                ]
+
+        if with_change_logs:
+            self.set_change_logs()
+
+    def get_section(self, section_id):
+        """
+        Get the section of the tree with this id, else None
+        :param section_id: int
+        :return: section or None
+        """
+        for section in self.section_list:
+            if section.id == section_id:
+                return section
+        return None
+
+    def get_elements_of_section(self, section):
+        """
+        Get the evaluation elements of the section, ordered by master evaluation element
+        :param section: section of the tree
+        :return: list
+        """
+        return self.element_dic.get(section.id, [])
+
+    def get_element_list(self):
+        """
+        Get all the evaluation elements of the evaluation, ordered by section then by master evaluation element
+        :return: list
+        """
+        return [
+            element
+            for section in self.section_list
+            for element in self.get_elements_of_section(section)
+        ]
+
+    def get_dict_sections_elements_choices(self):
+        """
+        Dictionary with the sections as keys and, as values, dictionaries with the evaluation elements
+        as keys and the lists of their choices as values
+        :return: dictionary
+        """
+        return {
+            section: {
+                element: list(element.choice_set.all())
+                for element in self.get_elements_of_section(section)
+            }
+            for section in self.section_list
+        }
+
+    def set_change_logs(self):
+        """
+        Load the change logs of the assessment with one query and set, on each evaluation element, the change
+        log with its numbering (None if there is none or several, like EvaluationElement.get_element_change_log)
+        """
+        evaluation = self.evaluation
+        if evaluation.upgraded_from:
+            previous_assessment = evaluation.upgraded_from
+        else:
+            previous_assessment = evaluation.assessment.previous_assessment
+        change_logs_by_numbering = {}
+        for change_log in ElementChangeLog.objects.filter(
+            previous_assessment=previous_assessment, assessment=evaluation.assessment
+        ):
+            change_logs_by_numbering.setdefault(change_log.eval_element_numbering, []).append(
+                change_log
+            )
+        for element in self.get_element_list():
+            change_log_list = change_logs_by_numbering.get(
+                element.master_evaluation_element.get_numbering(), []
+            )
+            element.prefetched_change_log = (
+                change_log_list[0] if len(change_log_list) == 1 else None
+            )
@@ -0,0 +1,43 @@
+from django.db import models
+from django.db.models import JSONField
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Job(models.Model):
+    """
+    This class defines the jobs of the background job runner (see assessment/jobs.py), which are run by the
+    run_jobs command, outside of the requests.
+    A job is defined by the name of its handler, registered in JOB_HANDLERS, and the keyword arguments
+    of the handler (payload).
+    A pending job is taken by a worker once its run_after date is passed, then it is running. It is deleted when
+    it succeeds, else it is pending again, after a delay doubled at each attempt, until it has been attempted
+    JOB_MAX_ATTEMPTS times, then it is failed and kept with its error.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+
+    STATUS = (
+        (PENDING, _("pending")),
+        (RUNNING, _("running")),
+        (FAILED, _("failed")),
+    )
+
+    name = models.CharField(max_length=200)
+    payload = JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS, default=PENDING)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="job_status_run_after_idx")
+        ]
+
+    def __str__(self):
+        return f"Job {self.name} (id={self.id}, {self.status})"
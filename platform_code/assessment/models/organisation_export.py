@@ -0,0 +1,65 @@
+import os
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from home.models import Organisation
+
+
+class OrganisationExport(models.Model):
+    """
+    This class defines the exports of the results of all the finished evaluations of an organisation, as a zip
+    file with the PDF of the results and a json file with the answers and the scores of each evaluation.
+    The zip file is built by a background job (see assessment/organisation_export.py), which sets the number
+    of evaluations exported so the progression can be displayed while it runs.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS = (
+        (PENDING, _("pending")),
+        (RUNNING, _("running")),
+        (DONE, _("done")),
+        (FAILED, _("failed")),
+    )
+
+    organisation = models.ForeignKey(Organisation, on_delete=models.CASCADE)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    language = models.CharField(max_length=10)
+    status = models.CharField(max_length=20, choices=STATUS, default=PENDING)
+    nb_evaluations = models.IntegerField(default=0)
+    nb_evaluations_done = models.IntegerField(default=0)
+    file_path = models.CharField(max_length=500, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Export of the organisation {self.organisation} (id={self.id}, {self.status})"
+
+    def get_progression(self):
+        """
+        Return the percentage of the evaluations exported
+        """
+        if self.status == self.DONE:
+            return 100
+        if not self.nb_evaluations:
+            return 0
+        return int(self.nb_evaluations_done * 100 / self.nb_evaluations)
+
+    def is_in_progress(self):
+        return self.status in (self.PENDING, self.RUNNING)
+
+    def delete_file(self):
+        """
+        Delete the zip file of the export, if it has been created
+        """
+        if self.file_path:
+            try:
+                os.remove(self.file_path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,292 @@
+from .choice import Choice
+from .evaluation_element import EvaluationElement
+from .scoring_plan import get_scoring_plan
+
+
+class ScoringEngine:
+    """
+    This class calculates in memory the scoring data of an evaluation (points not concerned, points obtained,
+    points to dilate, dilatation factor, score and exposition dictionary).
+
+    The sections, the evaluation elements (with their master objects) and the choices are loaded once when the
+    engine is created and the weights come from the scoring plan of the assessment. Then all the values are
+    calculated by walking the loaded tree without any other query. The methods of EvaluationScore delegate the calculations to this class.
+    """
+
+    def __init__(self, evaluation):
+        self.evaluation = evaluation
+        self.section_list = list(evaluation.section_set.all().order_by("id"))
+        # The elements are ordered like the sections and the elements of the assessment
+        self.element_list = list(
+            EvaluationElement.objects.filter(section__evaluation=evaluation)
+            .select_related("master_evaluation_element__master_section")
+            .order_by(
+                "section__master_section__order_id",
+                "master_evaluation_element__order_id",
+                "id",
+            )
+        )
+        choice_list = (
+            Choice.objects.filter(evaluation_element__section__evaluation=evaluation)
+            .select_related("master_choice")
+            .order_by("id")
+        )
+        # todo set the logic of organisation type
+        self.scoring_plan = get_scoring_plan(evaluation.assessment_id)
+
+        self.choices_by_element = {element.id: [] for element in self.element_list}
+        self.choices_by_master_choice = {}
+        for choice in choice_list:
+            self.choices_by_element[choice.evaluation_element_id].append(choice)
+            self.choices_by_master_choice[choice.master_choice_id] = choice
+        self.elements_by_master_element = {
+            element.master_evaluation_element_id: element for element in self.element_list
+        }
+
+    def get_element_weight(self, element):
+        """
+        Get the weight of the evaluation element, from the scoring plan of the assessment
+        :param element: evaluation element
+        :return: float
+        """
+        return self.scoring_plan.get_element_weight(element.master_evaluation_element_id)
+
+    def get_choice_depending_on(self, element):
+        """
+        For an evaluation element with a condition inter evaluation elements, return the choice it depends on,
+        else None
+        :param element: evaluation element
+        :return: choice or None
+        """
+        master_choice_id = element.master_evaluation_element.depends_on_id
+        if master_choice_id is None:
+            return None
+        return self.choices_by_master_choice[master_choice_id]
+
+    def get_master_element_depending_on(self, element):
+        """
+        Return the master evaluation element on which the element depends (condition inter elements)
+        :param element: evaluation element
+        :return: master evaluation element
+        """
+        choice = self.get_choice_depending_on(element)
+        return self.elements_by_master_element[
+            choice.master_choice.master_evaluation_element_id
+        ].master_evaluation_element
+
+    def is_applicable(self, element):
+        """
+        False if the choice the evaluation element depends on is ticked, else True
+        :param element: evaluation element
+        :return: boolean
+        """
+        choice = self.get_choice_depending_on(element)
+        return choice is None or not choice.is_ticked
+
+    def get_choice_condition_intra(self, element):
+        """
+        Return the choice of the evaluation element which sets conditions on the other choices, else None
+        :param element: evaluation element
+        :return: choice or None
+        """
+        for choice in self.choices_by_element[element.id]:
+            if choice.master_choice.is_concerned_switch:
+                return choice
+        return None
+
+    def calculate_element_points_not_concerned(self, element):
+        """
+        Same calculation as EvaluationElement.calculate_points_not_concerned: the max points of the element if
+        it is not applicable or if the choice setting conditions intra is ticked, weighted by the element weight
+        :param element: evaluation element
+        :return: float
+        """
+        sum_points_not_concerned = 0
+        if self.is_applicable(element):
+            for choice in self.choices_by_element[element.id]:
+                # if the choice which sets conditions on other choices is ticked
+                if choice.master_choice.is_concerned_switch and choice.is_ticked:
+                    sum_points_not_concerned = element.max_points
+        else:
+            sum_points_not_concerned = element.max_points
+        return sum_points_not_concerned * self.get_element_weight(element)
+
+    def calculate_points_not_concerned(self):
+        """
+        Calculate the total of the points not concerned of the evaluation, due to conditions inter or intra
+        evaluation elements
+        :return: float
+        """
+        sum_points_not_concerned = 0
+        for element in sorted(self.element_list, key=lambda item: (item.section_id, item.id)):
+            if self.get_choice_condition_intra(element) is not None or not self.is_applicable(
+                element
+            ):
+                # The element weight is applied in the points not concerned of the element and once more here
+                sum_points_not_concerned += self.calculate_element_points_not_concerned(
+                    element
+                ) * self.get_element_weight(element)
+        return sum_points_not_concerned
+
+    def calculate_exposition_dic(self):
+        """
+        Build the dictionary of the risk domains as keys and the list of the ids of the master evaluation elements
+        for which the user is exposed to the risk as values. See EvaluationScore.set_exposition_dic
+        :return: dictionary
+        """
+        exposition_dic = {}
+        for element in self.element_list:
+            master_element = element.master_evaluation_element
+            has_condition_on = master_element.depends_on_id is not None
+            if not master_element.risk_domain and not has_condition_on:
+                continue
+            is_applicable = self.is_applicable(element)
+            # Check condition inter elements
+            if has_condition_on:
+                master_element_depending_on = self.get_master_element_depending_on(element)
+                if master_element_depending_on.risk_domain not in exposition_dic:
+                    # No condition inter, so concerned by the risk, register it with evaluation setting conditions
+                    if is_applicable:
+                        exposition_dic[master_element_depending_on.risk_domain] = [
+                            master_element_depending_on.id
+                        ]
+                    # Condition inter, so not concerned by the risk, just register it
+                    else:
+                        exposition_dic[master_element_depending_on.risk_domain] = []
+            choice_condition_intra = self.get_choice_condition_intra(element)
+            if choice_condition_intra is not None:
+                # Check conditions intra element, if the choice is ticked, so not concerned by the risk
+                if is_applicable and not choice_condition_intra.is_ticked:
+                    exposition_dic.setdefault(master_element.risk_domain, []).append(
+                        master_element.id
+                    )
+                # Choice ticked or element not applicable due to conditions inter, still add the risk as
+                # not exposed
+                elif master_element.risk_domain not in exposition_dic:
+                    exposition_dic[master_element.risk_domain] = []
+        return exposition_dic
+
+    def calculate_section_scores(self, coefficient):
+        """
+        Calculate the score of each section, with the compensation of its points not concerned, like
+        Section.calculate_score_per_section but for all the sections at once
+        :param coefficient: coefficient of the scoring system
+        :return: dictionary with the section ids as keys and the scores (points) as values
+        """
+        points_not_concerned = {section.id: 0 for section in self.section_list}
+        for element in self.element_list:
+            if self.get_choice_condition_intra(element) is not None or not self.is_applicable(
+                element
+            ):
+                points_not_concerned[
+                    element.section_id
+                ] += self.calculate_element_points_not_concerned(
+                    element
+                ) * self.get_element_weight(
+                    element
+                )
+        return {
+            section.id: calculate_section_score(
+                section.points, section.max_points, points_not_concerned[section.id], coefficient
+            )
+            for section in self.section_list
+        }
+
+    def calculate_scoring(self, max_points, coefficient):
+        """
+        Calculate all the dynamic fields of the evaluation score in one pass
+        :param max_points: max points of the evaluation
+        :param coefficient: coefficient of the scoring system
+        :return: dictionary with the field names as keys
+        """
+        points_not_concerned = self.calculate_points_not_concerned()
+        points_obtained = calculate_points_obtained(
+            calculate_points_sections(self.section_list), points_not_concerned, coefficient
+        )
+        points_to_dilate = calculate_points_to_dilate(
+            points_obtained, points_not_concerned, coefficient
+        )
+        dilatation_factor = calculate_dilatation_factor(
+            max_points, points_not_concerned, coefficient
+        )
+        return {
+            "points_not_concerned": points_not_concerned,
+            "points_obtained": points_obtained,
+            "points_to_dilate": points_to_dilate,
+            "dilatation_factor": dilatation_factor,
+            "score": calculate_score(
+                dilatation_factor,
+                points_to_dilate,
+                points_not_concerned,
+                coefficient,
+                max_points,
+            ),
+            "exposition_dic": self.calculate_exposition_dic(),
+        }
+
+
+def calculate_points_sections(section_list):
+    """
+    Sum of the points of the sections
+    :param section_list: list of sections
+    :return: float
+    """
+    points = 0
+    for section in section_list:
+        points += section.points
+    return points
+
+
+def calculate_section_score(points, max_points, points_not_concerned, coefficient):
+    """
+    Score of a section: the points obtained are dilated to compensate the points not concerned, and the points
+    not concerned * the coefficient are added
+    :return: float
+    """
+    dilatation_factor = (max_points - points_not_concerned * coefficient) / (
+        max_points - points_not_concerned
+    )
+    return points * dilatation_factor + coefficient * points_not_concerned
+
+
+def calculate_points_obtained(points_sections, points_not_concerned, coefficient):
+    """
+    Points obtained: the points of the sections plus the points not concerned * the coefficient
+    (half points not concerned usually)
+    :return: float
+    """
+    return round(points_sections + points_not_concerned * coefficient, 4)
+
+
+def calculate_points_to_dilate(points_obtained, points_not_concerned, coefficient):
+    """
+    Points to dilate: points obtained - points not concerned * coefficient, which is just the sum of the
+    points of the ticked choices according to the scoring
+    :return: float
+    """
+    return round(points_obtained - points_not_concerned * coefficient, 4)
+
+
+def calculate_dilatation_factor(max_points, points_not_concerned, coefficient):
+    """
+    Dilatation factor, used to calculate the score of the evaluation
+    :return: float
+    """
+    return round(
+        (max_points - points_not_concerned * coefficient)
+        / (max_points - points_not_concerned),
+        6,
+    )
+
+
+def calculate_score(
+    dilatation_factor, points_to_dilate, points_not_concerned, coefficient, max_points
+):
+    """
+    Score of the evaluation, as percentage of the max points
+    :return: float
+    """
+    score_after_dilatation = (
+        dilatation_factor * points_to_dilate + points_not_concerned * coefficient
+    )
+    return round(score_after_dilatation * 100 / max_points, 1)
@@ -0,0 +1,137 @@
+from django.apps import apps
+from home.versioned_cache import get_cached_value, invalidate_cache
+
+from .evaluation_element_weight import EvaluationElementWeight
+from .scoring_system import ScoringSystem
+
+
+class ScoringPlan:
+    """
+    A scoring plan is the compiled version of the scoring system and of the evaluation element weight of an
+    assessment, for an organisation type.
+    The weights of the json fields, which have the numbering of the master objects as keys ("1.2.a"), are parsed
+    once and indexed by the ids of the master choices and master evaluation elements, so the scoring calculations
+    do not need to build the numbering of each object nor to query the scoring objects.
+
+    The plans are cached (see get_scoring_plan) and invalidated when a ScoringSystem or an EvaluationElementWeight
+    is saved or deleted (see assessment/signals.py).
+    """
+
+    def __init__(self, assessment_id, organisation_type="entreprise"):
+        self.assessment_id = assessment_id
+        self.organisation_type = organisation_type
+
+        scoring_system_list = list(
+            ScoringSystem.objects.filter(
+                assessment_id=assessment_id, organisation_type=organisation_type
+            ).order_by("id")
+        )
+        choices_weight_json = (
+            scoring_system_list[0].master_choices_weight_json if scoring_system_list else {}
+        )
+        # Same rule than EvaluationScore.set_coefficient_scoring_system
+        if len(scoring_system_list) == 1:
+            self.coefficient_scoring_system = scoring_system_list[
+                0
+            ].attributed_points_coefficient
+        else:
+            self.coefficient_scoring_system = 0.5
+
+        element_weight = (
+            EvaluationElementWeight.objects.filter(
+                assessment_id=assessment_id, organisation_type=organisation_type
+            )
+            .order_by("id")
+            .first()
+        )
+        element_weight_json = (
+            element_weight.master_evaluation_element_weight_json if element_weight else {}
+        )
+
+        # The master models are got from the registry as the modules of the master objects use the scoring plan
+        MasterChoice = apps.get_model("assessment", "MasterChoice")
+        MasterEvaluationElement = apps.get_model("assessment", "MasterEvaluationElement")
+
+        # Weights of the master choices, master choice ids as keys
+        self.choice_weights = {}
+        for (
+            master_choice_id,
+            section_order_id,
+            element_order_id,
+            order_id,
+        ) in MasterChoice.objects.filter(
+            master_evaluation_element__master_section__assessment_id=assessment_id
+        ).values_list(
+            "id",
+            "master_evaluation_element__master_section__order_id",
+            "master_evaluation_element__order_id",
+            "order_id",
+        ):
+            numbering = f"{section_order_id}.{element_order_id}.{order_id}"
+            if numbering in choices_weight_json:
+                self.choice_weights[master_choice_id] = float(choices_weight_json[numbering])
+
+        # Weights of the master evaluation elements, master evaluation element ids as keys
+        self.element_weights = {}
+        for (
+            master_element_id,
+            section_order_id,
+            order_id,
+        ) in MasterEvaluationElement.objects.filter(
+            master_section__assessment_id=assessment_id
+        ).values_list(
+            "id", "master_section__order_id", "order_id"
+        ):
+            numbering = f"{section_order_id}.{order_id}"
+            if numbering in element_weight_json:
+                self.element_weights[master_element_id] = float(element_weight_json[numbering])
+
+    def get_choice_points(self, master_choice_id):
+        """
+        Get the weight of the master choice. A master choice which is not in the scoring system raises a KeyError,
+        as the points of the evaluations cannot be calculated.
+        :param master_choice_id: int
+        :return: float
+        """
+        if master_choice_id not in self.choice_weights:
+            raise KeyError(
+                f"The master choice {master_choice_id} is not in the scoring system of the assessment "
+                f"{self.assessment_id} ({self.organisation_type})"
+            )
+        return self.choice_weights[master_choice_id]
+
+    def get_element_weight(self, master_element_id):
+        """
+        Get the weight of the master evaluation element. A master evaluation element which is not in the evaluation
+        element weight raises a KeyError, as the points of the evaluations cannot be calculated.
+        :param master_element_id: int
+        :return: float
+        """
+        if master_element_id not in self.element_weights:
+            raise KeyError(
+                f"The master evaluation element {master_element_id} is not in the evaluation element weight of "
+                f"the assessment {self.assessment_id} ({self.organisation_type})"
+            )
+        return self.element_weights[master_element_id]
+
+
+def get_scoring_plan(assessment_id, organisation_type="entreprise"):
+    """
+    Return the scoring plan of the assessment for the organisation type from the cache (see
+    home/versioned_cache.py), else the plan is compiled and cached
+    :param assessment_id: int
+    :param organisation_type: string
+    :return: ScoringPlan
+    """
+    return get_cached_value(
+        "scoring_plan",
+        f"{assessment_id}:{organisation_type}",
+        lambda: ScoringPlan(assessment_id, organisation_type),
+    )
+
+
+def invalidate_scoring_plan():
+    """
+    Remove the scoring plans of all the assessments from the cache of all the processes
+    """
+    invalidate_cache("scoring_plan")
@@ -5,6 +5,7 @@ from django.template.defaultfilters import slugify
 from django.urls import reverse
 
 from .assessment import Assessment
+from .scoring_plan import get_scoring_plan
 
 
 class MasterSection(models.Model):
@@ -54,6 +55,10 @@ class Section(models.Model):
     user_progression = models.IntegerField(
         default=0
     )  # progression of user inside this section, as percentage
+    # Counters of the evaluation elements of the section and of the ones answered or not applicable, used to
+    # update the progression by deltas when an answer is saved
+    nb_elements = models.IntegerField(default=0)
+    nb_elements_done = models.IntegerField(default=0)
     points = models.FloatField(default=0)
     max_points = models.FloatField(default=0, blank=True, null=True)
     # This field "fetch" is used for the versioning of assessments
@@ -102,19 +107,46 @@ class Section(models.Model):
         the number of evaluation_element treated by the global number of evaluation_element
         """
 
-        evaluation_element_list = self.evaluationelement_set.all()
-        count_element_done = 0
-        # If not empty
-        if list(evaluation_element_list):
-            for element in evaluation_element_list:
-                if (
-                    element.status or not element.is_applicable()
-                ):  # the element has been answered or is not applicable
-                    count_element_done += 1
+        evaluation_element_list = list(self.evaluationelement_set.all())
+        self.nb_elements = len(evaluation_element_list)
+        self.nb_elements_done = 0
+        for element in evaluation_element_list:
+            if (
+                element.status or not element.is_applicable()
+            ):  # the element has been answered or is not applicable
+                self.nb_elements_done += 1
+        self.calculate_progression()
+        self.save()
+
+    def calculate_progression(self):
+        """
+        Set the progression of the section, as percentage, from the counters of evaluation elements.
+        The progression is not modified if the section has no evaluation element
+        """
+        if self.nb_elements:
             self.user_progression = int(
-                round(count_element_done * 100 / len(evaluation_element_list), 0)
+                round(self.nb_elements_done * 100 / self.nb_elements, 0)
             )
-        self.save()
+
+    def is_done(self):
+        """True if the progression of the section is 100 %"""
+        return self.user_progression >= 100
+
+    def apply_delta(self, delta_elements_done, delta_points):
+        """
+        Update the counter of evaluation elements done, the progression and the points of the section
+        with the changes of some of its evaluation elements, without scanning all the elements.
+        The section must have been loaded with its row locked (see Evaluation.apply_elements_delta), so the
+        deltas of concurrent requests are not lost.
+        :param delta_elements_done: int, variation of the number of elements answered or not applicable
+        :param delta_points: float, variation of the points of the applicable elements
+        """
+        self.nb_elements_done += delta_elements_done
+        self.points += delta_points
+        self.calculate_progression()
+        self.save(
+            update_fields=["nb_elements_done", "points", "user_progression", "updated_at"]
+        )
 
     def set_points(self):
         """Set the points for a section according to the points set by each evaluation element of the section"""
@@ -142,14 +174,13 @@ class Section(models.Model):
         Get the sum of the points not concerned within a section, due to conditions inter evaluation elements or
         to conditions intra evaluation elements.
         """
-        evaluation_score = self.evaluation.evaluationscore_set.first()
-        evaluation_element_weight = evaluation_score.get_element_weight()
+        scoring_plan = get_scoring_plan(self.evaluation.assessment_id)
         sum_points_not_concerned = 0
         for element in self.evaluationelement_set.all():
             # Check this is useful to calculate points not concerned (condition intra or inter)
             if element.has_condition_between_choices() or not element.is_applicable():
-                element_weight = evaluation_element_weight.get_master_element_weight(
-                    element.master_evaluation_element
+                element_weight = scoring_plan.get_element_weight(
+                    element.master_evaluation_element_id
                 )
                 sum_points_not_concerned += (
                     element.calculate_points_not_concerned() * element_weight
@@ -162,9 +193,9 @@ class Section(models.Model):
         Multiply the dilatation factor with the points obtained and sum it with half the points not
         concerned.
         """
+        # Imported here as the scoring engine imports the evaluation elements, which import this module
+        from .scoring_engine import calculate_section_score
+
         pts_not_concerned = self.get_points_not_concerned()
         coeff = self.evaluation.evaluationscore_set.first().coefficient_scoring_system
-        dilatation_factor = (self.max_points - pts_not_concerned * coeff) / (
-            self.max_points - pts_not_concerned
-        )
-        return self.points * dilatation_factor + coeff * pts_not_concerned
+        return calculate_section_score(self.points, self.max_points, pts_not_concerned, coeff)
@@ -0,0 +1,106 @@
+from django.apps import apps
+from django.db.models import Prefetch
+from home.versioned_cache import get_cached_value, invalidate_cache
+
+# The master evaluation element with this numbering is not required to be translated
+NUMBERING_NOT_TRANSLATED = "2.2"
+
+
+class TranslationCompleteness:
+    """
+    The translation completeness of an assessment lists, for each language of the settings, the fields registered in
+    TRANSLATED_FIELDS which are empty in the assessment and its body (master sections, master evaluation elements,
+    master choices and external links). The languages without empty field are the available languages of the
+    assessment.
+
+    The body is loaded with a fixed number of queries, whatever the size of the assessment, and the assessment texts
+    only change when an assessment is imported or edited in the admin, so the completeness is cached (see
+    get_translation_completeness). It is invalidated by the signals when one of these objects is modified (see
+    assessment/signals.py).
+    """
+
+    def __init__(self, assessment_id):
+        # The models are got from the registry and the constants imported here, as the module of the assessments
+        # uses the completeness
+        from .assessment import TRANSLATED_FIELDS, get_available_languages
+
+        Assessment = apps.get_model("assessment", "Assessment")
+        MasterEvaluationElement = apps.get_model("assessment", "MasterEvaluationElement")
+        assessment = Assessment.objects.prefetch_related(
+            Prefetch(
+                "mastersection_set__masterevaluationelement_set",
+                queryset=MasterEvaluationElement.objects.prefetch_related(
+                    "masterchoice_set", "external_links"
+                ),
+            )
+        ).get(id=assessment_id)
+
+        # List of the objects with their fields to check, as (obj, obj_name) tuples
+        obj_list = [(assessment, "assessment")]
+        for master_section in assessment.mastersection_set.all():
+            obj_list.append((master_section, "master_section"))
+            for master_evaluation_element in master_section.masterevaluationelement_set.all():
+                # Link the loaded master section, so get_numbering does not query it again
+                master_evaluation_element.master_section = master_section
+                if master_evaluation_element.get_numbering() != NUMBERING_NOT_TRANSLATED:
+                    obj_list.append((master_evaluation_element, "master_evaluation_element"))
+                for master_choice in master_evaluation_element.masterchoice_set.all():
+                    obj_list.append((master_choice, "master_choice"))
+                for external_link in master_evaluation_element.external_links.all():
+                    obj_list.append((external_link, "external_link"))
+
+        fields_not_translated = {}
+        for language in get_available_languages():
+            dic_fields = {}
+            for obj, obj_name in obj_list:
+                for field in TRANSLATED_FIELDS[obj_name]:
+                    if not getattr(obj, field + "_" + language):
+                        dic_fields[obj] = field + "_" + language
+            fields_not_translated[language] = dic_fields
+
+        self.fields_not_translated = fields_not_translated
+        self.available_languages = tuple(
+            language
+            for language, dic_fields in self.fields_not_translated.items()
+            if not dic_fields
+        )
+
+    def has_language(self, language):
+        """
+        True if all the fields registered to have a translation are filled for the language
+        :param language: string, key of the language, ex "fr"
+        :return: boolean
+        """
+        return language in self.available_languages
+
+    def get_fields_not_translated(self, language):
+        """
+        Get the dictionary with the objects which have an empty field for the language as keys and the field as
+        values (the last one if several are empty). It is empty if the language is not in the settings.
+        :param language: string, key of the language, ex "fr"
+        :return: dictionary
+        """
+        return dict(self.fields_not_translated.get(language, {}))
+
+
+def get_translation_completeness(assessment_id):
+    """
+    Return the translation completeness of the assessment from the cache (see home/versioned_cache.py), else it is
+    computed and cached.
+    A completeness computed inside a transaction is not cached, as the texts it is based on may be rolled back.
+    :param assessment_id: int
+    :return: TranslationCompleteness
+    """
+    return get_cached_value(
+        "translation_completeness",
+        assessment_id,
+        lambda: TranslationCompleteness(assessment_id),
+        cache_in_transaction=False,
+    )
+
+
+def invalidate_translation_completeness():
+    """
+    Remove the translation completeness of all the assessments from the cache of all the processes
+    """
+    invalidate_cache("translation_completeness")
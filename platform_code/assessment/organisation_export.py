@@ -0,0 +1,235 @@
+"""
+Export of the results of all the finished evaluations of an organisation.
+
+The export is requested from the organisation page or with an action of the admin, then built by a background
+job (see assessment/jobs.py): the results of the evaluations are rendered in parallel by a pool of
+ORGANISATION_EXPORT_PROCESSES processes, each one calculating the score and storing the PDF of an evaluation as
+the prerendering does (see assessment/results_prerendering.py), so the PDF already stored in the cache are
+reused. The PDF and a json file with the answers and the scores of each evaluation are written in a zip file,
+and the number of evaluations exported is saved after each one so the progression can be displayed.
+The zip files are stored outside the MEDIA_ROOT, which is served without authentication, with a random name,
+and are only downloaded through the views checking the membership of the user.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.template.defaultfilters import slugify
+from django.utils import timezone
+from home.models import Organisation
+
+from .jobs import enqueue_job
+from .models import Evaluation, EvaluationScore, OrganisationExport
+from .results_prerendering import prerender_evaluation_results
+
+logger = logging.getLogger("monitoring")
+
+JOB_NAME = "export_organisation_results"
+
+
+def get_organisation_export_dir():
+    """
+    Return the directory of the zip files of the exports (ORGANISATION_EXPORT_DIR setting,
+    "private/organisation_exports" in the BASE_DIR if not set), which must not be served by the web server
+    """
+    return getattr(
+        settings,
+        "ORGANISATION_EXPORT_DIR",
+        os.path.join(settings.BASE_DIR, "private", "organisation_exports"),
+    )
+
+
+def request_organisation_export(organisation, user, language):
+    """
+    Create an export of the results of the finished evaluations of the organisation and enqueue the job which
+    builds it, unless an export of the organisation is already in progress. The previous exports of the
+    organisation which are not in progress are deleted.
+    :param organisation: organisation
+    :param user: user who requests the export
+    :param language: string, code of the language of the PDF
+    :return: organisation export, None if an export is already in progress
+    """
+    with transaction.atomic():
+        # The organisation is locked so two exports cannot be requested at the same time
+        Organisation.objects.select_for_update().filter(id=organisation.id).first()
+        if OrganisationExport.objects.filter(
+            organisation=organisation,
+            status__in=[OrganisationExport.PENDING, OrganisationExport.RUNNING],
+        ).exists():
+            return None
+        for previous_export in OrganisationExport.objects.filter(
+            organisation=organisation,
+            status__in=[OrganisationExport.DONE, OrganisationExport.FAILED],
+        ):
+            # The file is deleted by the signal
+            previous_export.delete()
+        organisation_export = OrganisationExport.objects.create(
+            organisation=organisation, created_by=user, language=language
+        )
+        enqueue_job(JOB_NAME, export_id=organisation_export.id)
+    return organisation_export
+
+
+def get_evaluation_data(evaluation):
+    """
+    Return the answers and the scores of the evaluation, which are written in the json file of the export
+    :param evaluation: finished evaluation
+    :return: dictionary
+    """
+    evaluation_score = EvaluationScore.objects.get(evaluation=evaluation)
+    section_list = []
+    for section, elements in evaluation.get_dict_sections_elements_choices().items():
+        element_list = []
+        for element, choices in elements.items():
+            element_list.append(
+                {
+                    "numbering": element.master_evaluation_element.get_numbering(),
+                    "is_applicable": element.is_applicable(),
+                    "ticked_choices": [
+                        choice.master_choice.get_numbering()
+                        for choice in choices
+                        if choice.is_ticked
+                    ],
+                    "points": element.points,
+                    "max_points": element.max_points,
+                    "user_justification": element.user_justification,
+                    "user_notes": element.user_notes,
+                }
+            )
+        section_list.append(
+            {
+                "numbering": section.master_section.get_numbering(),
+                "points": section.points,
+                "max_points": section.max_points,
+                "user_notes": section.user_notes,
+                "elements": element_list,
+            }
+        )
+    return {
+        "organisation": evaluation.organisation.name,
+        "evaluation": evaluation.name,
+        "evaluation_id": evaluation.id,
+        "assessment_version": evaluation.assessment.version,
+        "finished_at": evaluation.finished_at.isoformat() if evaluation.finished_at else None,
+        "score": evaluation_score.score,
+        "points_obtained": evaluation_score.points_obtained,
+        "max_points": evaluation_score.max_points,
+        "sections": section_list,
+    }
+
+
+def render_evaluation_results(evaluation_id, language):
+    """
+    Calculate the score of the evaluation and store the PDF of its results if it is not stored yet, then return
+    its data. This is run in the processes of the pool.
+    :param evaluation_id: int
+    :param language: string, code of the language of the PDF
+    :return: tuple (evaluation id, path of the PDF or None, json string or None if the evaluation is not
+    finished anymore)
+    """
+    pdf_path = prerender_evaluation_results(evaluation_id, language)
+    evaluation = (
+        Evaluation.objects.select_related("organisation", "assessment")
+        .filter(id=evaluation_id, is_finished=True)
+        .first()
+    )
+    if evaluation is None:
+        return evaluation_id, None, None
+    return evaluation_id, pdf_path, json.dumps(get_evaluation_data(evaluation), indent=2)
+
+
+def render_evaluations_results(evaluation_ids, language):
+    """
+    Render the results of the evaluations, in a pool of ORGANISATION_EXPORT_PROCESSES processes if there are
+    several processes and several evaluations, else in the current process.
+    :param evaluation_ids: list of int
+    :param language: string
+    :return: generator of the results of render_evaluation_results, in the order they are rendered
+    """
+    processes = min(getattr(settings, "ORGANISATION_EXPORT_PROCESSES", 4), len(evaluation_ids))
+    if processes <= 1:
+        for evaluation_id in evaluation_ids:
+            yield render_evaluation_results(evaluation_id, language)
+        return
+    # The connections to the database cannot be shared with the processes, which open their own connections
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        futures = [
+            executor.submit(render_evaluation_results, evaluation_id, language)
+            for evaluation_id in evaluation_ids
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def export_organisation_results(export_id):
+    """
+    Handler of the job: write the PDF and the json file of each finished evaluation of the organisation in the
+    zip file of the export and save the progression after each evaluation.
+    :param export_id: int
+    """
+    organisation_export = (
+        OrganisationExport.objects.select_related("organisation").filter(id=export_id).first()
+    )
+    if organisation_export is None:
+        return
+    organisation = organisation_export.organisation
+    evaluation_names = dict(
+        Evaluation.objects.filter(organisation=organisation, is_finished=True)
+        .order_by("id")
+        .values_list("id", "name")
+    )
+    organisation_export.status = OrganisationExport.RUNNING
+    organisation_export.nb_evaluations = len(evaluation_names)
+    organisation_export.nb_evaluations_done = 0
+    organisation_export.save()
+
+    export_dir = get_organisation_export_dir()
+    os.makedirs(export_dir, exist_ok=True)
+    # The name cannot be guessed, the file is downloaded with the name of the organisation by the views
+    file_path = os.path.join(export_dir, f"{secrets.token_urlsafe(32)}.zip")
+    temporary_path = f"{file_path}.tmp"
+    try:
+        with zipfile.ZipFile(temporary_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            nb_done = 0
+            for evaluation_id, pdf_path, json_data in render_evaluations_results(
+                list(evaluation_names.keys()), organisation_export.language
+            ):
+                name = f"{evaluation_id}-{slugify(evaluation_names[evaluation_id])}"
+                if json_data is not None:
+                    zip_file.writestr(f"{name}.json", json_data)
+                if pdf_path is not None:
+                    zip_file.write(pdf_path, f"{name}.pdf")
+                elif json_data is not None:
+                    logger.warning(
+                        f"[organisation_export_pdf_missing] The PDF of the evaluation (id {evaluation_id}) "
+                        f"could not be stored, it is not in the export (id {organisation_export.id})"
+                    )
+                nb_done += 1
+                OrganisationExport.objects.filter(id=organisation_export.id).update(
+                    nb_evaluations_done=nb_done
+                )
+        os.replace(temporary_path, file_path)
+    except Exception:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        OrganisationExport.objects.filter(id=organisation_export.id).update(
+            status=OrganisationExport.FAILED
+        )
+        raise
+    OrganisationExport.objects.filter(id=organisation_export.id).update(
+        status=OrganisationExport.DONE, file_path=file_path, finished_at=timezone.now()
+    )
+    logger.info(
+        f"[organisation_export] The results of {len(evaluation_names)} evaluations of the organisation "
+        f"{organisation.name} (id {organisation.id}) have been exported (export id {organisation_export.id})"
+    )
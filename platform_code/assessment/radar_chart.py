@@ -0,0 +1,203 @@
+"""
+Radar chart of the scores per section displayed on the results page.
+
+The chart is drawn as an inline SVG, so no javascript library is embedded in the page. The scores of all the
+sections are calculated at once by the scoring engine, and the chart is stored with the content hash of the
+results of the evaluation (see assessment/results_pdf_cache.py), which changes with the answers, the score, the
+master objects, the language and the platform color, so it is drawn again only when one of them changes.
+The chart is stored in the directory of the PDF of the results of the evaluation, which is shared by the web
+server and the worker, so the chart drawn by the prerendering of the results (see
+assessment/results_prerendering.py) is served by the results page. This directory is outside the MEDIA_ROOT, so
+the chart is never served as a file, it is only embedded inline in the results page of the members of the
+organisation.
+"""
+
+import math
+import os
+import tempfile
+
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+from django.utils.translation import gettext as _
+from home.models.platform_management import get_platform_management
+
+from .models import EvaluationScore
+from .models.scoring_engine import ScoringEngine
+from .results_pdf_cache import get_evaluation_content_hash, get_evaluation_pdf_dir
+
+# Prefix of the files of the radar charts in the directory of the evaluation
+RADAR_CHART_PREFIX = "radar-"
+
+# Size of the chart, the radius is the one of the 100% polygon
+RADAR_CHART_WIDTH = 600
+RADAR_CHART_HEIGHT = 440
+RADAR_CHART_RADIUS = 150
+RADAR_CHART_TICKS = (20, 40, 60, 80, 100)
+
+
+def get_radar_chart(evaluation, section_list):
+    """
+    Return the html of the radar chart of the scores per section of the finished evaluation, from the file stored
+    if it has already been drawn for the same results
+    :param evaluation: finished evaluation
+    :param section_list: sections of the evaluation, in the order of the chart
+    :return: string (html) or None if there is no section
+    """
+    if not section_list:
+        return None
+    content_hash = get_evaluation_content_hash(evaluation, evaluation.organisation)
+    # The score needs to be calculated again, so the chart is not stored
+    if content_hash is None:
+        return draw_radar_chart(evaluation, section_list)
+    path = get_radar_chart_path(evaluation.id, content_hash)
+    try:
+        with open(path, encoding="utf-8") as file:
+            return file.read()
+    except FileNotFoundError:
+        pass
+    radar_chart = draw_radar_chart(evaluation, section_list)
+    store_radar_chart(radar_chart, path)
+    return radar_chart
+
+
+def get_radar_chart_path(evaluation_id, content_hash):
+    """
+    Return the path of the radar chart of the evaluation with this content hash, with the language in the name of
+    the file as for the PDF
+    """
+    return os.path.join(
+        get_evaluation_pdf_dir(evaluation_id),
+        f"{RADAR_CHART_PREFIX}{get_language()}-{content_hash}.svg",
+    )
+
+
+def store_radar_chart(radar_chart, path):
+    """
+    Write the radar chart in a temporary file moved to its path, so a chart being written is never read, and
+    delete the previous chart of the evaluation in the same language. The chart is not stored if the directory
+    cannot be written.
+    :param radar_chart: string (html)
+    :param path: string, returned by get_radar_chart_path
+    """
+    evaluation_dir = os.path.dirname(path)
+    try:
+        os.makedirs(evaluation_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=evaluation_dir, suffix=".tmp", encoding="utf-8", delete=False
+        ) as file:
+            file.write(radar_chart)
+        os.replace(file.name, path)
+    except OSError:
+        return
+    language_prefix = f"{RADAR_CHART_PREFIX}{get_language()}-"
+    for file_name in os.listdir(evaluation_dir):
+        file_path = os.path.join(evaluation_dir, file_name)
+        if (
+            file_name.startswith(language_prefix)
+            and file_name.endswith(".svg")
+            and file_path != path
+        ):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                # Already removed by an other request
+                pass
+
+
+def get_section_scores(evaluation, section_list):
+    """
+    Return the score of each section in percentage of its max points, calculated once for all the sections
+    :param evaluation: evaluation
+    :param section_list: sections of the evaluation
+    :return: list of floats, in the order of the section list
+    """
+    coefficient = (
+        EvaluationScore.objects.filter(evaluation=evaluation)
+        .values_list("coefficient_scoring_system", flat=True)
+        .first()
+    )
+    section_scores = ScoringEngine(evaluation).calculate_section_scores(coefficient or 0)
+    return [
+        section_scores[section.id] / section.max_points * 100 if section.max_points else 0
+        for section in section_list
+    ]
+
+
+def get_polygon_points(values):
+    """
+    Return the coordinates of the points of a polygon of the chart, one per axis, for values in percentage.
+    The first axis is vertical and the axis follow clockwise.
+    :param values: list of floats between 0 and 100
+    :return: list of tuples (x, y)
+    """
+    points = []
+    for i, value in enumerate(values):
+        angle = 2 * math.pi * i / len(values) - math.pi / 2
+        radius = RADAR_CHART_RADIUS * max(0, min(value, 100)) / 100
+        points.append(
+            (
+                round(RADAR_CHART_WIDTH / 2 + radius * math.cos(angle), 1),
+                round(RADAR_CHART_HEIGHT / 2 + radius * math.sin(angle), 1),
+            )
+        )
+    return points
+
+
+def format_points(points):
+    return " ".join(f"{x},{y}" for x, y in points)
+
+
+def draw_radar_chart(evaluation, section_list):
+    """
+    Draw the radar chart of the evaluation as a SVG
+    :param evaluation: finished evaluation
+    :param section_list: sections of the evaluation
+    :return: string (html)
+    """
+    scores = get_section_scores(evaluation, section_list)
+    nb_axis = len(section_list)
+    label_points = get_polygon_points([115] * nb_axis)
+    labels = []
+    for section, (x, y) in zip(section_list, label_points):
+        if abs(x - RADAR_CHART_WIDTH / 2) < 1:
+            anchor = "middle"
+        elif x > RADAR_CHART_WIDTH / 2:
+            anchor = "start"
+        else:
+            anchor = "end"
+        labels.append(
+            {
+                "x": x,
+                "y": y,
+                "anchor": anchor,
+                "text": f"Section {section.master_section.order_id}{_(': ')}"
+                f"{section.master_section.keyword}",
+            }
+        )
+    vertices = [
+        {"x": x, "y": y, "title": f"Score{_(': ')}{round(score, 1)}%"}
+        for (x, y), score in zip(get_polygon_points(scores), scores)
+    ]
+    context = {
+        "width": RADAR_CHART_WIDTH,
+        "height": RADAR_CHART_HEIGHT,
+        "color": f"#{get_platform_management().primary_color}",
+        "grid_polygons": [
+            format_points(get_polygon_points([tick] * nb_axis)) for tick in RADAR_CHART_TICKS
+        ],
+        "axis_points": get_polygon_points([100] * nb_axis),
+        "center_x": RADAR_CHART_WIDTH / 2,
+        "center_y": RADAR_CHART_HEIGHT / 2,
+        "ticks": [
+            {
+                "x": RADAR_CHART_WIDTH / 2 - 6,
+                "y": RADAR_CHART_HEIGHT / 2 - RADAR_CHART_RADIUS * tick / 100,
+                "text": f"{tick}%",
+            }
+            for tick in (0,) + RADAR_CHART_TICKS
+        ],
+        "score_polygon": format_points(get_polygon_points(scores)),
+        "vertices": vertices,
+        "labels": labels,
+    }
+    return render_to_string("assessment/radar-chart.html", context)
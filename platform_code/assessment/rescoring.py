@@ -0,0 +1,284 @@
+"""
+Batch rescoring of the evaluations of an assessment, used after the scoring system or the evaluation element
+weight of the assessment has been modified.
+
+The answers of the evaluations are loaded as a tick matrix (evaluations x master choices) and the weights of the
+scoring plan are applied as vectors, so the max points, the points and the points not concerned of all the
+evaluation elements, sections and evaluations are calculated with matrix operations. The results are written back
+with chunked bulk updates.
+"""
+
+import numpy as np
+from assessment.models import (
+    Choice,
+    Evaluation,
+    EvaluationElement,
+    EvaluationScore,
+    MasterChoice,
+    MasterEvaluationElement,
+    MasterSection,
+    Section,
+)
+from assessment.models.scoring_engine import (
+    calculate_dilatation_factor,
+    calculate_points_obtained,
+    calculate_points_to_dilate,
+    calculate_score,
+)
+from assessment.models.scoring_plan import get_scoring_plan
+from django.db import transaction
+
+
+class AssessmentMatrices:
+    """
+    Static matrices of an assessment: the weights of the master choices and master evaluation elements and the
+    incidence matrices between master choices, master evaluation elements and master sections.
+    """
+
+    def __init__(self, assessment):
+        scoring_plan = get_scoring_plan(assessment.id)
+        self.coefficient_scoring_system = scoring_plan.coefficient_scoring_system
+
+        master_section_ids = list(
+            MasterSection.objects.filter(assessment=assessment).values_list("id", flat=True)
+        )
+        master_element_list = list(
+            MasterEvaluationElement.objects.filter(master_section__assessment=assessment)
+            .order_by("id")
+            .values_list("id", "master_section_id", "question_type", "depends_on_id")
+        )
+        master_choice_list = list(
+            MasterChoice.objects.filter(
+                master_evaluation_element__master_section__assessment=assessment
+            )
+            .order_by("id")
+            .values_list("id", "master_evaluation_element_id", "is_concerned_switch")
+        )
+        # Column of each master object in the matrices
+        self.section_index = {master_id: i for i, master_id in enumerate(master_section_ids)}
+        self.element_index = {
+            master_id: i for i, (master_id, *_) in enumerate(master_element_list)
+        }
+        self.choice_index = {
+            master_id: i for i, (master_id, *_) in enumerate(master_choice_list)
+        }
+        nb_sections, nb_elements, nb_choices = (
+            len(master_section_ids),
+            len(master_element_list),
+            len(master_choice_list),
+        )
+
+        # Weights of the choices and of the elements
+        self.choice_weights = np.array(
+            [
+                scoring_plan.get_choice_points(master_id)
+                for master_id, *_ in master_choice_list
+            ],
+            dtype=float,
+        )
+        self.element_weights = np.array(
+            [
+                scoring_plan.get_element_weight(master_id)
+                for master_id, *_ in master_element_list
+            ],
+            dtype=float,
+        )
+        # Incidence matrices: choice -> element and element -> section
+        self.choice_element = np.zeros((nb_choices, nb_elements))
+        for i, (_, master_element_id, _) in enumerate(master_choice_list):
+            self.choice_element[i, self.element_index[master_element_id]] = 1
+        self.element_section = np.zeros((nb_elements, nb_sections))
+        for i, (_, master_section_id, _, _) in enumerate(master_element_list):
+            self.element_section[i, self.section_index[master_section_id]] = 1
+
+        # Choices setting conditions intra evaluation element and elements which have such a choice
+        self.switch_choices = np.array(
+            [is_concerned_switch for _, _, is_concerned_switch in master_choice_list],
+            dtype=float,
+        )
+        self.has_condition_intra = (self.switch_choices @ self.choice_element) > 0
+        # For each element with a condition inter elements, the column of the choice it depends on
+        self.conditioned_elements = np.array(
+            [i for i, (*_, depends_on_id) in enumerate(master_element_list) if depends_on_id],
+            dtype=int,
+        )
+        self.conditioning_choices = np.array(
+            [
+                self.choice_index[depends_on_id]
+                for *_, depends_on_id in master_element_list
+                if depends_on_id
+            ],
+            dtype=int,
+        )
+
+        # Max points of the elements: the max of the weights for a radio, the sum for a checkbox
+        weighted_incidence = self.choice_element * self.choice_weights[:, np.newaxis]
+        is_radio = np.array(
+            [question_type == "radio" for _, _, question_type, _ in master_element_list],
+            dtype=bool,
+        )
+        is_checkbox = np.array(
+            [question_type == "checkbox" for _, _, question_type, _ in master_element_list],
+            dtype=bool,
+        )
+        radio_max = (
+            np.maximum(weighted_incidence.max(axis=0), 0)
+            if nb_choices
+            else np.zeros(nb_elements)
+        )
+        self.element_max_points = np.where(
+            is_radio, radio_max, np.where(is_checkbox, weighted_incidence.sum(axis=0), 0)
+        )
+        self.section_max_points = self.element_max_points @ self.element_section
+        self.max_points = float(self.element_max_points.sum())
+
+    def calculate(self, ticks):
+        """
+        Calculate the points of the elements and sections and the points not concerned of the evaluations
+        :param ticks: boolean matrix, evaluations x master choices
+        :return: tuple of matrices (element points, section points) and vector of points not concerned
+        """
+        ticks = ticks.astype(float)
+        # Elements not applicable: the choice they depend on is ticked
+        not_applicable = np.zeros((ticks.shape[0], len(self.element_weights)), dtype=bool)
+        not_applicable[:, self.conditioned_elements] = ticks[:, self.conditioning_choices] > 0
+
+        raw_points = (ticks * self.choice_weights) @ self.choice_element
+        element_points = np.where(not_applicable, 0, raw_points * self.element_weights)
+        section_points = element_points @ self.element_section
+
+        # Points not concerned, same calculation than the scoring engine (the element weight is applied twice)
+        condition_intra_ticked = ((ticks * self.switch_choices) @ self.choice_element) > 0
+        element_not_concerned = np.where(
+            not_applicable | condition_intra_ticked, self.element_max_points, 0
+        )
+        counted = not_applicable | self.has_condition_intra
+        points_not_concerned = (
+            np.where(counted, element_not_concerned * self.element_weights**2, 0)
+        ).sum(axis=1)
+        return element_points, section_points, points_not_concerned
+
+
+def rescore_assessment(assessment, only_flagged=True, chunk_size=500):
+    """
+    Calculate again the max points, the points and the score of the evaluations of the assessment.
+    The evaluations are processed by chunks, each chunk is saved in its own transaction.
+
+    :param assessment: assessment
+    :param only_flagged: if True, only the evaluations with need_to_set_max_points are processed
+    :param chunk_size: number of evaluations processed and saved at once
+    :return: number of evaluations rescored
+    """
+    matrices = AssessmentMatrices(assessment)
+    evaluation_scores = EvaluationScore.objects.filter(evaluation__assessment=assessment)
+    if only_flagged:
+        evaluation_scores = evaluation_scores.filter(need_to_set_max_points=True)
+    score_list = list(
+        evaluation_scores.order_by("evaluation_id").values_list(
+            "id", "evaluation_id", "evaluation__is_finished"
+        )
+    )
+    for start in range(0, len(score_list), chunk_size):
+        rescore_chunk(matrices, score_list[start : start + chunk_size])
+    return len(score_list)
+
+
+@transaction.atomic
+def rescore_chunk(matrices, score_list):
+    """
+    Rescore a chunk of evaluations and save the elements, sections and evaluation scores with bulk updates
+    :param matrices: AssessmentMatrices of the assessment
+    :param score_list: list of tuples (evaluation score id, evaluation id, evaluation is finished)
+    """
+    row_index = {evaluation_id: i for i, (_, evaluation_id, _) in enumerate(score_list)}
+    evaluation_ids = list(row_index)
+
+    ticks = np.zeros((len(score_list), len(matrices.choice_index)), dtype=bool)
+    for evaluation_id, master_choice_id in Choice.objects.filter(
+        evaluation_element__section__evaluation_id__in=evaluation_ids, is_ticked=True
+    ).values_list("evaluation_element__section__evaluation_id", "master_choice_id"):
+        ticks[row_index[evaluation_id], matrices.choice_index[master_choice_id]] = True
+    element_points, section_points, points_not_concerned = matrices.calculate(ticks)
+
+    element_list = []
+    for element_id, evaluation_id, master_element_id in EvaluationElement.objects.filter(
+        section__evaluation_id__in=evaluation_ids
+    ).values_list("id", "section__evaluation_id", "master_evaluation_element_id"):
+        column = matrices.element_index[master_element_id]
+        element_list.append(
+            EvaluationElement(
+                id=element_id,
+                points=float(element_points[row_index[evaluation_id], column]),
+                max_points=float(matrices.element_max_points[column]),
+            )
+        )
+    EvaluationElement.objects.bulk_update(element_list, ["points", "max_points"])
+
+    section_list = []
+    for section_id, evaluation_id, master_section_id in Section.objects.filter(
+        evaluation_id__in=evaluation_ids
+    ).values_list("id", "evaluation_id", "master_section_id"):
+        column = matrices.section_index[master_section_id]
+        section_list.append(
+            Section(
+                id=section_id,
+                points=float(section_points[row_index[evaluation_id], column]),
+                max_points=float(matrices.section_max_points[column]),
+            )
+        )
+    Section.objects.bulk_update(section_list, ["points", "max_points"])
+    Evaluation.objects.bulk_update(
+        [
+            Evaluation(id=evaluation_id, points=float(section_points[i].sum()))
+            for i, evaluation_id in enumerate(evaluation_ids)
+        ],
+        ["points"],
+    )
+
+    coefficient = matrices.coefficient_scoring_system
+    max_points = matrices.max_points
+    finished_score_list = []
+    not_finished_score_list = []
+    for i, (score_id, _, is_finished) in enumerate(score_list):
+        evaluation_score = EvaluationScore(
+            id=score_id,
+            max_points=max_points,
+            coefficient_scoring_system=coefficient,
+            need_to_set_max_points=False,
+            score=0,
+        )
+        pts_not_concerned = float(points_not_concerned[i])
+        # The score is only set for finished evaluations, see EvaluationScore.process_score_calculation
+        if is_finished and max_points != pts_not_concerned:
+            evaluation_score.points_not_concerned = pts_not_concerned
+            evaluation_score.points_obtained = calculate_points_obtained(
+                float(section_points[i].sum()), pts_not_concerned, coefficient
+            )
+            evaluation_score.points_to_dilate = calculate_points_to_dilate(
+                evaluation_score.points_obtained, pts_not_concerned, coefficient
+            )
+            evaluation_score.dilatation_factor = calculate_dilatation_factor(
+                max_points, pts_not_concerned, coefficient
+            )
+            evaluation_score.score = calculate_score(
+                evaluation_score.dilatation_factor,
+                evaluation_score.points_to_dilate,
+                pts_not_concerned,
+                coefficient,
+                max_points,
+            )
+            finished_score_list.append(evaluation_score)
+        else:
+            not_finished_score_list.append(evaluation_score)
+    static_fields = [
+        "max_points",
+        "coefficient_scoring_system",
+        "need_to_set_max_points",
+        "score",
+    ]
+    EvaluationScore.objects.bulk_update(
+        finished_score_list,
+        static_fields
+        + ["points_not_concerned", "points_obtained", "points_to_dilate", "dilatation_factor"],
+    )
+    EvaluationScore.objects.bulk_update(not_finished_score_list, static_fields)
@@ -0,0 +1,197 @@
+"""
+Cache of the PDF files of the results of the evaluations, stored on the local disk.
+
+A PDF is stored with a content hash built from everything it displays which can change: the evaluation (name,
+finished_at, answers, notes and justifications through the last update of its evaluation elements and the ticked
+choices), its score, the organisation name, the active language, the primary color of the platform and the
+version of the PDF template (PDF_TEMPLATE_VERSION, to increase when the layout of ResultsPDFView changes).
+The master objects (texts, resources) are in the hash through the generation number of the element cards,
+renewed by the signals when one of them is modified (see assessment/element_card_cache.py). The generation is
+stored in the database, so the PDF prerendered by the worker have the same hash than in the web server.
+
+The content hash is computed with one query, so a PDF already generated for an unchanged evaluation is served
+from the disk without building the document again. The PDF is also written on the disk while it is generated,
+instead of being kept in memory, then moved to its final path.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Count, Max, Q
+from django.utils.translation import get_language
+from home.models.platform_management import get_platform_management
+
+from .element_card_cache import get_generation
+from .models import Evaluation
+
+# Version of the layout of the PDF, to increase when ResultsPDFView prints the results differently
+PDF_TEMPLATE_VERSION = 2
+# Extension of the files being written, which are not served
+TEMPORARY_SUFFIX = ".tmp"
+
+
+def get_results_pdf_cache_dir():
+    """
+    Return the directory of the PDF files (RESULTS_PDF_CACHE_DIR setting, "private/results_pdf" in the BASE_DIR if
+    not set). It is outside the MEDIA_ROOT, which is served without authentication, so the PDF are only served by
+    ResultsPDFView to the members of the organisation
+    """
+    return getattr(
+        settings,
+        "RESULTS_PDF_CACHE_DIR",
+        os.path.join(settings.BASE_DIR, "private", "results_pdf"),
+    )
+
+
+def get_evaluation_pdf_dir(evaluation_id):
+    """
+    Return the directory of the PDF files of the evaluation
+    """
+    return os.path.join(get_results_pdf_cache_dir(), str(evaluation_id))
+
+
+def get_evaluation_content_hash(evaluation, organisation):
+    """
+    Build the content hash of the PDF of the evaluation, with one query for the evaluation elements, the choices
+    and the score of the evaluation.
+    Returns None if the score of the evaluation needs to be calculated again, as the PDF must then be generated.
+    :param evaluation: evaluation
+    :param organisation: organisation of the evaluation
+    :return: string or None
+    """
+    state = Evaluation.objects.filter(id=evaluation.id).aggregate(
+        elements_updated_at=Max("section__evaluationelement__updated_at"),
+        # The ids of the ticked choices are sorted, so the same ticks always give the same list
+        ticked_choice_ids=ArrayAgg(
+            "section__evaluationelement__choice__id",
+            filter=Q(section__evaluationelement__choice__is_ticked=True),
+            ordering="section__evaluationelement__choice__id",
+        ),
+        score=Max("evaluationscore__score"),
+        nb_scores_outdated=Count(
+            "evaluationscore",
+            filter=Q(evaluationscore__need_to_calculate=True)
+            | Q(evaluationscore__need_to_set_max_points=True),
+        ),
+    )
+    if state["nb_scores_outdated"]:
+        return None
+    elements_updated_at = state["elements_updated_at"]
+    content = (
+        PDF_TEMPLATE_VERSION,
+        get_generation(),
+        get_language(),
+        get_platform_management().primary_color,
+        evaluation.id,
+        evaluation.name,
+        evaluation.finished_at.isoformat() if evaluation.finished_at else None,
+        organisation.name,
+        elements_updated_at.isoformat() if elements_updated_at else None,
+        tuple(state["ticked_choice_ids"] or ()),
+        state["score"],
+    )
+    return hashlib.sha256(repr(content).encode()).hexdigest()
+
+
+def get_pdf_path(evaluation_id, content_hash):
+    """
+    Return the path of the PDF of the evaluation with this content hash. The language is in the name of the file,
+    so the PDF of each language is kept.
+    """
+    return os.path.join(
+        get_evaluation_pdf_dir(evaluation_id), f"{get_language()}-{content_hash}.pdf"
+    )
+
+
+def get_cached_pdf_path(evaluation_id, content_hash):
+    """
+    Return the path of the PDF of the evaluation with this content hash if it has been stored, else None
+    """
+    if content_hash is None:
+        return None
+    path = get_pdf_path(evaluation_id, content_hash)
+    return path if os.path.isfile(path) else None
+
+
+def create_pdf_file(evaluation_id, content_hash):
+    """
+    Create the file in which the PDF is written while it is generated. If the content hash is known, it is a
+    temporary file in the directory of the evaluation, so it can then be moved to its path in the cache (see
+    store_pdf_file).
+    Else, or if the directory cannot be written, it is a spooled temporary file, kept in memory up to
+    RESULTS_PDF_SPOOL_MAX_SIZE bytes then written on the disk, which is not stored in the cache.
+    :param evaluation_id: int
+    :param content_hash: string or None
+    :return: file object opened in binary mode
+    """
+    if content_hash is not None:
+        try:
+            evaluation_dir = get_evaluation_pdf_dir(evaluation_id)
+            os.makedirs(evaluation_dir, exist_ok=True)
+            return tempfile.NamedTemporaryFile(
+                dir=evaluation_dir, suffix=TEMPORARY_SUFFIX, delete=False
+            )
+        except OSError:
+            pass
+    return tempfile.SpooledTemporaryFile(
+        max_size=getattr(settings, "RESULTS_PDF_SPOOL_MAX_SIZE", 1024 * 1024)
+    )
+
+
+def is_stored_file(pdf_file):
+    """
+    True if the file has been created to be stored in the cache, False for a spooled temporary file
+    """
+    return isinstance(getattr(pdf_file, "name", None), str)
+
+
+def store_pdf_file(pdf_file, evaluation_id, content_hash):
+    """
+    Close the file in which the PDF has been generated, move it to its path in the cache and delete the previous
+    PDF of the evaluation in the same language.
+    :param pdf_file: file object returned by create_pdf_file for this content hash, with the PDF written
+    :param evaluation_id: int
+    :param content_hash: string
+    :return: string, path of the PDF
+    """
+    pdf_file.close()
+    path = get_pdf_path(evaluation_id, content_hash)
+    os.replace(pdf_file.name, path)
+    evaluation_dir = os.path.dirname(path)
+    language_prefix = f"{get_language()}-"
+    for file_name in os.listdir(evaluation_dir):
+        file_path = os.path.join(evaluation_dir, file_name)
+        if (
+            file_name.startswith(language_prefix)
+            and not file_name.endswith(TEMPORARY_SUFFIX)
+            and file_path != path
+        ):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                # Already removed by an other request
+                pass
+    return path
+
+
+def discard_pdf_file(pdf_file):
+    """
+    Close and delete the file in which the PDF was generated, when the generation failed
+    """
+    pdf_file.close()
+    if is_stored_file(pdf_file):
+        try:
+            os.remove(pdf_file.name)
+        except FileNotFoundError:
+            pass
+
+
+def delete_evaluation_pdf_files(evaluation_id):
+    """
+    Delete all the PDF of the evaluation, when it is deleted
+    """
+    shutil.rmtree(get_evaluation_pdf_dir(evaluation_id), ignore_errors=True)
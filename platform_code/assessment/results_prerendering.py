@@ -0,0 +1,80 @@
+"""
+Prerendering of the results of the evaluations in the background.
+
+When an evaluation is finished, or modified after being finished, the user usually goes to the results and
+downloads the PDF next. A job is then enqueued (see assessment/jobs.py) to calculate the max points if needed,
+the score and the exposition dic of the evaluation and to store the PDF of its results and the radar chart of the
+results page in the language of the user, so the results page and the PDF download serve what has been calculated.
+The PDF and the chart are stored in the directory of the PDF of the results (RESULTS_PDF_CACHE_DIR), which must be
+shared by the web server and the worker, with a content hash using only data of the database (see
+assessment/results_pdf_cache.py), so the web server finds them.
+"""
+
+from django.conf import settings
+from django.utils import translation
+from django.utils.translation import get_language
+
+from .jobs import enqueue_job
+from .models import Evaluation, EvaluationScore, Section
+
+JOB_NAME = "prerender_evaluation_results"
+
+
+def enqueue_results_prerendering(evaluation):
+    """
+    Enqueue the prerendering of the results of the finished evaluation in the active language, if the
+    prerendering is enabled (RESULTS_PRERENDERING_ENABLED setting). The job is run RESULTS_PRERENDERING_DELAY
+    seconds after the last change of the evaluation, so the results are prerendered once after several answers.
+    :param evaluation: evaluation
+    :return: job or None
+    """
+    if not evaluation.is_finished or not getattr(
+        settings, "RESULTS_PRERENDERING_ENABLED", False
+    ):
+        return None
+    return enqueue_job(
+        JOB_NAME,
+        delay=getattr(settings, "RESULTS_PRERENDERING_DELAY", 30),
+        evaluation_id=evaluation.id,
+        language=get_language(),
+    )
+
+
+def prerender_evaluation_results(evaluation_id, language):
+    """
+    Handler of the job: calculate the score and the exposition dic of the evaluation and store the PDF of
+    its results and its radar chart in the language. Nothing is done if the evaluation has been deleted or is not
+    finished anymore.
+    :param evaluation_id: int
+    :param language: string, code of the language of the PDF
+    :return: string or None, path of the PDF stored
+    """
+    # The views are imported here as the section view enqueues the jobs with this module
+    from .radar_chart import get_radar_chart
+    from .views.resultsPDF import prerender_results_pdf
+    from .views.utils.utils import calculate_evaluation_exposition
+
+    evaluation = (
+        Evaluation.objects.select_related("organisation", "assessment")
+        .filter(id=evaluation_id)
+        .first()
+    )
+    if evaluation is None or not evaluation.is_finished:
+        return None
+
+    evaluation_score = EvaluationScore.objects.get(evaluation=evaluation)
+    if evaluation_score.need_to_set_max_points:
+        evaluation_score.calculate_max_points()
+    calculate_evaluation_exposition(evaluation_score)
+
+    with translation.override(language):
+        # Same sections and order than the results page
+        get_radar_chart(
+            evaluation,
+            list(
+                Section.objects.filter(evaluation=evaluation)
+                .select_related("master_section")
+                .order_by("master_section__order_id")
+            ),
+        )
+        return prerender_results_pdf(evaluation)
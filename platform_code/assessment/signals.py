@@ -0,0 +1,126 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .element_card_cache import invalidate_element_cards
+from .models import (
+    Assessment,
+    ElementChangeLog,
+    Evaluation,
+    EvaluationElementWeight,
+    ExternalLink,
+    MasterChoice,
+    MasterEvaluationElement,
+    MasterSection,
+    OrganisationExport,
+    ScoringSystem,
+)
+from .models.assessment_registry import invalidate_assessment_registry
+from .models.condition_index import invalidate_condition_index
+from .models.scoring_plan import invalidate_scoring_plan
+from .models.translation_completeness import invalidate_translation_completeness
+from .results_pdf_cache import delete_evaluation_pdf_files
+
+
+@receiver(post_save, sender=Assessment)
+@receiver(post_delete, sender=Assessment)
+def invalidate_assessment_registry_on_assessment_change(sender, instance, **kwargs):
+    """
+    The assessment registry (latest assessment, versions) is loaded again when an assessment is imported,
+    modified or deleted
+    """
+    invalidate_assessment_registry()
+
+
+@receiver(post_save, sender=Assessment)
+@receiver(post_delete, sender=Assessment)
+def invalidate_translation_completeness_on_assessment_change(sender, instance, **kwargs):
+    """
+    The translation completeness of the assessments is computed again when the name of one of them is modified
+    """
+    invalidate_translation_completeness()
+
+
+@receiver(post_save, sender=MasterSection)
+@receiver(post_delete, sender=MasterSection)
+@receiver(post_save, sender=MasterEvaluationElement)
+@receiver(post_delete, sender=MasterEvaluationElement)
+@receiver(post_save, sender=MasterChoice)
+@receiver(post_delete, sender=MasterChoice)
+@receiver(post_save, sender=ExternalLink)
+@receiver(post_delete, sender=ExternalLink)
+@receiver(m2m_changed, sender=MasterEvaluationElement.external_links.through)
+def invalidate_translation_completeness_on_master_change(sender, instance, **kwargs):
+    """
+    The translation completeness depends on the texts of the master objects and of the resources, which can be
+    shared between assessments, so all the completeness are invalidated when one of these objects is modified
+    """
+    invalidate_translation_completeness()
+
+
+@receiver(post_save, sender=ScoringSystem)
+@receiver(post_delete, sender=ScoringSystem)
+@receiver(post_save, sender=EvaluationElementWeight)
+@receiver(post_delete, sender=EvaluationElementWeight)
+def invalidate_scoring_plan_on_weight_change(sender, instance, **kwargs):
+    """
+    The scoring plans need to be compiled again when the weights of an assessment are modified
+    """
+    invalidate_scoring_plan()
+
+
+@receiver(post_save, sender=MasterChoice)
+@receiver(post_save, sender=MasterEvaluationElement)
+def invalidate_scoring_plan_on_master_change(sender, instance, **kwargs):
+    """
+    The scoring plans index the weights by master object ids, so a new or renumbered master choice or master
+    evaluation element requires to compile the plans again. This only happens when an assessment is imported or
+    edited in the admin, so all the plans are invalidated to avoid querying the assessment of the master object.
+    """
+    invalidate_scoring_plan()
+
+
+@receiver(post_save, sender=MasterChoice)
+@receiver(post_delete, sender=MasterChoice)
+@receiver(post_save, sender=MasterEvaluationElement)
+@receiver(post_delete, sender=MasterEvaluationElement)
+def invalidate_condition_index_on_master_change(sender, instance, **kwargs):
+    """
+    The condition indexes are built from the master choices and master evaluation elements, so they are all
+    invalidated when one of these objects is modified, as for the scoring plans
+    """
+    invalidate_condition_index()
+
+
+@receiver(post_save, sender=MasterSection)
+@receiver(post_delete, sender=MasterSection)
+@receiver(post_save, sender=MasterEvaluationElement)
+@receiver(post_delete, sender=MasterEvaluationElement)
+@receiver(post_save, sender=MasterChoice)
+@receiver(post_delete, sender=MasterChoice)
+@receiver(post_save, sender=ExternalLink)
+@receiver(post_delete, sender=ExternalLink)
+@receiver(post_save, sender=ElementChangeLog)
+@receiver(post_delete, sender=ElementChangeLog)
+@receiver(m2m_changed, sender=MasterEvaluationElement.external_links.through)
+def invalidate_element_cards_on_master_change(sender, instance, **kwargs):
+    """
+    The element cards of the section page display the texts of the master objects, their resources and their
+    change logs, so the cached cards are all invalidated when one of these objects is modified
+    """
+    invalidate_element_cards()
+
+
+@receiver(post_delete, sender=Evaluation)
+def delete_pdf_files_on_evaluation_delete(sender, instance, **kwargs):
+    """
+    The PDF of the results of the evaluation stored in the cache are deleted with the evaluation
+    """
+    delete_evaluation_pdf_files(instance.id)
+
+
+@receiver(post_delete, sender=OrganisationExport)
+def delete_file_on_organisation_export_delete(sender, instance, **kwargs):
+    """
+    The zip file of an export of the results of an organisation is deleted with the export
+    """
+    instance.delete_file()
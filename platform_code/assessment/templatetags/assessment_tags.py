@@ -1,8 +1,15 @@
 import re
 
+from assessment.element_card_cache import (
+    CSRF_TOKEN_PLACEHOLDER,
+    get_cached_card,
+    get_element_card_key,
+    set_cached_card,
+)
 from django import template
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
+from home.authorization import get_authorization_context
 from home.models import Membership, Organisation
 
 register = template.Library()
@@ -86,8 +93,13 @@ def format_resource_link(text):
 
 @register.filter
 def order_elements_of_section(section):
-    list_element = list(
-        section.evaluationelement_set.all().order_by("master_evaluation_element__order_id")
+    # Sorted in memory so the evaluation elements prefetched by the evaluation tree are not queried again
+    list_element = sorted(
+        section.evaluationelement_set.all(),
+        key=lambda element: (
+            element.master_evaluation_element.order_id is None,
+            element.master_evaluation_element.order_id or 0,
+        ),
     )
     return list_element
 
@@ -132,7 +144,7 @@ def user_can_edit_evaluation(evaluation, user):
     that the evaluation is editable.
     Used to blocked the buttons
     """
-    user_can_edit = evaluation.organisation.check_user_is_member_and_can_edit_evaluations(user)
+    user_can_edit = get_authorization_context(user).can_edit(evaluation.organisation)
     return user_can_edit and evaluation.is_editable
 
 
@@ -200,3 +212,53 @@ def get_sector_as_str(sector):
     return str(
         [sector_tuple[1] for sector_tuple in sector_tuple if sector_tuple[0] == sector][0]
     )
+
+
+@register.tag
+def element_card_cache(parser, token):
+    """
+    Cache the content of the block, which is the card of the evaluation element "element" of the section page.
+    Usage: {% element_card_cache %} ... {% endelement_card_cache %}
+    """
+    nodelist = parser.parse(("endelement_card_cache",))
+    parser.delete_first_token()
+    return ElementCardCacheNode(nodelist)
+
+
+class ElementCardCacheNode(template.Node):
+    """
+    Render the card of the evaluation element from the cache if it has not changed (see element_card_cache.py).
+    The edit rights and the resources liked by the user are got once for all the cards of the page.
+    """
+
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        csrf_token = context.get("csrf_token")
+        # Without request (no csrf token), the card is just rendered
+        if not csrf_token or csrf_token == "NOTPROVIDED":
+            return self.nodelist.render(context)
+
+        if "element_card_user_can_edit" not in context.render_context:
+            context.render_context["element_card_user_can_edit"] = user_can_edit_evaluation(
+                context["evaluation"], context["user"]
+            )
+            context.render_context["element_card_liked_resource_ids"] = {
+                resource.id for resource in context.get("resources_liked", [])
+            }
+        key = get_element_card_key(
+            element=context["element"],
+            section_url=context["section"].get_absolute_url(),
+            position=context["forloop"]["counter"],
+            is_last=context["forloop"]["last"],
+            user_can_edit=context.render_context["element_card_user_can_edit"],
+            evaluation_is_editable=context["evaluation"].is_editable,
+            liked_resource_ids=context.render_context["element_card_liked_resource_ids"],
+        )
+        card = get_cached_card(key)
+        if card is None:
+            with context.push(csrf_token=CSRF_TOKEN_PLACEHOLDER):
+                card = self.nodelist.render(context)
+            set_cached_card(key, card)
+        return mark_safe(card.replace(CSRF_TOKEN_PLACEHOLDER, str(csrf_token)))
@@ -4,6 +4,7 @@ from assessment.models import (
     ElementChangeLog,
     Evaluation,
     EvaluationElement,
+    EvaluationElementWeight,
     ExternalLink,
     MasterChoice,
     MasterEvaluationElement,
@@ -11,6 +12,8 @@ from assessment.models import (
     ScoringSystem,
     Section,
 )
+from django.test import Client
+from home.models import Organisation, User, UserResources
 
 
 def create_assessment(name, version, previous_assessment=None):
@@ -296,7 +299,9 @@ def create_assessment_body(
 def create_scoring(assessment, **kwargs):
     """
     This function is used to create a scoring for the tests when no one is imported
-    Because the evaluation_create_body function requires a scoring to calculate max_points
+    Because the evaluation_create_body function requires a scoring to calculate max_points.
+    The evaluation element weight of the assessment is created too if it does not exist, with the weight 1 for
+    each master evaluation element, as the scoring requires the weight of every evaluation element.
 
     kwargs: dic_choices, dictionary with master choice numbering (string, '1.1.a') as keys
             and weight (float/string, 0.5) as values
@@ -315,6 +320,17 @@ def create_scoring(assessment, **kwargs):
         master_choices_weight_json=dic_choices,
     )
     scoring.save()
+    if not EvaluationElementWeight.objects.filter(assessment=assessment).exists():
+        EvaluationElementWeight.objects.create(
+            assessment=assessment,
+            name="element_weight_of_" + assessment.name,
+            master_evaluation_element_weight_json={
+                master_element.get_numbering(): "1"
+                for master_element in MasterEvaluationElement.objects.filter(
+                    master_section__assessment=assessment
+                ).select_related("master_section")
+            },
+        )
 
 
 def create_element_change_log(
@@ -343,3 +359,69 @@ def create_element_change_log(
         assessment=assessment,
     )
     element_change_log.save()
+
+
+def create_large_assessment_body(version="1.0", nb_sections=10, nb_elements=10, nb_choices=4):
+    """
+    Create a synthetic assessment used to test the heavy operations, with nb_sections master sections,
+    nb_elements master evaluation elements per master section (alternatively radio and checkbox) and
+    nb_choices master choices per master evaluation element. A scoring system is also created.
+    :param version:
+    :param nb_sections:
+    :param nb_elements:
+    :param nb_choices:
+    :return: assessment
+    """
+    assessment = create_assessment(name="large assessment", version=version)
+    dic_choices = {}
+    for i in range(1, nb_sections + 1):
+        master_section = create_master_section(
+            name=f"master_section{i}",
+            assessment=assessment,
+            description="",
+            order_id=str(i),
+            keyword=f"keyword {i}",
+        )
+        for j in range(1, nb_elements + 1):
+            master_evaluation_element = create_master_evaluation_element(
+                name=f"master_element{i}.{j}",
+                master_section=master_section,
+                order_id=str(j),
+                question_type=MasterEvaluationElement.RADIO
+                if j % 2
+                else MasterEvaluationElement.CHECKBOX,
+                question_text=f"Question {i}.{j}",
+            )
+            for k in range(nb_choices):
+                order_id = chr(ord("a") + k)
+                create_master_choice(
+                    master_evaluation_element=master_evaluation_element,
+                    answer_text=f"answer {order_id}",
+                    order_id=order_id,
+                )
+                dic_choices[f"{i}.{j}.{order_id}"] = str(k * 0.5)
+    create_scoring(assessment=assessment, dic_choices=dic_choices)
+    return assessment
+
+
+class MemberTestMixin:
+    """
+    Create a user, logged in the client of the test, and an organisation the user is member of
+    """
+
+    email = "user@test.com"
+    password = "user_password"
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.object.create_user(self.email, self.password)
+        UserResources.create_user_resources(user=self.user)
+        self.client = Client()
+        self.client.login(email=self.email, password=self.password)
+        self.organisation = Organisation.create_organisation(
+            name="organisation",
+            size=Organisation.SIZE[0][0],
+            country="FR",
+            sector=Organisation.SECTOR[0][0],
+            created_by=self.user,
+        )
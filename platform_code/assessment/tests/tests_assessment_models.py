@@ -13,10 +13,18 @@ from assessment.models import (
     Section,
     get_last_assessment_created,
 )
+from assessment.models.assessment_registry import (
+    get_assessment_registry,
+    invalidate_assessment_registry,
+)
+from django.db import connection
+from django.db.models import F
 from django.template.defaultfilters import slugify
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils.translation import activate
-from home.models import Organisation, User
+from home.models import CacheVersion, Organisation, User
+from home.versioned_cache import reset_cache_versions
 from home.views.utils import get_all_change_logs
 
 # a master evaluation element can not depends on itself -> need to see for choice.depends_on in this case
@@ -27,6 +35,7 @@ from .object_creation import (
     create_element_change_log,
     create_evaluation,
     create_external_link,
+    create_large_assessment_body,
     create_master_evaluation_element,
     create_master_section,
     create_scoring,
@@ -78,6 +87,54 @@ class AssessmentTestCase(TestCase):
         assessment2 = Assessment.objects.get(name="assessment2")
         self.assertEqual(get_last_assessment_created(), assessment2)
 
+    def test_assessment_registry(self):
+        assessment3 = create_assessment(
+            name="assessment3",
+            version="10.0",
+            previous_assessment=Assessment.objects.get(name="assessment2"),
+        )
+        assessment_registry = get_assessment_registry()
+        self.assertEqual(assessment_registry.latest(), assessment3)
+        self.assertEqual(assessment_registry.ordered_versions, (1.0, 2.0, 10.0))
+        self.assertEqual(assessment_registry.get_previous_versions("10.0"), ["2.0", "1.0"])
+        self.assertEqual(assessment_registry.get_version(assessment3.id), "10.0")
+        # The versions are compared as floats, not as strings
+        self.assertTrue(assessment_registry.is_upgradable("2.0"))
+        self.assertFalse(assessment_registry.is_upgradable("10.0"))
+
+
+class AssessmentRegistryCacheTestCase(TransactionTestCase):
+    """
+    Test the cache of the assessment registry, which is only filled outside of the transactions
+    """
+
+    def setUp(self):
+        self.addCleanup(invalidate_assessment_registry)
+        invalidate_assessment_registry()
+        create_assessment(name="assessment1", version="1.0")
+
+    def test_assessment_registry_cached(self):
+        assessment1 = get_last_assessment_created()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_last_assessment_created(), assessment1)
+            self.assertFalse(get_assessment_registry().is_upgradable("1.0"))
+
+    def test_assessment_registry_invalidated(self):
+        get_last_assessment_created()
+        assessment2 = create_assessment(name="assessment2", version="2.0")
+        self.assertEqual(get_last_assessment_created(), assessment2)
+        assessment2.delete()
+        self.assertEqual(get_last_assessment_created().version, "1.0")
+
+    def test_assessment_registry_invalidated_by_other_process(self):
+        get_last_assessment_created()
+        # An other process imports an assessment (without signal here) and renews the version of the registry
+        Assessment.objects.bulk_create([Assessment(name="assessment2", version="2.0")])
+        CacheVersion.objects.filter(name="assessment_registry").update(version=F("version") + 1)
+        # The versions are loaded again at the next request
+        reset_cache_versions()
+        self.assertEqual(get_last_assessment_created().version, "2.0")
+
     """
     def test_previous_assessment_null_after_deletion(self):
         assessment1 = Assessment.objects.get(name="assessment1")
@@ -1060,3 +1117,52 @@ class ModelsAfterImportTestCase(TestCase):
     def test_assessment_count_risk_elements(self):
         self.assertEqual(self.assessment.version, "0.9")
         self.assertEqual(self.assessment.count_master_elements_with_risks(), 2)
+
+
+class EvaluationBodyCreationTestCase(TestCase):
+    """
+    Test the creation of the body of an evaluation (sections, evaluation elements and choices) with a number of
+    queries which does not depend on the size of the assessment
+    """
+
+    def setUp(self):
+        self.small_assessment = create_large_assessment_body(
+            version="1.0", nb_sections=2, nb_elements=2, nb_choices=2
+        )
+        self.large_assessment = create_large_assessment_body(
+            version="2.0", nb_sections=10, nb_elements=20, nb_choices=4
+        )
+
+    @staticmethod
+    def create_evaluation_body(assessment):
+        """
+        Create an evaluation with its body and return the evaluation and the number of queries
+        """
+        evaluation = create_evaluation(assessment=assessment, name="evaluation")
+        with CaptureQueriesContext(connection) as context:
+            evaluation.create_evaluation_body()
+        return evaluation, len(context.captured_queries)
+
+    def test_evaluation_creation_queries_constant(self):
+        _, small_queries = self.create_evaluation_body(self.small_assessment)
+        _, large_queries = self.create_evaluation_body(self.large_assessment)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_evaluation_creation_objects(self):
+        evaluation, _ = self.create_evaluation_body(self.large_assessment)
+        self.assertEqual(Section.objects.filter(evaluation=evaluation).count(), 10)
+        self.assertEqual(
+            EvaluationElement.objects.filter(section__evaluation=evaluation).count(), 200
+        )
+        self.assertEqual(
+            Choice.objects.filter(evaluation_element__section__evaluation=evaluation).count(),
+            800,
+        )
+        # Radio elements have 1.5 max points and checkbox elements 3 max points
+        section = Section.objects.get(evaluation=evaluation, master_section__order_id=1)
+        self.assertEqual(section.max_points, 45)
+        element = EvaluationElement.objects.get(
+            section=section, master_evaluation_element__order_id="2"
+        )
+        self.assertEqual(element.max_points, 3)
+        self.assertEqual(EvaluationScore.objects.get(evaluation=evaluation).max_points, 450)
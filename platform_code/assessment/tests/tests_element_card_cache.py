@@ -0,0 +1,95 @@
+from assessment.element_card_cache import (
+    CSRF_TOKEN_PLACEHOLDER,
+    get_element_card_key,
+    invalidate_element_cards,
+)
+from assessment.models import Choice, EvaluationElement, Section
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .object_creation import MemberTestMixin, create_evaluation, create_large_assessment_body
+
+
+class ElementCardCacheTestCase(MemberTestMixin, TestCase):
+    """
+    Test the cache of the evaluation element cards of the section page
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.assessment = create_large_assessment_body(
+            version="1.0", nb_sections=2, nb_elements=9, nb_choices=4
+        )
+        self.evaluation = create_evaluation(
+            assessment=self.assessment,
+            name="evaluation",
+            created_by=self.user,
+            organisation=self.organisation,
+        )
+        self.evaluation.create_evaluation_body()
+        self.section = Section.objects.get(
+            evaluation=self.evaluation, master_section__order_id=1
+        )
+        self.element = EvaluationElement.objects.get(
+            section=self.section, master_evaluation_element__order_id=1
+        )
+        invalidate_element_cards()
+
+    def get_section_page(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.section.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        return response, len(context.captured_queries)
+
+    def test_cards_cached(self):
+        response_miss, queries_miss = self.get_section_page()
+        response_hit, queries_hit = self.get_section_page()
+        self.assertLess(queries_hit, queries_miss)
+        content = response_hit.content.decode()
+        self.assertNotIn(CSRF_TOKEN_PLACEHOLDER, content)
+        self.assertIn('name="csrfmiddlewaretoken"', content)
+        self.assertEqual(
+            content.count(f'id="element_status_not_done{self.element.id}"'),
+            response_miss.content.decode().count(
+                f'id="element_status_not_done{self.element.id}"'
+            ),
+        )
+
+    def test_card_updated_after_answer(self):
+        self.get_section_page()
+        choice = Choice.objects.get(
+            evaluation_element=self.element, master_choice__order_id="b"
+        )
+        self.client.post(
+            self.section.get_absolute_url(),
+            {
+                "element_id": self.element.id,
+                f"{self.element.id}-{self.element.id}": str(choice),
+            },
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        response, _ = self.get_section_page()
+        self.assertContains(response, f'id="element_status_done{self.element.id}"')
+
+    def test_cards_invalidated_on_master_change(self):
+        self.get_section_page()
+        master_element = self.element.master_evaluation_element
+        master_element.question_text = "Updated question text"
+        master_element.save()
+        response, _ = self.get_section_page()
+        self.assertContains(response, "Updated question text")
+
+    def test_card_key_depends_on_evaluation_editable(self):
+        key_kwargs = {
+            "element": self.element,
+            "section_url": self.section.get_absolute_url(),
+            "position": 1,
+            "is_last": False,
+            "user_can_edit": True,
+            "liked_resource_ids": set(),
+        }
+        self.assertNotEqual(
+            get_element_card_key(evaluation_is_editable=True, **key_kwargs),
+            get_element_card_key(evaluation_is_editable=False, **key_kwargs),
+        )
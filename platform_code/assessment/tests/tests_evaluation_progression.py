@@ -6,6 +6,11 @@ from assessment.models import (
     MasterSection,
     Section,
 )
+from assessment.models.condition_index import (
+    get_condition_index,
+    get_master_assessment_map,
+    invalidate_condition_index,
+)
 from django.test import TestCase
 
 from .object_creation import create_assessment_body, create_evaluation, create_scoring
@@ -203,3 +208,155 @@ class EvaluationProgressionTestCase(TestCase):
         self.evaluation.set_finished()
         self.assertTrue(self.evaluation.is_finished)
         self.assertIsNotNone(self.evaluation.finished_at)
+
+    def test_evaluation_apply_elements_delta(self):
+        """
+        The counters updated with the deltas of the elements are the same than the ones calculated by scanning
+        the sections and the evaluation
+        """
+        self.assertEqual(self.section1.nb_elements, 2)
+        self.assertEqual(self.evaluation.nb_sections, 2)
+        # Answer EE2 then tick C1, which sets conditions on EE2
+        states_before = {
+            self.evaluation_element2.id: self.evaluation_element2.get_progression_state()
+        }
+        self.choice3.set_choice_ticked()
+        self.evaluation_element2.set_status()
+        self.evaluation.apply_elements_delta(states_before, [self.evaluation_element2])
+        self.section1.refresh_from_db()
+        self.assertEqual(self.section1.nb_elements_done, 1)
+        self.assertEqual(self.section1.user_progression, 50)
+
+        element_list = [
+            self.evaluation_element1
+        ] + self.evaluation_element1.get_elements_conditioned()
+        self.assertEqual(element_list, [self.evaluation_element1, self.evaluation_element2])
+        states_before = {
+            element.id: element.get_progression_state() for element in element_list
+        }
+        self.choice1.set_choice_ticked()
+        self.evaluation_element1.set_status()
+        self.evaluation_element2.reset_choices()
+        section_dic = self.evaluation.apply_elements_delta(
+            states_before, [self.evaluation_element1, self.evaluation_element2]
+        )
+        self.assertEqual(section_dic[self.section1.id].nb_elements_done, 2)
+        self.assertEqual(section_dic[self.section1.id].user_progression, 100)
+        self.assertEqual(self.evaluation.nb_sections_done, 1)
+        self.assertFalse(self.evaluation.is_finished)
+
+        # Same values when the sections and the evaluation are scanned
+        self.section1.set_progression()
+        self.assertEqual(self.section1.nb_elements_done, 2)
+        self.assertEqual(self.section1.user_progression, 100)
+        self.evaluation.set_finished()
+        self.assertEqual(self.evaluation.nb_sections_done, 1)
+
+    def test_evaluation_apply_elements_delta_stale_instances(self):
+        """
+        The deltas applied by two requests which loaded the evaluation before each other's changes are both kept,
+        as the counters are loaded again with the rows locked
+        """
+        evaluation_1 = Evaluation.objects.get(id=self.evaluation.id)
+        evaluation_2 = Evaluation.objects.get(id=self.evaluation.id)
+        states_before = {
+            self.evaluation_element2.id: self.evaluation_element2.get_progression_state()
+        }
+        self.choice3.set_choice_ticked()
+        self.evaluation_element2.set_status()
+        evaluation_1.apply_elements_delta(states_before, [self.evaluation_element2])
+        # The second request has loaded the evaluation before the first one saved its delta
+        states_before = {
+            self.evaluation_element3.id: self.evaluation_element3.get_progression_state()
+        }
+        self.choice5.set_choice_ticked()
+        self.evaluation_element3.set_status()
+        evaluation_2.apply_elements_delta(states_before, [self.evaluation_element3])
+
+        self.section1.refresh_from_db()
+        self.section2.refresh_from_db()
+        self.assertEqual(self.section1.nb_elements_done, 1)
+        self.assertEqual(self.section2.nb_elements_done, 1)
+        self.assertEqual(self.section2.user_progression, 100)
+        self.evaluation.refresh_from_db()
+        self.assertEqual(self.evaluation.nb_sections_done, 1)
+        self.assertEqual(evaluation_2.nb_sections_done, 1)
+        # Same values when the sections and the evaluation are scanned
+        points = self.evaluation.points
+        self.evaluation.set_finished()
+        self.assertEqual(self.evaluation.nb_sections_done, 1)
+        self.assertEqual(self.evaluation.points, points)
+
+    def test_condition_index(self):
+        """
+        The conditions of the assessment are indexed once, then the condition checks do not query the master
+        objects and the evaluation level lookups use the id map of the evaluation
+        """
+        condition_index = get_condition_index(self.assessment.id)
+        master_element1 = self.evaluation_element1.master_evaluation_element
+        master_element2 = self.evaluation_element2.master_evaluation_element
+        self.assertEqual(
+            condition_index.get_master_choice_depending_on(master_element2.id),
+            self.choice1.master_choice_id,
+        )
+        self.assertEqual(
+            condition_index.get_master_elements_conditioned_by(self.choice1.master_choice_id),
+            (master_element2.id,),
+        )
+        self.assertEqual(
+            condition_index.get_switch_master_choice(master_element2.id),
+            self.choice3.master_choice_id,
+        )
+        self.assertEqual(
+            condition_index.get_switch_master_choice(master_element1.id),
+            self.choice1.master_choice_id,
+        )
+        with self.assertNumQueries(0):
+            self.assertIs(get_condition_index(self.assessment.id), condition_index)
+            self.assertTrue(self.evaluation_element2.has_condition_between_choices())
+            self.assertTrue(self.evaluation_element1.has_condition_on_other_elements())
+            self.assertTrue(self.choice4.has_condition_on())
+            self.assertFalse(self.choice3.has_condition_on())
+        self.assertEqual(
+            self.choice1.get_list_element_depending_on(), [self.evaluation_element2]
+        )
+        self.assertEqual(self.evaluation_element2.get_choice_depending_on(), self.choice1)
+        # Once the section of the element is loaded, only the choice is queried, by id
+        with self.assertNumQueries(1):
+            self.assertEqual(self.evaluation_element2.get_choice_depending_on(), self.choice1)
+
+        # The index is built again when a master object is modified
+        master_choice = self.choice4.master_choice
+        master_choice.is_concerned_switch = True
+        master_choice.save()
+        self.assertIsNot(get_condition_index(self.assessment.id), condition_index)
+        self.assertTrue(self.choice3.has_condition_on())
+
+    def test_condition_on_element_without_choices(self):
+        """
+        The evaluation elements without choices are in the id map of the evaluation
+        """
+        Choice.objects.filter(evaluation_element=self.evaluation_element2).delete()
+        self.assertEqual(
+            self.choice1.get_list_element_depending_on(), [self.evaluation_element2]
+        )
+
+    def test_master_assessment_map(self):
+        """
+        The assessments of the master objects are cached with the condition indexes
+        """
+        master_assessment_map = get_master_assessment_map()
+        self.assertEqual(
+            master_assessment_map.element_assessments[
+                self.evaluation_element1.master_evaluation_element_id
+            ],
+            self.assessment.id,
+        )
+        self.assertEqual(
+            master_assessment_map.choice_assessments[self.choice1.master_choice_id],
+            self.assessment.id,
+        )
+        with self.assertNumQueries(0):
+            self.assertIs(get_master_assessment_map(), master_assessment_map)
+        invalidate_condition_index()
+        self.assertIsNot(get_master_assessment_map(), master_assessment_map)
@@ -0,0 +1,119 @@
+from assessment.models import EvaluationElement, Section
+from assessment.views.utils.utils import set_form_for_results, set_form_for_sections
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .object_creation import MemberTestMixin, create_evaluation, create_large_assessment_body
+
+
+class EvaluationTreeTestCase(MemberTestMixin, TestCase):
+    """
+    Test the evaluation tree is loaded, and the pages using it are rendered, with a number of queries which does
+    not depend on the size of the evaluation
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.small_assessment = create_large_assessment_body(
+            version="1.0", nb_sections=1, nb_elements=2, nb_choices=4
+        )
+        self.large_assessment = create_large_assessment_body(
+            version="2.0", nb_sections=4, nb_elements=9, nb_choices=4
+        )
+
+    def create_evaluation(self, assessment):
+        evaluation = create_evaluation(
+            assessment=assessment,
+            name="evaluation",
+            created_by=self.user,
+            organisation=self.organisation,
+        )
+        evaluation.create_evaluation_body()
+        return evaluation
+
+    def render_forms(self, assessment):
+        """
+        Load the tree of an evaluation of the assessment, render the forms of the section and results pages
+        and return the tree and the number of queries
+        """
+        evaluation = self.create_evaluation(assessment)
+        with CaptureQueriesContext(connection) as context:
+            tree = evaluation.get_tree(with_change_logs=True)
+            for form in set_form_for_sections(tree.section_list).values():
+                str(form)
+            for form in set_form_for_results(evaluation, tree=tree).values():
+                str(form)
+            for element in tree.get_element_list():
+                element.is_applicable()
+                element.get_element_depending_on()
+                element.get_element_change_log()
+                element.master_evaluation_element.get_numbering()
+                element.master_evaluation_element.has_resources()
+        return tree, len(context.captured_queries)
+
+    def get_section_page(self, assessment):
+        """
+        Get the page of the first section of an evaluation of the assessment and return the number of queries.
+        The membership queries are not counted as the edit rights are checked by the template for each
+        evaluation element, independently of the evaluation tree
+        """
+        evaluation = self.create_evaluation(assessment)
+        section = Section.objects.get(evaluation=evaluation, master_section__order_id=1)
+        # The condition index and the scoring plan are cached by the process
+        self.client.get(section.get_absolute_url())
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(section.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_tree_queries_constant(self):
+        _, small_queries = self.render_forms(self.small_assessment)
+        _, large_queries = self.render_forms(self.large_assessment)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_tree_order(self):
+        tree, _ = self.render_forms(self.large_assessment)
+        self.assertEqual(
+            [section.master_section.order_id for section in tree.section_list], [1, 2, 3, 4]
+        )
+        for section in tree.section_list:
+            self.assertEqual(
+                [
+                    element.master_evaluation_element.order_id
+                    for element in tree.get_elements_of_section(section)
+                ],
+                list(range(1, 10)),
+            )
+        self.assertEqual(len(tree.get_element_list()), 36)
+        self.assertEqual(
+            tree.get_element_list(),
+            list(
+                EvaluationElement.objects.filter(section__evaluation=tree.evaluation).order_by(
+                    "section__master_section__order_id", "master_evaluation_element__order_id"
+                )
+            ),
+        )
+
+    def test_section_page_queries_constant(self):
+        small_queries = self.get_section_page(self.small_assessment)
+        large_queries = self.get_section_page(self.large_assessment)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_section_page_independent_of_other_sections(self):
+        one_section_assessment = create_large_assessment_body(
+            version="3.0", nb_sections=1, nb_elements=9, nb_choices=4
+        )
+        one_section_queries = self.get_section_page(one_section_assessment)
+        large_queries = self.get_section_page(self.large_assessment)
+        self.assertEqual(one_section_queries, large_queries)
+
+    def test_section_page_forms_of_displayed_section(self):
+        evaluation = self.create_evaluation(self.large_assessment)
+        section = Section.objects.get(evaluation=evaluation, master_section__order_id=2)
+        response = self.client.get(section.get_absolute_url())
+        self.assertEqual(len(response.context["section_list"]), 4)
+        self.assertEqual(len(response.context["dic_form"]), 9)
+        self.assertTrue(
+            all(element.section_id == section.id for element in response.context["dic_form"])
+        )
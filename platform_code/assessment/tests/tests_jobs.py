@@ -0,0 +1,234 @@
+import os
+import tempfile
+from io import StringIO
+
+from assessment.jobs import enqueue_job, run_pending_jobs
+from assessment.models import Choice, EvaluationElement, EvaluationScore, Job, Section
+from assessment.rescoring import rescore_assessment
+from assessment.results_pdf_cache import delete_evaluation_pdf_files, get_evaluation_pdf_dir
+from assessment.element_card_cache import get_element_card_cache
+from assessment.results_prerendering import JOB_NAME, enqueue_results_prerendering
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from home.models import Organisation, User
+from home.versioned_cache import reset_cache_versions
+
+from .object_creation import create_evaluation, create_large_assessment_body
+
+
+class JobTestCase(TestCase):
+    """
+    Test the queue of the background jobs
+    """
+
+    def test_enqueue_job_pending_once(self):
+        job = enqueue_job(JOB_NAME, evaluation_id=1, language="fr")
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(enqueue_job(JOB_NAME, evaluation_id=1, language="fr"), job)
+        enqueue_job(JOB_NAME, evaluation_id=1, language="en")
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_enqueue_job_delayed(self):
+        job = enqueue_job(JOB_NAME, delay=30, evaluation_id=1, language="fr")
+        self.assertEqual(run_pending_jobs(), 0)
+        # The pending job is postponed when it is enqueued again
+        run_after = job.run_after
+        self.assertEqual(enqueue_job(JOB_NAME, delay=60, evaluation_id=1, language="fr"), job)
+        job.refresh_from_db()
+        self.assertGreater(job.run_after, run_after)
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+        self.assertEqual(run_pending_jobs(), 1)
+
+    def test_enqueue_job_not_registered(self):
+        with self.assertRaises(KeyError):
+            enqueue_job("unknown_job")
+
+    def test_run_job_succeeded(self):
+        # The evaluation does not exist, so there is nothing to do
+        enqueue_job(JOB_NAME, evaluation_id=0, language="fr")
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOB_MAX_ATTEMPTS=2, JOB_RETRY_DELAY=60)
+    def test_run_job_failed(self):
+        # The arguments of the handler are missing
+        job = Job.objects.create(name=JOB_NAME, payload={})
+        self.assertEqual(run_pending_jobs(max_jobs=1), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("TypeError", job.error)
+        # The job is retried after JOB_RETRY_DELAY seconds
+        self.assertGreater(job.run_after, timezone.now() + timezone.timedelta(seconds=50))
+        self.assertEqual(run_pending_jobs(), 0)
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+        self.assertEqual(run_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        # A failed job is not run again
+        self.assertEqual(run_pending_jobs(), 0)
+
+    @override_settings(JOB_TIMEOUT=60)
+    def test_running_job_taken_again_after_timeout(self):
+        job = Job.objects.create(
+            name=JOB_NAME,
+            payload={"evaluation_id": 0, "language": "fr"},
+            status=Job.RUNNING,
+            started_at=timezone.now(),
+        )
+        self.assertEqual(run_pending_jobs(), 0)
+        job.started_at = timezone.now() - timezone.timedelta(seconds=120)
+        job.save()
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertFalse(Job.objects.exists())
+
+    def test_run_jobs_command(self):
+        enqueue_job(JOB_NAME, evaluation_id=0, language="fr")
+        out = StringIO()
+        call_command("run_jobs", "--once", stdout=out)
+        self.assertIn("1 jobs run", out.getvalue())
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(
+    RESULTS_PRERENDERING_ENABLED=True,
+    RESULTS_PRERENDERING_DELAY=0,
+    RESULTS_PDF_CACHE_DIR=os.path.join(tempfile.gettempdir(), "test_results_prerendering"),
+)
+class ResultsPrerenderingTestCase(TestCase):
+    """
+    Test the prerendering of the results of a finished evaluation in the background
+    """
+
+    def setUp(self):
+        self.email = "user@test.com"
+        self.password = "user_password"
+        self.user = User.object.create_user(self.email, self.password)
+        self.client = Client()
+        self.client.login(email=self.email, password=self.password)
+        self.organisation = Organisation.create_organisation(
+            name="organisation",
+            size=Organisation.SIZE[0][0],
+            country="FR",
+            sector=Organisation.SECTOR[0][0],
+            created_by=self.user,
+        )
+        self.assessment = create_large_assessment_body(
+            version="1.0", nb_sections=1, nb_elements=2, nb_choices=4
+        )
+        self.evaluation = create_evaluation(
+            assessment=self.assessment,
+            name="evaluation",
+            created_by=self.user,
+            organisation=self.organisation,
+        )
+        self.evaluation.create_evaluation_body()
+        Choice.objects.filter(
+            evaluation_element__section__evaluation=self.evaluation,
+            master_choice__order_id="d",
+        ).update(is_ticked=True)
+        EvaluationElement.objects.filter(section__evaluation=self.evaluation).update(
+            status=True
+        )
+        Section.objects.filter(evaluation=self.evaluation).update(
+            nb_elements_done=F("nb_elements"), user_progression=100
+        )
+        self.evaluation.set_finished()
+        EvaluationScore.objects.filter(evaluation=self.evaluation).update(
+            need_to_set_max_points=True
+        )
+        rescore_assessment(self.assessment)
+        self.addCleanup(delete_evaluation_pdf_files, self.evaluation.id)
+
+    def test_results_prerendered(self):
+        enqueue_results_prerendering(self.evaluation)
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertFalse(Job.objects.exists())
+        evaluation_score = EvaluationScore.objects.get(evaluation=self.evaluation)
+        self.assertFalse(evaluation_score.need_to_calculate)
+        self.assertTrue(evaluation_score.exposition_dic is not None)
+        # The PDF and the radar chart are stored
+        self.assertEqual(len(os.listdir(get_evaluation_pdf_dir(self.evaluation.id))), 2)
+
+        # The PDF download serves the PDF prerendered
+        response = self.client.get(
+            reverse(
+                "assessment:resultsPDF",
+                kwargs={
+                    "orga_id": self.organisation.id,
+                    "slug": self.evaluation.slug,
+                    "pk": self.evaluation.id,
+                },
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+        self.assertEqual(len(os.listdir(get_evaluation_pdf_dir(self.evaluation.id))), 2)
+
+    def test_results_prerendered_served_without_local_caches(self):
+        enqueue_results_prerendering(self.evaluation)
+        run_pending_jobs()
+        evaluation_dir = get_evaluation_pdf_dir(self.evaluation.id)
+        stored_files = {
+            file_name: os.stat(os.path.join(evaluation_dir, file_name)).st_mtime_ns
+            for file_name in os.listdir(evaluation_dir)
+        }
+        # The PDF and the radar chart
+        self.assertEqual(len(stored_files), 2)
+
+        # The web server does not share the local caches of the worker
+        cache.clear()
+        get_element_card_cache().clear()
+        reset_cache_versions()
+        url_kwargs = {
+            "orga_id": self.organisation.id,
+            "slug": self.evaluation.slug,
+            "pk": self.evaluation.id,
+        }
+        response = self.client.get(reverse("assessment:resultsPDF", kwargs=url_kwargs))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse("assessment:results", kwargs=url_kwargs))
+        self.assertContains(response, "<svg")
+        # The files prerendered are served, not generated again
+        self.assertEqual(
+            {
+                file_name: os.stat(os.path.join(evaluation_dir, file_name)).st_mtime_ns
+                for file_name in os.listdir(evaluation_dir)
+            },
+            stored_files,
+        )
+
+    def test_prerendering_enqueued_on_answer(self):
+        section = Section.objects.get(evaluation=self.evaluation)
+        element = EvaluationElement.objects.get(
+            section=section, master_evaluation_element__order_id="1"
+        )
+        choice = Choice.objects.get(evaluation_element=element, master_choice__order_id="b")
+        response = self.client.post(
+            section.get_absolute_url(),
+            {"element_id": element.id, f"{element.id}-{element.id}": str(choice)},
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        self.assertTrue(response.json()["success"])
+        job = Job.objects.get()
+        self.assertEqual(job.name, JOB_NAME)
+        self.assertEqual(job.payload, {"evaluation_id": self.evaluation.id, "language": "fr"})
+
+    @override_settings(RESULTS_PRERENDERING_DELAY=30)
+    def test_prerendering_delayed(self):
+        job = enqueue_results_prerendering(self.evaluation)
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertEqual(run_pending_jobs(), 0)
+        # The answers saved meanwhile postpone the same job
+        self.assertEqual(enqueue_results_prerendering(self.evaluation), job)
+        self.assertEqual(Job.objects.count(), 1)
+
+    @override_settings(RESULTS_PRERENDERING_ENABLED=False)
+    def test_prerendering_disabled(self):
+        self.assertIsNone(enqueue_results_prerendering(self.evaluation))
+        self.assertFalse(Job.objects.exists())
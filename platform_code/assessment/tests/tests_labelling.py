@@ -1,6 +1,7 @@
 from assessment.models import Assessment, Evaluation, EvaluationElement, Labelling
 from django.test import Client, RequestFactory, TestCase
 from home.models import Organisation, PlatformManagement, User
+from home.models.platform_management import invalidate_platform_management
 from home.views.profile import ProfileView
 
 
@@ -10,6 +11,9 @@ class TestLabellingProcess(TestCase):
     """
 
     def setUp(self):
+        # The labelling threshold is modified in some tests, the platform management object cached in the process
+        # must not be kept for the next tests, as their changes are rolled back
+        self.addCleanup(invalidate_platform_management)
         # Configure an user and organisation
         self.email = "admin@hotmail.com"
         self.password = "admin_password"
@@ -9,8 +9,14 @@ from assessment.models import (
     MasterSection,
     is_language_activation_allowed,
 )
-from django.test import TestCase
+from assessment.models.translation_completeness import (
+    TranslationCompleteness,
+    invalidate_translation_completeness,
+)
+from assessment.utils import render_choice_label
+from django.test import TestCase, TransactionTestCase
 from django.utils.translation import activate
+from markdownify.templatetags.markdownify import markdownify
 
 
 def create_translated_fields():
@@ -112,6 +118,32 @@ class ImportAssessmentLanguageTestCase(TestCase):
                         self.assertTrue(getattr(external_link, fields + "_fr"))
                         self.assertTrue(getattr(external_link, fields + "_en"))
 
+    def test_import_assessment_rendered_texts(self):
+        """
+        The html of the texts of the master evaluation elements and master choices is rendered for each language
+        during the import
+        """
+        import_assessment = ImportAssessment(self.assessment_data)
+        self.assertTrue(import_assessment.success)
+        master_element = MasterEvaluationElement.objects.filter(
+            master_section__assessment=import_assessment.assessment
+        ).first()
+        master_choice = master_element.masterchoice_set.first()
+        for language in ["fr", "en"]:
+            activate(language)
+            self.assertEqual(
+                master_element.question_text_html,
+                str(markdownify(getattr(master_element, "question_text_" + language))),
+            )
+            self.assertEqual(
+                master_element.get_question_text_html(), master_element.question_text_html
+            )
+            self.assertEqual(
+                master_choice.get_answer_text_label(),
+                render_choice_label(getattr(master_choice, "answer_text_" + language)),
+            )
+        activate("en")
+
 
 class AssessmentLanguageTestCase(TestCase):
     """
@@ -212,3 +244,53 @@ class AssessmentLanguageTestCase(TestCase):
         self.assessment.delete_language("de")
         self.assertIn("en", self.assessment.get_the_available_languages())
         self.assertIn("fr", self.assessment.get_the_available_languages())
+
+    def test_fields_not_translated(self):
+        self.assertEqual(self.assessment.get_fields_not_translated("en"), {})
+        master_choice = MasterChoice.objects.filter(
+            master_evaluation_element__master_section__assessment=self.assessment
+        ).first()
+        master_choice.answer_text_en = None
+        master_choice.save()
+        self.assertFalse(self.assessment.check_has_language("en"))
+        self.assertTrue(self.assessment.check_has_language("fr"))
+        self.assertEqual(
+            self.assessment.get_fields_not_translated("en"), {master_choice: "answer_text_en"}
+        )
+        self.assertEqual(self.assessment.get_the_available_languages(), ["fr"])
+
+    def test_translation_completeness_queries(self):
+        # The assessment, its master sections, master evaluation elements, master choices and external links
+        with self.assertNumQueries(5):
+            translation_completeness = TranslationCompleteness(self.assessment.id)
+        self.assertEqual(set(translation_completeness.available_languages), {"fr", "en"})
+
+
+class TranslationCompletenessCacheTestCase(TransactionTestCase):
+    """
+    Test the cache of the translation completeness, which is only filled outside of the transactions
+    """
+
+    def setUp(self):
+        self.addCleanup(invalidate_translation_completeness)
+        invalidate_translation_completeness()
+        with open(
+            "assessment/tests/import_test_files/assessment_test_first_version.json"
+        ) as json_file:
+            self.assessment = ImportAssessment(json.load(json_file)).assessment
+
+    def test_translation_completeness_cached(self):
+        self.assessment.get_the_available_languages()
+        with self.assertNumQueries(0):
+            self.assertTrue(self.assessment.check_has_language("en"))
+            self.assertEqual(set(self.assessment.get_the_available_languages()), {"fr", "en"})
+
+    def test_translation_completeness_invalidated(self):
+        self.assertTrue(self.assessment.check_has_language("en"))
+        master_section = self.assessment.mastersection_set.first()
+        master_section.keyword_en = ""
+        master_section.save()
+        self.assertFalse(self.assessment.check_has_language("en"))
+        self.assessment.name_fr = ""
+        self.assessment.save()
+        self.assertEqual(self.assessment.get_the_available_languages(), [])
@@ -0,0 +1,230 @@
+import json
+import os
+import tempfile
+import zipfile
+
+from assessment.jobs import run_pending_jobs
+from assessment.models import Choice, EvaluationElement, Job, OrganisationExport
+from assessment.organisation_export import request_organisation_export
+from assessment.results_pdf_cache import delete_evaluation_pdf_files
+from assessment.results_prerendering import prerender_evaluation_results
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from home.models import User
+from home.versioned_cache import reset_cache_versions
+
+from .object_creation import MemberTestMixin, create_evaluation, create_large_assessment_body
+
+
+class OrganisationExportTestMixin(MemberTestMixin):
+    """
+    Create an organisation with two finished evaluations and an evaluation in progress
+    """
+
+    def setUp(self):
+        super().setUp()
+        assessment = create_large_assessment_body(
+            version="1.0", nb_sections=2, nb_elements=2, nb_choices=4
+        )
+        self.evaluation_list = []
+        for i in range(3):
+            evaluation = create_evaluation(
+                assessment=assessment,
+                name=f"evaluation {i}",
+                created_by=self.user,
+                organisation=self.organisation,
+            )
+            evaluation.create_evaluation_body()
+            self.addCleanup(delete_evaluation_pdf_files, evaluation.id)
+            self.evaluation_list.append(evaluation)
+        # The last evaluation is not finished so it is not exported
+        for evaluation in self.evaluation_list[:2]:
+            Choice.objects.filter(
+                evaluation_element__section__evaluation=evaluation,
+                master_choice__order_id="d",
+            ).update(is_ticked=True)
+            EvaluationElement.objects.filter(section__evaluation=evaluation).update(
+                status=True, user_notes="Notes"
+            )
+            evaluation.is_finished = True
+            evaluation.finished_at = timezone.now()
+            evaluation.save()
+
+    def tearDown(self):
+        for organisation_export in OrganisationExport.objects.all():
+            organisation_export.delete_file()
+
+
+@override_settings(
+    ORGANISATION_EXPORT_PROCESSES=1,
+    ORGANISATION_EXPORT_DIR=os.path.join(tempfile.gettempdir(), "test_organisation_export"),
+    RESULTS_PDF_CACHE_DIR=os.path.join(tempfile.gettempdir(), "test_organisation_export_pdf"),
+)
+class OrganisationExportTestCase(OrganisationExportTestMixin, TestCase):
+    """
+    Test the export of the results of the finished evaluations of an organisation
+    """
+
+    def test_export_zip(self):
+        organisation_export = request_organisation_export(self.organisation, self.user, "fr")
+        self.assertEqual(Job.objects.get().payload, {"export_id": organisation_export.id})
+        self.assertEqual(run_pending_jobs(), 1)
+        organisation_export.refresh_from_db()
+        self.assertEqual(organisation_export.status, OrganisationExport.DONE)
+        self.assertEqual(organisation_export.nb_evaluations, 2)
+        self.assertEqual(organisation_export.nb_evaluations_done, 2)
+        self.assertEqual(organisation_export.get_progression(), 100)
+        with zipfile.ZipFile(organisation_export.file_path) as zip_file:
+            names = sorted(zip_file.namelist())
+            evaluation = self.evaluation_list[0]
+            data = json.loads(zip_file.read(f"{evaluation.id}-evaluation-0.json"))
+            self.assertTrue(
+                zip_file.read(f"{evaluation.id}-evaluation-0.pdf").startswith(b"%PDF")
+            )
+        self.assertEqual(len(names), 4)
+        self.assertEqual(data["evaluation_id"], evaluation.id)
+        self.assertEqual(len(data["sections"]), 2)
+        self.assertEqual(data["sections"][0]["elements"][0]["ticked_choices"], ["1.1.d"])
+        self.assertEqual(data["sections"][0]["elements"][0]["user_notes"], "Notes")
+
+    def test_export_file_name(self):
+        organisation_export = request_organisation_export(self.organisation, self.user, "fr")
+        run_pending_jobs()
+        organisation_export.refresh_from_db()
+        file_name = os.path.basename(organisation_export.file_path)
+        # The name is random, it does not contain the name of the organisation nor the id of the export
+        self.assertFalse(file_name.startswith("organisation"))
+        self.assertGreaterEqual(len(file_name), 40)
+        self.assertEqual(
+            os.path.dirname(organisation_export.file_path),
+            os.path.join(tempfile.gettempdir(), "test_organisation_export"),
+        )
+
+    def test_export_in_progress(self):
+        organisation_export = request_organisation_export(self.organisation, self.user, "fr")
+        self.assertIsNone(request_organisation_export(self.organisation, self.user, "fr"))
+        self.assertEqual(OrganisationExport.objects.get(), organisation_export)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_admin_export_in_progress(self):
+        self.user.staff = True
+        self.user.admin = True
+        self.user.save()
+        request_organisation_export(self.organisation, self.user, "fr")
+        response = self.client.post(
+            reverse("admin:home_organisation_changelist"),
+            {
+                "action": "export_evaluations_results",
+                "_selected_action": [self.organisation.id],
+            },
+            follow=True,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OrganisationExport.objects.count(), 1)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_export_reuses_cached_pdf(self):
+        evaluation = self.evaluation_list[0]
+        pdf_path = prerender_evaluation_results(evaluation.id, "fr")
+        modified_at = os.path.getmtime(pdf_path)
+        request_organisation_export(self.organisation, self.user, "fr")
+        run_pending_jobs()
+        self.assertEqual(os.path.getmtime(pdf_path), modified_at)
+
+    def test_previous_export_deleted(self):
+        organisation_export = request_organisation_export(self.organisation, self.user, "fr")
+        run_pending_jobs()
+        organisation_export.refresh_from_db()
+        file_path = organisation_export.file_path
+        request_organisation_export(self.organisation, self.user, "fr")
+        self.assertFalse(OrganisationExport.objects.filter(id=organisation_export.id).exists())
+        self.assertFalse(os.path.exists(file_path))
+
+    def test_export_views(self):
+        response = self.client.post(
+            reverse("assessment:organisation-export", kwargs={"orga_id": self.organisation.id})
+        )
+        self.assertRedirects(
+            response,
+            reverse("assessment:orga-summary", kwargs={"orga_id": self.organisation.id}),
+        )
+        organisation_export = OrganisationExport.objects.get()
+        progress_url = reverse(
+            "assessment:organisation-export-progress",
+            kwargs={"orga_id": self.organisation.id, "export_id": organisation_export.id},
+        )
+        data = self.client.get(progress_url).json()
+        self.assertEqual(data["status"], OrganisationExport.PENDING)
+        self.assertIsNone(data["download_url"])
+        # An other export cannot be requested while this one is in progress
+        self.client.post(
+            reverse("assessment:organisation-export", kwargs={"orga_id": self.organisation.id})
+        )
+        self.assertEqual(OrganisationExport.objects.count(), 1)
+
+        run_pending_jobs()
+        data = self.client.get(progress_url).json()
+        self.assertEqual(data["status"], OrganisationExport.DONE)
+        self.assertEqual(data["progression"], 100)
+        response = self.client.get(data["download_url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"PK"))
+
+    def test_export_not_member(self):
+        User.object.create_user("other@test.com", "other_password")
+        client = Client()
+        client.login(email="other@test.com", password="other_password")
+        response = client.post(
+            reverse("assessment:organisation-export", kwargs={"orga_id": self.organisation.id})
+        )
+        self.assertRedirects(response, reverse("home:homepage"), fetch_redirect_response=False)
+        self.assertFalse(OrganisationExport.objects.exists())
+
+    def test_export_progress_not_member(self):
+        organisation_export = request_organisation_export(self.organisation, self.user, "fr")
+        User.object.create_user("other@test.com", "other_password")
+        client = Client()
+        client.login(email="other@test.com", password="other_password")
+        response = client.get(
+            reverse(
+                "assessment:organisation-export-progress",
+                kwargs={"orga_id": self.organisation.id, "export_id": organisation_export.id},
+            ),
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.json()["success"])
+        self.assertNotIn("status", response.json())
+
+
+@override_settings(
+    ORGANISATION_EXPORT_PROCESSES=2,
+    ORGANISATION_EXPORT_DIR=os.path.join(tempfile.gettempdir(), "test_organisation_export"),
+    RESULTS_PDF_CACHE_DIR=os.path.join(tempfile.gettempdir(), "test_organisation_export_pdf"),
+)
+class OrganisationExportProcessesTestCase(OrganisationExportTestMixin, TransactionTestCase):
+    """
+    Test the export with the pool of processes, which needs the objects to be committed as the processes open
+    their own connections to the database
+    """
+
+    def setUp(self):
+        # The versions of the cached values of the previous tests were flushed with the database
+        reset_cache_versions()
+        super().setUp()
+
+    def test_export_zip_processes(self):
+        organisation_export = request_organisation_export(self.organisation, self.user, "fr")
+        self.assertEqual(run_pending_jobs(), 1)
+        organisation_export.refresh_from_db()
+        self.assertEqual(organisation_export.status, OrganisationExport.DONE)
+        self.assertEqual(organisation_export.nb_evaluations_done, 2)
+        with zipfile.ZipFile(organisation_export.file_path) as zip_file:
+            for evaluation in self.evaluation_list[:2]:
+                name = f"{evaluation.id}-{evaluation.name.replace(' ', '-')}"
+                self.assertTrue(zip_file.read(f"{name}.pdf").startswith(b"%PDF"))
+                data = json.loads(zip_file.read(f"{name}.json"))
+                self.assertEqual(data["evaluation_id"], evaluation.id)
+                self.assertEqual(data["sections"][0]["elements"][0]["ticked_choices"], ["1.1.d"])
+            self.assertEqual(len(zip_file.namelist()), 4)
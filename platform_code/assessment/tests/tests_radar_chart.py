@@ -0,0 +1,99 @@
+import os
+
+from assessment.models import Choice, EvaluationScore, Section
+from assessment.radar_chart import get_radar_chart, get_radar_chart_path, get_section_scores
+from assessment.rescoring import rescore_assessment
+from assessment.results_pdf_cache import (
+    delete_evaluation_pdf_files,
+    get_evaluation_content_hash,
+)
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from home.models import Organisation, User
+
+from .object_creation import create_evaluation, create_large_assessment_body
+
+
+class RadarChartTestCase(TestCase):
+    """
+    Test the radar chart of the scores per section of the results page is drawn once for each content of the
+    evaluation
+    """
+
+    def setUp(self):
+        self.organisation = Organisation.create_organisation(
+            name="organisation",
+            size=Organisation.SIZE[0][0],
+            country="FR",
+            sector=Organisation.SECTOR[0][0],
+            created_by=User.object.create_user("user@test.com", "user_password"),
+        )
+        assessment = create_large_assessment_body(
+            version="1.0", nb_sections=10, nb_elements=10, nb_choices=4
+        )
+        self.evaluation = create_evaluation(
+            assessment=assessment, name="evaluation", organisation=self.organisation
+        )
+        self.evaluation.create_evaluation_body()
+        Choice.objects.filter(
+            evaluation_element__section__evaluation=self.evaluation,
+            master_choice__order_id="c",
+        ).update(is_ticked=True)
+        self.evaluation.set_finished()
+        EvaluationScore.objects.filter(evaluation=self.evaluation).update(
+            need_to_set_max_points=True
+        )
+        rescore_assessment(assessment)
+        self.section_list = list(
+            Section.objects.filter(evaluation=self.evaluation)
+            .select_related("master_section")
+            .order_by("master_section__order_id")
+        )
+        delete_evaluation_pdf_files(self.evaluation.id)
+        self.addCleanup(delete_evaluation_pdf_files, self.evaluation.id)
+
+    def get_radar_chart(self):
+        with CaptureQueriesContext(connection) as context:
+            radar_chart = get_radar_chart(self.evaluation, self.section_list)
+        return radar_chart, len(context.captured_queries)
+
+    def test_section_scores(self):
+        scores = get_section_scores(self.evaluation, self.section_list)
+        for section, score in zip(self.section_list, scores):
+            self.assertAlmostEqual(
+                score, section.calculate_score_per_section() / section.max_points * 100
+            )
+
+    def test_radar_chart_cached(self):
+        radar_chart, queries_miss = self.get_radar_chart()
+        self.assertTrue(radar_chart.strip().startswith("<svg"))
+        self.assertEqual(radar_chart.count("<circle"), 10)
+        self.assertIn("Section 1", radar_chart)
+        self.assertNotIn("plotly", radar_chart)
+        radar_chart_hit, queries_hit = self.get_radar_chart()
+        self.assertEqual(radar_chart_hit, radar_chart)
+        self.assertLess(queries_hit, queries_miss)
+
+    def test_radar_chart_drawn_after_answer(self):
+        _, queries_miss = self.get_radar_chart()
+        Choice.objects.filter(
+            evaluation_element__section__evaluation=self.evaluation,
+            evaluation_element__section__master_section__order_id=1,
+            master_choice__order_id="d",
+        ).update(is_ticked=True)
+        # The content hash has changed, so the chart is drawn again
+        _, queries = self.get_radar_chart()
+        self.assertEqual(queries, queries_miss)
+
+    def test_radar_chart_not_public(self):
+        radar_chart, _ = self.get_radar_chart()
+        path = get_radar_chart_path(
+            self.evaluation.id, get_evaluation_content_hash(self.evaluation, self.organisation)
+        )
+        with open(path, encoding="utf-8") as file:
+            self.assertEqual(file.read(), radar_chart)
+        # The chart is stored outside the directory served without authentication
+        media_root = os.path.join(os.path.abspath(settings.MEDIA_ROOT), "")
+        self.assertFalse(os.path.abspath(path).startswith(media_root))
@@ -0,0 +1,186 @@
+import os
+import tempfile
+from io import BytesIO
+
+from assessment.models import Choice, EvaluationElement, EvaluationScore
+from assessment.rescoring import rescore_assessment
+from assessment.results_pdf_cache import (
+    delete_evaluation_pdf_files,
+    get_evaluation_content_hash,
+    get_evaluation_pdf_dir,
+)
+from assessment.views.resultsPDF import ResultsPDFView, clear_pdf_layout_cache, wrap_master_string
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from home.models import Organisation, User
+
+from .object_creation import MemberTestMixin, create_evaluation, create_large_assessment_body
+
+
+@override_settings(
+    RESULTS_PDF_CACHE_DIR=os.path.join(tempfile.gettempdir(), "test_results_pdf")
+)
+class ResultsPDFCacheTestCase(MemberTestMixin, TestCase):
+    """
+    Test the cache of the PDF of the results of a finished evaluation
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.assessment = create_large_assessment_body(
+            version="1.0", nb_sections=2, nb_elements=9, nb_choices=4
+        )
+        self.evaluation = create_evaluation(
+            assessment=self.assessment,
+            name="evaluation",
+            created_by=self.user,
+            organisation=self.organisation,
+        )
+        self.evaluation.create_evaluation_body()
+        Choice.objects.filter(
+            evaluation_element__section__evaluation=self.evaluation,
+            master_choice__order_id="d",
+        ).update(is_ticked=True)
+        EvaluationElement.objects.filter(section__evaluation=self.evaluation).update(
+            status=True
+        )
+        self.evaluation.is_finished = True
+        self.evaluation.finished_at = timezone.now()
+        self.evaluation.save()
+        # Set the points of the elements, sections and evaluation
+        EvaluationScore.objects.filter(evaluation=self.evaluation).update(
+            need_to_set_max_points=True
+        )
+        rescore_assessment(self.assessment)
+        self.url = reverse(
+            "assessment:resultsPDF",
+            kwargs={
+                "orga_id": self.organisation.id,
+                "slug": self.evaluation.slug,
+                "pk": self.evaluation.id,
+            },
+        )
+        self.addCleanup(delete_evaluation_pdf_files, self.evaluation.id)
+
+    def get_pdf(self, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, **headers)
+            content = b"".join(getattr(response, "streaming_content", []))
+        return response, content, len(context.captured_queries)
+
+    def test_pdf_cached(self):
+        response_miss, content_miss, queries_miss = self.get_pdf()
+        self.assertEqual(response_miss.status_code, 200)
+        self.assertTrue(content_miss.startswith(b"%PDF"))
+        response_hit, content_hit, queries_hit = self.get_pdf()
+        self.assertEqual(response_hit.status_code, 200)
+        self.assertEqual(content_hit, content_miss)
+        self.assertEqual(response_hit["ETag"], response_miss["ETag"])
+        self.assertLess(queries_hit, queries_miss)
+        response_not_modified, _, _ = self.get_pdf(HTTP_IF_NONE_MATCH=response_hit["ETag"])
+        self.assertEqual(response_not_modified.status_code, 304)
+
+    def test_pdf_generated_after_answer(self):
+        response, _, _ = self.get_pdf()
+        etag = response["ETag"]
+        element = EvaluationElement.objects.filter(section__evaluation=self.evaluation).first()
+        element.user_justification = "Justification"
+        element.save()
+        response, content, _ = self.get_pdf(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(os.listdir(get_evaluation_pdf_dir(self.evaluation.id))), 1)
+
+    def test_content_hash_with_ticks_swapped(self):
+        element_1, element_2 = EvaluationElement.objects.filter(
+            section__evaluation=self.evaluation
+        ).order_by("id")[:2]
+
+        def tick(order_id_1, order_id_2):
+            Choice.objects.filter(evaluation_element__section__evaluation=self.evaluation).update(
+                is_ticked=False
+            )
+            Choice.objects.filter(
+                Q(evaluation_element=element_1, master_choice__order_id=order_id_1)
+                | Q(evaluation_element=element_2, master_choice__order_id=order_id_2)
+            ).update(is_ticked=True)
+            return get_evaluation_content_hash(self.evaluation, self.organisation)
+
+        # The sums of the ids of the ticked choices are the same, but not the answers
+        self.assertNotEqual(tick("a", "b"), tick("b", "a"))
+
+
+class PDFLayoutCacheTestCase(TestCase):
+    """
+    Test the layout of the texts is cached when the PDF of the results of a large evaluation (300 evaluation
+    elements) is printed
+    """
+
+    def setUp(self):
+        self.organisation = Organisation.create_organisation(
+            name="organisation",
+            size=Organisation.SIZE[0][0],
+            country="FR",
+            sector=Organisation.SECTOR[0][0],
+            created_by=User.object.create_user("user@test.com", "user_password"),
+        )
+        assessment = create_large_assessment_body(
+            version="1.0", nb_sections=10, nb_elements=30, nb_choices=4
+        )
+        self.evaluation = create_evaluation(
+            assessment=assessment,
+            name="evaluation",
+            organisation=self.organisation,
+            is_finished=True,
+            finished_at=timezone.now(),
+        )
+        self.evaluation.create_evaluation_body()
+        EvaluationElement.objects.filter(section__evaluation=self.evaluation).update(
+            user_justification="<p>Justification of the answer, <strong>long enough</strong> to be "
+            "split in several lines when it is drawn in the PDF of the results</p>\r\n<ul>\r\n"
+            "<li>first point</li>\r\n<li>second point</li>\r\n</ul>",
+            user_notes="Notes",
+        )
+        self.addCleanup(clear_pdf_layout_cache)
+
+    def print_pdf(self):
+        view = ResultsPDFView()
+        context = {
+            "evaluation_score": 50,
+            "dict_sections_elements": self.evaluation.get_dict_sections_elements_choices(),
+            "evaluation": self.evaluation,
+            "organisation": self.organisation,
+            "nb_risks_exposed": 0,
+            "len_exposition_dic": 0,
+            "exposition_dic": {},
+        }
+        pdf_file = view.print_pdf(context, BytesIO())
+        return pdf_file.getvalue(), view.page_num
+
+    def test_layout_cached(self):
+        clear_pdf_layout_cache()
+        content_cold, pages_cold = self.print_pdf()
+        self.assertTrue(content_cold.startswith(b"%PDF"))
+        misses = wrap_master_string.cache_info().misses
+        self.assertGreater(misses, 0)
+        content_warm, pages_warm = self.print_pdf()
+        self.assertEqual(pages_warm, pages_cold)
+        # All the texts of the master objects have been measured during the first print
+        self.assertEqual(wrap_master_string.cache_info().misses, misses)
+        self.assertGreater(wrap_master_string.cache_info().hits, 0)
+
+    def test_user_texts_not_cached(self):
+        clear_pdf_layout_cache()
+        self.print_pdf()
+        cache_size = wrap_master_string.cache_info().currsize
+        EvaluationElement.objects.filter(section__evaluation=self.evaluation).update(
+            user_justification="Other justification", user_notes="Other notes"
+        )
+        self.evaluation.name = "other evaluation"
+        self.print_pdf()
+        # Only the texts of the master objects and of the platform are kept in the process
+        self.assertEqual(wrap_master_string.cache_info().currsize, cache_size)
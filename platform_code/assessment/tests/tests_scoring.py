@@ -12,10 +12,14 @@ from assessment.models import (
     ScoringSystem,
     Section,
 )
+from assessment.models.scoring_plan import get_scoring_plan
+from assessment.rescoring import rescore_assessment
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from home.models import User
 
-from .object_creation import create_evaluation
+from .object_creation import create_evaluation, create_large_assessment_body
 
 """
 In this file, the scoring is tested: the class EvaluationScore, the calculation of the max score
@@ -521,6 +525,53 @@ class TestScoreValues(TestCase):
         self.evaluation_score.process_score_calculation()
         self.assertEqual(self.evaluation_score.score, 100)
 
+    def test_evaluation_score_process_score_calculation_queries(self):
+        """
+        The scoring engine loads the evaluation tree in a constant number of queries, the weights come from the
+        scoring plan already compiled and the fields are saved with one query
+        """
+        self.set_progression_evaluation("1.1.a", "1.1.b", "2.1.a")
+        self.evaluation_score.evaluation = Evaluation.objects.get(name="evaluation")
+        with self.assertNumQueries(4):
+            self.evaluation_score.process_score_calculation()
+        # The points not concerned are the same than the sum calculated by the evaluation elements
+        self.assertEqual(
+            self.evaluation_score.points_not_concerned,
+            self.evaluation_element2.calculate_points_not_concerned(),
+        )
+
+    def test_scoring_plan(self):
+        """
+        The scoring plan is compiled once and cached, then compiled again when the scoring system is saved
+        """
+        scoring_plan = get_scoring_plan(self.assessment.id)
+        master_choice = MasterChoice.objects.get(
+            order_id="b",
+            master_evaluation_element__order_id="2",
+            master_evaluation_element__master_section__order_id="1",
+        )
+        self.assertEqual(scoring_plan.get_choice_points(master_choice.id), 0.5)
+        self.assertEqual(
+            scoring_plan.get_element_weight(master_choice.master_evaluation_element_id), 1
+        )
+        with self.assertNumQueries(0):
+            self.assertIs(get_scoring_plan(self.assessment.id), scoring_plan)
+        kwargs = {"1.2.b": "5.58"}
+        self.change_weight_choices(**kwargs)
+        new_scoring_plan = get_scoring_plan(self.assessment.id)
+        self.assertIsNot(new_scoring_plan, scoring_plan)
+        self.assertEqual(new_scoring_plan.get_choice_points(master_choice.id), 5.58)
+
+    def test_scoring_plan_unknown_master_objects(self):
+        """
+        The points cannot be calculated for a master object without weight, so the scoring plan raises an error
+        """
+        scoring_plan = get_scoring_plan(self.assessment.id)
+        with self.assertRaises(KeyError):
+            scoring_plan.get_choice_points(-1)
+        with self.assertRaises(KeyError):
+            scoring_plan.get_element_weight(-1)
+
     def test_evaluation_score_calculate_max_points_no_changes(self):
         self.assertFalse(self.evaluation_score.need_to_set_max_points)
         max_points_before = self.evaluation_score.max_points
@@ -610,6 +661,58 @@ class TestScoreValues(TestCase):
         self.assertEqual(self.evaluation_score.points_obtained, 9)
         self.assertEqual(self.evaluation_score.score, 100)
 
+    def test_rescore_assessment_evaluation_finished(self):
+        self.set_progression_evaluation("1.1.b", "1.2.b", "2.1.b")
+        kwargs = {"1.2.b": "5", "2.1.b": "3", "no_change_max_points": True}
+        self.change_weight_choices(**kwargs)
+        self.evaluation_score.need_to_set_max_points = True
+        self.evaluation_score.save()
+        self.assertEqual(rescore_assessment(self.assessment), 1)
+        self.assertEqual(
+            rescore_assessment(self.assessment), 0
+        )  # Only the flagged evaluations
+        self.evaluation_element2.refresh_from_db()
+        self.section1.refresh_from_db()
+        self.section2.refresh_from_db()
+        self.evaluation_score.refresh_from_db()
+        self.assertEqual(self.evaluation_element2.max_points, 5)
+        self.assertEqual(self.evaluation_element2.points, 5)
+        self.assertEqual(self.section1.max_points, 6)
+        self.assertEqual(self.section2.max_points, 3)
+        self.assertEqual(self.section1.points, 6)
+        self.assertEqual(self.section2.points, 3)
+        self.assertEqual(self.evaluation_score.max_points, 9)
+        self.assertFalse(self.evaluation_score.need_to_set_max_points)
+        self.assertEqual(self.evaluation_score.points_obtained, 9)
+        self.assertEqual(self.evaluation_score.score, 100)
+
+    def test_rescore_assessment_same_as_score_calculation(self):
+        """
+        The scores calculated with the matrices are the same than the ones of the scoring engine, with the
+        conditions intra and inter evaluation elements
+        """
+        for ticked_choices in [
+            ("1.1.a", "1.2.a", "2.1.a"),
+            ("1.1.a", "1.2.b", "2.1.b"),  # Condition intra
+            ("1.1.b", "1.2.a", "2.1.b"),  # Condition inter
+            ("1.1.b", "1.2.b", "2.1.a"),
+        ]:
+            self.set_progression_evaluation(*ticked_choices)
+            self.evaluation_score.evaluation = Evaluation.objects.get(name="evaluation")
+            self.evaluation_score.process_score_calculation()
+            rescore_assessment(self.assessment, only_flagged=False)
+            evaluation_score = EvaluationScore.objects.get(id=self.evaluation_score.id)
+            for field in [
+                "max_points",
+                "points_not_concerned",
+                "points_obtained",
+                "dilatation_factor",
+                "score",
+            ]:
+                self.assertAlmostEqual(
+                    getattr(evaluation_score, field), getattr(self.evaluation_score, field)
+                )
+
     def test_set_exposition_dic(self):
         self.assertEqual(self.evaluation_score.exposition_dic, {})
         self.set_progression_evaluation("1.1.b", "1.2.b", "2.1.b")
@@ -698,3 +801,50 @@ class TestEvaluationCompletion(TestCase):
         self.assertIsNotNone(evaluation_score.score)
         self.assertTrue(evaluation_score.score < 48)
         self.assertTrue(evaluation_score.score >= 5)
+
+
+class TestRescoring(TestCase):
+    """
+    Test the batch rescoring of the evaluations of an assessment after a change of the scoring system
+    """
+
+    def setUp(self):
+        self.assessment = create_large_assessment_body(
+            version="1.0", nb_sections=10, nb_elements=20, nb_choices=4
+        )
+        for i in range(20):
+            evaluation = create_evaluation(assessment=self.assessment, name=f"evaluation {i}")
+            evaluation.create_evaluation_body()
+            Choice.objects.filter(
+                evaluation_element__section__evaluation=evaluation,
+                master_choice__order_id="d",
+            ).update(is_ticked=True)
+            evaluation.set_finished()
+        # Double the weights of all the choices
+        scoring_system = self.assessment.scoringsystem_set.get()
+        scoring_system.master_choices_weight_json = {
+            key: str(float(value) * 2)
+            for key, value in scoring_system.master_choices_weight_json.items()
+        }
+        scoring_system.save()
+        EvaluationScore.objects.filter(evaluation__assessment=self.assessment).update(
+            need_to_set_max_points=True
+        )
+
+    def test_rescore_assessment_queries_and_results(self):
+        with CaptureQueriesContext(connection) as context:
+            count = rescore_assessment(self.assessment, chunk_size=10)
+        self.assertEqual(count, 20)
+        # The queries depend on the number of chunks, not on the number of evaluations nor elements
+        self.assertLess(len(context.captured_queries), 40)
+        evaluation_score = EvaluationScore.objects.filter(
+            evaluation__assessment=self.assessment
+        ).first()
+        self.assertEqual(evaluation_score.max_points, 900)
+        self.assertFalse(evaluation_score.need_to_set_max_points)
+        section = Section.objects.filter(
+            evaluation=evaluation_score.evaluation, master_section__order_id=1
+        ).get()
+        self.assertEqual(section.max_points, 90)
+        self.assertEqual(section.points, 60)
+
@@ -0,0 +1,208 @@
+from assessment.models import Choice, EvaluationElement, EvaluationScore, Section
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .object_creation import MemberTestMixin, create_evaluation, create_large_assessment_body
+
+
+class SectionAnswerTestCase(MemberTestMixin, TestCase):
+    """
+    Test the ajax POST saving the answer of an evaluation element in the section page updates the counters with
+    a number of queries which does not depend on the size of the section
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.small_assessment = create_large_assessment_body(
+            version="1.0", nb_sections=1, nb_elements=2, nb_choices=4
+        )
+        self.large_assessment = create_large_assessment_body(
+            version="2.0", nb_sections=1, nb_elements=9, nb_choices=4
+        )
+
+    def answer_first_element(self, assessment):
+        """
+        Answer the first evaluation element of an evaluation of the assessment and return the evaluation and
+        the number of queries
+        """
+        evaluation = create_evaluation(
+            assessment=assessment,
+            name="evaluation",
+            created_by=self.user,
+            organisation=self.organisation,
+        )
+        evaluation.create_evaluation_body()
+        section = Section.objects.get(evaluation=evaluation)
+        element = EvaluationElement.objects.get(
+            section=section, master_evaluation_element__order_id="1"
+        )
+        choice = Choice.objects.get(evaluation_element=element, master_choice__order_id="b")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                section.get_absolute_url(),
+                {"element_id": element.id, f"{element.id}-{element.id}": str(choice)},
+                HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+            )
+        self.assertTrue(response.json()["success"])
+        evaluation.refresh_from_db()
+        return evaluation, len(context.captured_queries)
+
+    def test_answer_queries_constant(self):
+        _, small_queries = self.answer_first_element(self.small_assessment)
+        _, large_queries = self.answer_first_element(self.large_assessment)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_answer_counters(self):
+        evaluation, _ = self.answer_first_element(self.large_assessment)
+        section = Section.objects.get(evaluation=evaluation)
+        self.assertEqual(section.nb_elements, 9)
+        self.assertEqual(section.nb_elements_done, 1)
+        self.assertEqual(section.user_progression, 11)
+        self.assertEqual(section.points, 0.5)
+        self.assertEqual(evaluation.points, 0.5)
+        self.assertEqual(evaluation.nb_sections, 1)
+        self.assertEqual(evaluation.nb_sections_done, 0)
+        self.assertFalse(evaluation.is_finished)
+
+
+class SectionBatchAnswerTestCase(MemberTestMixin, TestCase):
+    """
+    Test the ajax POST saving the answers of all the evaluation elements of a section at once, compared to one
+    ajax POST by evaluation element
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.assessment = create_large_assessment_body(
+            version="1.0", nb_sections=2, nb_elements=9, nb_choices=4
+        )
+
+    def create_section(self):
+        """
+        Create an evaluation of the assessment and return its first section and the evaluation elements of
+        this section
+        """
+        evaluation = create_evaluation(
+            assessment=self.assessment,
+            name="evaluation",
+            created_by=self.user,
+            organisation=self.organisation,
+        )
+        evaluation.create_evaluation_body()
+        section = Section.objects.get(evaluation=evaluation, master_section__order_id=1)
+        element_list = list(
+            EvaluationElement.objects.filter(section=section).order_by(
+                "master_evaluation_element__order_id"
+            )
+        )
+        return section, element_list
+
+    @staticmethod
+    def get_answer_data(element):
+        choice = Choice.objects.get(evaluation_element=element, master_choice__order_id="b")
+        return {
+            f"{element.id}-{element.id}": str(choice),
+            f"{element.id}-notes": f"notes {element.id}",
+        }
+
+    def post_batch(self, section, element_list, extra_ids=()):
+        data = {
+            "batch_element_ids": [element.id for element in element_list] + list(extra_ids)
+        }
+        for element in element_list:
+            data.update(self.get_answer_data(element))
+        return self.client.post(
+            section.get_absolute_url(), data, HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+        )
+
+    def test_batch_queries_and_counters(self):
+        section_one_by_one, element_list = self.create_section()
+        with CaptureQueriesContext(connection) as context:
+            for element in element_list:
+                self.client.post(
+                    section_one_by_one.get_absolute_url(),
+                    dict(self.get_answer_data(element), element_id=element.id),
+                    HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+                )
+        queries_one_by_one = len(context.captured_queries)
+
+        section_batch, element_list = self.create_section()
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_batch(section_batch, element_list)
+        self.assertLess(len(context.captured_queries), queries_one_by_one)
+
+        data = response.json()
+        self.assertTrue(data["success"])
+        self.assertEqual(
+            [outcome["element_id"] for outcome in data["element_list"]],
+            [element.id for element in element_list],
+        )
+        self.assertTrue(all(outcome["success"] for outcome in data["element_list"]))
+        self.assertEqual(data["section_progression"], 100)
+
+        section_one_by_one.refresh_from_db()
+        section_batch.refresh_from_db()
+        for field in ["nb_elements_done", "user_progression", "points"]:
+            self.assertEqual(getattr(section_batch, field), getattr(section_one_by_one, field))
+        self.assertEqual(section_batch.evaluation.points, section_one_by_one.evaluation.points)
+        self.assertTrue(
+            EvaluationScore.objects.get(evaluation=section_batch.evaluation).need_to_calculate
+        )
+        for element in EvaluationElement.objects.filter(section=section_batch):
+            self.assertTrue(element.status)
+            self.assertEqual(element.user_notes, f"notes {element.id}")
+
+    def test_batch_element_not_in_section(self):
+        section, element_list = self.create_section()
+        other_section = Section.objects.get(
+            evaluation=section.evaluation, master_section__order_id=2
+        )
+        other_element = EvaluationElement.objects.filter(section=other_section).first()
+        response = self.post_batch(section, element_list[:2], extra_ids=[other_element.id])
+        data = response.json()
+        self.assertFalse(data["success"])
+        self.assertEqual(data["message_type"], "alert-warning")
+        outcome_dic = {outcome["element_id"]: outcome for outcome in data["element_list"]}
+        self.assertFalse(outcome_dic[str(other_element.id)]["success"])
+        self.assertTrue(outcome_dic[element_list[0].id]["success"])
+        other_element.refresh_from_db()
+        self.assertFalse(other_element.status)
+        section.refresh_from_db()
+        self.assertEqual(section.nb_elements_done, 2)
+
+    def test_batch_condition_inter(self):
+        section, element_list = self.create_section()
+        # The 2nd element is not applicable if the choice "a" of the 1st element is ticked
+        master_element = element_list[1].master_evaluation_element
+        master_element.depends_on = Choice.objects.get(
+            evaluation_element=element_list[0], master_choice__order_id="a"
+        ).master_choice
+        master_element.save()
+        # The 2nd element is answered before the 1st one disables it
+        response = self.post_batch(section, element_list[:2])
+        self.assertTrue(response.json()["success"])
+
+        data = self.get_answer_data(element_list[0])
+        choice_a = Choice.objects.get(
+            evaluation_element=element_list[0], master_choice__order_id="a"
+        )
+        data[f"{element_list[0].id}-{element_list[0].id}"] = str(choice_a)
+        data.update(self.get_answer_data(element_list[1]))
+        data["batch_element_ids"] = [element_list[0].id, element_list[1].id]
+        response = self.client.post(
+            section.get_absolute_url(), data, HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+        )
+        outcome_list = response.json()["element_list"]
+        self.assertTrue(outcome_list[0]["success"])
+        self.assertEqual(
+            outcome_list[0]["conditional_elements_list"], [str(element_list[1].id)]
+        )
+        # The 2nd element is not applicable anymore, its answer is not saved
+        self.assertFalse(outcome_list[1]["success"])
+        element_list[1].refresh_from_db()
+        self.assertFalse(element_list[1].status)
+        self.assertEqual(element_list[1].points, 0)
+        section.refresh_from_db()
+        self.assertEqual(section.nb_elements_done, 2)
+        self.assertEqual(section.points, 0)
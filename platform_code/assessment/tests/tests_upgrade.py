@@ -18,9 +18,13 @@ from assessment.models import (
     get_last_assessment_created,
 )
 from django.contrib.messages import get_messages
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from home.models import User
 
+from .object_creation import create_evaluation, create_large_assessment_body
+
 
 class TestJsonUploadUpgradeCase(TestCase):
     """
@@ -522,3 +526,60 @@ class TestUpgradeTableStructure(TestCase):
             "Due to this failure, the assessment and the scoring have been deleted. ",
             str(messages[3]),
         )
+
+
+class TestEvaluationUpgradeQueries(TestCase):
+    """
+    Test the upgrade of an evaluation of 200 evaluation elements to a new version of the assessment with the same
+    structure is done with a few queries
+    """
+
+    def setUp(self):
+        self.assessment_v1 = create_large_assessment_body(
+            version="1.0", nb_sections=10, nb_elements=20, nb_choices=4
+        )
+        self.assessment_v2 = create_large_assessment_body(
+            version="2.0", nb_sections=10, nb_elements=20, nb_choices=4
+        )
+        upgrade_json = {"sections": {}, "elements": {}, "answer_items": {}}
+        for master_section in self.assessment_v2.mastersection_set.all():
+            upgrade_json["sections"][master_section.get_numbering()] = 1
+            for master_element in master_section.masterevaluationelement_set.all():
+                upgrade_json["elements"][master_element.get_numbering()] = {
+                    "upgrade_status": 1
+                }
+                for master_choice in master_element.masterchoice_set.all():
+                    upgrade_json["answer_items"][master_choice.get_numbering()] = 1
+        Upgrade.objects.create(
+            origin_assessment=self.assessment_v1,
+            final_assessment=self.assessment_v2,
+            upgrade_json=upgrade_json,
+        )
+        self.evaluation = create_evaluation(assessment=self.assessment_v1, name="evaluation")
+        self.evaluation.create_evaluation_body()
+        # Answer all the evaluation with the last choice of each element
+        Choice.objects.filter(
+            evaluation_element__section__evaluation=self.evaluation,
+            master_choice__order_id="d",
+        ).update(is_ticked=True)
+        for section in self.evaluation.section_set.all():
+            section.user_notes = f"notes {section.master_section.order_id}"
+            section.save()
+
+    def test_upgrade_queries_and_results(self):
+        with CaptureQueriesContext(connection) as context:
+            new_evaluation = self.evaluation.upgrade()
+        self.assertLess(len(context.captured_queries), 50)
+        self.assertTrue(new_evaluation.is_finished)
+        self.assertEqual(
+            Choice.objects.filter(
+                evaluation_element__section__evaluation=new_evaluation, is_ticked=True
+            ).count(),
+            200,
+        )
+        section = Section.objects.get(evaluation=new_evaluation, master_section__order_id=1)
+        self.assertEqual(section.user_notes, "notes 1")
+        self.assertEqual(section.user_progression, 100)
+        # Radio elements get 1.5 points and checkbox elements 1.5 points with the choice d
+        self.assertEqual(section.points, 30)
+
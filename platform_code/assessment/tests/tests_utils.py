@@ -1,4 +1,11 @@
-from assessment.utils import markdownify_bold, markdownify_italic, select_label_choice
+from assessment.utils import (
+    markdownify_bold,
+    markdownify_italic,
+    render_choice_label,
+    render_choice_plain,
+    render_markdown,
+    select_label_choice,
+)
 from django.test import TestCase
 
 
@@ -51,6 +58,25 @@ class TestMarkdownify(TestCase):
         )
 
 
+class TestRenderTexts(TestCase):
+    def test_render_choice_label(self):
+        self.assertEqual(
+            "I <strong>gonna</strong> take <i>a break</i> &lt;now&gt;",
+            render_choice_label("I **gonna** take _a break_ <now>"),
+        )
+        self.assertIsNone(render_choice_label(None))
+
+    def test_render_choice_plain(self):
+        self.assertEqual(
+            "There are bold text EVERYWHERE !!",
+            render_choice_plain("There **are** __bold__ *text* **EVERYWHERE** !!"),
+        )
+
+    def test_render_markdown(self):
+        self.assertEqual("Bonjour <em>madame</em>", render_markdown("Bonjour *madame*"))
+        self.assertEqual("", render_markdown(""))
+
+
 class TestSelectLabelChoice(TestCase):
     def setUp(self):
         self.text1 = (
@@ -29,13 +29,23 @@ class MasterSectionTranslationOptions(TranslationOptions):
 @register(MasterEvaluationElement)
 class MasterEvaluationElementTranslationOptions(TranslationOptions):
     # Add new fields to TRANSLATED_FIELDS in models/assessment
-    fields = ("name", "question_text", "explanation_text", "risk_domain")
+    # The html fields are rendered from the texts when saved, they are not in TRANSLATED_FIELDS
+    fields = (
+        "name",
+        "question_text",
+        "explanation_text",
+        "risk_domain",
+        "name_html",
+        "question_text_html",
+        "explanation_text_html",
+    )
 
 
 @register(MasterChoice)
 class MasterChoiceTranslationOptions(TranslationOptions):
     # Add new fields to TRANSLATED_FIELDS in models/assessment
-    fields = ("answer_text",)
+    # The rendered answer texts are set from answer_text when saved, they are not in TRANSLATED_FIELDS
+    fields = ("answer_text", "answer_text_html", "answer_text_label", "answer_text_plain")
 
 
 @register(ExternalLink)
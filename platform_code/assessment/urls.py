@@ -14,6 +14,9 @@ from .views import (
     labellingJustification,
     labellingView,
     leave_organisation,
+    organisationExportDownload,
+    organisationExportProgress,
+    organisationExportView,
     upgradeView,
 )
 
@@ -31,6 +34,17 @@ urlpatterns = [
                 ),
                 path("", SummaryView.as_view(), name="orga-summary"),
                 path("leave-organisation", leave_organisation, name="leave-organisation"),
+                path("export/", organisationExportView, name="organisation-export"),
+                path(
+                    "export/<int:export_id>/",
+                    organisationExportProgress,
+                    name="organisation-export-progress",
+                ),
+                path(
+                    "export/<int:export_id>/download/",
+                    organisationExportDownload,
+                    name="organisation-export-download",
+                ),
                 path(
                     "<slug:slug>/<int:pk>/",
                     include(
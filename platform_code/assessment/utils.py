@@ -1,6 +1,9 @@
 import re
 
 from django.db.models import JSONField
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from markdownify.templatetags.markdownify import markdownify
 
 
 class RawJSONField(JSONField):
@@ -74,6 +77,69 @@ def remove_markdownify_italic(text):
     return re.sub(r"(?<!\_)\_(?!\_)(.*?)(?<!\_)\_(?!\_)", r"\g<1>", text_bis)  # noqa
 
 
+def render_markdown(text):
+    """
+    Render the markdown text as sanitized html, like the markdownify filter used in the templates
+    :param text: string or None
+    :return: string or None
+    """
+    if not text:
+        return text
+    return str(markdownify(text))
+
+
+def render_choice_label(text):
+    """
+    Render the text of a master choice as the label of the choice forms: the text is escaped then the bold and
+    italic markdown are replaced by html tags
+    :param text: string or None
+    :return: string or None
+    """
+    if not text:
+        return text
+    return markdownify_italic(markdownify_bold(escape(text)))
+
+
+def render_choice_plain(text):
+    """
+    Remove the italic and bold markdown of the text of a master choice, for the results page
+    :param text: string or None
+    :return: string or None
+    """
+    if not text:
+        return text
+    return remove_markdown_bold(remove_markdownify_italic(text))
+
+
+def set_rendered_fields(obj, rendered_fields, languages):
+    """
+    Set, for each language, the rendered version of the translated fields of the object, for instance
+    question_text_html_fr from question_text_fr
+    :param obj: master object (MasterEvaluationElement, MasterChoice)
+    :param rendered_fields: dictionary with the rendered fields as keys and tuples (source field, render function)
+    as values
+    :param languages: list of the languages, ex ["fr", "en"]
+    """
+    for rendered_field, (source_field, render) in rendered_fields.items():
+        for language in languages:
+            setattr(
+                obj,
+                f"{rendered_field}_{language}",
+                render(getattr(obj, f"{source_field}_{language}")),
+            )
+
+
+def get_rendered_field(obj, rendered_field, source_field, render):
+    """
+    Get the rendered field of the object in the active language, rendered now if it has not been stored yet
+    :return: safe string
+    """
+    rendered_text = getattr(obj, rendered_field)
+    if rendered_text is None:
+        rendered_text = render(getattr(obj, source_field))
+    return mark_safe(rendered_text or "")
+
+
 def select_label_choice(text):
     """
     This function selects the string between /" after 'value' keyword and before "id"
@@ -7,6 +7,11 @@ from .labelling import (  # noqa
     labellingView,
 )
 from .organisation import SummaryView, leave_organisation  # noqa
+from .organisation_export import (  # noqa
+    organisationExportDownload,
+    organisationExportProgress,
+    organisationExportView,
+)
 from .results import ResultsView  # noqa
 from .resultsPDF import ResultsPDFView  # noqa
 from .section import SectionView  # noqa
@@ -2,7 +2,7 @@ import json
 import logging
 
 from assessment.forms import AddMemberForm, EditRoleForm, EvaluationForm
-from assessment.models import Evaluation
+from assessment.models import Evaluation, OrganisationExport
 from assessment.templatetags.assessment_tags import get_sector_as_str
 from assessment.views.utils.security_checks import (
     can_edit_security_check,
@@ -129,6 +129,12 @@ class SummaryView(LoginRequiredMixin, DetailView):
 
         # Add evaluations to the context
         self.add_evaluation_list_to_context(organisation)
+        # Last export of the results of the finished evaluations, with its progression
+        self.context["organisation_export"] = (
+            OrganisationExport.objects.filter(organisation=organisation)
+            .order_by("-created_at")
+            .first()
+        )
 
         # If the scoring system has changed, it set the max points again for the evaluation, sections, EE
         success_max_points = manage_evaluation_max_points(
@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+
+from assessment.models import Evaluation, OrganisationExport
+from assessment.organisation_export import request_organisation_export
+from assessment.views.utils.security_checks import membership_security_check
+from django.contrib import messages
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.defaultfilters import slugify
+from django.urls import reverse
+from django.utils.translation import get_language
+from django.utils.translation import gettext as _
+from django.views.decorators.http import require_POST
+from home.models import Organisation
+
+logger = logging.getLogger("monitoring")
+
+
+@require_POST
+def organisationExportView(request, *args, **kwargs):
+    """
+    This view is called when a member of the organisation asks for the export of the results of all the
+    finished evaluations of the organisation. The export is built in the background, the organisation page
+    displays its progression then the link to download it.
+    """
+    organisation = get_object_or_404(Organisation, id=kwargs.get("orga_id"))
+    # Check if the user is member of the organisation (caught in the url), if not, return HttpResponseForbidden
+    if not membership_security_check(request, organisation=organisation):
+        return redirect("home:homepage")
+
+    if not Evaluation.objects.filter(organisation=organisation, is_finished=True).exists():
+        messages.warning(request, _("There is no finished evaluation to export."))
+        return redirect("assessment:orga-summary", organisation.id)
+
+    organisation_export = request_organisation_export(organisation, request.user, get_language())
+    if organisation_export is None:
+        messages.warning(request, _("An export of the evaluations is already in progress."))
+    else:
+        logger.info(
+            f"[organisation_export_requested] The user {request.user.email} has requested the export of the "
+            f"results of the organisation {organisation.name} (id {organisation.id}, export id "
+            f"{organisation_export.id})"
+        )
+        messages.success(
+            request,
+            _(
+                "The export of the finished evaluations has started, you will be able to download it "
+                "on this page."
+            ),
+        )
+    return redirect("assessment:orga-summary", organisation.id)
+
+
+def organisationExportProgress(request, *args, **kwargs):
+    """
+    Return in json the status and the progression of the export, and the url to download it when it is done.
+    This is called with ajax by the organisation page while the export is in progress.
+    """
+    organisation = get_object_or_404(Organisation, id=kwargs.get("orga_id"))
+    # The ajax request of a user who is not member of the organisation is forbidden, it is not redirected
+    if not membership_security_check(request, organisation=organisation):
+        return JsonResponse(
+            {"success": False, "message": _("You don't have the right to do this action.")},
+            status=403,
+        )
+    organisation_export = get_object_or_404(
+        OrganisationExport, id=kwargs.get("export_id"), organisation=organisation
+    )
+    data = {
+        "status": organisation_export.status,
+        "progression": organisation_export.get_progression(),
+        "nb_evaluations": organisation_export.nb_evaluations,
+        "nb_evaluations_done": organisation_export.nb_evaluations_done,
+        "download_url": reverse(
+            "assessment:organisation-export-download",
+            kwargs={"orga_id": organisation.id, "export_id": organisation_export.id},
+        )
+        if organisation_export.status == OrganisationExport.DONE
+        else None,
+    }
+    return HttpResponse(json.dumps(data), content_type="application/json")
+
+
+def organisationExportDownload(request, *args, **kwargs):
+    """
+    Download the zip file of the export once it is done
+    """
+    organisation = get_object_or_404(Organisation, id=kwargs.get("orga_id"))
+    if not membership_security_check(request, organisation=organisation):
+        return redirect("home:homepage")
+    organisation_export = get_object_or_404(
+        OrganisationExport,
+        id=kwargs.get("export_id"),
+        organisation=organisation,
+        status=OrganisationExport.DONE,
+    )
+    if not organisation_export.file_path or not os.path.isfile(organisation_export.file_path):
+        messages.warning(request, _("The export is not available anymore, please export again."))
+        return redirect("assessment:orga-summary", organisation.id)
+    logger.info(
+        f"[organisation_export_downloaded] The user {request.user.email} has downloaded the export "
+        f"(id {organisation_export.id}) of the organisation {organisation.name} (id {organisation.id})"
+    )
+    return FileResponse(
+        open(organisation_export.file_path, "rb"),
+        as_attachment=True,
+        filename=f"{slugify(organisation.name)}-evaluations.zip",
+    )
@@ -1,10 +1,10 @@
 import logging
 
 from assessment.models import Evaluation
+from assessment.radar_chart import get_radar_chart
 from assessment.utils import get_client_ip
 from assessment.views.utils.security_checks import membership_security_check
 from assessment.views.utils.utils import (
-    create_radar_chart,
     manage_evaluation_exposition_score,
     manage_evaluation_max_points,
     manage_evaluation_score,
@@ -77,26 +77,14 @@ class ResultsView(LoginRequiredMixin, DetailView):
                 context["exposition_dic"],
             ) = manage_evaluation_exposition_score(request, evaluation)
 
-            context["dic_form_results"] = set_form_for_results(evaluation=evaluation)
-            context["section_list"] = list(
-                evaluation.section_set.all().order_by("master_section__order_id")
+            # The body of the evaluation is loaded once and shared by the forms and the context
+            tree = evaluation.get_tree()
+            context["dic_form_results"] = set_form_for_results(
+                evaluation=evaluation, tree=tree
             )
-            context["radar_chart"] = create_radar_chart(
-                object_list=context["section_list"],
-                math_expression=lambda x: (x.calculate_score_per_section() / x.max_points)
-                * 100,
-                text_expression=lambda x: (
-                    "Section "
-                    + str(x.master_section.order_id)
-                    + _(": ")
-                    + str(x.master_section.keyword)
-                ),
-                hovertext_expression=lambda x: "Score"
-                + _(": ")
-                + str(round((x.calculate_score_per_section() / x.max_points) * 100, 1))
-                + "%",
-            )
-            context["evaluation_element_list"] = evaluation.get_list_all_elements()
+            context["section_list"] = tree.section_list
+            context["radar_chart"] = get_radar_chart(evaluation, context["section_list"])
+            context["evaluation_element_list"] = tree.get_element_list()
             context["organisation"] = organisation
             return self.render_to_response(context)
         else:
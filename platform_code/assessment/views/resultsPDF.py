@@ -1,12 +1,21 @@
-import io
 import logging
+import os
 import re
 import textwrap
-from datetime import date, datetime
+from datetime import date
+from functools import lru_cache
 from html import unescape
 
 import reportlab
-from assessment.models import Evaluation
+from assessment.models import Evaluation, EvaluationScore
+from assessment.results_pdf_cache import (
+    create_pdf_file,
+    discard_pdf_file,
+    get_cached_pdf_path,
+    get_evaluation_content_hash,
+    is_stored_file,
+    store_pdf_file,
+)
 from assessment.utils import (
     convert_color_to_reportlab,
     get_client_ip,
@@ -18,15 +27,20 @@ from assessment.views.utils.utils import (
     manage_evaluation_exposition_score,
     manage_evaluation_max_points,
     manage_evaluation_score,
+    order_exposition_dic,
+    unpack_exposition_dic,
 )
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import FileResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django.utils.translation import gettext as _
 from django.views.generic import DetailView
-from home.models import Organisation, PlatformManagement
+from home.models import Organisation
+from home.models.platform_management import get_platform_management
 from reportlab.lib import colors
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.pdfbase import pdfmetrics
@@ -38,6 +52,10 @@ from sentry_sdk import capture_message
 
 logger = logging.getLogger("monitoring")
 
+# Maximum number of texts of the master objects and of the platform whose layout is kept in the cache of a
+# process, see wrap_master_string
+PDF_LAYOUT_CACHE_SIZE = 20000
+
 
 class ResultsPDFView(LoginRequiredMixin, DetailView):
     """
@@ -71,25 +89,25 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # creates a buffer that will be used by the pdf Canvas
-        self.buffer = io.BytesIO()
         reportlab.rl_config.TTFSearchPath.append(
             str(settings.BASE_DIR) + "/assessment/static/fonts/Ubuntu"
         )
         pdfmetrics.registerFont(TTFont("UbuntuRegular", "Ubuntu-Regular.ttf"))
         pdfmetrics.registerFont(TTFont("UbuntuItalic", "Ubuntu-Italic.ttf"))
         pdfmetrics.registerFont(TTFont("UbuntuBold", "Ubuntu-Bold.ttf"))
-        self.pdf = canvas.Canvas(self.buffer)
+        # The pdf Canvas is created with the file in which it is written (see print_pdf)
+        self.pdf = None
         self.cursor = self.PAGE_HEIGHT
         self.page_num = 1
-        self.platform_management = PlatformManagement.get_or_create()
+        self.platform_management = get_platform_management()
         self.COLOR_TITLE = convert_color_to_reportlab(self.platform_management.primary_color)
 
-    def print_pdf(self, context):
+    def print_pdf(self, context, pdf_file):
         """
-        This method sets the metadata for the pdf and prints the header and sections on the buffer.
-        After printing the buffer is closed and is returned
+        This method sets the metadata for the pdf and prints the header and sections in the file.
+        After printing the file is returned, at its beginning
         """
+        self.pdf = canvas.Canvas(pdf_file)
         # METADATA
         self.pdf.setAuthor(context["organisation"].name)
         self.pdf.setTitle(context["evaluation"].name)
@@ -107,8 +125,8 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
 
         # return
         self.pdf.save()
-        self.buffer.seek(0)
-        return self.buffer
+        pdf_file.seek(0)
+        return pdf_file
 
     def print_header(self, context):
         """
@@ -158,7 +176,7 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
         self.pdf.setFont("UbuntuRegular", 12)
         for section in context["dict_sections_elements"]:
             string = f"{_('Section')} {section.master_section.order_id}: {section.master_section.name}"
-            self.draw_centered_string_on_pdf(string, 500)
+            self.draw_centered_string_on_pdf(string, 500, master_text=True)
             section_points = (section.calculate_score_per_section() / section.max_points) * 100
             self.draw_centered_string_on_pdf(
                 f"{section_points:.1f} %",
@@ -220,6 +238,7 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
                 "2020, the 50/100 threshold can be considered a very advanced maturity level."
             ),
             self.MARGIN_BASE,
+            master_text=True,
         )
         self.cursor -= self.PARAGRAPH_SPACE
         self.draw_string_on_pdf(
@@ -228,6 +247,7 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
                 "that you can consult on assessment.labelia.org"
             ),
             self.MARGIN_BASE,
+            master_text=True,
         )
         self.cursor -= self.PARAGRAPH_SPACE
         self.draw_string_on_pdf(
@@ -239,18 +259,19 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
                 "building skills on your topics of interest."
             ),
             self.MARGIN_BASE,
+            master_text=True,
         )
         self.cursor -= self.LINE_JUMP * 2
 
     def print_stamp(self, context):
         """
-        This method prints the stamp with the current date and the organisation name.
+        This method prints the stamp with the organisation name. The PDF is stored and can be served long after
+        it has been generated, so the stamp does not display the date of generation, the date of the download is in
+        the name of the file.
         """
-        today_date = date.today().strftime("%d/%m/%Y")
-        current_time = datetime.now().strftime("%H:%M")
         organisation_name = context["organisation"].name
         stamp = _(
-            f"PDF generated on {today_date} at {current_time} UTC by the assessment.labelia.org platform. "
+            "PDF generated by the assessment.labelia.org platform. "
             f"This is a self-assessment realized by the organisation {organisation_name}. "
             "It has not been verified or audited by Labelia Labs."
         )
@@ -266,14 +287,16 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
         """
         # 'Your answers' text
         self.pdf.setFont("UbuntuRegular", 25)
-        self.draw_string_on_pdf(_("Evaluation details"), self.MARGIN_QUESTION)
+        self.draw_string_on_pdf(
+            _("Evaluation details"), self.MARGIN_QUESTION, master_text=True
+        )
         self.cursor -= self.PARAGRAPH_SPACE
 
         for section, elements in dict_sections_elements.items():
             self.pdf.setFont("UbuntuRegular", 16)
             self.pdf.setStrokeColorRGB(*self.COLOR_TEXT)
             self.pdf.setFillColorRGB(*self.COLOR_TEXT)
-            self.draw_string_on_pdf(str(section), self.MARGIN_QUESTION)
+            self.draw_string_on_pdf(str(section), self.MARGIN_QUESTION, master_text=True)
 
             self.cursor -= 10
             for element, choices in elements.items():
@@ -349,7 +372,7 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
             )
 
         q_header_size = self.PARAGRAPH_SPACE + self.LINE_BREAK * self.get_line_count(
-            str(element), "UbuntuRegular", 12, 480
+            str(element), "UbuntuRegular", 12, 480, master_text=True
         )
 
         if self.cursor - full_elem_height >= self.MARGIN_BOTTOM:
@@ -512,7 +535,7 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
         self.pdf.setFillColorRGB(*self.COLOR_TEXT)
         self.pdf.setFont("UbuntuRegular", 12)
 
-        self.draw_string_on_pdf(str(element), self.MARGIN_QUESTION)
+        self.draw_string_on_pdf(str(element), self.MARGIN_QUESTION, master_text=True)
         self.cursor -= self.LINE_JUMP
         if not_concerned:
             self.pdf.setFillColorRGB(*self.COLOR_FILL_CONCERN_NOTE)
@@ -528,16 +551,17 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
             self.draw_string_on_pdf(
                 _("You are not concerned by this evaluation element"),
                 self.MARGIN_QUESTION,
+                master_text=True,
             )
             self.pdf.setFillColorRGB(*self.COLOR_TEXT)
             self.cursor -= self.LINE_JUMP
 
         self.pdf.setFont("UbuntuBold", 12)
-        self.draw_string_on_pdf(element_text, self.MARGIN_QUESTION)
+        self.draw_string_on_pdf(element_text, self.MARGIN_QUESTION, master_text=True)
         self.cursor -= self.PARAGRAPH_SPACE
 
         self.pdf.setFont("UbuntuItalic", 12)
-        self.draw_string_on_pdf(question_type_note, self.MARGIN_QUESTION)
+        self.draw_string_on_pdf(question_type_note, self.MARGIN_QUESTION, master_text=True)
         self.cursor -= self.PARAGRAPH_SPACE
 
         # CHOICES
@@ -564,7 +588,9 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
         # choice text
         self.pdf.setFillColorRGB(*self.COLOR_TEXT)
         self.pdf.setFont("UbuntuRegular", 12)
-        self.draw_string_on_pdf(choice.master_choice.answer_text, self.MARGIN_ANSWER)
+        self.draw_string_on_pdf(
+            choice.master_choice.answer_text, self.MARGIN_ANSWER, master_text=True
+        )
         self.cursor -= self.PARAGRAPH_SPACE
 
     def draw_justification_and_notes(self, formatted_justification, formatted_notes):
@@ -585,7 +611,9 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
                 remaining_justification = formatted_justification
             else:
                 self.pdf.setFont("UbuntuBold", 12)
-                self.draw_string_on_pdf(_("Your answer justification:"), self.MARGIN_NOTES)
+                self.draw_string_on_pdf(
+                    _("Your answer justification:"), self.MARGIN_NOTES, master_text=True
+                )
                 self.pdf.setFont("UbuntuRegular", 12)
                 remaining_justification = self.draw_html_on_pdf(formatted_justification)
                 if not remaining_justification or len(remaining_justification) == 0:
@@ -599,7 +627,7 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
                 remaining_notes = formatted_notes
             else:
                 self.pdf.setFont("UbuntuBold", 12)
-                self.draw_string_on_pdf(_("My notes:"), self.MARGIN_NOTES)
+                self.draw_string_on_pdf(_("My notes:"), self.MARGIN_NOTES, master_text=True)
                 self.pdf.setFont("UbuntuRegular", 12)
                 remaining_notes = self.draw_html_on_pdf(formatted_notes)
         if len(remaining_notes) == 0 and len(remaining_justification) == 0:
@@ -620,14 +648,14 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
         # each text line takes 15 pixels
         # we add 10 pixels for space between paragraphs
         core_size += self.PARAGRAPH_SPACE + self.LINE_BREAK * self.get_line_count(
-            elem_content["elem_text"], "UbuntuRegular", 12, 480
+            elem_content["elem_text"], "UbuntuRegular", 12, 480, master_text=True
         )
         core_size += self.LINE_BREAK
         core_size += self.PARAGRAPH_SPACE + self.LINE_BREAK * self.get_line_count(
-            elem_content["element_text"], "UbuntuBold", 12, 480
+            elem_content["element_text"], "UbuntuBold", 12, 480, master_text=True
         )
         core_size += self.PARAGRAPH_SPACE + self.LINE_BREAK * self.get_line_count(
-            elem_content["question_type_note"], "UbuntuItalic", 12, 480
+            elem_content["question_type_note"], "UbuntuItalic", 12, 480, master_text=True
         )
 
         if elem_content["not_concerned"]:
@@ -636,7 +664,7 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
 
         for choice in elem_content["choices"]:
             core_size += self.PARAGRAPH_SPACE + self.LINE_BREAK * self.get_line_count(
-                choice.master_choice.answer_text, "UbuntuRegular", 12, 450
+                choice.master_choice.answer_text, "UbuntuRegular", 12, 450, master_text=True
             )
         if "user_notes" in elem_content:
             # The "My notes: " text takes 1 line
@@ -652,17 +680,16 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
 
         return core_size, extra_size + core_size
 
-    def draw_string_on_pdf(self, string, x):
+    def draw_string_on_pdf(self, string, x, master_text=False):
         """
         This method draws the string on pdf at coordinates x in param and y = self.cursor
         This is used for classic text (text of the assessment).
+        The layout of the string is cached if it is a text of the master objects or of the platform (master_text),
+        see wrap_text.
         """
-        string = remove_markdownify_italic(remove_markdown_bold(string))
-        size = self.pdf.stringWidth(string) / (self.PAGE_WIDTH - self.MARGIN_BASE - x - 25)
-        if int(len(string) / size) < 1:
-            list_string = [string]
-        else:
-            list_string = textwrap.wrap(string, int(len(string) / size))
+        list_string = self.wrap_text(
+            string, self.PAGE_WIDTH - self.MARGIN_BASE - x - 25, master_text
+        )
         for s in list_string:
             self.pdf.drawString(x, self.cursor, s)
             self.cursor -= self.LINE_BREAK
@@ -672,33 +699,20 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
         Splits a string with its linebreak and to fit the page width.
         Returns the list of the strings by line.
         """
-        split_list = string.split("\r\n")
-        split_list = manage_html_list(split_list)
         formatted_list = []
-        for row in split_list:
+        for row in split_html_text(string):
             row_margin = self.manage_margin_left(x, row)
-            font_size = set_font_size(row)
-            row_text = re.sub(r"<(.|\n)*?>", "", row)
-            row_text = manage_special_characters(row_text)
-            row_size = self.pdf.stringWidth(row_text, "UbuntuRegular", font_size) / (
-                self.PAGE_WIDTH - self.MARGIN_BASE - row_margin - 25
+            font_size, row_lines, text_with_tags, is_wrapped = split_html_row(
+                row, self.PAGE_WIDTH - self.MARGIN_BASE - row_margin - 25
             )
             row_format_dic = self.format_html_text(row)
             row_format_dic["margin_left"] = row_margin
             row_format_dic["font_size"] = font_size
-            row_format_dic["text_with_tags"] = re.sub(
-                r'</?(h[1-6]|pre|p( style="margin-left:[0-9]+px")?|div|address|([uo])l|ol n=[0-9]+|li|\n)*?>',
-                "",
-                row,
-            )
-            if row_size > 1:
-                row_split = textwrap.wrap(row_text, int(len(row_text) / row_size))
-                [row_format_dic["text"].append(val) for val in row_split]
+            row_format_dic["text_with_tags"] = text_with_tags
+            row_format_dic["text"] = list(row_lines)
+            if is_wrapped:
                 row_format_dic = self.calculate_height(row_format_dic)
-                formatted_list.append(row_format_dic)
-            else:
-                row_format_dic["text"] = [row_text]
-                formatted_list.append(row_format_dic)
+            formatted_list.append(row_format_dic)
 
         return formatted_list
 
@@ -779,13 +793,11 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
         else:
             return []
 
-    def draw_centered_string_on_pdf(self, string, width):
+    def draw_centered_string_on_pdf(self, string, width, master_text=False):
         """
         This method draws the string centered on pdf, y = self.cursor
         """
-        string = remove_markdownify_italic(remove_markdown_bold(string))
-        text_size = self.pdf.stringWidth(string) / width
-        list_string = textwrap.wrap(string, int(len(string) / text_size))
+        list_string = self.wrap_text(string, width, master_text)
         for s in list_string:
             self.pdf.drawCentredString(self.PAGE_WIDTH / 2, self.cursor, s)
             self.cursor -= self.LINE_BREAK
@@ -830,14 +842,32 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
         )
         return text
 
-    def get_line_count(self, string, font_name, font_size, line_width):
+    def wrap_text(self, string, line_width, master_text=False):
+        """
+        Split the string without markdown in lines which fit the line width with the current font. The texts of
+        the master objects and of the platform are the same in all the PDF, so their layout is kept in the cache of
+        the process (see wrap_master_string), while the texts of the users (names, notes, justifications) are
+        measured for each PDF and not kept in the process.
+        :param string: string
+        :param line_width: int, width available for the lines
+        :param master_text: boolean, True for a text of the master objects or of the platform
+        :return: tuple of strings
+        """
+        font_name, font_size = self.pdf._fontname, self.pdf._fontsize
+        if master_text:
+            return wrap_master_string(
+                remove_master_markdown(string), font_name, font_size, line_width
+            )
+        return wrap_string(remove_markdown(string), font_name, font_size, line_width)
+
+    def get_line_count(self, string, font_name, font_size, line_width, master_text=False):
         """
-        This function returns the number of line used by the string
+        This function returns the number of line used by the string, the layout of the texts of the master
+        objects and of the platform (master_text) is cached, see wrap_text
         """
-        line_count = stringWidth(string, font_name, font_size) / line_width
-        symbols_per_line = int(len(string) / line_count)
-        # textwrap.wrap is used because it does not line break mid-word
-        return len(textwrap.wrap(string, symbols_per_line))
+        if master_text:
+            return len(wrap_master_string(string, font_name, font_size, line_width))
+        return len(wrap_string(string, font_name, font_size, line_width))
 
     def page_break(self, evaluation_name, section_order_id=None):
         """
@@ -857,7 +887,43 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
         self.draw_centered_string_on_pdf(evaluation_name, 300)
         self.cursor = 40
         if section_order_id is not None:
-            self.draw_string_on_pdf(f"{_('Section')} {section_order_id}", self.MARGIN_QUESTION)
+            self.draw_string_on_pdf(
+                f"{_('Section')} {section_order_id}", self.MARGIN_QUESTION, master_text=True
+            )
+
+    def write_pdf(self, context, content_hash):
+        """
+        Print the pdf in the file created for the content hash (see create_pdf_file) and store it in the cache
+        when possible.
+        Returns a tuple with the path of the PDF stored and None, else None and the file in which the PDF is printed
+        """
+        evaluation_id = context["evaluation"].id
+        pdf_file = create_pdf_file(evaluation_id, content_hash)
+        try:
+            self.print_pdf(context, pdf_file)
+        except Exception:
+            discard_pdf_file(pdf_file)
+            raise
+        if not is_stored_file(pdf_file):
+            return None, pdf_file
+        return store_pdf_file(pdf_file, evaluation_id, content_hash), None
+
+    @staticmethod
+    def get_pdf_file_response(request, pdf_path, content_hash, filename):
+        """
+        Serve the PDF stored in the cache, with its content hash as ETag and its creation as Last-Modified, so the
+        browser does not download it again if it has not changed
+        """
+        etag = quote_etag(content_hash)
+        last_modified = int(os.path.getmtime(pdf_path))
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = FileResponse(
+                open(pdf_path, "rb"), as_attachment=True, filename=filename
+            )
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
 
     def get(self, request, *args, **kwargs):
         context = {}
@@ -875,6 +941,18 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
         # If the evaluation is finished, which should always be the case here,
         # set the score of the evaluation
         if evaluation.is_finished:
+            today_date = date.today().strftime("%Y-%m-%d")
+            evaluation_name = evaluation.name.replace(" ", "-")
+            organisation_name = organisation.name.replace(" ", "-")
+            filename = f"{today_date}-{evaluation_name}-{organisation_name}-Labelia-Labs.pdf"
+            filename = filename.replace("_", "-")
+
+            # The PDF already generated for this content is served without building it again
+            content_hash = get_evaluation_content_hash(evaluation, organisation)
+            pdf_path = get_cached_pdf_path(evaluation.id, content_hash)
+            if pdf_path is not None:
+                return self.get_pdf_file_response(request, pdf_path, content_hash, filename)
+
             # If the scoring system has changed,
             # it set the max points again for the evaluation, sections, EE
             success_max_points = manage_evaluation_max_points(
@@ -901,12 +979,14 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
                 context["len_exposition_dic"],
                 context["exposition_dic"],
             ) = manage_evaluation_exposition_score(request, evaluation)
-            today_date = date.today().strftime("%Y-%m-%d")
-            evaluation_name = evaluation.name.replace(" ", "-")
-            organisation_name = organisation.name.replace(" ", "-")
-            filename = f"{today_date}-{evaluation_name}-{organisation_name}-Labelia-Labs.pdf"
-            filename = filename.replace("_", "-")
-            return FileResponse(self.print_pdf(context), as_attachment=True, filename=filename)
+
+            # The score has been calculated if it was needed, so the content hash can be built
+            if content_hash is None:
+                content_hash = get_evaluation_content_hash(evaluation, organisation)
+            pdf_path, pdf_file = self.write_pdf(context, content_hash)
+            if pdf_path is None:
+                return FileResponse(pdf_file, as_attachment=True, filename=filename)
+            return self.get_pdf_file_response(request, pdf_path, content_hash, filename)
         else:
             capture_message(
                 f"[html_forced] The user {request.user.email}, "
@@ -918,6 +998,43 @@ class ResultsPDFView(LoginRequiredMixin, DetailView):
             return redirect("home:user-profile")
 
 
+def prerender_results_pdf(evaluation):
+    """
+    Print and store in the cache the PDF of the results of the finished evaluation in the active language, if it is
+    not stored yet, so the download is served from the cache. The score and the exposition dic of the evaluation
+    must have been calculated. This is used by the background job run when the evaluation is finished or modified
+    (see assessment/results_prerendering.py).
+    :param evaluation: finished evaluation
+    :return: string or None, path of the PDF stored
+    """
+    organisation = evaluation.organisation
+    content_hash = get_evaluation_content_hash(evaluation, organisation)
+    # The score needs to be calculated again
+    if content_hash is None:
+        return None
+    pdf_path = get_cached_pdf_path(evaluation.id, content_hash)
+    if pdf_path is not None:
+        return pdf_path
+
+    evaluation_score = EvaluationScore.objects.get(evaluation=evaluation)
+    exposition_dic = order_exposition_dic(
+        unpack_exposition_dic(evaluation_score.exposition_dic)
+    )
+    context = {
+        "evaluation_score": evaluation_score.score,
+        "dict_sections_elements": evaluation.get_dict_sections_elements_choices(),
+        "evaluation": evaluation,
+        "organisation": organisation,
+        "nb_risks_exposed": len([li for li in evaluation_score.exposition_dic.values() if li]),
+        "len_exposition_dic": len(exposition_dic),
+        "exposition_dic": exposition_dic,
+    }
+    pdf_path, pdf_file = ResultsPDFView().write_pdf(context, content_hash)
+    if pdf_file is not None:
+        pdf_file.close()
+    return pdf_path
+
+
 def convert_exposition_dic_to_data(exposition_dic, size):
     data = [[_("Risk domain"), _("Exposition to the risk")]]
     for key, value in exposition_dic.items():
@@ -961,6 +1078,87 @@ def count_total_height(formatted_list):
     return count
 
 
+def wrap_string(string, font_name, font_size, line_width):
+    """
+    Split the string in lines which fit the line width with the font, without line break mid-word.
+    :param string: string
+    :param font_name: string, name of a registered font
+    :param font_size: int
+    :param line_width: int, width available for the lines
+    :return: tuple of strings
+    """
+    size = stringWidth(string, font_name, font_size) / line_width
+    if not size or int(len(string) / size) < 1:
+        return (string,)
+    # textwrap.wrap is used because it does not line break mid-word
+    return tuple(textwrap.wrap(string, int(len(string) / size)))
+
+
+@lru_cache(maxsize=PDF_LAYOUT_CACHE_SIZE)
+def wrap_master_string(string, font_name, font_size, line_width):
+    """
+    Cached version of wrap_string, only for the texts of the master objects and of the platform: they are the
+    same in all the PDF, so a text is measured once per process for a font and a width. The texts of the users are
+    not kept in the process, they are wrapped with wrap_string.
+    :return: tuple of strings
+    """
+    return wrap_string(string, font_name, font_size, line_width)
+
+
+def remove_markdown(string):
+    """
+    Remove the markdown bold and italic of the string, as they are not drawn in the PDF
+    """
+    return remove_markdownify_italic(remove_markdown_bold(string))
+
+
+@lru_cache(maxsize=PDF_LAYOUT_CACHE_SIZE)
+def remove_master_markdown(string):
+    """
+    Cached version of remove_markdown, only for the texts of the master objects and of the platform
+    """
+    return remove_markdown(string)
+
+
+def split_html_text(text):
+    """
+    Split the html text (user justification or notes) in rows with its linebreaks and manage its html lists
+    (see manage_html_list)
+    :return: tuple of strings
+    """
+    return tuple(manage_html_list(text.split("\r\n")))
+
+
+def split_html_row(row, line_width):
+    """
+    Return the layout of a row of an html text (see split_html_text): the font size, the text without tags
+    split in lines which fit the line width, the text with only its inline tags and if the text has been split
+    :param row: string
+    :param line_width: int, width available for the lines
+    :return: tuple (int, tuple of strings, string, boolean)
+    """
+    font_size = set_font_size(row)
+    row_text = manage_special_characters(re.sub(r"<(.|\n)*?>", "", row))
+    text_with_tags = re.sub(
+        r'</?(h[1-6]|pre|p( style="margin-left:[0-9]+px")?|div|address|([uo])l|ol n=[0-9]+|li|\n)*?>',
+        "",
+        row,
+    )
+    row_size = stringWidth(row_text, "UbuntuRegular", font_size) / line_width
+    if row_size > 1:
+        row_lines = tuple(textwrap.wrap(row_text, int(len(row_text) / row_size)))
+        return font_size, row_lines, text_with_tags, True
+    return font_size, (row_text,), text_with_tags, False
+
+
+def clear_pdf_layout_cache():
+    """
+    Empty the cache of the layouts of the texts of the PDF, for instance when the fonts change
+    """
+    for function in (wrap_master_string, remove_master_markdown):
+        function.cache_clear()
+
+
 def manage_html_list(split_text):
     """
     Function used to remove the lines with the <ol> <ul> html tags and format the
@@ -1,5 +1,4 @@
 import json
-import logging
 
 from assessment.forms import (
     ChoiceForm,
@@ -7,7 +6,8 @@ from assessment.forms import (
     SectionFeedbackForm,
     SectionNotesForm,
 )
-from assessment.models import Evaluation, EvaluationElement, EvaluationScore, Section
+from assessment.models import Choice, Evaluation, EvaluationElement, EvaluationScore, Section
+from assessment.results_prerendering import enqueue_results_prerendering
 from assessment.utils import get_client_ip
 from assessment.views.utils.security_checks import (
     can_edit_security_check,
@@ -17,15 +17,16 @@ from assessment.views.utils.treat_feedback_and_resources import treat_feedback,
 from assessment.views.utils.utils import manage_missing_language, set_form_for_sections
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
+from django.db import transaction
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.utils.translation import gettext as _
 from django.views.generic import ListView
+from home.authorization import get_authorization_context
 from home.models import Organisation
+from home.monitoring_events import emit_event
 from sentry_sdk import capture_message
 
-logger = logging.getLogger("monitoring")
-
 
 class SectionView(LoginRequiredMixin, ListView):
     """
@@ -45,11 +46,7 @@ class SectionView(LoginRequiredMixin, ListView):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.data_update = {
-            "success": False,
-            "message": _("An error occurred."),
-            "message_type": "alert-danger",
-        }
+        self.data_update = get_initial_data_update()
 
     def get(self, request, *args, **kwargs):
         """
@@ -76,30 +73,29 @@ class SectionView(LoginRequiredMixin, ListView):
         section_query = self.get_queryset(evaluation=evaluation)
         self.object_list = section_query
 
-        # Create the context and add the list of the sections
+        # The sections of the evaluation are loaded once and shared by the forms and the context, with the
+        # evaluation elements and choices of the displayed section only
+        section_id = get_object_or_404(Section, id=kwargs.get("id"), evaluation=evaluation).id
+        tree = evaluation.get_tree(with_change_logs=True, section_ids=[section_id])
+        section = tree.get_section(section_id)
+
+        # Create the context and add the list of the sections, used in section.html to cover all the section
         self.context = self.get_context_data()
-        self.context["section_list"] = list(
-            section_query
-        )  # used in section.html to cover all the section
+        self.context["section_list"] = tree.section_list
 
-        # Create the form for each evaluation element and add it to context, used in evaluation element cards
-        self.context["dic_form"] = set_form_for_sections(section_query)
+        # Create the form for each evaluation element of the section, used in evaluation element cards
+        self.context["dic_form"] = set_form_for_sections([section])
 
         # Add the evaluation to context, used in templates to go back to evaluation page
         self.context["evaluation"] = evaluation
 
-        # Order the list of evaluation elements by order_id
-        section = get_object_or_404(Section, id=kwargs.get("id"), evaluation=evaluation)
-        self.context["element_list"] = list(
-            section.evaluationelement_set.all().order_by("master_evaluation_element__order_id")
-        )
+        # List of evaluation elements ordered by order_id
+        self.context["element_list"] = tree.get_elements_of_section(section)
 
         # Get the form for section notes
         self.context["section_notes_form"] = SectionNotesForm(
             section=section,
-            user_can_edit=organisation.check_user_is_member_and_can_edit_evaluations(
-                user=request.user
-            ),
+            user_can_edit=get_authorization_context(request.user).can_edit(organisation),
         )
 
         # Manage dynamic conditions between evaluation elements in a dictionary depends_on_dic
@@ -114,7 +110,7 @@ class SectionView(LoginRequiredMixin, ListView):
         self.context["section_feedback_form"] = SectionFeedbackForm()
 
         # Manage pagination and next/previous section
-        self.manage_pagination(section_query, kwargs.get("page"))
+        self.manage_pagination(tree.section_list, kwargs.get("page"))
 
         self.context["organisation"] = organisation
         # List of the resources liked by the user
@@ -158,6 +154,7 @@ class SectionView(LoginRequiredMixin, ListView):
             - updating the justification
             - updating an evaluation element answer (choices, justification or notes)
             - resetting the evaluation element responses
+            - updating the answers, notes and justifications of several evaluation elements of the section at once
 
         The evaluation elements may have conditions set on them (conditions inter) or may have conditions
         on their own choices (condition intra) that we need to check before validating and saving the answer,
@@ -236,6 +233,10 @@ class SectionView(LoginRequiredMixin, ListView):
                                         request, evaluation_element
                                     )
 
+                        # Choices validation, notes and justification of several evaluation elements at once
+                        elif "batch_element_ids" in request.POST:
+                            self.treat_batch_elements(request, evaluation, section)
+
                         # Element choices validation and/or notes and/or justification
                         else:
                             evaluation_element = get_evaluation_element_with_logs(
@@ -362,13 +363,16 @@ class SectionView(LoginRequiredMixin, ListView):
             - checks if there is a change in the element status (data_update new key)
         """
         initial_element_status = evaluation_element.status
+        states_before = get_progression_states(evaluation_element)
         self.manage_no_more_conditions_inter(request, evaluation_element, reset=True)
         evaluation_element.reset_choices()
         self.manage_element_status_change(initial_element_status, evaluation_element)
         self.data_update["message"] = _("Your answers have been reset!")
         self.data_update["message_type"] = "alert-success"
         self.data_update["success"] = True
-        self.manage_evaluation_progression_and_points(request, evaluation, evaluation_element)
+        self.manage_evaluation_progression_and_points(
+            request, evaluation, evaluation_element, states_before
+        )
 
     def treat_element_validation(self, request, evaluation, evaluation_element):
         """
@@ -381,10 +385,13 @@ class SectionView(LoginRequiredMixin, ListView):
             "need to be calculated again"
         """
         initial_element_status = evaluation_element.status
+        states_before = get_progression_states(evaluation_element)
         self.manage_no_more_conditions_inter(request, evaluation_element, reset=False)
         self.manage_choice_validation(request, evaluation_element)
         self.manage_element_status_change(initial_element_status, evaluation_element)
-        self.manage_evaluation_progression_and_points(request, evaluation, evaluation_element)
+        self.manage_evaluation_progression_and_points(
+            request, evaluation, evaluation_element, states_before
+        )
 
     def manage_no_more_conditions_inter(self, request, evaluation_element, reset=False):
         """
@@ -506,40 +513,35 @@ class SectionView(LoginRequiredMixin, ListView):
                 choice.set_choice_ticked()
                 # And if this choice turns other evaluation elements not applicable, the ids of the evaluation
                 # elements which won't be available due to this choice are added to list
-                if choice.get_list_element_depending_on():
-                    for element_ in choice.get_list_element_depending_on():
-                        self.data_update["conditional_elements_list"].append(str(element_.id))
-                        element_.reset_choices()
+                for element_ in choice.get_list_element_depending_on():
+                    self.data_update["conditional_elements_list"].append(str(element_.id))
+                    element_.reset_choices()
             # if the choice is not ticked, set not ticked
             else:
                 choice.set_choice_unticked()
 
     def manage_evaluation_progression_and_points(
-        self, request, evaluation, evaluation_element
+        self, request, evaluation, evaluation_element, states_before
     ):
         """
         This method manages the evaluation and section progression & points evolution resulting changes in the
         element choices (reset or validation).
+        Only the evaluation element and the elements it sets conditions on can change, so the counters and points
+        of the sections and of the evaluation are updated with the deltas of these elements, without scanning
+        the whole section or evaluation.
         The evaluation score "need_to_calculate" variable is set to True as we assume the answer is not the same than
         before so the evaluation points have changed.
         If the evaluation is finished for the 1st time, we create a log.
 
         """
         evaluation_element.set_points()
-        # get the section
-        section = evaluation_element.section
-        section.set_progression()
-        section.set_points()
-        # If all the other evaluation element are answered and this one is the last
-        # The evaluation.is_finished attribute is set to True, else False
-        evaluation_already_finished = evaluation.is_finished
-        evaluation.set_finished()
-
-        # Set that the score will have to be calculated again as we suppose the evaluation has changed
-        evaluation_score = get_object_or_404(EvaluationScore, evaluation=evaluation)
-        if not evaluation_score.need_to_calculate:
-            evaluation_score.need_to_calculate = True
-            evaluation_score.save()
+        section_dic = update_evaluation_progression_and_points(
+            request,
+            evaluation,
+            states_before,
+            [evaluation_element] + evaluation_element.get_elements_conditioned(),
+        )
+        section = section_dic[evaluation_element.section_id]
 
         # The progression and status are added to the data_update dictionary
         self.data_update["section_progression"] = section.user_progression
@@ -547,13 +549,6 @@ class SectionView(LoginRequiredMixin, ListView):
         self.data_update["evaluation_element_treated"] = evaluation_element.status
         self.data_update["evaluation_finished"] = evaluation.is_finished
 
-        # First time the evaluation is finished
-        if not evaluation_already_finished and evaluation.is_finished:
-            logger.info(
-                f"[evaluation_finished] The user {request.user.email} has finished his evaluation "
-                f"(id: {evaluation.id}) of the organisation {evaluation.organisation}"
-            )
-
     def manage_evaluation_element_not_applicable(self, request, evaluation_element):
         capture_message(
             f"[html_forced] The user {request.user.email} wants to do an action on the evaluation element"
@@ -562,6 +557,190 @@ class SectionView(LoginRequiredMixin, ListView):
         )
         self.data_update["message"] = _("You cannot do this action.")
 
+    def treat_batch_elements(self, request, evaluation, section):
+        """
+        Treat the answers, notes and justifications of several evaluation elements of the section posted at once.
+        The ids of the evaluation elements are in the list "batch_element_ids" and their fields have the same names
+        than in the ajax post of one evaluation element (prefixed by the element id, like "4-4" for the choices
+        of the element 4), so the elements are validated like one by one, with their conditions intra and inter.
+        All the changes are saved in one transaction and the progression and points of the section and of the
+        evaluation are updated once, with the deltas of all the elements changed.
+
+        The outcome of each evaluation element, with the same keys than data_update for one element, is added in
+        the list "element_list" of data_update, with its id in the key "element_id".
+        """
+        element_outcome_list = []
+        # The evaluation elements are loaded with their choices and master objects, so the forms and the
+        # validation of the answers do not query them again
+        tree = evaluation.get_tree(section_ids=[section.id])
+        element_dic = {
+            element.id: element
+            for element in tree.get_elements_of_section(tree.get_section(section.id))
+        }
+        element_list = []
+        for element_id in request.POST.getlist("batch_element_ids"):
+            element = element_dic.get(int(element_id)) if element_id.isdigit() else None
+            if element is None:
+                capture_message(
+                    f"[html_forced] The user {request.user.email}, with IP address "
+                    f"{get_client_ip(request)} did a batch POST request on an evaluation element (id "
+                    f"{element_id}) which does not belong to the section (id {section.id})"
+                )
+                element_outcome_list.append(
+                    dict(get_initial_data_update(), element_id=element_id)
+                )
+            elif element not in element_list:
+                element_list.append(element)
+
+        with transaction.atomic():
+            # The evaluation is locked before its elements are read, so the concurrent updates of its
+            # progression wait for this one, and the elements loaded with the tree are reloaded under the lock,
+            # so the deltas are computed from their current answers
+            Evaluation.objects.select_for_update().filter(id=evaluation.id).exists()
+            refresh_elements_answers(element_list)
+            # The states of all the elements which can change are got before any change
+            states_before = {}
+            for element in element_list:
+                for element_id, state in get_progression_states(element).items():
+                    states_before.setdefault(element_id, state)
+
+            # Ids of the elements whose answers may have been reset by the treatment of an element setting
+            # conditions on them
+            reset_element_ids = set()
+            for element in element_list:
+                if element.id in reset_element_ids:
+                    refresh_element_answers(element)
+                self.data_update = get_initial_data_update()
+                if element.is_applicable():
+                    self.treat_element_notes(request, element)
+                    initial_element_status = element.status
+                    self.manage_no_more_conditions_inter(request, element, reset=False)
+                    self.manage_choice_validation(request, element)
+                    self.manage_element_status_change(initial_element_status, element)
+                    element.set_points()
+                    self.treat_element_justification(request, element)
+                    self.data_update["evaluation_element_treated"] = element.status
+                    reset_element_ids.update(
+                        element_.id for element_ in element.get_elements_conditioned()
+                    )
+                else:
+                    self.manage_evaluation_element_not_applicable(request, element)
+                element_outcome_list.append(dict(self.data_update, element_id=element.id))
+
+            if states_before:
+                update_evaluation_progression_and_points(
+                    request,
+                    evaluation,
+                    states_before,
+                    EvaluationElement.objects.filter(id__in=states_before.keys()),
+                )
+                section.refresh_from_db()
+
+        self.data_update = get_initial_data_update()
+        self.data_update["element_list"] = element_outcome_list
+        if element_outcome_list and all(
+            outcome["success"] for outcome in element_outcome_list
+        ):
+            self.data_update["success"] = True
+            self.data_update["message"] = _("Your answers have been saved!")
+            self.data_update["message_type"] = "alert-success"
+        elif any(outcome["success"] for outcome in element_outcome_list):
+            self.data_update["message"] = _("Some of your answers have not been saved.")
+            self.data_update["message_type"] = "alert-warning"
+        self.data_update["section_progression"] = section.user_progression
+        self.data_update["section_order_id"] = section.master_section.order_id
+        self.data_update["evaluation_finished"] = evaluation.is_finished
+
+
+def get_initial_data_update():
+    """
+    Initial data_update dictionary, returned in the response of the ajax posts of the section page. The action
+    is supposed to fail until it succeeds.
+    """
+    return {
+        "success": False,
+        "message": _("An error occurred."),
+        "message_type": "alert-danger",
+    }
+
+
+def update_evaluation_progression_and_points(request, evaluation, states_before, element_list):
+    """
+    Update the progression and the points of the sections and of the evaluation with the changes of the
+    evaluation elements (see Evaluation.apply_elements_delta) and set that the evaluation score needs to be
+    calculated again. If the evaluation is finished for the 1st time, we create a log.
+    :return: dictionary of the sections of the elements, with their ids as keys
+    """
+    # If all the other evaluation element are answered and these ones are the last
+    # The evaluation.is_finished attribute is set to True, else False
+    evaluation_already_finished = evaluation.is_finished
+    section_dic = evaluation.apply_elements_delta(states_before, element_list)
+
+    # Set that the score will have to be calculated again as we suppose the evaluation has changed
+    evaluation_score = get_object_or_404(EvaluationScore, evaluation=evaluation)
+    if not evaluation_score.need_to_calculate:
+        evaluation_score.need_to_calculate = True
+        evaluation_score.save()
+
+    # First time the evaluation is finished
+    if not evaluation_already_finished and evaluation.is_finished:
+        emit_event(
+            "evaluation_finished",
+            f"The user {request.user.email} has finished his evaluation (id: {evaluation.id}) of the "
+            f"organisation {evaluation.organisation}",
+            evaluation_id=evaluation.id,
+            organisation_id=evaluation.organisation_id,
+            assessment_version=evaluation.assessment.version,
+        )
+    # The results of the finished evaluation are calculated again in the background
+    enqueue_results_prerendering(evaluation)
+    return section_dic
+
+
+def refresh_element_answers(evaluation_element):
+    """
+    Reload the status, the points and the ticked choices of the evaluation element, in place, so the choices
+    loaded with the evaluation tree stay shared with the elements depending on them
+    """
+    refresh_elements_answers([evaluation_element])
+
+
+def refresh_elements_answers(evaluation_element_list):
+    """
+    Reload the status, the points and the ticked choices of the evaluation elements, in place, with one query
+    for the elements and one for their choices (see refresh_element_answers)
+    """
+    if not evaluation_element_list:
+        return
+    element_dic = {element.id: element for element in evaluation_element_list}
+    for element_id, status, points, updated_at in EvaluationElement.objects.filter(
+        id__in=element_dic.keys()
+    ).values_list("id", "status", "points", "updated_at"):
+        element = element_dic[element_id]
+        element.status = status
+        element.points = points
+        element.updated_at = updated_at
+    ticked_dic = dict(
+        Choice.objects.filter(evaluation_element_id__in=element_dic.keys()).values_list(
+            "id", "is_ticked"
+        )
+    )
+    for element in evaluation_element_list:
+        for choice in element.choice_set.all():
+            choice.is_ticked = ticked_dic[choice.id]
+
+
+def get_progression_states(evaluation_element):
+    """
+    Get the progression states of the evaluation element and of the elements it sets conditions on, before they
+    are modified by the user action, see Evaluation.apply_elements_delta
+    :return: dictionary with the element ids as keys
+    """
+    return {
+        element.id: element.get_progression_state()
+        for element in [evaluation_element] + evaluation_element.get_elements_conditioned()
+    }
+
 
 def get_evaluation_element_with_logs(request, section, element_id_name):
     """
@@ -1,5 +1,4 @@
 import json
-import logging
 
 from assessment.models import Evaluation, get_last_assessment_created
 from assessment.views.utils.security_checks import can_edit_security_check
@@ -9,10 +8,9 @@ from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.utils.translation import gettext as _
 from home.models import Organisation
+from home.monitoring_events import emit_event
 from sentry_sdk import capture_message
 
-logger = logging.getLogger("monitoring")
-
 
 def upgradeView(request, *args, **kwargs):
     """
@@ -51,8 +49,12 @@ def upgradeView(request, *args, **kwargs):
                 "Your evaluation has been upgraded."
                 " You will be redirected to the new version."
             )
-            logger.info(
-                f"[upgrade] The user {request.user.email} upgrade his evaluation (id: {evaluation_id})"
+            emit_event(
+                "upgrade",
+                f"The user {request.user.email} upgrade his evaluation (id: {evaluation_id})",
+                evaluation_id=evaluation.id,
+                new_evaluation_id=new_eval.id,
+                assessment_version=latest_version,
             )
 
         except ValueError:
@@ -3,6 +3,7 @@ import logging
 from django.contrib import messages
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext as _
+from home.authorization import get_authorization_context
 from home.models import Organisation
 from sentry_sdk import capture_message
 
@@ -12,6 +13,7 @@ logger = logging.getLogger("monitoring")
 def membership_security_check(request, *args, **kwargs):
     """
     This function checks that the user is member of the organisation.
+    The memberships of the user are loaded once for the request, see home/authorization.py
     :returns boolean
     """
     user = request.user
@@ -20,7 +22,7 @@ def membership_security_check(request, *args, **kwargs):
     if organisation is None:
         organisation_id = kwargs.get("orga_id", None)
         organisation = get_object_or_404(Organisation, id=organisation_id)
-    is_member = organisation.check_user_is_member(user=user)
+    is_member = get_authorization_context(user).is_member(organisation)
     if not is_member:
         messages.warning(request, _("You don't have access to this content."))
         capture_message(
@@ -41,7 +43,7 @@ def membership_admin_security_check(request, *args, **kwargs):
     if organisation is None:
         organisation_id = kwargs.get("orga_id", None)
         organisation = get_object_or_404(Organisation, id=organisation_id)
-    is_member_as_admin = organisation.check_user_is_member_as_admin(user=user)
+    is_member_as_admin = get_authorization_context(user).is_admin(organisation)
     return is_member_as_admin
 
 
@@ -56,7 +58,5 @@ def can_edit_security_check(request, *args, **kwargs):
     if organisation is None:
         organisation_id = kwargs.get("orga_id", None)
         organisation = get_object_or_404(Organisation, id=organisation_id)
-    is_member_allowed_to_edit = organisation.check_user_is_member_and_can_edit_evaluations(
-        user=user
-    )
+    is_member_allowed_to_edit = get_authorization_context(user).can_edit(organisation)
     return is_member_allowed_to_edit
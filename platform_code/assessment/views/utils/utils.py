@@ -1,8 +1,5 @@
 import json
-import logging
 
-import plotly.graph_objects as go
-import plotly.offline as opy
 from assessment.forms import ChoiceForm, ResultsForm, SectionResultsForm
 from assessment.models import (
     Assessment,
@@ -12,6 +9,7 @@ from assessment.models import (
     MasterEvaluationElement,
     get_last_assessment_created,
 )
+from assessment.models.translation_completeness import get_translation_completeness
 from django.contrib import messages
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
 from django.db.models import Q
@@ -19,10 +17,10 @@ from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect
 from django.utils.translation import LANGUAGE_SESSION_KEY, activate, get_language_from_request
 from django.utils.translation import gettext as _
+from home.monitoring_events import emit_event
 from sentry_sdk import capture_message
 
 LANGUAGE_QUERY_PARAMETER = "language"
-logger = logging.getLogger("monitoring")
 
 
 def set_form_for_sections(section_query):
@@ -30,7 +28,8 @@ def set_form_for_sections(section_query):
     Create a dictionary where keys are evaluation_elements and values are forms (ChoiceForm) for the evaluation element
     The forms is made up of a radio or checkbox and a textfield for the notes
     The dictionary dic_form is used as value for the variable 'context' and will be called in the template
-    :param section_query: query of all the sections of the evaluation
+    :param section_query: sections for which the forms are created (the section page only needs the displayed
+    one), preferably from an EvaluationTree so the evaluation elements and their choices are not queried again
     :return: dic_form, evaluation_elements as keys and choice_form as values
     """
     dic_form = {}
@@ -43,23 +42,24 @@ def set_form_for_sections(section_query):
     return dic_form
 
 
-def set_form_for_results(evaluation):
+def set_form_for_results(evaluation, tree=None):
     """
     Create a dictionary where keys are evaluation_elements and values are forms (ResultsForm) for the evaluation element
     The forms is made up of a radio or checkbox and a textfield for the notes
     The form is entirely disabled
     :param evaluation
+    :param tree: EvaluationTree of the evaluation, loaded if not given
     :return: dic_form, evaluation_elements as keys and results_form as values
     """
+    if tree is None:
+        tree = evaluation.get_tree()
     dic_form = {}
-    for section in evaluation.section_set.all().order_by("master_section__order_id"):
+    for section in tree.section_list:
         dic_form[section] = SectionResultsForm(
             section=section,
             prefix=section.id,
         )
-        for evaluation_element in section.evaluationelement_set.all().order_by(
-            "master_evaluation_element__order_id"
-        ):
+        for evaluation_element in tree.get_elements_of_section(section):
             dic_form[evaluation_element] = ResultsForm(
                 evaluation_element=evaluation_element,
                 prefix=evaluation_element.id,
@@ -108,18 +108,7 @@ def manage_evaluation_exposition_score(request, evaluation):
     nb_risk_exposed = None
     try:
         evaluation_score = EvaluationScore.objects.get(evaluation=evaluation)
-        if evaluation_score.need_to_calculate:
-            evaluation_score.process_score_calculation()
-        assessment = evaluation_score.evaluation.assessment
-        # If the exposition idc is not set yet or a key is "null" which shouldn't happen, calculate it
-        if (
-            not evaluation_score.exposition_dic
-            or "null" in evaluation_score.exposition_dic.keys()
-            or len(evaluation_score.exposition_dic)
-            < assessment.count_master_elements_with_risks()
-        ):
-            evaluation_score.set_exposition_dic()
-        exposition_dic = evaluation_score.exposition_dic
+        exposition_dic = calculate_evaluation_exposition(evaluation_score)
         nb_risk_exposed = len([li for li in exposition_dic.values() if li])
     except (ObjectDoesNotExist, MultipleObjectsReturned, ValueError) as e:
         capture_message(
@@ -137,6 +126,26 @@ def manage_evaluation_exposition_score(request, evaluation):
     return nb_risk_exposed, len(exposition_dic), exposition_dic
 
 
+def calculate_evaluation_exposition(evaluation_score):
+    """
+    Calculate the score of the evaluation if needed and its exposition dic if it is not set yet, then
+    return the exposition dic
+    :param evaluation_score: evaluation score
+    :return: dictionary
+    """
+    if evaluation_score.need_to_calculate:
+        evaluation_score.process_score_calculation()
+    assessment = evaluation_score.evaluation.assessment
+    # If the exposition idc is not set yet or a key is "null" which shouldn't happen, calculate it
+    if (
+        not evaluation_score.exposition_dic
+        or "null" in evaluation_score.exposition_dic.keys()
+        or len(evaluation_score.exposition_dic) < assessment.count_master_elements_with_risks()
+    ):
+        evaluation_score.set_exposition_dic()
+    return evaluation_score.exposition_dic
+
+
 def order_exposition_dic(dic):
     """
     This function orders the exposition dic -
@@ -249,9 +258,12 @@ def treat_evaluation_creation_valid_form(form, organisation, user):
         user=user,
     )
     eval.create_evaluation_body()
-    logger.info(
-        f"[evaluation_creation] The user {user.email} created an evaluation {eval.name} in the organisation "
-        f"{organisation.name}"
+    emit_event(
+        "evaluation_creation",
+        f"The user {user.email} created an evaluation {eval.name} in the organisation "
+        f"{organisation.name}",
+        evaluation_id=eval.id,
+        organisation_id=organisation.id,
     )
     # Check if we need to fetch the evaluation
     if last_version_in_organisation and last_version_in_organisation < float(
@@ -266,59 +278,13 @@ def treat_evaluation_creation_valid_form(form, organisation, user):
     return redirect("assessment:evaluation", organisation.id, eval.slug, eval.pk)
 
 
-def create_radar_chart(object_list, math_expression, text_expression, hovertext_expression):
-    """
-    This function creates the radar chart of the object list, with the value coming from the object evaluated
-    with the math expression (lambda function) and the text from the text expression (lambda function).
-    If the math_expression and the text_expression are not lambda functions, it returns None
-
-    :param object_list: list of objects (section)
-    :param math_expression: lambda expression
-    :param text_expression: lambda expression
-    :param hovertext_expression: lambda expression
-    """
-    if math_expression.__name__ == "<lambda>" and text_expression.__name__ == "<lambda>":
-        fig = go.Figure(
-            data=go.Scatterpolar(
-                # r is the radius, the first value is added at the end to loop the trace
-                r=[math_expression(obj) for obj in object_list]
-                + [math_expression(object_list[0])],
-                # theta is the label
-                theta=[text_expression(obj) for obj in object_list]
-                + [text_expression(object_list[0])],
-                fill="toself",
-                hoverinfo="text",
-                text=[hovertext_expression(obj) for obj in object_list]
-                + [hovertext_expression(object_list[0])],
-            )
-        )
-
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 100],
-                    tickmode="array",
-                    tickvals=[0, 20, 40, 60, 80, 100],
-                    ticktext=["0%", "20%", "40%", "60%", "80%", "100%"],
-                    ticks="outside",
-                    angle=90,
-                ),
-            ),
-            showlegend=False,
-        )
-        return opy.plot(fig, auto_open=False, output_type="div")
-    else:
-        return None
-
-
 def manage_missing_language(request, evaluation, **kwargs):
     """
     If the user wants to change the language of the platform while not having the evaluation in the same
     language, reactive the language of the evaluation
     """
     lang_code = get_language_from_request(request)
-    if lang_code not in evaluation.assessment.get_the_available_languages():
+    if not get_translation_completeness(evaluation.assessment_id).has_language(lang_code):
         valid_lang = "fr"
         # messages.warning(request, _("Your evaluation has not this language"))
         request.session[LANGUAGE_SESSION_KEY] = valid_lang
@@ -51,6 +51,8 @@ INSTALLED_APPS = [
 SITE_ID = 1
 
 MIDDLEWARE = [
+    # Save the monitoring events buffered during the request (see home/monitoring_events.py)
+    "home.monitoring_events.MonitoringEventsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -158,10 +160,15 @@ LOGGING = {
             "formatter": "app",
             "maxBytes": 10485760,  # 10MB
         },
+        # Events of the admin monitoring (see home/monitoring_events.py)
+        "events": {
+            "level": "INFO",
+            "class": "home.monitoring_events.MonitoringEventHandler",
+        },
     },
     "loggers": {
         "monitoring": {
-            "handlers": ["file"],
+            "handlers": ["file", "events"],
             "level": "INFO",
             "propagate": True,
         },
@@ -186,6 +193,59 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static")
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/media/"
 
+# Directory in which the PDF and the radar charts of the results of the evaluations are stored once generated,
+# shared by the web server and the worker, outside the MEDIA_ROOT as the PDF must only be downloaded by the
+# members of the organisation, and size in bytes up to which a PDF which cannot be stored is generated in memory
+RESULTS_PDF_CACHE_DIR = os.path.join(BASE_DIR, "private", "results_pdf")
+RESULTS_PDF_SPOOL_MAX_SIZE = 1024 * 1024
+# Time in seconds during which the statistics of the admin dashboard are kept in the cache
+DASHBOARD_STATS_CACHE_TIMEOUT = 60
+# The daily statistics of the dashboards are rolled up again by the worker when a dashboard is opened if the last
+# rollup is older than STATS_ROLLUP_INTERVAL seconds (see home/stats_rollup.py)
+STATS_ROLLUP_INTERVAL = 3600
+# Number of monitoring events buffered in a thread before they are saved, they are saved at the end of each
+# request and background job anyway
+MONITORING_EVENTS_BUFFER_SIZE = 100
+# Number of days during which the monitoring events and the counters of the tags of the logs are kept
+MONITORING_RETENTION_DAYS = 365
+# Background jobs (see assessment/jobs.py), run by the run_jobs command: the results of the evaluations are
+# prerendered RESULTS_PRERENDERING_DELAY seconds after their last change once they are finished, a running job is
+# taken again after JOB_TIMEOUT seconds, a job is retried up to JOB_MAX_ATTEMPTS times, after JOB_RETRY_DELAY
+# seconds doubled at each attempt, and a worker waits JOB_WORKER_SLEEP seconds when there is no job
+RESULTS_PRERENDERING_ENABLED = True
+RESULTS_PRERENDERING_DELAY = 30
+JOB_TIMEOUT = 600
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 60
+JOB_WORKER_SLEEP = 5
+# Exports of the results of the finished evaluations of an organisation (see assessment/organisation_export.py):
+# directory of the zip files, outside the MEDIA_ROOT as they must only be downloaded by the members of the
+# organisation, and number of processes rendering the PDF of the evaluations
+ORGANISATION_EXPORT_DIR = os.path.join(BASE_DIR, "private", "organisation_exports")
+ORGANISATION_EXPORT_PROCESSES = 4
+
+# Caches, "element_cards" stores the rendered evaluation element cards of the section page
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "element_cards": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "element_cards",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+ELEMENT_CARD_CACHE = "element_cards"
+# Time in seconds during which a value of the versioned cache (platform management object, footer links, scoring
+# plans, condition indexes...) is kept in the default cache, the values are invalidated with their version (see
+# home/versioned_cache.py)
+VERSIONED_CACHE_TIMEOUT = 3600
+# Time in seconds during which the versions of the versioned cache are used by a process before being loaded again,
+# so a value invalidated by an other process is served at most this time more
+CACHE_VERSIONS_TTL = 5
+# Time in seconds during which a rendered evaluation element card is kept in the cache
+ELEMENT_CARD_CACHE_TIMEOUT = 3600
+
 # Email configuration
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
@@ -1,20 +1,24 @@
 import datetime
-import re
 
 import plotly.graph_objs as go
 import plotly.offline as opy
-from django.conf import settings
+from assessment.jobs import enqueue_job
 from django.contrib import admin
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
 from django.shortcuts import redirect
 from django.template.response import TemplateResponse
 from django.urls import path
+from home.forms import MonitoringEventsFilterForm
+from home.log_indexer import index_logs
+from home.models import DailyStats, LogTagCount, MonitoringEvent
+from home.stats_rollup import request_stats_rollup
 
 
 class DashboardAdminSite(admin.AdminSite):
     site_header = "Admin monitoring"
     site_title = "Monitoring"
     index_title = "Welcome to the admin monitoring dashboard"
-    context = {"graph_list": []}
 
     def get_urls(self):
         urls = super().get_urls()
@@ -26,85 +30,118 @@ class DashboardAdminSite(admin.AdminSite):
     def get_view(self, request):
         """
         Generate the view of the dashboard, if the user is admin.
-        Call the function set_context to add all the graphs registered in the context.
+        Call the function set_context to add all the graphs registered in the context, and add the graph of the
+        events of the tags and the period chosen in the form.
         """
         user = request.user
         if user.is_admin:
-            self.set_context()
-            return TemplateResponse(request, "admin/monitoring.html", self.context)
+            request_stats_rollup()
+            index_logs()
+            enqueue_job("purge_monitoring")
+            today = datetime.date.today()
+            events_form = MonitoringEventsFilterForm(
+                request.GET or None,
+                initial={"start_date": today - datetime.timedelta(30), "end_date": today},
+            )
+            # The graphs are drawn again for each request, in a context which is not shared with the other requests
+            # as the admin site is a single instance
+            context = {"graph_list": [], "events_form": events_form}
+            if events_form.is_valid():
+                self.add_graph_to_context(
+                    context,
+                    graph=self.make_events_graph(
+                        events_form.cleaned_data["start_date"],
+                        events_form.cleaned_data["end_date"],
+                        events_form.cleaned_data["tags"],
+                    )
+                )
+            self.set_context(context)
+            return TemplateResponse(request, "admin/monitoring.html", context)
         else:
             return redirect("home:homepage")
 
-    def set_context(self):
+    def set_context(self, context):
         """
         This method add the graphs to the context in a list "graph_list".
         You can add other objects to the context here as it will be called by the method "get_view"
+        :param context: dictionary, context of the template of the request
         """
-        self.account_creation_graph()
-        self.organisation_creation_graph()
-        self.evaluation_creation_graph()
-        self.user_connection_graph()
-        self.error_graph()
+        self.account_creation_graph(context)
+        self.organisation_creation_graph(context)
+        self.evaluation_creation_graph(context)
+        self.user_connection_graph(context)
+        self.error_graph(context)
 
-    def get_logs(self, *args, **kwargs):
+    def add_graph_to_context(self, context, graph):
         """
-        Return the lines of the log files in platform_code/logs.
-        You can pass in kwargs the name of the file : "file_name=<name>"
-        :return:
+        Add a graph (plotly)
         """
-        if "file_name" in kwargs:
-            file_name = kwargs.get("file_name")
-            with open(file_name) as file:
-                file_data = file.read()
-                file.close()
-        else:
-            if settings.DEBUG:
-                with open("dev.log") as file:
-                    file_data = file.read()
-                    file.close()
-            # Prod configuration
-            else:
-                with open("prod.log") as file:
-                    file_data = file.read()
-                    file.close()
-        return file_data
-
-    def add_graph_to_context(self, graph):
+        context["graph_list"].append(graph)
+
+    def get_daily_stats(self, entity, first_date):
         """
-        Add a graph (plotly)
+        Return the number of objects of the entity created each day since the first date, read from the daily
+        statistics (see home/stats_rollup.py)
+        :param entity: string, DailyStats.USER, DailyStats.ORGANISATION or DailyStats.EVALUATION
+        :param first_date: date
+        :return: dictionary with the dates as keys
         """
-        self.context["graph_list"].append(graph)
+        return dict(
+            DailyStats.objects.filter(entity=entity, date__gte=first_date)
+            .values("date")
+            .annotate(total=Sum("count"))
+            .values_list("date", "total")
+        )
+
+    def get_log_tag_counts(self, log_tag, first_date):
+        """
+        Return the number of occurrences of the tags matching log_tag in the logs each day since the first date,
+        read from the counters of the log indexer (see home/log_indexer.py)
+        :param log_tag: string, regex matching the whole tag
+        :param first_date: date
+        :return: dictionary with the dates as keys
+        """
+        return dict(
+            LogTagCount.objects.filter(date__gte=first_date, tag__regex=rf"^({log_tag})$")
+            .values("date")
+            .annotate(total=Sum("count"))
+            .values_list("date", "total")
+        )
 
     def make_time_graph(
         self,
         days,
         graph_type,
-        log_tag,
         graph_title,
         y_axis_title,
+        log_tag=None,
+        entity=None,
     ):
         """
-        This method creates a plotly graph with time in x axis and you chose the variable for y "log_tag"
-        which will be search in the logs.
+        This method creates a plotly graph with time in x axis and you chose the variable for y: "log_tag"
+        whose occurrences in the logs are counted, or "entity" whose daily statistics are counted.
 
         :param days: int, the number of days in the x axis
         :param graph_type: string ("line" or "bar")
-        :param log_tag: string, searched in the logs
         :param graph_title: string, title of the graph
         :param y_axis_title: string, title of y axis
+        :param log_tag: string, regex of the tags counted in the logs
+        :param entity: string, entity of the daily statistics
         """
-        logs_data = self.get_logs()
         # Number of days
         length = days
         today = datetime.datetime.now()
+        first_date = (today - datetime.timedelta(length - 1)).date()
+        if entity is not None:
+            counts = self.get_daily_stats(entity, first_date)
+        else:
+            counts = self.get_log_tag_counts(log_tag, first_date)
         x = [today]
         y = [0] * length
         for i in range(length):
             x = [today - datetime.timedelta(i)] + x
             date = today - datetime.timedelta(i)
-            date_readable = datetime.datetime.strftime(date, "%Y-%m-%d")
-            regex = re.findall(rf"({date_readable})(.*)\[({log_tag})\]", logs_data)
-            y[-i - 1] = len(regex)
+            y[-i - 1] = counts.get(date.date(), 0)
         if graph_type == "bar":
             data = go.Bar(x=x, y=y)
         elif graph_type == "line":
@@ -133,46 +170,79 @@ class DashboardAdminSite(admin.AdminSite):
         figure = go.Figure(data=data, layout=layout)
         return opy.plot(figure, auto_open=False, output_type="div")
 
-    def account_creation_graph(self):
+    def make_events_graph(self, start_date, end_date, tags):
+        """
+        This method creates a plotly graph of the number of monitoring events per day of each tag during the
+        period, counted with one query.
+
+        :param start_date: date, first day of the x axis
+        :param end_date: date, last day of the x axis
+        :param tags: list of strings, tags of the events (a line per tag)
+        """
+        counts = {
+            (day, tag): count
+            for day, tag, count in MonitoringEvent.objects.filter(
+                tag__in=tags, created_at__date__range=(start_date, end_date)
+            )
+            .annotate(day=TruncDate("created_at"))
+            .values("day", "tag")
+            .annotate(count=Count("id"))
+            .values_list("day", "tag", "count")
+        }
+        nb_days = (end_date - start_date).days + 1
+        x = [start_date + datetime.timedelta(i) for i in range(nb_days)]
+        data = [
+            go.Scatter(x=x, y=[counts.get((day, tag), 0) for day in x], mode="lines", name=tag)
+            for tag in tags
+        ]
+        layout = go.Layout(
+            title="Number of events per day",
+            xaxis={"title": "date", "type": "date", "tickformat": "%d %b %Y"},
+            yaxis={"title": "events"},
+        )
+        figure = go.Figure(data=data, layout=layout)
+        return opy.plot(figure, auto_open=False, output_type="div")
+
+    def account_creation_graph(self, context):
         """
-        Number of account creation ie account which has been activated
+        Number of accounts created
         """
         graph = self.make_time_graph(
             days=30,
             graph_type="bar",
-            log_tag="account_activated",
-            graph_title="Number of accounts created and activated per day",
-            y_axis_title="Account activated",
+            entity=DailyStats.USER,
+            graph_title="Number of accounts created per day",
+            y_axis_title="Accounts created",
         )
-        self.add_graph_to_context(graph=graph)
+        self.add_graph_to_context(context, graph=graph)
 
-    def organisation_creation_graph(self):
+    def organisation_creation_graph(self, context):
         """
         Organisation creation
         """
         graph = self.make_time_graph(
             days=30,
             graph_type="bar",
-            log_tag="organisation_creation",
+            entity=DailyStats.ORGANISATION,
             graph_title="Number of organisations created per day",
             y_axis_title="Organisations created",
         )
-        self.add_graph_to_context(graph=graph)
+        self.add_graph_to_context(context, graph=graph)
 
-    def evaluation_creation_graph(self):
+    def evaluation_creation_graph(self, context):
         """
         Evaluation creation
         """
         graph = self.make_time_graph(
             days=30,
             graph_type="bar",
-            log_tag="evaluation_creation",
+            entity=DailyStats.EVALUATION,
             graph_title="Number of evaluations created per day",
             y_axis_title="Evaluations created",
         )
-        self.add_graph_to_context(graph=graph)
+        self.add_graph_to_context(context, graph=graph)
 
-    def error_graph(self):
+    def error_graph(self, context):
         """
         Graph of all the error 404, 403, 500 and 400
         """
@@ -183,13 +253,13 @@ class DashboardAdminSite(admin.AdminSite):
             graph_title="Number of errors - all",
             y_axis_title="error",
         )
-        self.add_graph_to_context(graph=graph)
+        self.add_graph_to_context(context, graph=graph)
 
-    def user_connection_graph(self):
+    def user_connection_graph(self, context):
         """
         Create the plotly graph to count the user connections
-        During a certain period of time until today, we search in the log file if there is a lof for an user connection
-        to the corresponding date. We count them day by day (list y) using regex.
+        During a certain period of time until today, we count day by day (list y) the logs of user connection, with
+        the counters of the log indexer.
         :return:
         """
         graph = self.make_time_graph(
@@ -199,4 +269,4 @@ class DashboardAdminSite(admin.AdminSite):
             graph_title="Number of users connection per day",
             y_axis_title="connections",
         )
-        self.add_graph_to_context(graph=graph)
+        self.add_graph_to_context(context, graph=graph)
@@ -2,8 +2,10 @@ import csv
 from datetime import date
 
 from assessment.models import EvaluationScore
-from django.contrib import admin
+from assessment.organisation_export import request_organisation_export
+from django.contrib import admin, messages
 from django.http import HttpResponse
+from django.utils.translation import get_language
 from django.utils.translation import gettext as _
 
 
@@ -12,7 +14,7 @@ class OrganisationAdmin(admin.ModelAdmin):
     Class to custom Organisation in admin interface
     """
 
-    actions = ["export_data_to_csv"]
+    actions = ["export_data_to_csv", "export_evaluations_results"]
 
     list_display = (
         "name",
@@ -118,3 +120,31 @@ class OrganisationAdmin(admin.ModelAdmin):
         return response
 
     export_data_to_csv.short_description = _("Export the organisation evaluations as CSV file")
+
+    def export_evaluations_results(self, request, queryset):
+        """
+        Action which for the selected organisations, starts the export of the PDF and the json files of the
+        results of their finished evaluations, downloadable in the organisation exports once done. The
+        organisations which have an export in progress are skipped.
+        """
+        nb_started = 0
+        for organisation in queryset:
+            if request_organisation_export(organisation, request.user, get_language()) is not None:
+                nb_started += 1
+        self.message_user(
+            request,
+            f"The export of the results of {nb_started} organisations has started, the files will be "
+            f"available in the organisation exports.",
+            messages.SUCCESS,
+        )
+        if nb_started < len(queryset):
+            self.message_user(
+                request,
+                f"{len(queryset) - nb_started} organisations have an export in progress, they have been "
+                f"skipped.",
+                messages.WARNING,
+            )
+
+    export_evaluations_results.short_description = _(
+        "Export the results of the finished evaluations (PDF and json)"
+    )
@@ -0,0 +1,90 @@
+"""
+Authorization context of the user of the request.
+
+The memberships of the user are loaded with one query the first time a role is needed during the request and
+the roles are kept by organisation id, so the security checks of the views and the template filters do not query
+the memberships again. The context is kept on the user object, which the authentication middleware loads again
+for each request, so it does not outlive the request.
+"""
+
+from django.apps import apps
+
+# Roles of Membership which give rights on the organisation
+ADMIN = "admin"
+EDITOR = "editor"
+
+
+class AuthorizationContext:
+    """
+    Roles of the user in their organisations, loaded once
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._roles = None
+
+    @property
+    def roles(self):
+        """
+        Dictionary with the organisation ids as keys and the roles of the user as values
+        """
+        if self._roles is None:
+            if self.user.is_authenticated:
+                # The membership model is got from the registry as the module of the memberships uses the context
+                Membership = apps.get_model("home", "Membership")
+                self._roles = dict(
+                    Membership.objects.filter(user=self.user).values_list(
+                        "organisation_id", "role"
+                    )
+                )
+            else:
+                self._roles = {}
+        return self._roles
+
+    def get_role(self, organisation):
+        """
+        Get the role of the user in the organisation, None if they are not member
+        :param organisation: organisation
+        :return: string or None
+        """
+        return self.roles.get(organisation.id)
+
+    def is_member(self, organisation):
+        return organisation.id in self.roles
+
+    def is_admin(self, organisation):
+        return self.get_role(organisation) == ADMIN
+
+    def can_edit(self, organisation):
+        """
+        True if the user is member of the organisation as admin or editor, so can edit the evaluations
+        """
+        return self.get_role(organisation) in [ADMIN, EDITOR]
+
+    def invalidate(self):
+        """
+        The memberships will be loaded again, used when they are modified during the request
+        """
+        self._roles = None
+
+
+def get_authorization_context(user):
+    """
+    Return the authorization context of the user, created the first time it is needed
+    :param user: user of the request
+    :return: AuthorizationContext
+    """
+    authorization_context = getattr(user, "authorization_context", None)
+    if authorization_context is None:
+        authorization_context = AuthorizationContext(user)
+        user.authorization_context = authorization_context
+    return authorization_context
+
+
+def invalidate_authorization_context(user):
+    """
+    Invalidate the authorization context of the user if it exists, after a change of their memberships
+    """
+    authorization_context = getattr(user, "authorization_context", None)
+    if authorization_context is not None:
+        authorization_context.invalidate()
@@ -1,25 +1,24 @@
 from assessment.models import is_language_activation_allowed
 from django.utils.translation import activate
-from home.models import Footer, PlatformManagement
+from home.models.footer import get_footer_list
+from home.models.platform_management import get_platform_management
 
 
 def add_footer_list(request):
     return {
-        "footer_list": Footer.objects.all(),
+        "footer_list": get_footer_list(),
     }
 
 
 def add_platform_management(request):
-    if PlatformManagement.objects.all().count() > 1:
-        while PlatformManagement.objects.all().count() > 1:
-            PlatformManagement.objects.last().delete()
-        platform_management = PlatformManagement.objects.first()
-    else:
-        platform_management = PlatformManagement.get_or_create()
+    # The platform management object and the footer list are cached in the process, see home/signals.py
+    platform_management = get_platform_management()
     # If the languages are not activated (English), the site is in French
     if not platform_management.activate_multi_languages:
         activate("fr")
     return {
         "platform_management": platform_management,
-        "is_language_activation_allowed": is_language_activation_allowed(),
+        # The function is called by the template only when the variable is used (admin change form), as it
+        # covers all the assessments
+        "is_language_activation_allowed": is_language_activation_allowed,
     }
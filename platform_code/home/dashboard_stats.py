@@ -0,0 +1,186 @@
+"""
+Statistics of the admin dashboard (users, organisations and evaluations tabs).
+
+The statistics are read from the daily statistics (see home/models/daily_stats.py and home/stats_rollup.py), so
+their cost does not depend on the number of users, organisations and evaluations. Each tab is calculated with one
+aggregation query on the daily statistics: the counts per sector, per size, per month, per status and per
+assessment version are conditional sums (Sum with a filter) of the same query. The filters of the tabs are built
+once as a Q object by build_stats_filter. The statistics are kept in the cache for
+DASHBOARD_STATS_CACHE_TIMEOUT seconds, so switching between the tabs does not query them again.
+"""
+
+import calendar
+from datetime import datetime
+
+from assessment.models import Assessment
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils.translation import get_language
+from home.models import DailyStats, Organisation
+
+# First date of the statistics when no date is filtered
+STATS_MIN_DATE = datetime(2020, 1, 1)
+
+
+def build_stats_filter(entity, created_after=None, sector=None, size=None):
+    """
+    Return the filter of the daily statistics, the filters which are None are not applied
+    :param entity: string, DailyStats.USER, DailyStats.ORGANISATION or DailyStats.EVALUATION
+    :param created_after: date, minimum creation date
+    :param sector: string, value of Organisation.SECTOR
+    :param size: string, value of Organisation.SIZE
+    :return: Q object
+    """
+    filters = Q(entity=entity)
+    if created_after is not None:
+        filters &= Q(date__gte=created_after)
+    if sector is not None:
+        filters &= Q(sector=sector)
+    if size is not None:
+        filters &= Q(size=size)
+    return filters
+
+
+def sum_count(**filters):
+    """
+    Return the sum of the counts of the daily statistics of the filters, 0 if there is none
+    """
+    return Coalesce(Sum("count", filter=Q(**filters)), 0)
+
+
+def get_cached_stats(name, function, **kwargs):
+    """
+    Return the statistics calculated by the function with the keyword arguments, from the cache if they have
+    been calculated less than DASHBOARD_STATS_CACHE_TIMEOUT seconds ago
+    """
+    arguments = ",".join(f"{key}={value}" for key, value in sorted(kwargs.items()))
+    key = f"dashboard_stats:{name}:{get_language()}:{arguments}"
+    stats = cache.get(key)
+    if stats is None:
+        stats = function(**kwargs)
+        cache.set(key, stats, getattr(settings, "DASHBOARD_STATS_CACHE_TIMEOUT", 60))
+    return stats
+
+
+def get_organisations_stats(created_after=None):
+    """
+    Return the number of organisations, per sector and per size, with one query
+    :param created_after: date, minimum creation date of the organisations
+    :return: dictionary
+    """
+    aggregates = {"nb_orgas": sum_count()}
+    for i, (sector, _label) in enumerate(Organisation.SECTOR):
+        aggregates[f"sector_{i}"] = sum_count(sector=sector)
+    for i, (size, _label) in enumerate(Organisation.SIZE):
+        aggregates[f"size_{i}"] = sum_count(size=size)
+    counts = DailyStats.objects.filter(
+        build_stats_filter(DailyStats.ORGANISATION, created_after=created_after)
+    ).aggregate(**aggregates)
+    return {
+        "nb_orgas": counts["nb_orgas"],
+        "nb_orgas_per_sector": {
+            label: counts[f"sector_{i}"]
+            for i, (_sector, label) in enumerate(Organisation.SECTOR)
+        },
+        "nb_orgas_per_size": {
+            label: counts[f"size_{i}"] for i, (_size, label) in enumerate(Organisation.SIZE)
+        },
+    }
+
+
+def get_users_stats(registered_after=None):
+    """
+    Return the number of users and the cumulative number of users at each of the 12 months following the
+    registration date (the first of January 2020 if not set), with one query
+    :param registered_after: date or None, minimum registration date of the users counted in nb_users
+    :return: dictionary
+    """
+    if registered_after is None:
+        first_step = STATS_MIN_DATE
+        min_date = STATS_MIN_DATE
+        aggregates = {"nb_users": sum_count()}
+    else:
+        # The months are counted until their last day
+        first_step = datetime(
+            registered_after.year,
+            registered_after.month,
+            calendar.monthrange(registered_after.year, registered_after.month)[1],
+        )
+        min_date = registered_after
+        aggregates = {"nb_users": sum_count(date__gte=registered_after)}
+    steps = [take_n_month_steps(first_step, i) for i in range(12)]
+    for i, step in enumerate(steps):
+        aggregates[f"month_{i}"] = sum_count(date__lte=step.date())
+    counts = DailyStats.objects.filter(build_stats_filter(DailyStats.USER)).aggregate(
+        **aggregates
+    )
+    return {
+        "nb_users": counts["nb_users"],
+        "min_date": min_date.strftime("%d-%b-%Y"),
+        "one_year_users_count": {
+            step.strftime("%B-%Y"): counts[f"month_{i}"] for i, step in enumerate(steps)
+        },
+    }
+
+
+def get_evaluations_stats(created_after=None, sector=None, size=None):
+    """
+    Return the number of evaluations per status and per assessment version, with one query for the counts and
+    one for the versions, which are all displayed even without evaluation
+    :param created_after: date, minimum creation date of the evaluations
+    :param sector: string or None, sector of the organisations of the evaluations
+    :param size: string or None, size of the organisations of the evaluations
+    :return: dictionary
+    """
+    versions = list(Assessment.objects.values_list("version", flat=True))
+    daily_stats = DailyStats.objects.filter(
+        build_stats_filter(
+            DailyStats.EVALUATION, created_after=created_after, sector=sector, size=size
+        )
+    )
+    aggregates = {
+        "nb_evaluations_completed": sum_count(is_finished=True),
+        "nb_evaluations_in_progress": sum_count(is_finished=False),
+    }
+    for i, version in enumerate(versions):
+        aggregates[f"version_{i}"] = sum_count(assessment_version=version)
+    counts = daily_stats.aggregate(**aggregates)
+    return {
+        "versions_stats": {
+            version: counts[f"version_{i}"] for i, version in enumerate(versions)
+        },
+        "nb_evaluations_completed": counts["nb_evaluations_completed"],
+        "nb_evaluations_in_progress": counts["nb_evaluations_in_progress"],
+        "total_nb_evals": counts["nb_evaluations_completed"]
+        + counts["nb_evaluations_in_progress"],
+    }
+
+
+def take_n_month_steps(date, nb_steps):
+    """
+    This function takes a "date" as a parameter then adds or subtracts "nb_steps" months from it (depending
+    on the sign of nb_steps), It returns the resulting date
+    """
+    m, y = (date.month + nb_steps) % 12, date.year + (date.month + nb_steps - 1) // 12
+    if not m:
+        m = 12
+    d = min(
+        date.day,
+        [
+            31,
+            29 if y % 4 == 0 and (not y % 100 == 0 or y % 400 == 0) else 28,
+            31,
+            30,
+            31,
+            30,
+            31,
+            31,
+            30,
+            31,
+            30,
+            31,
+        ][m - 1],
+    )
+    return date.replace(day=d, month=m, year=y)
@@ -10,7 +10,7 @@ from django.contrib.auth.forms import (
 from django.forms import ModelForm
 from django.utils.translation import gettext_lazy as _
 
-from .models import Organisation, User
+from .models import MonitoringEvent, Organisation, User
 
 UserModel = get_user_model()
 
@@ -296,6 +296,40 @@ class DashboardEvaluationsStatsTabFilterForm(forms.Form):
     )
 
 
+class MonitoringEventsFilterForm(forms.Form):
+    """
+    A form of the admin monitoring to choose the tags of the events and the period of their graph
+    """
+
+    start_date = forms.DateField(
+        widget=forms.widgets.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+        label=_("From the"),
+    )
+    end_date = forms.DateField(
+        widget=forms.widgets.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+        label=_("To the"),
+    )
+    tags = forms.MultipleChoiceField(widget=forms.SelectMultiple(attrs={"size": 8}), label=_("Tags"))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The tags which have been logged at least once
+        self.fields["tags"].choices = [
+            (tag, tag)
+            for tag in MonitoringEvent.objects.order_by("tag")
+            .values_list("tag", flat=True)
+            .distinct()
+        ]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get("start_date")
+        end_date = cleaned_data.get("end_date")
+        if start_date and end_date and start_date > end_date:
+            raise forms.ValidationError(_("The start date must be before the end date."))
+        return cleaned_data
+
+
 class LabellingStatusForm(forms.Form):
     choices = Labelling.STATUS
     status_choices = [_ for _ in choices]
@@ -0,0 +1,138 @@
+"""
+Incremental indexer of the logs of the monitoring logger, for the graphs of the admin monitoring.
+
+The log file of the "file" handler of LOGGING is read from the position where the last indexing stopped, and
+the tags of the messages (e.g. "[user_connection]") are counted per day in one pass, then added to the counters
+of LogTagCount. The position is kept with the inode of the file in LogIndexCheckpoint: when the file has been
+rotated by the RotatingFileHandler (renamed to .1, .2, ...), the end of the rotated file is read from the
+position, then the newer files from their beginning. Only the complete lines are indexed, so a line being
+written is indexed the next time.
+
+The indexing is run by the admin monitoring before drawing the graphs and by the index_logs command. It runs
+where the log files are written (the web server), as the worker of the background jobs does not share them.
+"""
+
+import os
+import re
+from collections import Counter
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from home.models import LogIndexCheckpoint, LogTagCount
+
+# Lines written with the "app" formatter: date, time, [level], (module.function), then the message
+LOG_LINE_REGEX = re.compile(r"^(\d{4}-\d{2}-\d{2}) \d{2}:\d{2}:\d{2} \[\w+\] \([^)]*\) (.*)$")
+TAG_REGEX = re.compile(r"\[(\w+)\]")
+
+
+def get_log_file():
+    """
+    Return the name of the log file and the number of rotated files kept, from the file handler of LOGGING
+    :return: tuple (string, int)
+    """
+    handler = settings.LOGGING.get("handlers", {}).get("file", {})
+    return handler.get("filename", "prod.log"), handler.get("backupCount", 0)
+
+
+def get_files_to_index(file_name, backup_count, checkpoint):
+    """
+    Return the files to read with the position to start from, from the oldest to the current one
+    :param file_name: string, current log file
+    :param backup_count: int, number of rotated files
+    :param checkpoint: LogIndexCheckpoint or None if the logs have never been indexed
+    :return: list of tuples (path, offset)
+    """
+    rotated_files = [
+        f"{file_name}.{i}"
+        for i in range(backup_count, 0, -1)
+        if os.path.exists(f"{file_name}.{i}")
+    ]
+    if checkpoint is None:
+        return [(path, 0) for path in rotated_files] + [(file_name, 0)]
+    stat = os.stat(file_name)
+    if stat.st_ino == checkpoint.inode:
+        # The file has been truncated if it is shorter than the position
+        return [(file_name, checkpoint.offset if stat.st_size >= checkpoint.offset else 0)]
+    files = []
+    for path in rotated_files:
+        if files:
+            files.append((path, 0))
+        elif os.stat(path).st_ino == checkpoint.inode:
+            files.append((path, checkpoint.offset))
+    if not files:
+        # The file of the checkpoint has been deleted, all the rotated files are newer
+        files = [(path, 0) for path in rotated_files]
+    return files + [(file_name, 0)]
+
+
+def count_tags(path, offset, counts):
+    """
+    Count the tags of the complete lines of the file from the offset, per day
+    :param path: string
+    :param offset: int, position in bytes
+    :param counts: Counter of (date, tag), updated
+    :return: tuple (inode of the file, position after the last complete line)
+    """
+    with open(path, "rb") as file:
+        inode = os.fstat(file.fileno()).st_ino
+        file.seek(offset)
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            match = LOG_LINE_REGEX.match(line.decode("utf-8", errors="replace").rstrip())
+            if match is None:
+                # Lines of the tracebacks
+                continue
+            day = date.fromisoformat(match.group(1))
+            for tag in TAG_REGEX.findall(match.group(2)):
+                counts[(day, tag)] += 1
+    return inode, offset
+
+
+def save_counts(counts):
+    """
+    Add the counts to the counters of the tags
+    :param counts: Counter of (date, tag)
+    """
+    existing_counts = {
+        (log_tag_count.date, log_tag_count.tag): log_tag_count
+        for log_tag_count in LogTagCount.objects.filter(date__in={day for day, _tag in counts})
+    }
+    updated_counts = []
+    new_counts = []
+    for (day, tag), count in counts.items():
+        if (day, tag) in existing_counts:
+            existing_counts[(day, tag)].count += count
+            updated_counts.append(existing_counts[(day, tag)])
+        else:
+            new_counts.append(LogTagCount(date=day, tag=tag, count=count))
+    LogTagCount.objects.bulk_update(updated_counts, ["count"])
+    LogTagCount.objects.bulk_create(new_counts)
+
+
+def index_logs():
+    """
+    Count the tags of the lines written in the log files since the last indexing
+    :return: int, number of tags counted
+    """
+    file_name, backup_count = get_log_file()
+    if not os.path.exists(file_name):
+        return 0
+    with transaction.atomic():
+        # The lock prevents two indexings to count the same lines
+        checkpoint = (
+            LogIndexCheckpoint.objects.select_for_update().filter(file_name=file_name).first()
+        )
+        counts = Counter()
+        for path, offset in get_files_to_index(file_name, backup_count, checkpoint):
+            inode, offset = count_tags(path, offset, counts)
+        save_counts(counts)
+        if checkpoint is None:
+            checkpoint = LogIndexCheckpoint(file_name=file_name)
+        # The position is the one in the current file, read last
+        checkpoint.inode = inode
+        checkpoint.offset = offset
+        checkpoint.save()
+    return sum(counts.values())
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from home.models import Membership
+from home.models.membership import delete_duplicated_memberships
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the duplicated memberships (same user and organisation), keeping the last one created. "
+        "The migration adding the unique constraint on the memberships does it once, the command can be used "
+        "to do it again on a database restored from an older backup."
+    )
+
+    def handle(self, *args, **options):
+        count = delete_duplicated_memberships(Membership)
+        self.stdout.write(f"{count} duplicated memberships deleted")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from home.log_indexer import index_logs
+
+
+class Command(BaseCommand):
+    help = (
+        "Count per day the tags of the lines written in the log files since the last indexing, for the graphs "
+        "of the admin monitoring. The admin monitoring indexes the logs too before drawing the graphs."
+    )
+
+    def handle(self, *args, **options):
+        count = index_logs()
+        self.stdout.write(f"{count} tags counted")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from home.monitoring_events import purge_monitoring
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the monitoring events and the counters of the tags of the logs older than "
+        "MONITORING_RETENTION_DAYS days. The admin monitoring enqueues the job doing it too."
+    )
+
+    def handle(self, *args, **options):
+        count = purge_monitoring()
+        self.stdout.write(f"{count} monitoring rows deleted")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from home.stats_rollup import rollup_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Count the users, organisations and evaluations created each day for the admin dashboards. Only the days "
+        "since the last rollup and the days of the objects modified since then are calculated again, unless "
+        "--full is used."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Calculate all the days again, e.g. after objects have been deleted",
+        )
+
+    def handle(self, *args, **options):
+        count = rollup_stats(full=options["full"])
+        self.stdout.write(f"{count} daily statistics rows created")
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.7 on 2026-10-18 09:51
+
+from django.db import migrations, models
+
+
+def delete_duplicates(apps, schema_editor):
+    """
+    Delete the duplicated memberships (same user and organisation), which would prevent the creation of the
+    constraint. The last one created is kept.
+    """
+    Membership = apps.get_model('home', 'Membership')
+    membership_keys = set()
+    duplicate_ids = []
+    for membership_id, user_id, organisation_id in Membership.objects.order_by('-id').values_list(
+        'id', 'user_id', 'organisation_id'
+    ):
+        if (user_id, organisation_id) in membership_keys:
+            duplicate_ids.append(membership_id)
+        else:
+            membership_keys.add((user_id, organisation_id))
+    Membership.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0009_auto_20231006_0814'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='membership',
+            constraint=models.UniqueConstraint(fields=('user', 'organisation'), name='unique_membership_user_organisation'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.7 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0010_unique_membership'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('entity', models.CharField(choices=[('user', 'user'), ('organisation', 'organisation'), ('evaluation', 'evaluation')], max_length=20)),
+                ('sector', models.CharField(blank=True, default='', max_length=1000)),
+                ('size', models.CharField(blank=True, default='', max_length=200)),
+                ('assessment_version', models.CharField(blank=True, default='', max_length=200)),
+                ('is_finished', models.BooleanField(default=False)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StatsRollupCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_date', models.DateField()),
+                ('last_rollup_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='dailystats',
+            index=models.Index(fields=['entity', 'date'], name='daily_stats_entity_date_idx'),
+        ),
+    ]
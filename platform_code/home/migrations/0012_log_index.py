@@ -0,0 +1,36 @@
+# Generated by Django 3.2.7 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0011_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogIndexCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=500, unique=True)),
+                ('inode', models.BigIntegerField()),
+                ('offset', models.BigIntegerField(default=0)),
+                ('indexed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LogTagCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('tag', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='logtagcount',
+            constraint=models.UniqueConstraint(fields=('date', 'tag'), name='unique_log_tag_count_date_tag'),
+        ),
+    ]
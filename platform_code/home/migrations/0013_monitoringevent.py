@@ -0,0 +1,33 @@
+# Generated by Django 3.2.7 on 2026-10-18 15:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0012_log_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonitoringEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(max_length=200)),
+                ('level', models.CharField(max_length=20)),
+                ('message', models.TextField(blank=True)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='monitoringevent',
+            index=models.Index(fields=['tag', 'created_at'], name='monitoring_event_tag_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monitoringevent',
+            index=models.Index(fields=['created_at'], name='monitoring_event_date_idx'),
+        ),
+    ]
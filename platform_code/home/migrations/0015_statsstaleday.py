@@ -0,0 +1,25 @@
+# Generated by Django 3.2.7 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0014_cacheversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailystats',
+            name='date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='StatsStaleDay',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.7 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+def delete_duplicates(apps, schema_editor):
+    """
+    Delete the duplicated stale days (same date), which would prevent the creation of the constraint. The first
+    one created is kept.
+    """
+    StatsStaleDay = apps.get_model('home', 'StatsStaleDay')
+    dates = set()
+    duplicate_ids = []
+    for stale_day_id, date in StatsStaleDay.objects.filter(date__isnull=False).order_by('id').values_list(
+        'id', 'date'
+    ):
+        if date in dates:
+            duplicate_ids.append(stale_day_id)
+        else:
+            dates.add(date)
+    StatsStaleDay.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0015_statsstaleday'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='statsstaleday',
+            name='date',
+            field=models.DateField(blank=True, null=True, unique=True),
+        ),
+    ]
@@ -1,16 +1,27 @@
+from .cache_version import CacheVersion
+from .daily_stats import DailyStats, StatsRollupCheckpoint, StatsStaleDay
 from .footer import Footer
+from .log_index import LogIndexCheckpoint, LogTagCount
 from .membership import Membership, PendingInvitation
+from .monitoring_event import MonitoringEvent
 from .organisation import Organisation
 from .platform_management import PlatformManagement
 from .release_note import ReleaseNote
 from .user import User, UserResources
 
 __all__ = [
+    "CacheVersion",
+    "DailyStats",
+    "LogIndexCheckpoint",
+    "LogTagCount",
     "Membership",
+    "MonitoringEvent",
     "Organisation",
     "PendingInvitation",
     "PlatformManagement",
     "ReleaseNote",
+    "StatsRollupCheckpoint",
+    "StatsStaleDay",
     "User",
     "UserResources",
     "Footer",
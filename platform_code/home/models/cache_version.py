@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class CacheVersion(models.Model):
+    """
+    Version of a family of cached values (e.g. "scoring_plan"), shared by all the processes through the database.
+    The values are cached with their version in the key (see home/versioned_cache.py), so renewing the version
+    invalidates them in all the processes and containers at once.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    # Renewed with the time in nanoseconds, so a version rolled back with its transaction is never reused
+    version = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} version {self.version}"
@@ -0,0 +1,64 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class DailyStats(models.Model):
+    """
+    Number of users, organisations and evaluations created each day, per sector and size of the organisation,
+    assessment version and finished status of the evaluation. The fields which do not apply to the entity are
+    empty (the users have no sector for example). The users registered before their creation date was saved
+    are counted in a row without date, so they are in the total number of users but not in the months.
+    The rows are calculated by the rollup_stats command (see home/stats_rollup.py) and read by the admin
+    dashboards, so they do not scan the tables of the users, the organisations and the evaluations.
+    """
+
+    USER = "user"
+    ORGANISATION = "organisation"
+    EVALUATION = "evaluation"
+
+    ENTITY = (
+        (USER, _("user")),
+        (ORGANISATION, _("organisation")),
+        (EVALUATION, _("evaluation")),
+    )
+
+    date = models.DateField(blank=True, null=True)
+    entity = models.CharField(max_length=20, choices=ENTITY)
+    sector = models.CharField(max_length=1000, blank=True, default="")
+    size = models.CharField(max_length=200, blank=True, default="")
+    assessment_version = models.CharField(max_length=200, blank=True, default="")
+    is_finished = models.BooleanField(default=False)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["entity", "date"], name="daily_stats_entity_date_idx")]
+
+    def __str__(self):
+        return f"{self.count} {self.entity} on {self.date}"
+
+
+class StatsRollupCheckpoint(models.Model):
+    """
+    Checkpoint of the rollup of the daily statistics, there is only one row.
+    The rollup calculates again the days from the last date processed (included, as it was not finished), and the
+    days of the evaluations and organisations modified since the last rollup.
+    """
+
+    last_date = models.DateField()
+    last_rollup_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Daily statistics rolled up until {self.last_date}"
+
+
+class StatsStaleDay(models.Model):
+    """
+    Day whose daily statistics must be calculated again at the next rollup because a user, an organisation or an
+    evaluation created that day has been deleted (see home/signals.py). The date is empty for the users without
+    creation date, there can be several rows without date as they are not unique in the database.
+    """
+
+    date = models.DateField(blank=True, null=True, unique=True)
+
+    def __str__(self):
+        return f"Daily statistics of {self.date} to calculate again"
@@ -1,4 +1,5 @@
 from django.db import models
+from home.versioned_cache import get_cached_value, invalidate_cache
 
 
 class Footer(models.Model):
@@ -9,3 +10,18 @@ class Footer(models.Model):
 
     class Meta:
         ordering = ["order"]
+
+
+def get_footer_list():
+    """
+    Return the list of the footer links from the cache (see home/versioned_cache.py), else it is loaded and cached
+    :return: list
+    """
+    return get_cached_value("footer", "list", lambda: list(Footer.objects.all()))
+
+
+def invalidate_footer_list():
+    """
+    Remove the footer list from the cache of all the processes
+    """
+    invalidate_cache("footer")
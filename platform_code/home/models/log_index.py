@@ -0,0 +1,36 @@
+from django.db import models
+
+
+class LogTagCount(models.Model):
+    """
+    Number of occurrences of a tag (e.g. "user_connection" for "[user_connection]") in the lines of the logs
+    written on a day. The counters are incremented by the log indexer (see home/log_indexer.py) and read by the
+    graphs of the admin monitoring.
+    """
+
+    date = models.DateField()
+    tag = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "tag"], name="unique_log_tag_count_date_tag")
+        ]
+
+    def __str__(self):
+        return f"[{self.tag}] {self.count} times on {self.date}"
+
+
+class LogIndexCheckpoint(models.Model):
+    """
+    Position of the log indexer in a log file: the inode of the file identifies it after it has been rotated
+    (renamed), and the offset is the number of bytes already indexed.
+    """
+
+    file_name = models.CharField(max_length=500, unique=True)
+    inode = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    indexed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.file_name} indexed until the byte {self.offset}"
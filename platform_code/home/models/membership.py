@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from home.authorization import invalidate_authorization_context
 
 
 class Membership(models.Model):
@@ -28,6 +29,15 @@ class Membership(models.Model):
     role = models.CharField(max_length=200, choices=ROLES, default=ADMIN)
     hide_membership = models.BooleanField(default=False)
 
+    class Meta:
+        # A user is member of an organisation once, the duplicates created before the constraint are deleted by
+        # the migration adding it (and by the command deduplicate_memberships)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "organisation"], name="unique_membership_user_organisation"
+            )
+        ]
+
     @classmethod
     def create_membership(cls, user, organisation, role, hide_membership=False):
         if cls.check_role(role):
@@ -38,6 +48,7 @@ class Membership(models.Model):
                 hide_membership=hide_membership,
             )
             member.save()
+            invalidate_authorization_context(user)
 
     @classmethod
     def create_membership_pending_invitations(cls, user):
@@ -117,3 +128,23 @@ class PendingInvitation(models.Model):
 
     def __str__(self):
         return f"{self.pk}"
+
+
+def delete_duplicated_memberships(membership_model):
+    """
+    Delete the duplicated memberships (same user and organisation), the last one created is kept.
+    Used by the command deduplicate_memberships, the migration adding the unique constraint does the same.
+    :param membership_model: Membership model
+    :return: number of memberships deleted
+    """
+    membership_keys = set()
+    duplicate_ids = []
+    for membership_id, user_id, organisation_id in membership_model.objects.order_by(
+        "-id"
+    ).values_list("id", "user_id", "organisation_id"):
+        if (user_id, organisation_id) in membership_keys:
+            duplicate_ids.append(membership_id)
+        else:
+            membership_keys.add((user_id, organisation_id))
+    membership_model.objects.filter(id__in=duplicate_ids).delete()
+    return len(duplicate_ids)
@@ -0,0 +1,29 @@
+from django.db import models
+from django.db.models import JSONField
+from django.utils import timezone
+
+
+class MonitoringEvent(models.Model):
+    """
+    Event of the monitoring logger (e.g. "[user_connection] The user ... has logged in"), saved with its tag so
+    the admin monitoring counts the events without parsing the logs.
+    The events are created by the handler of the monitoring logger and saved by batches (see
+    home/monitoring_events.py). The data are the structured data given with emit_event, and the other tags of the
+    message if it has several.
+    """
+
+    tag = models.CharField(max_length=200)
+    level = models.CharField(max_length=20)
+    message = models.TextField(blank=True)
+    data = JSONField(default=dict, blank=True)
+    # Date of the log, not of the saving of the batch
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tag", "created_at"], name="monitoring_event_tag_idx"),
+            models.Index(fields=["created_at"], name="monitoring_event_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"[{self.tag}] {self.created_at}"
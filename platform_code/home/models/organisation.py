@@ -2,6 +2,7 @@ from django.db import models
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from django_countries.fields import CountryField
+from home.authorization import invalidate_authorization_context
 
 from .membership import Membership
 from .user import User
@@ -138,6 +139,7 @@ class Organisation(models.Model):
         if self.count_displayed_members() > 1 and self.check_user_is_member(user):
             membership = self.get_membership_user(user=user)
             membership.delete()
+            invalidate_authorization_context(user)
 
     def get_list_members_not_staff(self):
         """
@@ -183,21 +185,12 @@ class Organisation(models.Model):
 
     def get_membership_user(self, user):
         """
-        Get the list of the membership of an user to an organisation.
-        Normally it is a one element list (the user can only be member once of an organisation for a defined role
+        Get the membership of an user to an organisation, None if they are not member.
+        The user can only be member once of an organisation (unique constraint of Membership).
         :param user: user in django
-        :return: list
+        :return: membership or None
         """
-        memberships = Membership.objects.filter(user=user, organisation=self)
-        if memberships.count() == 1:
-            return memberships[0]
-        elif memberships.count() > 1:
-            # Clean to keep one
-            while Membership.objects.filter(user=user, organisation=self).count() > 1:
-                Membership.objects.filter(user=user, organisation=self)[0].delete()
-            return Membership.objects.get(user=user, organisation=self)
-        else:
-            return None
+        return Membership.objects.filter(user=user, organisation=self).first()
 
     def check_user_is_member(self, user):
         """
@@ -1,4 +1,5 @@
 from django.db import models
+from home.versioned_cache import get_cached_value, invalidate_cache
 
 
 class PlatformManagement(models.Model):
@@ -56,9 +57,9 @@ class PlatformManagement(models.Model):
     @classmethod
     def get_labelling_threshold(cls):
         """
-        Get the labelling threshold of the platform management object
+        Get the labelling threshold of the platform management object, from the cache
         """
-        return cls.get_or_create().labelling_threshold
+        return get_platform_management().labelling_threshold
 
     def set_labelling_threshold(self, value):
         """
@@ -67,3 +68,19 @@ class PlatformManagement(models.Model):
         if value and (isinstance(value, float) or isinstance(value, int)):
             self.labelling_threshold = value
             self.save()
+
+
+def get_platform_management():
+    """
+    Return the platform management object from the cache (see home/versioned_cache.py), else it is got (or
+    created) and cached. It is read by the context processors at each template rendering.
+    :return: PlatformManagement
+    """
+    return get_cached_value("platform_management", "object", PlatformManagement.get_or_create)
+
+
+def invalidate_platform_management():
+    """
+    Remove the platform management object from the cache of all the processes
+    """
+    invalidate_cache("platform_management")
@@ -0,0 +1,142 @@
+"""
+Structured events of the monitoring, saved in MonitoringEvent for the admin monitoring.
+
+The handler MonitoringEventHandler is attached to the monitoring logger (see LOGGING in the settings), so each
+message logged with a tag, e.g. logger.info(f"[user_connection] ..."), is an event too: the tag is read once
+when the message is logged, and the structured data can be given with emit_event. The events are buffered in the
+thread which logs them and saved with one query at the end of the request by MonitoringEventsMiddleware, after
+each background job, at the end of the process, or when MONITORING_EVENTS_BUFFER_SIZE events are buffered.
+The events and the counters of the tags of the logs (see home/log_indexer.py) older than MONITORING_RETENTION_DAYS
+days are deleted by the job purge_monitoring, enqueued by the admin monitoring.
+"""
+
+import atexit
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+
+from django.apps import apps
+from django.conf import settings
+from sentry_sdk import capture_message
+
+logger = logging.getLogger("monitoring")
+
+# Tags at the beginning of the message, e.g. "[validation_error][html_forced]"
+TAGS_REGEX = re.compile(r"^((?:\[\w+\])+)")
+TAG_REGEX = re.compile(r"\[(\w+)\]")
+
+_buffer = threading.local()
+
+
+def get_buffered_events():
+    """
+    Return the list of the events buffered in the current thread. The list is not shared with the processes
+    forked with the buffer (see assessment/organisation_export.py), which would save the events again.
+    """
+    if getattr(_buffer, "pid", None) != os.getpid():
+        _buffer.pid = os.getpid()
+        _buffer.events = []
+    return _buffer.events
+
+
+def emit_event(tag, message="", level=logging.INFO, **data):
+    """
+    Log the message with the tag in the monitoring logger, and save the event with the data
+    :param tag: string, e.g. "evaluation_finished"
+    :param message: string
+    :param level: int, level of the log
+    :param data: data of the event, serializable in json
+    """
+    # The caller of emit_event is logged as the module and function of the message
+    logger.log(level, f"[{tag}] {message}", extra={"event_data": data}, stacklevel=2)
+
+
+def flush_events():
+    """
+    Save the events buffered in the current thread, with one query
+    :return: int, number of events saved
+    """
+    events = get_buffered_events()
+    if not events:
+        return 0
+    events_to_save = events[:]
+    events.clear()
+    try:
+        apps.get_model("home", "MonitoringEvent").objects.bulk_create(events_to_save)
+    except Exception as e:
+        # The events must not break the request, and they cannot be logged as the log would be an event
+        capture_message(
+            f"[monitoring_events_error] {len(events_to_save)} monitoring events could not be saved, error {e}"
+        )
+    return len(events_to_save)
+
+
+def purge_monitoring():
+    """
+    Delete the monitoring events and the counters of the tags of the logs older than MONITORING_RETENTION_DAYS
+    days
+    :return: int, number of rows deleted
+    """
+    retention_days = getattr(settings, "MONITORING_RETENTION_DAYS", 365)
+    limit = datetime.now(tz=timezone.utc) - timedelta(days=retention_days)
+    events_count, _ = (
+        apps.get_model("home", "MonitoringEvent").objects.filter(created_at__lt=limit).delete()
+    )
+    counts_count, _ = (
+        apps.get_model("home", "LogTagCount").objects.filter(date__lt=limit.date()).delete()
+    )
+    return events_count + counts_count
+
+
+# The events logged by the management commands are saved when they end
+atexit.register(flush_events)
+
+
+class MonitoringEventHandler(logging.Handler):
+    """
+    Handler of the monitoring logger which buffers an event for each message beginning with a tag
+    """
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+            match = TAGS_REGEX.match(message)
+            if match is None:
+                return
+            tags = TAG_REGEX.findall(match.group(1))
+            data = dict(getattr(record, "event_data", {}))
+            if len(tags) > 1:
+                data["tags"] = tags
+            # The model is got from the registry as the handler is created with the settings
+            MonitoringEvent = apps.get_model("home", "MonitoringEvent")
+            events = get_buffered_events()
+            events.append(
+                MonitoringEvent(
+                    tag=tags[0],
+                    level=record.levelname,
+                    message=message[match.end() :].strip(),
+                    data=data,
+                    created_at=datetime.fromtimestamp(record.created, tz=timezone.utc),
+                )
+            )
+            if len(events) >= getattr(settings, "MONITORING_EVENTS_BUFFER_SIZE", 100):
+                flush_events()
+        except Exception:
+            self.handleError(record)
+
+
+class MonitoringEventsMiddleware:
+    """
+    Save the monitoring events buffered during the request
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            flush_events()
@@ -0,0 +1,37 @@
+from assessment.models import Evaluation
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Footer, Organisation, PlatformManagement, User
+from .models.footer import invalidate_footer_list
+from .models.platform_management import invalidate_platform_management
+from .stats_rollup import record_stale_day
+
+
+@receiver(post_save, sender=PlatformManagement)
+@receiver(post_delete, sender=PlatformManagement)
+def invalidate_platform_management_on_change(sender, instance, **kwargs):
+    """
+    The platform management object cached is got again after it is modified in the admin
+    """
+    invalidate_platform_management()
+
+
+@receiver(post_save, sender=Footer)
+@receiver(post_delete, sender=Footer)
+def invalidate_footer_list_on_change(sender, instance, **kwargs):
+    """
+    The footer list cached is loaded again after a footer link is added, modified or deleted
+    """
+    invalidate_footer_list()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Organisation)
+@receiver(post_delete, sender=Evaluation)
+def record_stale_day_on_delete(sender, instance, **kwargs):
+    """
+    The daily statistics of the creation day of a deleted user, organisation or evaluation are calculated again
+    at the next rollup (see home/stats_rollup.py)
+    """
+    record_stale_day(instance.created_at)
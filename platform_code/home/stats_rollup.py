@@ -0,0 +1,196 @@
+"""
+Rollup of the daily statistics of the admin dashboards (see home/models/daily_stats.py).
+
+The number of users, organisations and evaluations created each day is counted with one GROUP BY query per
+entity and stored in DailyStats, so the dashboards read a few rows per day instead of the whole tables. The rollup
+is incremental: it calculates again the days from the date of its checkpoint, which was not finished at the last
+rollup, and the days of the evaluations and organisations modified since then (an evaluation may have been
+finished, the sector of an organisation may have changed), and of the users, organisations and evaluations
+deleted since then, recorded in StatsStaleDay by the signals. The rows of these days are deleted and created
+again in a transaction, so the rollup can be run again at any time with the same result.
+
+It is run by the rollup_stats command, and by a background job (see assessment/jobs.py) which the dashboard
+requests when the last rollup is older than STATS_ROLLUP_INTERVAL seconds. The first rollup is run by the
+dashboard itself, as the statistics would all be 0 until the worker runs it.
+"""
+
+import logging
+from datetime import timedelta
+
+from assessment.jobs import enqueue_job
+from assessment.models import Evaluation
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from home.models import (
+    DailyStats,
+    Organisation,
+    StatsRollupCheckpoint,
+    StatsStaleDay,
+    User,
+)
+
+logger = logging.getLogger("monitoring")
+
+JOB_NAME = "rollup_stats"
+
+
+def record_stale_day(created_at):
+    """
+    Record that the daily statistics of the creation day of a deleted object must be calculated again
+    :param created_at: datetime of the creation of the object, or None
+    """
+    day = timezone.localdate(created_at) if created_at is not None else None
+    # A single insert, which does nothing if the day is already recorded (by a concurrent deletion too)
+    StatsStaleDay.objects.bulk_create([StatsStaleDay(date=day)], ignore_conflicts=True)
+
+
+def get_modified_days(last_rollup_at, first_date):
+    """
+    Return the days before the first date whose statistics have changed since the last rollup: the creation days
+    of the evaluations modified, and of the organisations modified and their evaluations
+    :param last_rollup_at: datetime of the last rollup
+    :param first_date: date, first day calculated again anyway
+    :return: set of dates
+    """
+    modified_days = set()
+    for queryset in (
+        Evaluation.objects.filter(
+            Q(updated_at__gte=last_rollup_at) | Q(organisation__updated_at__gte=last_rollup_at)
+        ),
+        Organisation.objects.filter(updated_at__gte=last_rollup_at),
+    ):
+        modified_days.update(
+            queryset.filter(created_at__date__lt=first_date)
+            .annotate(day=TruncDate("created_at"))
+            .order_by()
+            .values_list("day", flat=True)
+            .distinct()
+        )
+    return modified_days
+
+
+def count_created_per_day(days_filter):
+    """
+    Return the daily statistics of the days of the filter, calculated with one query per entity
+    :param days_filter: Q object on created_at, None to calculate all the days
+    :return: list of DailyStats (not saved), the users without creation date are in a row without date
+    """
+    days_filter = days_filter or Q()
+    daily_stats = []
+    users = (
+        User.object.filter(days_filter)
+        .annotate(day=TruncDate("created_at"))
+        .order_by()
+        .values("day")
+        .annotate(count=Count("id"))
+    )
+    for row in users:
+        daily_stats.append(DailyStats(date=row["day"], entity=DailyStats.USER, count=row["count"]))
+    organisations = (
+        Organisation.objects.filter(days_filter)
+        .annotate(day=TruncDate("created_at"))
+        .order_by()
+        .values("day", "sector", "size")
+        .annotate(count=Count("id"))
+    )
+    for row in organisations:
+        daily_stats.append(
+            DailyStats(
+                date=row["day"],
+                entity=DailyStats.ORGANISATION,
+                sector=row["sector"],
+                size=row["size"],
+                count=row["count"],
+            )
+        )
+    evaluations = (
+        Evaluation.objects.filter(days_filter)
+        .annotate(day=TruncDate("created_at"))
+        .order_by()
+        .values(
+            "day",
+            "organisation__sector",
+            "organisation__size",
+            "assessment__version",
+            "is_finished",
+        )
+        .annotate(count=Count("id"))
+    )
+    for row in evaluations:
+        daily_stats.append(
+            DailyStats(
+                date=row["day"],
+                entity=DailyStats.EVALUATION,
+                sector=row["organisation__sector"] or "",
+                size=row["organisation__size"] or "",
+                assessment_version=row["assessment__version"] or "",
+                is_finished=row["is_finished"],
+                count=row["count"],
+            )
+        )
+    return daily_stats
+
+
+def rollup_stats(full=False):
+    """
+    Calculate the daily statistics of the days since the checkpoint, or of all the days if full is True, then
+    move the checkpoint to today
+    :param full: boolean, calculate all the days again
+    :return: int, number of DailyStats rows created
+    """
+    rollup_at = timezone.now()
+    today = timezone.localdate(rollup_at)
+    with transaction.atomic():
+        # The lock prevents two rollups to create the rows of the same days
+        checkpoint = StatsRollupCheckpoint.objects.select_for_update().first()
+        if checkpoint is None:
+            # There is no row to lock before the first rollup, the table is locked instead
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {StatsRollupCheckpoint._meta.db_table} IN EXCLUSIVE MODE"
+                )
+            checkpoint = StatsRollupCheckpoint.objects.select_for_update().first()
+        stale_days = dict(StatsStaleDay.objects.values_list("id", "date"))
+        if full or checkpoint is None:
+            days_filter = None
+            DailyStats.objects.all().delete()
+        else:
+            modified_days = get_modified_days(checkpoint.last_rollup_at, checkpoint.last_date)
+            modified_days.update(day for day in stale_days.values() if day is not None)
+            days_filter = Q(created_at__date__gte=checkpoint.last_date) | Q(
+                created_at__date__in=modified_days
+            )
+            rows_filter = Q(date__gte=checkpoint.last_date) | Q(date__in=modified_days)
+            if None in stale_days.values():
+                days_filter |= Q(created_at__isnull=True)
+                rows_filter |= Q(date__isnull=True)
+            DailyStats.objects.filter(rows_filter).delete()
+        daily_stats = DailyStats.objects.bulk_create(count_created_per_day(days_filter))
+        StatsStaleDay.objects.filter(id__in=list(stale_days)).delete()
+        if checkpoint is None:
+            StatsRollupCheckpoint.objects.create(last_date=today, last_rollup_at=rollup_at)
+        else:
+            checkpoint.last_date = today
+            checkpoint.last_rollup_at = rollup_at
+            checkpoint.save()
+    logger.info(
+        f"[stats_rollup] The daily statistics have been rolled up until {today} "
+        f"({len(daily_stats)} rows, full={full})"
+    )
+    return len(daily_stats)
+
+
+def request_stats_rollup():
+    """
+    Enqueue the job of the rollup if the last rollup is older than STATS_ROLLUP_INTERVAL seconds. If there has
+    been no rollup yet (fresh deployment, worker stopped), it is run now so the statistics are not all 0.
+    """
+    checkpoint = StatsRollupCheckpoint.objects.first()
+    interval = timedelta(seconds=getattr(settings, "STATS_ROLLUP_INTERVAL", 3600))
+    if checkpoint is None:
+        rollup_stats()
+    elif checkpoint.last_rollup_at < timezone.now() - interval:
+        enqueue_job(JOB_NAME)
@@ -1,5 +1,6 @@
 from django import template
 from django.utils.safestring import mark_safe
+from home.authorization import get_authorization_context
 
 register = template.Library()
 
@@ -12,11 +13,7 @@ def get_role(organisation, user):
     :param user: user
     :return: string : "admin" or "read_only"
     """
-    member = organisation.get_membership_user(user)
-    if member:
-        return member.role
-    else:
-        None
+    return get_authorization_context(user).get_role(organisation)
 
 
 @register.filter
@@ -1,11 +1,23 @@
-from assessment.models import Assessment
+from datetime import timedelta
+
+from assessment.models import Assessment, Evaluation
 from assessment.tests.object_creation import (
     create_assessment_body,
     create_evaluation,
     create_scoring,
 )
+from django.core.cache import cache
 from django.test import Client, TestCase
-from home.models import Organisation, User
+from django.urls import reverse
+from django.utils import timezone
+from home.dashboard_stats import (
+    get_cached_stats,
+    get_evaluations_stats,
+    get_organisations_stats,
+    get_users_stats,
+)
+from home.models import DailyStats, Organisation, StatsRollupCheckpoint, StatsStaleDay, User
+from home.stats_rollup import request_stats_rollup, rollup_stats
 
 
 class DashAccessTestCase(TestCase):
@@ -104,3 +116,141 @@ class DashAccessTestCase(TestCase):
     #     self.assertEqual(response.context["nb_evals"], 2)
     #     self.assertEqual(response.context["nb_in_progress_evals"], 2)
     #     self.assertEqual(response.context["nb_users"], 3)
+
+
+class DashboardStatsTestCase(TestCase):
+    """
+    Test the statistics of the dashboard are read from the daily statistics with a few aggregation queries
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.object.create_user("user@test.com", "user_password")
+        create_assessment_body(version="1.0")
+        create_assessment_body(version="2.0")
+        self.assessment = Assessment.objects.get(version="1.0")
+        for i in range(3):
+            organisation = Organisation.create_organisation(
+                name=f"orga_{i}",
+                size=Organisation.SIZE[i][0],
+                country="FR",
+                sector=Organisation.SECTOR[0][0],
+                created_by=self.user,
+            )
+            evaluation = create_evaluation(
+                assessment=self.assessment,
+                name="evaluation",
+                created_by=self.user,
+                organisation=organisation,
+            )
+        evaluation.is_finished = True
+        evaluation.save()
+        rollup_stats()
+
+    def test_organisations_stats(self):
+        with self.assertNumQueries(1):
+            orgas_stats = get_organisations_stats()
+        self.assertEqual(orgas_stats["nb_orgas"], 3)
+        self.assertEqual(orgas_stats["nb_orgas_per_sector"][Organisation.SECTOR[0][1]], 3)
+        self.assertEqual(orgas_stats["nb_orgas_per_sector"][Organisation.SECTOR[1][1]], 0)
+        self.assertEqual(orgas_stats["nb_orgas_per_size"][Organisation.SIZE[2][1]], 1)
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        self.assertEqual(get_organisations_stats(created_after=tomorrow)["nb_orgas"], 0)
+
+    def test_users_stats(self):
+        with self.assertNumQueries(1):
+            users_stats = get_users_stats()
+        self.assertEqual(users_stats["nb_users"], 1)
+        self.assertEqual(users_stats["min_date"], "01-Jan-2020")
+        self.assertEqual(len(users_stats["one_year_users_count"]), 12)
+
+    def test_evaluations_stats(self):
+        # The list of the versions and the counts
+        with self.assertNumQueries(2):
+            evals_stats = get_evaluations_stats(size=Organisation.SIZE[2][0])
+        self.assertEqual(evals_stats["versions_stats"], {"1.0": 1, "2.0": 0})
+        self.assertEqual(evals_stats["nb_evaluations_completed"], 1)
+        self.assertEqual(evals_stats["nb_evaluations_in_progress"], 0)
+        evals_stats = get_evaluations_stats(sector=Organisation.SECTOR[0][0])
+        self.assertEqual(evals_stats["total_nb_evals"], 3)
+        self.assertEqual(evals_stats["nb_evaluations_in_progress"], 2)
+
+    def test_cached_stats(self):
+        get_cached_stats("organisations", get_organisations_stats)
+        with self.assertNumQueries(0):
+            orgas_stats = get_cached_stats("organisations", get_organisations_stats)
+        self.assertEqual(orgas_stats["nb_orgas"], 3)
+
+    def test_rollup_idempotent(self):
+        rows = DailyStats.objects.values_list("entity", "count", "is_finished").order_by("id")
+        previous_rows = list(rows)
+        self.assertEqual(rollup_stats(), len(previous_rows))
+        self.assertEqual(list(rows), previous_rows)
+        self.assertEqual(rollup_stats(full=True), len(previous_rows))
+        self.assertEqual(StatsRollupCheckpoint.objects.count(), 1)
+
+    def test_rollup_modified_day(self):
+        # The evaluation created before the checkpoint and finished after the last rollup is counted again
+        yesterday = timezone.now() - timedelta(days=1)
+        evaluation = Evaluation.objects.filter(is_finished=False).first()
+        Evaluation.objects.filter(id=evaluation.id).update(created_at=yesterday)
+        rollup_stats(full=True)
+        StatsRollupCheckpoint.objects.update(last_date=timezone.localdate())
+        evaluation.refresh_from_db()
+        evaluation.is_finished = True
+        evaluation.save()
+        rollup_stats()
+        self.assertEqual(get_evaluations_stats()["nb_evaluations_completed"], 2)
+        self.assertEqual(
+            DailyStats.objects.get(
+                entity=DailyStats.EVALUATION, date=timezone.localdate(yesterday)
+            ).is_finished,
+            True,
+        )
+
+    def test_rollup_deleted_objects(self):
+        # The evaluation and the organisation created before the checkpoint and deleted are not counted anymore
+        yesterday = timezone.now() - timedelta(days=1)
+        organisation = Organisation.objects.get(name="orga_0")
+        Organisation.objects.filter(id=organisation.id).update(created_at=yesterday)
+        Evaluation.objects.filter(organisation=organisation).update(created_at=yesterday)
+        rollup_stats(full=True)
+        StatsRollupCheckpoint.objects.update(last_date=timezone.localdate())
+        organisation.delete()
+        self.assertEqual(
+            list(StatsStaleDay.objects.values_list("date", flat=True)),
+            [timezone.localdate(yesterday)],
+        )
+        rollup_stats()
+        self.assertEqual(get_organisations_stats()["nb_orgas"], 2)
+        self.assertEqual(get_evaluations_stats()["total_nb_evals"], 2)
+        self.assertFalse(StatsStaleDay.objects.exists())
+
+    def test_users_without_creation_date(self):
+        # The users without creation date are in the total number of users, but not in the months
+        User.object.filter(id=self.user.id).update(created_at=None)
+        rollup_stats(full=True)
+        self.assertIsNone(DailyStats.objects.get(entity=DailyStats.USER).date)
+        self.assertEqual(get_users_stats()["nb_users"], 1)
+        self.assertEqual(get_users_stats(registered_after=timezone.localdate())["nb_users"], 0)
+        self.user.delete()
+        rollup_stats()
+        self.assertEqual(get_users_stats()["nb_users"], 0)
+
+    def test_first_rollup_in_request(self):
+        # Without rollup, the dashboard runs it instead of waiting for the worker
+        StatsRollupCheckpoint.objects.all().delete()
+        DailyStats.objects.all().delete()
+        request_stats_rollup()
+        self.assertEqual(StatsRollupCheckpoint.objects.count(), 1)
+        self.assertEqual(get_organisations_stats()["nb_orgas"], 3)
+
+    def test_first_rollup_dashboard(self):
+        StatsRollupCheckpoint.objects.all().delete()
+        DailyStats.objects.all().delete()
+        User.object.create_superuser("admin@test.com", "admin_password")
+        client = Client()
+        client.login(email="admin@test.com", password="admin_password")
+        response = client.get(reverse("home:admin-dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_organisations_stats()["nb_orgas"], 3)
@@ -4,8 +4,24 @@ from assessment.tests.object_creation import (
     create_evaluation,
     create_scoring,
 )
-from django.test import TestCase
-from home.models import Membership, Organisation, PendingInvitation, PlatformManagement, User
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.test import TestCase, override_settings
+from home.authorization import get_authorization_context
+from home.context_processors import add_footer_list, add_platform_management
+from home.models import (
+    CacheVersion,
+    Footer,
+    Membership,
+    Organisation,
+    PendingInvitation,
+    PlatformManagement,
+    User,
+)
+from home.models.footer import invalidate_footer_list
+from home.models.membership import delete_duplicated_memberships
+from home.models.platform_management import invalidate_platform_management
+from home.versioned_cache import get_cache_version, invalidate_cache, reset_cache_versions
 
 
 class UserTestCase(TestCase):
@@ -288,6 +304,56 @@ class OrganisationMembershipTestCAse(TestCase):
         )
 
 
+class AuthorizationContextTestCase(TestCase):
+    def setUp(self):
+        self.user1 = User.object.create_user(email="user1@test.com", password="test12345")
+        self.user2 = User.object.create_user(email="user2@test.com", password="test12345")
+        self.organisation = Organisation.create_organisation(
+            name="Orga_test",
+            size=Organisation.SIZE[0][0],
+            country="FR",
+            sector=Organisation.SECTOR[0][0],
+            created_by=self.user1,
+        )
+        self.organisation_2 = Organisation.create_organisation(
+            name="Orga_test_2",
+            size=Organisation.SIZE[0][0],
+            country="FR",
+            sector=Organisation.SECTOR[0][0],
+            created_by=self.user2,
+        )
+        self.organisation_2.add_user_to_organisation(user=self.user1, role="read_only")
+
+    def test_roles_loaded_once(self):
+        user = User.object.get(id=self.user1.id)
+        with self.assertNumQueries(1):
+            authorization_context = get_authorization_context(user)
+            self.assertEqual(authorization_context.get_role(self.organisation), "admin")
+            self.assertTrue(authorization_context.is_admin(self.organisation))
+            self.assertTrue(authorization_context.can_edit(self.organisation))
+            self.assertEqual(authorization_context.get_role(self.organisation_2), "read_only")
+            self.assertTrue(get_authorization_context(user).is_member(self.organisation_2))
+            self.assertFalse(get_authorization_context(user).can_edit(self.organisation_2))
+
+    def test_roles_updated_after_membership_change(self):
+        user = User.object.get(id=self.user1.id)
+        self.assertTrue(get_authorization_context(user).is_member(self.organisation_2))
+        self.organisation_2.remove_user_to_organisation(user)
+        self.assertFalse(get_authorization_context(user).is_member(self.organisation_2))
+        self.organisation_2.add_user_to_organisation(user=user, role="editor")
+        self.assertTrue(get_authorization_context(user).can_edit(self.organisation_2))
+
+    def test_membership_unique(self):
+        with self.assertRaises(IntegrityError):
+            Membership.objects.create(
+                user=self.user1, organisation=self.organisation, role="editor"
+            )
+
+    def test_delete_duplicated_memberships(self):
+        self.assertEqual(delete_duplicated_memberships(Membership), 0)
+        self.assertEqual(Membership.objects.filter(user=self.user1).count(), 2)
+
+
 class OrganisationEvaluationTestCAse(TestCase):
     def setUp(self):
         self.user1 = User.object.create_user(email="user1@test.com", password="test12345")
@@ -388,6 +454,11 @@ class TestPendingInvitation(TestCase):
 
 
 class TestPlatformManagement(TestCase):
+    def setUp(self):
+        # The objects cached must not be kept for the next tests, as their changes are rolled back
+        self.addCleanup(invalidate_platform_management)
+        self.addCleanup(invalidate_footer_list)
+
     def test_platform_management_get_or_create(self):
         self.assertFalse(PlatformManagement.objects.all())  # No objects
         platform_management = PlatformManagement.get_or_create()
@@ -399,3 +470,78 @@ class TestPlatformManagement(TestCase):
     def test_platform_management_name(self):
         platform_management = PlatformManagement.get_or_create()
         self.assertEqual(str(platform_management), "Platform management")
+
+    def test_platform_management_cached(self):
+        # The objects may have been cached by the previous tests
+        invalidate_platform_management()
+        invalidate_footer_list()
+        add_platform_management(None)
+        add_footer_list(None)
+        with self.assertNumQueries(0):
+            context = add_platform_management(None)
+            footer_context = add_footer_list(None)
+            self.assertEqual(PlatformManagement.get_labelling_threshold(), 45)
+        self.assertEqual(context["platform_management"], PlatformManagement.objects.first())
+        self.assertEqual(footer_context["footer_list"], [])
+
+    def test_platform_management_cache_invalidated(self):
+        platform_management = PlatformManagement.get_or_create()
+        self.assertEqual(PlatformManagement.get_labelling_threshold(), 45)
+        platform_management.set_labelling_threshold(60)
+        self.assertEqual(PlatformManagement.get_labelling_threshold(), 60)
+        add_footer_list(None)
+        footer = Footer.objects.create(
+            logo="logo/logo.png", link="https://test.com", name="test"
+        )
+        self.assertEqual(add_footer_list(None)["footer_list"], [footer])
+        footer.delete()
+        self.assertEqual(add_footer_list(None)["footer_list"], [])
+
+    def test_platform_management_invalidated_by_other_process(self):
+        PlatformManagement.get_or_create()
+        self.assertEqual(PlatformManagement.get_labelling_threshold(), 45)
+        # An other process modifies the object and renews the version of the cache in the database
+        PlatformManagement.objects.update(labelling_threshold=60)
+        CacheVersion.objects.filter(name="platform_management").update(version=F("version") + 1)
+        # The versions are kept by the process during CACHE_VERSIONS_TTL seconds
+        self.assertEqual(PlatformManagement.get_labelling_threshold(), 45)
+        reset_cache_versions()
+        self.assertEqual(PlatformManagement.get_labelling_threshold(), 60)
+
+    def test_cache_versions_ttl(self):
+        get_cache_version("footer")
+        # The versions are not loaded again during CACHE_VERSIONS_TTL seconds
+        with self.assertNumQueries(0):
+            get_cache_version("footer")
+        # An other process renews the version
+        CacheVersion.objects.filter(name="footer").update(version=F("version") + 1)
+        with override_settings(CACHE_VERSIONS_TTL=0):
+            self.assertEqual(
+                get_cache_version("footer"), CacheVersion.objects.get(name="footer").version
+            )
+
+    def test_invalidations_batched_in_transaction(self):
+        get_cache_version("footer")
+        with transaction.atomic():
+            invalidate_cache("footer")
+            version = get_cache_version("footer")
+            invalidate_cache("footer")
+            # The version has been read since the last invalidation, so it has been renewed
+            self.assertNotEqual(get_cache_version("footer"), version)
+            invalidate_cache("footer")
+            # The version has not been read since the last invalidation
+            with self.assertNumQueries(0):
+                invalidate_cache("footer")
+                invalidate_cache("footer")
+
+    def test_invalidation_rolled_back(self):
+        version = get_cache_version("footer")
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                invalidate_cache("footer")
+                self.assertNotEqual(get_cache_version("footer"), version)
+                raise IntegrityError
+        self.assertEqual(get_cache_version("footer"), version)
+        # The renewal has been rolled back, so the version is renewed again
+        with self.assertNumQueries(1):
+            invalidate_cache("footer")
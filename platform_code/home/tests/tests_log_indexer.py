@@ -0,0 +1,64 @@
+import os
+import tempfile
+from datetime import date
+
+from django.test import TestCase, override_settings
+from home.log_indexer import index_logs
+from home.models import LogTagCount
+
+LOG_FILE = os.path.join(tempfile.gettempdir(), "test_log_indexer.log")
+
+
+def log_line(day, tag):
+    return f"{day} 10:00:00 [INFO] (views.login) [{tag}] The user user@test.com is connected\n"
+
+
+@override_settings(
+    LOGGING={"version": 1, "handlers": {"file": {"filename": LOG_FILE, "backupCount": 2}}}
+)
+class LogIndexerTestCase(TestCase):
+    """
+    Test the tags of the logs are counted once per line, across the rotations of the log file
+    """
+
+    def setUp(self):
+        self.addCleanup(self.delete_log_files)
+
+    def delete_log_files(self):
+        for path in (LOG_FILE, f"{LOG_FILE}.1", f"{LOG_FILE}.2"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write(self, text, path=LOG_FILE):
+        with open(path, "a") as file:
+            file.write(text)
+
+    def get_count(self, day, tag):
+        log_tag_count = LogTagCount.objects.filter(date=day, tag=tag).first()
+        return log_tag_count.count if log_tag_count else 0
+
+    def test_incremental_index(self):
+        self.write(log_line("2026-10-01", "user_connection") * 3)
+        self.write("Traceback (most recent call last):\n")
+        self.write(log_line("2026-10-02", "error_404"))
+        self.assertEqual(index_logs(), 4)
+        # The lines already indexed are not counted again, the incomplete line is counted once complete
+        self.write(log_line("2026-10-02", "user_connection")[:20])
+        self.assertEqual(index_logs(), 0)
+        self.write(log_line("2026-10-02", "user_connection")[20:])
+        self.assertEqual(index_logs(), 1)
+        self.assertEqual(self.get_count(date(2026, 10, 1), "user_connection"), 3)
+        self.assertEqual(self.get_count(date(2026, 10, 2), "user_connection"), 1)
+        self.assertEqual(self.get_count(date(2026, 10, 2), "error_404"), 1)
+        self.assertEqual(self.get_count(date(2026, 10, 2), "INFO"), 0)
+
+    def test_rotation(self):
+        self.write(log_line("2026-10-01", "user_connection"))
+        index_logs()
+        # Lines written before the rotation, then in the new file
+        self.write(log_line("2026-10-01", "user_connection"))
+        os.rename(LOG_FILE, f"{LOG_FILE}.1")
+        self.write(log_line("2026-10-02", "user_connection"))
+        self.assertEqual(index_logs(), 2)
+        self.assertEqual(self.get_count(date(2026, 10, 1), "user_connection"), 2)
+        self.assertEqual(self.get_count(date(2026, 10, 2), "user_connection"), 1)
@@ -0,0 +1,71 @@
+import logging
+from datetime import date, timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from home.models import LogTagCount, MonitoringEvent
+from home.monitoring_events import (
+    emit_event,
+    flush_events,
+    get_buffered_events,
+    purge_monitoring,
+)
+
+logger = logging.getLogger("monitoring")
+
+
+class MonitoringEventsTestCase(TestCase):
+    """
+    Test the messages of the monitoring logger are saved as events by batches
+    """
+
+    def setUp(self):
+        get_buffered_events().clear()
+
+    def test_tagged_messages_buffered(self):
+        logger.info("[user_connection] The user user@test.com has logged in")
+        logger.info("[validation_error][html_forced] The user user@test.com tried to validate")
+        logger.info("A message without tag")
+        self.assertFalse(MonitoringEvent.objects.exists())
+        with self.assertNumQueries(1):
+            self.assertEqual(flush_events(), 2)
+        event = MonitoringEvent.objects.get(tag="user_connection")
+        self.assertEqual(event.level, "INFO")
+        self.assertEqual(event.message, "The user user@test.com has logged in")
+        self.assertEqual(
+            MonitoringEvent.objects.get(tag="validation_error").data,
+            {"tags": ["validation_error", "html_forced"]},
+        )
+        self.assertEqual(flush_events(), 0)
+
+    def test_emit_event(self):
+        emit_event("evaluation_finished", "The evaluation is finished", evaluation_id=1)
+        flush_events()
+        event = MonitoringEvent.objects.get()
+        self.assertEqual(event.tag, "evaluation_finished")
+        self.assertEqual(event.data, {"evaluation_id": 1})
+
+    def test_emit_event_call_site(self):
+        with self.assertLogs("monitoring", level="INFO") as logs:
+            emit_event("user_connection")
+        self.assertEqual(logs.records[0].funcName, "test_emit_event_call_site")
+
+    @override_settings(MONITORING_EVENTS_BUFFER_SIZE=2)
+    def test_buffer_full(self):
+        emit_event("user_connection")
+        self.assertEqual(MonitoringEvent.objects.count(), 0)
+        emit_event("user_connection")
+        self.assertEqual(MonitoringEvent.objects.count(), 2)
+        self.assertEqual(get_buffered_events(), [])
+
+    @override_settings(MONITORING_RETENTION_DAYS=30)
+    def test_purge_monitoring(self):
+        MonitoringEvent.objects.create(
+            tag="user_connection", level="INFO", created_at=timezone.now() - timedelta(days=31)
+        )
+        MonitoringEvent.objects.create(tag="user_connection", level="INFO")
+        LogTagCount.objects.create(date=date.today() - timedelta(days=31), tag="error_404", count=2)
+        LogTagCount.objects.create(date=date.today(), tag="error_404", count=1)
+        self.assertEqual(purge_monitoring(), 2)
+        self.assertEqual(MonitoringEvent.objects.count(), 1)
+        self.assertEqual(LogTagCount.objects.get().count, 1)
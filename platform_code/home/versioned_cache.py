@@ -0,0 +1,169 @@
+"""
+Cache of the values computed from the database and read very often (platform management object, footer links,
+scoring plans, condition indexes...), consistent between all the processes and containers.
+
+Each family of values (e.g. "scoring_plan") has a version stored in CacheVersion, renewed by invalidate_cache when
+the objects the values are computed from are modified (see the signals). The values are cached in the Django cache
+with the version of their family in the key, so a value computed before an invalidation is not served anymore by
+any process, whatever the cache backend. The versions are loaded with one query by process, at their first use
+after CACHE_VERSIONS_TTL seconds, so the requests do not query them each time, and a value invalidated by an
+other process is served at most CACHE_VERSIONS_TTL seconds more. The versions are loaded again right away after an
+invalidation in the process and at the beginning of each background job (see reset_cache_versions). The values
+are also kept in the process with their version, so the hot paths (e.g. the scoring of each evaluation element)
+do not unpickle them at each call.
+The values must not be modified, as they are shared by the threads of the process.
+
+Inside a transaction, the new versions are only seen by the other processes once it is committed, so a family is
+invalidated again only if its version has been read since its last invalidation in the transaction: saving many
+objects in one transaction (an import, a form of the admin with its inlines) renews each version once instead of
+at each save (see TransactionVersions).
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+# Versions loaded in the process, with the names of the families as keys, and monotonic time of their loading
+_versions = SimpleNamespace(dic=None, loaded_at=0.0)
+# Values used in the process, with (name, key) as keys and (version, value) as values
+_values = {}
+# Versions renewed in the current transaction of the thread, see TransactionVersions
+_transaction_versions = threading.local()
+
+
+class TransactionVersions:
+    """
+    Versions renewed in a transaction by the current thread, with the names of the families as keys, used instead
+    of the versions loaded in the process until the transaction is committed, as they are not seen by the other
+    threads and processes before. The object is registered as a callback of the commit, which makes the process
+    load the versions again, and Django drops it with the other callbacks when the transaction, or the savepoint in
+    which it was created, is rolled back, so it is only used while it is registered (see get_transaction_versions).
+    """
+
+    def __init__(self):
+        self.dic = {}
+        # Families whose version has been read since their last invalidation in the transaction
+        self.read_names = set()
+
+    def __call__(self):
+        reset_cache_versions()
+
+
+def get_transaction_versions(create=False):
+    """
+    Return the versions renewed in the current transaction, None outside a transaction or if no version has been
+    renewed in it and create is False
+    :param create: boolean, True to create them if needed
+    :return: TransactionVersions or None
+    """
+    if not connection.in_atomic_block:
+        return None
+    transaction_versions = getattr(_transaction_versions, "current", None)
+    if transaction_versions is not None:
+        if any(callback[1] is transaction_versions for callback in connection.run_on_commit):
+            return transaction_versions
+        # The transaction has been committed or rolled back
+        _transaction_versions.current = None
+    if not create:
+        return None
+    transaction_versions = TransactionVersions()
+    transaction.on_commit(transaction_versions)
+    _transaction_versions.current = transaction_versions
+    return transaction_versions
+
+
+def reset_cache_versions():
+    """
+    Forget the versions loaded in the process, and the versions renewed in the current transaction, so they are
+    loaded again at their next use. Called after an invalidation outside a transaction, after the commit of a
+    transaction renewing versions and at the beginning of each background job.
+    """
+    _versions.dic = None
+    _transaction_versions.current = None
+
+
+def get_cache_version(name):
+    """
+    Return the version of the family of values. The version of a family which has none yet is created.
+    :param name: string, e.g. "scoring_plan"
+    :return: int
+    """
+    transaction_versions = get_transaction_versions()
+    if transaction_versions is not None and name in transaction_versions.dic:
+        transaction_versions.read_names.add(name)
+        return transaction_versions.dic[name]
+
+    CacheVersion = apps.get_model("home", "CacheVersion")
+    now = time.monotonic()
+    versions = _versions.dic
+    ttl = getattr(settings, "CACHE_VERSIONS_TTL", 5)
+    if versions is None or now - _versions.loaded_at > ttl:
+        versions = {
+            name_: version
+            for name_, version in CacheVersion.objects.values_list("name", "version")
+            # The versions renewed in the transaction are not shared with the other threads before it is committed
+            if transaction_versions is None or name_ not in transaction_versions.dic
+        }
+        _versions.dic, _versions.loaded_at = versions, now
+    if name not in versions:
+        cache_version, _ = CacheVersion.objects.get_or_create(
+            name=name, defaults={"version": time.time_ns()}
+        )
+        versions[name] = cache_version.version
+    return versions[name]
+
+
+def invalidate_cache(name):
+    """
+    Renew the version of the family of values, so the values cached before are not served anymore by any process.
+    Inside a transaction, the version is not renewed again if it has not been read since its last renewal in the
+    transaction, as no value has been cached with it (see TransactionVersions).
+    :param name: string, e.g. "scoring_plan"
+    """
+    transaction_versions = get_transaction_versions(create=True)
+    if (
+        transaction_versions is not None
+        and name in transaction_versions.dic
+        and name not in transaction_versions.read_names
+    ):
+        return
+    CacheVersion = apps.get_model("home", "CacheVersion")
+    version = time.time_ns()
+    if not CacheVersion.objects.filter(name=name).update(version=version):
+        CacheVersion.objects.update_or_create(name=name, defaults={"version": version})
+    if transaction_versions is None:
+        reset_cache_versions()
+    else:
+        transaction_versions.dic[name] = version
+        transaction_versions.read_names.discard(name)
+
+
+def get_cached_value(name, key, compute, cache_in_transaction=True):
+    """
+    Return the value of the family for the key from the cache if it has been computed for the current version of
+    the family, else it is computed and cached for VERSIONED_CACHE_TIMEOUT seconds
+    :param name: string, name of the family, e.g. "scoring_plan"
+    :param key: string or int identifying the value in the family, e.g. the assessment id
+    :param compute: function without argument returning the value, which must be picklable and not None
+    :param cache_in_transaction: boolean, False if a value computed inside a transaction must not be cached, as the
+    objects it is computed from may be rolled back
+    :return: value
+    """
+    version = get_cache_version(name)
+    value_version, value = _values.get((name, key), (None, None))
+    if value_version == version:
+        return value
+    cache_key = f"versioned_cache:{name}:{key}:{version}"
+    value = cache.get(cache_key)
+    if value is None:
+        value = compute()
+        if connection.in_atomic_block and not cache_in_transaction:
+            return value
+        cache.set(cache_key, value, getattr(settings, "VERSIONED_CACHE_TIMEOUT", 3600))
+    _values[(name, key)] = (version, value)
+    return value
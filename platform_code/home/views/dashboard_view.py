@@ -1,19 +1,25 @@
-import calendar
 import json
 from datetime import datetime
 
-from assessment.models import Assessment, Evaluation, Labelling
+from assessment.models import Labelling
 from django.http import HttpResponse
 from django.shortcuts import redirect
 from django.utils.translation import gettext as _
 from django.views.generic import TemplateView
+from home.dashboard_stats import (
+    get_cached_stats,
+    get_evaluations_stats,
+    get_organisations_stats,
+    get_users_stats,
+)
 from home.forms import (
     DashboardEvaluationsStatsTabFilterForm,
     DashboardOrganisationsStatsTabFilterForm,
     DashboardUsersStatsTabFilterForm,
     LabellingStatusForm,
 )
-from home.models import Organisation, PlatformManagement, User
+from home.models import PlatformManagement
+from home.stats_rollup import request_stats_rollup
 
 
 class DashboardView(TemplateView):
@@ -55,6 +61,9 @@ class DashboardView(TemplateView):
         self.organisations_filters.clear()
         self.evaluations_filters.clear()
 
+        # the stats are read from the daily statistics, which are rolled up by the worker
+        request_stats_rollup()
+
         # initialize the stats and graphs for each dashboard tab
         # users
         users_stats = self.get_users_stats()
@@ -253,240 +262,46 @@ class DashboardView(TemplateView):
         """
         - Return the number of organisations based on the filters
         """
-        orgas_stats = {"nb_orgas_per_sector": {}, "nb_orgas_per_size": {}}
-
-        if not self.organisations_filters:
-            # no filters to apply, return the total number of organisations
-            orgas_stats["nb_orgas"] = Organisation.objects.all().count()
-
-            # number of organisations per sector
-            for sector_tuple in Organisation.SECTOR:
-                orgas_stats["nb_orgas_per_sector"][
-                    sector_tuple[1]
-                ] = Organisation.objects.filter(sector=sector_tuple[0]).count()
-
-            # number of organisations per size
-            for size_tuple in Organisation.SIZE:
-                orgas_stats["nb_orgas_per_size"][size_tuple[1]] = Organisation.objects.filter(
-                    size=size_tuple[1]
-                ).count()
-
-        else:
-            # apply filters here
-            # organisation creation date
-            orgas_stats["nb_orgas"] = Organisation.objects.filter(
-                created_at__gte=self.organisations_filters["creation_date"]
-            ).count()
-
-            # number of organisations per sector
-            for sector_tuple in Organisation.SECTOR:
-                orgas_stats["nb_orgas_per_sector"][
-                    sector_tuple[1]
-                ] = Organisation.objects.filter(
-                    sector=sector_tuple[0],
-                    created_at__gte=self.organisations_filters["creation_date"],
-                ).count()
-
-            # number of organisations per size
-            for size_tuple in Organisation.SIZE:
-                orgas_stats["nb_orgas_per_size"][size_tuple[1]] = Organisation.objects.filter(
-                    size=size_tuple[1],
-                    created_at__gte=self.organisations_filters["creation_date"],
-                ).count()
-
-        return orgas_stats
+        created_after = None
+        if self.organisations_filters:
+            created_after = datetime.strptime(
+                self.organisations_filters["creation_date"], "%Y-%m-%d %H:%M:%S"
+            ).date()
+        return get_cached_stats(
+            "organisations", get_organisations_stats, created_after=created_after
+        )
 
     def get_users_stats(self):
         """
         Return the number of users based on the filters and call corresponding graph functions
         """
-        users_stats = {"one_year_users_count": {}}
-
-        if not self.users_filters:
-            # no filters to apply, return the total number of users
-            users_stats["nb_users"] = User.object.all().count()
-
-            min_date = datetime(2020, 1, 1)
-            users_stats["min_date"] = min_date.strftime("%d-%b-%Y")
-            for i in range(12):
-                date_to_filter_by = take_n_month_steps(min_date, i)
-                users_stats["one_year_users_count"][
-                    date_to_filter_by.strftime("%B-%Y")
-                ] = User.object.filter(created_at__lte=date_to_filter_by).count()
-
-        else:
-            # apply filter
-            users_stats["nb_users"] = User.object.filter(
-                created_at__gte=self.users_filters["Inscription_date"]
-            ).count()
-
-            submitted_date = datetime.strptime(
+        registered_after = None
+        if self.users_filters:
+            registered_after = datetime.strptime(
                 self.users_filters["Inscription_date"], "%Y-%m-%d %H:%M:%S"
-            )
-            users_stats["min_date"] = submitted_date.strftime("%d-%b-%Y")
-            submitted_date_end_month = datetime(
-                int(submitted_date.year),
-                int(submitted_date.month),
-                int(calendar.monthrange(submitted_date.year, submitted_date.month)[1]),
-                23,
-                59,
-                59,
-            )
-
-            for i in range(12):
-                date_to_filter_by = take_n_month_steps(submitted_date_end_month, i)
-                users_stats["one_year_users_count"][
-                    date_to_filter_by.strftime("%B-%Y")
-                ] = User.object.filter(created_at__lte=date_to_filter_by).count()
-
-        return users_stats
+            ).date()
+        return get_cached_stats("users", get_users_stats, registered_after=registered_after)
 
     def get_evaluations_stats(self):
         """
         Return the number of evaluations based on the filters(date,sector,size)
         """
-        evals_stats = {"versions_stats": {}}
-        versions = Assessment.objects.values("version")
-
         if not self.evaluations_filters:
             # no filters to apply, return the total number of evaluations
-            # number of evaluations per status
-            evals_stats["nb_evaluations_completed"] = Evaluation.objects.filter(
-                is_finished=True
-            ).count()
-            evals_stats["nb_evaluations_in_progress"] = Evaluation.objects.filter(
-                is_finished=False
-            ).count()
-
-            # number of evaluations per version
-            for version in versions:
-                evals_stats["versions_stats"][version["version"]] = Evaluation.objects.filter(
-                    assessment=Assessment.objects.get(version=version["version"])
-                ).count()
-            evals_stats["eval_creation_date"] = "01-01-2020"
-
-        else:
-            # apply the filters
-            evals_stats["eval_creation_date"] = self.evaluations_filters["date_raw"].strftime(
-                "%d-%m-%Y"
-            )
-            if self.evaluations_filters["sectors"] == _(
-                "all sectors"
-            ) and self.evaluations_filters["sizes"] == _("all sizes"):
-                # number of evaluations per version for all sectors and all sizes
-                for version in versions:
-                    evals_stats["versions_stats"][
-                        version["version"]
-                    ] = Evaluation.objects.filter(
-                        assessment__version=version["version"],
-                        created_at__gte=self.evaluations_filters["date"],
-                    ).count()
-                # number of evaluations per status for all sectors and all sizes
-                evals_stats["nb_evaluations_completed"] = Evaluation.objects.filter(
-                    is_finished=True, created_at__gte=self.evaluations_filters["date"]
-                ).count()
-                evals_stats["nb_evaluations_in_progress"] = Evaluation.objects.filter(
-                    is_finished=False, created_at__gte=self.evaluations_filters["date"]
-                ).count()
-            elif self.evaluations_filters["sectors"] == _(
-                "all sectors"
-            ) and self.evaluations_filters["sizes"] != _("all sizes"):
-                # number of evaluations per versions for all sectors but for a specified size
-                for version in versions:
-                    evals_stats["versions_stats"][
-                        version["version"]
-                    ] = Evaluation.objects.filter(
-                        assessment__version=version["version"],
-                        organisation__size=self.evaluations_filters["sizes"],
-                        created_at__gte=self.evaluations_filters["date"],
-                    ).count()
-                # number of evaluations per status for all sectors but for a specified size
-                evals_stats["nb_evaluations_completed"] = Evaluation.objects.filter(
-                    is_finished=True,
-                    created_at__gte=self.evaluations_filters["date"],
-                    organisation__size=self.evaluations_filters["sizes"],
-                ).count()
-                evals_stats["nb_evaluations_in_progress"] = Evaluation.objects.filter(
-                    is_finished=False,
-                    created_at__gte=self.evaluations_filters["date"],
-                    organisation__size=self.evaluations_filters["sizes"],
-                ).count()
-            elif self.evaluations_filters["sectors"] != _(
-                "all sectors"
-            ) and self.evaluations_filters["sizes"] == _("all sizes"):
-                # number of evaluations per versions for all sizes but for a specified sector
-                for version in versions:
-                    evals_stats["versions_stats"][
-                        version["version"]
-                    ] = Evaluation.objects.filter(
-                        assessment__version=version["version"],
-                        organisation__sector=self.evaluations_filters["sectors"],
-                        created_at__gte=self.evaluations_filters["date"],
-                    ).count()
-                # number of evaluations per status for all sizes but for a specified sector
-                evals_stats["nb_evaluations_completed"] = Evaluation.objects.filter(
-                    is_finished=True,
-                    created_at__gte=self.evaluations_filters["date"],
-                    organisation__sector=self.evaluations_filters["sectors"],
-                ).count()
-                evals_stats["nb_evaluations_in_progress"] = Evaluation.objects.filter(
-                    is_finished=False,
-                    created_at__gte=self.evaluations_filters["date"],
-                    organisation__sector=self.evaluations_filters["sectors"],
-                ).count()
-            else:
-                # number of evaluations per version for a specified sector and a size
-                for version in versions:
-                    evals_stats["versions_stats"][
-                        version["version"]
-                    ] = Evaluation.objects.filter(
-                        assessment__version=version["version"],
-                        organisation__sector=self.evaluations_filters["sectors"],
-                        organisation__size=self.evaluations_filters["sizes"],
-                        created_at__gte=self.evaluations_filters["date"],
-                    ).count()
-                # number of evaluations per status for a specified sector and a size
-                evals_stats["nb_evaluations_completed"] = Evaluation.objects.filter(
-                    is_finished=True,
-                    created_at__gte=self.evaluations_filters["date"],
-                    organisation__sector=self.evaluations_filters["sectors"],
-                    organisation__size=self.evaluations_filters["sizes"],
-                ).count()
-                evals_stats["nb_evaluations_in_progress"] = Evaluation.objects.filter(
-                    is_finished=False,
-                    created_at__gte=self.evaluations_filters["date"],
-                    organisation__sector=self.evaluations_filters["sectors"],
-                    organisation__size=self.evaluations_filters["sizes"],
-                ).count()
-        evals_stats["total_nb_evals"] = (
-            evals_stats["nb_evaluations_completed"] + evals_stats["nb_evaluations_in_progress"]
+            evals_stats = get_cached_stats("evaluations", get_evaluations_stats)
+            return {**evals_stats, "eval_creation_date": "01-01-2020"}
+
+        # "all sectors" and "all sizes" do not filter the evaluations
+        sector = self.evaluations_filters["sectors"]
+        size = self.evaluations_filters["sizes"]
+        evals_stats = get_cached_stats(
+            "evaluations",
+            get_evaluations_stats,
+            created_after=self.evaluations_filters["date_raw"],
+            sector=None if sector == _("all sectors") else sector,
+            size=None if size == _("all sizes") else size,
         )
-        return evals_stats
-
-
-def take_n_month_steps(date, nb_steps):
-    """
-    This function takes a "date" as a parameter then adds or subtracts "nb_steps" months from it (depending
-    on the sign of nb_steps), It returns the resulting date
-    """
-    m, y = (date.month + nb_steps) % 12, date.year + (date.month + nb_steps - 1) // 12
-    if not m:
-        m = 12
-    d = min(
-        date.day,
-        [
-            31,
-            29 if y % 4 == 0 and (not y % 100 == 0 or y % 400 == 0) else 28,
-            31,
-            30,
-            31,
-            30,
-            31,
-            31,
-            30,
-            31,
-            30,
-            31,
-        ][m - 1],
-    )
-    return date.replace(day=d, month=m, year=y)
+        return {
+            **evals_stats,
+            "eval_creation_date": self.evaluations_filters["date_raw"].strftime("%d-%m-%Y"),
+        }
@@ -22,6 +22,7 @@ from django.utils.translation import gettext as _
 from django.utils.translation import ngettext
 from home.forms import PasswordResetForm_, SignUpForm
 from home.models import Membership, PendingInvitation, User, UserResources
+from home.monitoring_events import emit_event
 from sentry_sdk import set_user
 
 logger = logging.getLogger("monitoring")
@@ -76,7 +77,9 @@ class HomepageView(LoginView):
             if user is not None and user.active:
                 login(self.request, user)
                 set_user({"email": email})
-                logger.info(f"[user_connection] The user {user.email} has logged in")
+                emit_event(
+                    "user_connection", f"The user {user.email} has logged in", user_id=user.id
+                )
                 return HttpResponseRedirect(self.get_success_url())
             else:
                 return redirect("home:homepage")
@@ -1,5 +1,3 @@
-import logging
-
 from assessment.models import (
     Assessment,
     ElementChangeLog,
@@ -9,10 +7,9 @@ from assessment.models import (
 )
 from django.utils.translation import gettext as _
 from home.models import Organisation, UserResources
+from home.monitoring_events import emit_event
 from sentry_sdk import capture_message
 
-logger = logging.getLogger("monitoring")
-
 
 def organisation_required_message(context):
     """
@@ -51,9 +48,12 @@ def organisation_creation(request, form):
         sector=sector,
         created_by=user,
     )
-    logger.info(
-        f"[organisation_creation] A new organisation {organisation.name} has been created by "
-        f"the user {user.email}"
+    emit_event(
+        "organisation_creation",
+        f"A new organisation {organisation.name} has been created by the user {user.email}",
+        organisation_id=organisation.id,
+        sector=organisation.sector,
+        size=organisation.size,
     )
     return organisation
 
@@ -95,11 +95,10 @@ def add_last_version_last_assessment_dictionary(dictionary):
     :returns: dict
     """
     if isinstance(dictionary, dict):
-        if get_last_assessment_created():
-            dictionary[
-                "last_version"
-            ] = get_last_assessment_created().version  # get last version
-            dictionary["last_assessment"] = get_last_assessment_created()
+        last_assessment = get_last_assessment_created()
+        if last_assessment:
+            dictionary["last_version"] = last_assessment.version  # get last version
+            dictionary["last_assessment"] = last_assessment
         else:
             dictionary["last_version"] = []
     return dictionary